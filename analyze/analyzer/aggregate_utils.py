@@ -0,0 +1,454 @@
+"""
+Cross-run aggregation utilities
+Gộp kết quả nhiều lần chạy (sweep) thành một bảng cột: group-by, pivot, mean/CI
+"""
+
+import csv
+import json
+import math
+import os
+import re
+from pathlib import Path
+import numpy as np
+from .data_utils import parse_summary, parse_flow_stats, SUFFIX_EXTENSIONS
+from .flow_utils import split_data_flows
+from .fairness_utils import flow_jain_index
+
+
+MANIFEST_NAME = 'sweep_manifest.json'
+
+# Metric lấy từ summary file (thứ tự cột trong bảng)
+RUN_METRICS = [
+    'total_throughput', 'avg_throughput', 'loss_rate', 'avg_delay',
+    'total_tx', 'total_rx', 'total_lost',
+    'state_changes', 'dup_acks', 'fast_retransmits', 'fast_recoveries', 'timeouts',
+    'num_flows', 'jain_index', 'stop_time', 'converged',
+]
+
+# Giá trị tới hạn t hai phía (df = 1..30), df lớn hơn dùng bảng thưa + phân phối chuẩn
+T_CRITICAL = {
+    0.90: [6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+           1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+           1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697],
+    0.95: [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+           2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+           2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042],
+    0.99: [63.657, 9.925, 5.841, 4.604, 4.032, 3.707, 3.499, 3.355, 3.250, 3.169,
+           3.106, 3.055, 3.012, 2.977, 2.947, 2.921, 2.898, 2.878, 2.861, 2.845,
+           2.831, 2.819, 2.807, 2.797, 2.787, 2.779, 2.771, 2.763, 2.756, 2.750],
+}
+T_CRITICAL_LARGE_DF = {
+    0.90: [(40, 1.684), (60, 1.671), (120, 1.658), (math.inf, 1.645)],
+    0.95: [(40, 2.021), (60, 2.000), (120, 1.980), (math.inf, 1.960)],
+    0.99: [(40, 2.704), (60, 2.660), (120, 2.617), (math.inf, 2.576)],
+}
+
+# Hệ số đơn vị cho tham số dạng số + đơn vị (vd 5Mbps, 10ms)
+UNIT_SCALE = {
+    'bps': 1.0, 'kbps': 1e3, 'mbps': 1e6, 'gbps': 1e9,
+    's': 1.0, 'ms': 1e-3, 'us': 1e-6, 'ns': 1e-9,
+    'b': 1.0, 'kb': 1e3, 'mb': 1e6,
+    'p': 1.0, 'pkt': 1.0, 'pkts': 1.0, 'packets': 1.0,
+}
+
+_QUANTITY_RE = re.compile(r'^\s*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)\s*([A-Za-z]*)\s*$')
+
+
+def parse_quantity(value):
+    """
+    Đổi giá trị tham số sang số thực theo đơn vị cơ sở
+
+    vd "5Mbps" -> 5e6, "10ms" -> 0.01, "25" -> 25.0
+
+    Returns:
+        float: Giá trị, hoặc nan nếu không phải số
+    """
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    match = _QUANTITY_RE.match(str(value))
+    if not match:
+        return math.nan
+    unit = match.group(2).lower()
+    if unit and unit not in UNIT_SCALE:
+        return math.nan
+    return float(match.group(1)) * UNIT_SCALE.get(unit, 1.0)
+
+
+def sort_values(values):
+    """Sắp xếp giá trị tham số theo số (5Mbps < 10Mbps), không phải số thì theo chuỗi"""
+    return sorted(values, key=lambda v: (math.isnan(parse_quantity(v)),
+                                         parse_quantity(v), str(v)))
+
+
+def t_critical(df, confidence=0.95):
+    """
+    Giá trị tới hạn t hai phía cho khoảng tin cậy
+
+    Args:
+        df (int): Bậc tự do (n - 1)
+        confidence (float): 0.90, 0.95 hoặc 0.99
+
+    Returns:
+        float: t, hoặc nan nếu df < 1
+    """
+    if confidence not in T_CRITICAL:
+        raise ValueError(f"Độ tin cậy phải là một trong {sorted(T_CRITICAL)}")
+    if df < 1:
+        return math.nan
+    if df <= 30:
+        return T_CRITICAL[confidence][int(df) - 1]
+    lo_df, lo_t = 30, T_CRITICAL[confidence][-1]
+    for hi_df, hi_t in T_CRITICAL_LARGE_DF[confidence]:
+        if df <= hi_df:
+            if math.isinf(hi_df):
+                return hi_t
+            # Nội suy theo 1/df (chính xác hơn nội suy tuyến tính theo df)
+            w = (1.0 / lo_df - 1.0 / df) / (1.0 / lo_df - 1.0 / hi_df)
+            return lo_t + w * (hi_t - lo_t)
+        lo_df, lo_t = hi_df, hi_t
+    return T_CRITICAL_LARGE_DF[confidence][-1][1]
+
+
+def mean_ci(values, confidence=0.95):
+    """
+    Trung bình và nửa độ rộng khoảng tin cậy (phân phối t)
+
+    Args:
+        values (array-like): Các giá trị (nan bị bỏ qua)
+        confidence (float): Độ tin cậy
+
+    Returns:
+        dict: {'n', 'mean', 'std', 'ci'}
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    n = len(values)
+    if n == 0:
+        return {'n': 0, 'mean': math.nan, 'std': math.nan, 'ci': math.nan}
+    std = float(np.std(values, ddof=1)) if n > 1 else math.nan
+    ci = t_critical(n - 1, confidence) * std / math.sqrt(n) if n > 1 else math.nan
+    return {'n': n, 'mean': float(np.mean(values)), 'std': std, 'ci': ci}
+
+
+def scan_output_files(directory, suffix='summary'):
+    """
+    Tìm file output mới nhất của mỗi (prefix, queue) trong một lần quét thư mục
+
+    Args:
+        directory (str|Path): Thư mục kết quả
+        suffix (str): Loại output (summary, cwnd_trace, ...)
+
+    Returns:
+        dict: {(prefix, queue): Path}
+    """
+    pattern = re.compile(r'^(?P<prefix>.+?)_(?:\d{8}_\d{6}_)?' + re.escape(suffix)
+                         + r'_(?P<queue>DropTail|RED)'
+                         + re.escape(SUFFIX_EXTENSIONS.get(suffix, '')) + '$')
+    found = {}
+    with os.scandir(directory) as it:
+        for entry in it:
+            match = pattern.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            key = (match.group('prefix'), match.group('queue'))
+            # Tên có timestamp nên tên lớn nhất là file mới nhất
+            if key not in found or entry.name > found[key].name:
+                found[key] = Path(entry.path)
+    return found
+
+
+def _read_metrics(path):
+    """Parse metric của một lần chạy từ summary file"""
+    with open(path, 'r') as f:
+        content = f.read()
+    metrics = parse_summary(content)
+    flows = parse_flow_stats(content)
+    data_flows = split_data_flows(flows)
+    metrics['num_flows'] = len(data_flows) if flows else math.nan
+    metrics['jain_index'] = flow_jain_index(data_flows)
+    return metrics
+
+
+def scan_runs(directory):
+    """
+    Liệt kê các lần chạy trong một thư mục kết quả
+
+    Dùng sweep_manifest.json nếu có (tham số, seed, trạng thái của từng job),
+    ngược lại mỗi summary file là một lần chạy (chỉ biết prefix và queue).
+
+    Args:
+        directory (str|Path): Thư mục sweep hoặc thư mục results
+
+    Returns:
+        list: Mỗi phần tử là dict (sweep, prefix, queue, seed, status, elapsed,
+              params, summary)
+    """
+    directory = Path(directory)
+    summaries = scan_output_files(directory, 'summary')
+    manifest_path = directory / MANIFEST_NAME
+
+    runs = []
+    if manifest_path.exists():
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+        sweep = manifest.get('name', directory.name)
+        for job in manifest.get('jobs', []):
+            runs.append({
+                'sweep': sweep,
+                'prefix': job['prefix'],
+                'queue': job['queue'],
+                'seed': job.get('seed'),
+                'status': job.get('status', ''),
+                'elapsed': job.get('elapsed'),
+                'params': dict(job.get('point', {})),
+                'summary': summaries.get((job['prefix'], job['queue'])),
+            })
+    else:
+        for (prefix, queue), path in sorted(summaries.items()):
+            runs.append({
+                'sweep': directory.name,
+                'prefix': prefix,
+                'queue': queue,
+                'seed': None,
+                'status': 'done',
+                'elapsed': None,
+                'params': {},
+                'summary': path,
+            })
+    return runs
+
+
+def build_table(directories, status='done'):
+    """
+    Tạo bảng cột (columnar) với mỗi dòng là một lần chạy
+
+    Chỉ đọc summary file (vài KB) của mỗi lần chạy, không mở trace/log,
+    nên hàng nghìn lần chạy được gộp trong vài giây.
+
+    Args:
+        directories (list): Các thư mục sweep/results
+        status (str): Chỉ lấy job có trạng thái này (None = tất cả)
+
+    Returns:
+        dict: {'columns': {tên cột: ndarray}, 'params': [tên tham số],
+               'metrics': [tên metric], 'n': số dòng}
+    """
+    if isinstance(directories, (str, Path)):
+        directories = [directories]
+
+    runs = []
+    for directory in directories:
+        runs.extend(scan_runs(directory))
+    if status:
+        runs = [r for r in runs if r['status'] == status]
+
+    param_names = []
+    for run in runs:
+        for key in run['params']:
+            if key not in param_names:
+                param_names.append(key)
+
+    metric_rows = [_read_metrics(r['summary']) if r['summary'] else {} for r in runs]
+
+    columns = {
+        'sweep': np.array([r['sweep'] for r in runs], dtype=str),
+        'prefix': np.array([r['prefix'] for r in runs], dtype=str),
+        'queue': np.array([r['queue'] for r in runs], dtype=str),
+        'seed': np.array([np.nan if r['seed'] is None else float(r['seed']) for r in runs]),
+    }
+    for name in param_names:
+        columns[name] = np.array([str(r['params'].get(name, '')) for r in runs], dtype=str)
+    columns['status'] = np.array([r['status'] for r in runs], dtype=str)
+    columns['elapsed'] = np.array([np.nan if r['elapsed'] is None else float(r['elapsed'])
+                                   for r in runs])
+    for name in RUN_METRICS:
+        columns[name] = np.array([m.get(name, np.nan) for m in metric_rows], dtype=float)
+
+    return {'columns': columns, 'params': param_names, 'metrics': list(RUN_METRICS),
+            'n': len(runs)}
+
+
+def select_rows(table, mask):
+    """
+    Lọc các dòng của bảng
+
+    Args:
+        table (dict): Bảng từ build_table()
+        mask (ndarray): Mảng bool (hoặc chỉ số) các dòng cần giữ
+
+    Returns:
+        dict: Bảng mới cùng cấu trúc
+    """
+    columns = {name: values[mask] for name, values in table['columns'].items()}
+    n = len(next(iter(columns.values()))) if columns else 0
+    return dict(table, columns=columns, n=n)
+
+
+def _group_codes(table, keys):
+    """
+    Mã hóa tổ hợp giá trị của các cột key thành một mã nguyên mỗi dòng
+
+    Returns:
+        tuple: (codes ndarray, [giá trị key của từng nhóm])
+    """
+    n = table['n']
+    if not keys:
+        return np.zeros(n, dtype=np.intp), [()]
+
+    uniques, inverses = [], []
+    for key in keys:
+        values, inverse = np.unique(table['columns'][key], return_inverse=True)
+        uniques.append(values)
+        inverses.append(inverse.ravel())
+    flat = np.ravel_multi_index(inverses, [len(u) for u in uniques])
+    group_flat, codes = np.unique(flat, return_inverse=True)
+    group_index = np.unravel_index(group_flat, [len(u) for u in uniques])
+    labels = [tuple(uniques[k][group_index[k][g]] for k in range(len(keys)))
+              for g in range(len(group_flat))]
+    return codes.ravel(), labels
+
+
+def group_by(table, keys, metrics=None, confidence=0.95):
+    """
+    Gộp các dòng theo key và tính n, mean, std, CI cho mỗi metric
+
+    Tính toàn bộ bằng np.bincount (không lặp theo từng nhóm).
+
+    Args:
+        table (dict): Bảng từ build_table()
+        keys (list): Các cột dùng để gộp (vd ['queue', 'bottleneck_bandwidth'])
+        metrics (list): Metric cần tính (mặc định: mọi metric)
+        confidence (float): Độ tin cậy cho CI
+
+    Returns:
+        dict: Bảng cột: các cột key + <metric>_n/_mean/_std/_ci cho từng metric
+    """
+    metrics = metrics or table['metrics']
+    for key in list(keys) + list(metrics):
+        if key not in table['columns']:
+            raise KeyError(f"Không có cột '{key}' (có: {', '.join(table['columns'])})")
+
+    codes, labels = _group_codes(table, keys)
+    # Sắp xếp nhóm theo giá trị số của key (5Mbps < 10Mbps)
+    order = sorted(range(len(labels)), key=lambda g: [
+        (math.isnan(parse_quantity(v)), parse_quantity(v), str(v)) for v in labels[g]])
+    labels = [labels[g] for g in order]
+    ngroups = len(labels)
+
+    columns = {}
+    for k, key in enumerate(keys):
+        columns[key] = np.array([label[k] for label in labels])
+
+    for metric in metrics:
+        values = np.asarray(table['columns'][metric], dtype=float)
+        valid = ~np.isnan(values)
+        n = np.bincount(codes[valid], minlength=ngroups).astype(float)
+        total = np.bincount(codes[valid], weights=values[valid], minlength=ngroups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = total / n
+            sq = np.bincount(codes[valid], weights=(values[valid] - mean[codes[valid]]) ** 2,
+                             minlength=ngroups)
+            std = np.sqrt(sq / (n - 1))
+            std[std < 1e-12 * np.abs(mean)] = 0.0  # nhiễu làm tròn khi mọi giá trị bằng nhau
+            std[n < 2] = np.nan
+            t = np.array([t_critical(int(k) - 1, confidence) for k in n])
+            ci = t * std / np.sqrt(n)
+        columns[f'{metric}_n'] = n[order]
+        columns[f'{metric}_mean'] = mean[order]
+        columns[f'{metric}_std'] = std[order]
+        columns[f'{metric}_ci'] = ci[order]
+
+    return {'columns': columns, 'keys': list(keys), 'metrics': list(metrics),
+            'confidence': confidence, 'n': ngroups}
+
+
+def pivot(table, index, column, metric, confidence=0.95):
+    """
+    Bảng pivot mean (và CI) của một metric theo hai cột
+
+    Args:
+        table (dict): Bảng từ build_table()
+        index (str): Cột cho các hàng
+        column (str): Cột cho các cột
+        metric (str): Metric cần tính
+
+    Returns:
+        dict: {'index': [giá trị hàng], 'columns': [giá trị cột],
+               'mean': ndarray (hàng x cột), 'ci': ndarray, 'n': ndarray}
+    """
+    grouped = group_by(table, [index, column], [metric], confidence)
+    rows = sort_values(set(grouped['columns'][index].tolist()))
+    cols = sort_values(set(grouped['columns'][column].tolist()))
+    row_pos = {v: i for i, v in enumerate(rows)}
+    col_pos = {v: j for j, v in enumerate(cols)}
+
+    shape = (len(rows), len(cols))
+    result = {'index': rows, 'columns': cols, 'metric': metric,
+              'mean': np.full(shape, np.nan), 'ci': np.full(shape, np.nan),
+              'n': np.zeros(shape)}
+    for g in range(grouped['n']):
+        i = row_pos[grouped['columns'][index][g]]
+        j = col_pos[grouped['columns'][column][g]]
+        result['mean'][i, j] = grouped['columns'][f'{metric}_mean'][g]
+        result['ci'][i, j] = grouped['columns'][f'{metric}_ci'][g]
+        result['n'][i, j] = grouped['columns'][f'{metric}_n'][g]
+    return result
+
+
+def _format_cell(value):
+    if isinstance(value, (float, np.floating)):
+        if math.isnan(value):
+            return ''
+        return f"{value:.6g}"
+    return str(value)
+
+
+def write_csv(table, path):
+    """Ghi bảng cột ra CSV"""
+    names = list(table['columns'])
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        for i in range(table['n']):
+            writer.writerow([_format_cell(table['columns'][name][i]) for name in names])
+    return path
+
+
+def print_group_table(grouped, metrics=None):
+    """In bảng group-by ra terminal (mean ± CI)"""
+    metrics = metrics or grouped['metrics']
+    level = int(round(grouped['confidence'] * 100))
+    headers = grouped['keys'] + ['n'] + [f"{m} (±{level}% CI)" for m in metrics]
+    rows = []
+    for g in range(grouped['n']):
+        row = [str(grouped['columns'][k][g]) for k in grouped['keys']]
+        row.append(f"{int(grouped['columns'][metrics[0] + '_n'][g])}" if metrics else '')
+        for m in metrics:
+            mean = grouped['columns'][f'{m}_mean'][g]
+            ci = grouped['columns'][f'{m}_ci'][g]
+            if math.isnan(mean):
+                row.append('n/a')
+            elif math.isnan(ci):
+                row.append(f"{mean:.4g}")
+            else:
+                row.append(f"{mean:.4g} ± {ci:.2g}")
+        rows.append(row)
+
+    widths = [max(len(h), *(len(r[c]) for r in rows)) if rows else len(h)
+              for c, h in enumerate(headers)]
+    print("   " + "  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("   " + "  ".join('-' * w for w in widths))
+    for row in rows:
+        print("   " + "  ".join(v.ljust(w) for v, w in zip(row, widths)))
+
+
+def print_pivot(result):
+    """In bảng pivot (mean) ra terminal"""
+    headers = [''] + [str(c) for c in result['columns']]
+    rows = [[str(r)] + [_format_cell(v) or 'n/a' for v in result['mean'][i]]
+            for i, r in enumerate(result['index'])]
+    widths = [max(len(headers[c]), *(len(r[c]) for r in rows)) for c in range(len(headers))]
+    print(f"   📐 {result['metric']} (mean)")
+    print("   " + "  ".join(h.rjust(w) for h, w in zip(headers, widths)))
+    for row in rows:
+        print("   " + "  ".join(v.rjust(w) for v, w in zip(row, widths)))
@@ -0,0 +1,168 @@
+"""
+Headless batch rendering utilities
+Vẽ dashboard/timeline/comparison cho mọi lần chạy trong thư mục bằng process pool
+"""
+
+import contextlib
+import io
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from .aggregate_utils import scan_output_files
+from .cache_utils import output_file
+
+
+BATCH_KINDS = ['dashboard', 'timeline', 'comparison']
+
+QUEUE_ORDER = ['DropTail', 'RED']
+
+
+def use_headless_backend():
+    """
+    Ép backend Agg (không mở cửa sổ) cho tiến trình hiện tại và tiến trình con
+
+    Phải gọi trước khi import matplotlib.pyplot. MPLBACKEND được đặt để các
+    worker khởi tạo bằng spawn (Windows/macOS) cũng dùng Agg.
+    """
+    os.environ['MPLBACKEND'] = 'Agg'
+    import matplotlib
+    matplotlib.use('Agg')
+
+
+def find_batch_runs(results_dir):
+    """
+    Các lần chạy trong thư mục: mỗi prefix cùng các hàng đợi có CWND trace
+
+    Returns:
+        list: [(prefix, [queues])] sắp xếp theo prefix
+    """
+    runs = {}
+    for prefix, queue in scan_output_files(results_dir, 'cwnd_trace'):
+        runs.setdefault(prefix, set()).add(queue)
+    return [(prefix, [q for q in QUEUE_ORDER if q in queues])
+            for prefix, queues in sorted(runs.items())]
+
+
+def input_mtimes(results_dir):
+    """Thời điểm sửa đổi mới nhất của các file input, theo prefix (một lần quét thư mục)"""
+    latest = {}
+    for suffix in ('summary', 'cwnd_trace', 'tcp_state'):
+        for (prefix, _), path in scan_output_files(results_dir, suffix).items():
+            latest[prefix] = max(latest.get(prefix, 0.0), path.stat().st_mtime)
+    return latest
+
+
+def render_run(results_dir, prefix, queues, kinds, newest_input=None):
+    """
+    Vẽ các hình của một lần chạy (chạy trong worker process)
+
+    Mỗi hình được lưu rồi đóng ngay, nên mỗi worker chỉ giữ một figure tại một thời điểm.
+
+    Args:
+        results_dir (str): Thư mục kết quả
+        prefix (str): Prefix của lần chạy
+        queues (list): Các hàng đợi có dữ liệu
+        kinds (list): Các loại hình cần vẽ
+        newest_input (float): Nếu có, bỏ qua hình mới hơn thời điểm này (mtime)
+
+    Returns:
+        dict: {'prefix', 'timings': {tên hình: giây}, 'skipped', 'load', 'error', 'log'}
+    """
+    import matplotlib.pyplot as plt
+    from .enhanced_tcp_analyzer import EnhancedTCPAnalyzer
+
+    result = {'prefix': prefix, 'timings': {}, 'skipped': [], 'load': 0.0,
+              'error': '', 'log': ''}
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            jobs = []
+            for kind in kinds:
+                if kind == 'comparison':
+                    if len(queues) == 2:
+                        jobs.append((kind, None))
+                else:
+                    jobs.extend((kind, q) for q in queues)
+
+            if newest_input is not None:
+                todo = []
+                for kind, queue in jobs:
+                    out = output_file(results_dir, prefix, kind, queue)
+                    if out.exists() and out.stat().st_mtime >= newest_input:
+                        result['skipped'].append(out.name)
+                    else:
+                        todo.append((kind, queue))
+                jobs = todo
+            if not jobs:
+                return result
+
+            analyzer = EnhancedTCPAnalyzer(results_dir, prefix)
+            start = time.time()
+            for queue in queues:
+                analyzer.load_data(queue)
+            result['load'] = time.time() - start
+
+            for kind, queue in jobs:
+                start = time.time()
+                if kind == 'dashboard':
+                    analyzer.create_dashboard(queue, show_gui=True)
+                elif kind == 'timeline':
+                    analyzer.create_animated_timeline(queue, show_gui=True)
+                elif kind == 'comparison':
+                    analyzer.create_comparison_dashboard(show_gui=True)
+                plt.close('all')
+                result['timings'][kind if queue is None else f"{kind}_{queue}"] = time.time() - start
+    except Exception as e:
+        plt.close('all')
+        result['error'] = f"{type(e).__name__}: {e}"
+        log.write(traceback.format_exc())
+    result['log'] = log.getvalue()
+    return result
+
+
+def run_batch(results_dir, kinds=None, workers=None, skip_existing=False, prefixes=None):
+    """
+    Vẽ hình cho mọi lần chạy trong thư mục bằng ProcessPoolExecutor
+
+    Args:
+        results_dir (str|Path): Thư mục kết quả (vd một thư mục sweep)
+        kinds (list): Các loại hình (dashboard, timeline, comparison)
+        workers (int): Số worker process (mặc định: số core)
+        skip_existing (bool): Bỏ qua hình đã mới hơn file input
+        prefixes (list): Chỉ vẽ các prefix này
+
+    Returns:
+        list: Kết quả từng lần chạy (xem render_run())
+    """
+    kinds = kinds or BATCH_KINDS
+    runs = find_batch_runs(results_dir)
+    if prefixes:
+        runs = [r for r in runs if r[0] in prefixes]
+    workers = workers or os.cpu_count() or 1
+    mtimes = input_mtimes(results_dir) if skip_existing else {}
+
+    print(f"🖼️  {len(runs)} runs, {', '.join(kinds)}, {workers} worker(s)")
+    results = []
+    batch_start = time.time()
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_headless_backend) as pool:
+        futures = [pool.submit(render_run, str(results_dir), prefix, queues, kinds,
+                               mtimes.get(prefix) if skip_existing else None)
+                   for prefix, queues in runs]
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results.append(result)
+            total = result['load'] + sum(result['timings'].values())
+            if result['error']:
+                print(f"   ❌ [{done}/{len(runs)}] {result['prefix']}: {result['error']}", flush=True)
+                continue
+            parts = ', '.join(f"{k} {v:.1f}s" for k, v in result['timings'].items())
+            skipped = f", {len(result['skipped'])} up to date" if result['skipped'] else ''
+            print(f"   ✅ [{done}/{len(runs)}] {result['prefix']}: {total:.1f}s "
+                  f"(load {result['load']:.1f}s{', ' + parts if parts else ''}{skipped})", flush=True)
+
+    elapsed = time.time() - batch_start
+    figures = sum(len(r['timings']) for r in results)
+    print(f"\n⏱️  {figures} figures in {elapsed:.1f}s "
+          f"({elapsed / max(len(runs), 1):.2f}s/run wall time)")
+    return results
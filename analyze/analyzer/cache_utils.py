@@ -0,0 +1,266 @@
+"""
+Render cache utilities
+Bỏ qua việc vẽ lại dashboard/timeline/infographic khi input, code vẽ, style và option không đổi
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sys
+import types
+from pathlib import Path
+from .data_utils import find_latest_file, rotated_log_files
+
+
+# Tăng khi thay đổi code vẽ nằm ngoài các hàm được hash (vd helper ở module khác)
+RENDER_CACHE_VERSION = 1
+
+# Module nạp/parse dữ liệu và tính metric: mọi hình đều phụ thuộc vào chúng
+DATA_MODULES = ['data_utils', 'metrics_utils']
+
+CACHE_DIR_NAME = '.render_cache'
+
+INPUT_SUFFIXES = ['cwnd_trace', 'tcp_state', 'summary', 'flow_cwnd', 'flow_bytes']
+
+# Option output của dashboard/timeline/comparison (dashboard_utils lưu PNG 300 dpi)
+FIGURE_OPTIONS = {'format': 'png', 'dpi': 300}
+
+# rcParams không ảnh hưởng tới nội dung file output
+_RC_IGNORED_PREFIXES = ('backend', 'interactive', 'keymap.', 'toolbar', 'webagg.',
+                        'tk.', 'macosx.', 'savefig.directory', 'figure.max_open_warning')
+
+
+def output_file(results_dir, prefix, kind, queue=None):
+    """Tên file output cố định của một loại hình (giống tên do dashboard_utils ghi)"""
+    if kind == 'comparison':
+        return Path(results_dir) / f"{prefix}_comparison_dashboard.png"
+    return Path(results_dir) / f"{prefix}_{kind}_{queue}.png"
+
+
+def _sha256_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _code_names(code):
+    """Các tên global mà một code object (kể cả hàm lồng/lambda bên trong) dùng tới"""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if isinstance(const, types.CodeType):
+            names |= _code_names(const)
+    return names
+
+
+def _class_functions(cls):
+    """Các hàm định nghĩa trong một class (method, property, cached_property)"""
+    functions = []
+    for member in vars(cls).values():
+        member = getattr(member, 'func', None) or getattr(member, 'fget', None) or member
+        member = getattr(member, '__func__', member)
+        if inspect.isfunction(member):
+            functions.append(member)
+    return functions
+
+
+@functools.lru_cache(maxsize=None)
+def data_fingerprint():
+    """
+    Hash toàn bộ mã nguồn của DATA_MODULES và các module cùng package mà chúng dùng (đệ quy)
+
+    Cách parse trace hay tính metric thay đổi thì mọi hình đã cache đều cũ, kể cả
+    khi hàm vẽ không gọi trực tiếp tới code đã sửa.
+    """
+    package = __name__.rpartition('.')[0]
+    pending = [sys.modules.get(f"{package}.{name}") or __import__(f"{package}.{name}", fromlist=['_'])
+               for name in DATA_MODULES]
+    modules = {}
+    while pending:
+        module = pending.pop()
+        if module.__name__ in modules:
+            continue
+        modules[module.__name__] = module
+        for obj in vars(module).values():
+            owner = obj.__name__ if inspect.ismodule(obj) else getattr(obj, '__module__', None)
+            if isinstance(owner, str) and owner.startswith(package + '.') and owner in sys.modules:
+                pending.append(sys.modules[owner])
+    digest = hashlib.sha256()
+    for name in sorted(modules):
+        digest.update(name.encode())
+        digest.update(Path(modules[name].__file__).read_bytes())
+    return digest.hexdigest()
+
+
+def renderer_fingerprint(func):
+    """
+    Hash mã nguồn của hàm vẽ và các hàm cùng package mà nó gọi (đệ quy), cùng với
+    data_fingerprint() của phần nạp dữ liệu và tính metric
+
+    Sửa code của một trang/panel chỉ làm mất hiệu lực các hình dùng code đó.
+    Class cùng package được tham chiếu (vd RunMetrics) được hash cùng mọi
+    method của nó. Helper vẽ gọi qua thuộc tính module (vd dashboard_utils.x)
+    không được theo dõi: khi sửa chúng, tăng RENDER_CACHE_VERSION.
+    """
+    package = func.__module__.split('.')[0]
+    sources = {}
+    stack = [func]
+    while stack:
+        f = stack.pop()
+        name = f"{f.__module__}.{f.__qualname__}"
+        if name in sources:
+            continue
+        try:
+            sources[name] = inspect.getsource(f)
+        except (OSError, TypeError):
+            sources[name] = ''
+        if inspect.isclass(f):
+            stack.extend(_class_functions(f))
+            continue
+        for ref in _code_names(f.__code__):
+            obj = f.__globals__.get(ref)
+            if (inspect.isfunction(obj) or inspect.isclass(obj)) and obj.__module__.split('.')[0] == package:
+                stack.append(obj)
+    digest = hashlib.sha256(str(RENDER_CACHE_VERSION).encode())
+    digest.update(data_fingerprint().encode())
+    for name in sorted(sources):
+        digest.update(name.encode())
+        digest.update(sources[name].encode())
+    return digest.hexdigest()
+
+
+def style_fingerprint(colors):
+    """Hash của color scheme và rcParams hiện tại (bỏ các key chỉ liên quan tới backend/GUI)"""
+    from matplotlib import rcParams
+    params = {k: repr(v) for k, v in rcParams.items()
+              if not k.startswith(_RC_IGNORED_PREFIXES)}
+    payload = json.dumps({'colors': colors, 'rc': params}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class RenderCache:
+    """
+    Cache hình đã vẽ của một lần chạy, trong results_dir/.render_cache/
+
+    Mỗi file output có một file <tên output>.json ghi key đã dùng để vẽ nó.
+    Key = hash của nội dung file input, code hàm vẽ, style và option output.
+    Hash nội dung input được dùng lại khi kích thước và mtime của file không
+    đổi, nên kiểm tra cache chỉ cần stat các file. Mỗi output có file riêng
+    nên nhiều process (batch) có thể ghi cache cùng lúc.
+    """
+
+    def __init__(self, results_dir, prefix, colors, reuse=True):
+        """
+        Args:
+            results_dir (str|Path): Thư mục kết quả
+            prefix (str): Prefix của lần chạy
+            colors (dict): Color scheme dùng để vẽ
+            reuse (bool): False = luôn vẽ lại (nhưng vẫn cập nhật cache)
+        """
+        self.results_dir = Path(results_dir)
+        self.prefix = prefix
+        self.colors = colors
+        self.reuse = reuse
+        self.root = self.results_dir / CACHE_DIR_NAME
+        self._style = None
+        self._renderers = {}
+        self._hashes = {}
+
+    def page_file(self, kind, page, ext):
+        """File lưu một trang đã vẽ (vd trang infographic) trong thư mục cache"""
+        return self.root / f"{self.prefix}_{kind}_page{page}.{ext}"
+
+    def _meta_path(self, output):
+        return self.root / f"{Path(output).name}.json"
+
+    def _load_meta(self, output):
+        try:
+            with open(self._meta_path(output), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _inputs(self, queues, meta):
+        """Fingerprint các file input của các hàng đợi: {vai trò: [tên, size, mtime_ns, sha]}"""
+        known = (meta or {}).get('inputs', {})
+        inputs = {}
+        for queue in queues:
+            for suffix in INPUT_SUFFIXES:
+                path = find_latest_file(self.results_dir, self.prefix, queue, suffix)
+                if path is None or not path.exists():
+                    continue
+                paths = rotated_log_files(path) if suffix == 'tcp_state' else [path]
+                for p in paths:
+                    # Vai trò không chứa timestamp: cùng nội dung dưới tên mới vẫn trúng cache
+                    role = f"{queue}/{suffix}{p.name[len(path.name):]}"
+                    st = p.stat()
+                    stat = [p.name, st.st_size, st.st_mtime_ns]
+                    old = known.get(role)
+                    sha = old[3] if old and old[:3] == stat else self._hashes.get(tuple(stat))
+                    if sha is None:
+                        sha = _sha256_file(p)
+                    self._hashes[tuple(stat)] = sha
+                    inputs[role] = stat + [sha]
+        return inputs
+
+    def _renderer(self, func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        if name not in self._renderers:
+            self._renderers[name] = renderer_fingerprint(func)
+        return self._renderers[name]
+
+    def check(self, output, func, queues, options=None):
+        """
+        Tính key của một output và kiểm tra file hiện có có dùng lại được không
+
+        Args:
+            output (Path): File output
+            func (callable): Hàm vẽ
+            queues (list): Các hàng đợi mà hình dùng dữ liệu
+            options (dict): Option ảnh hưởng tới file output (dpi, định dạng...)
+
+        Returns:
+            dict: {'output', 'key', 'inputs', 'fresh'} (truyền cho record() sau khi vẽ)
+        """
+        output = Path(output)
+        meta = self._load_meta(output)
+        if self._style is None:
+            self._style = style_fingerprint(self.colors)
+        inputs = self._inputs(queues, meta)
+        payload = json.dumps({
+            'renderer': self._renderer(func),
+            'style': self._style,
+            'inputs': {role: info[3] for role, info in inputs.items()},
+            'options': options or {},
+        }, sort_keys=True, default=str)
+        key = hashlib.sha256(payload.encode()).hexdigest()
+
+        fresh = False
+        if self.reuse and meta and meta.get('key') == key and output.exists():
+            st = output.stat()
+            # File output bị sửa/ghi đè từ bên ngoài thì không dùng lại
+            fresh = meta.get('output') == [st.st_size, st.st_mtime_ns]
+        return {'output': output, 'key': key, 'inputs': inputs, 'fresh': fresh}
+
+    def record(self, ticket, **extra):
+        """Ghi key của output vừa vẽ (ticket từ check())"""
+        output = ticket['output']
+        if not output.exists():
+            return
+        st = output.stat()
+        meta = {'key': ticket['key'], 'inputs': ticket['inputs'],
+                'output': [st.st_size, st.st_mtime_ns]}
+        meta.update(extra)
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self._meta_path(output)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, path)
+
+    def meta(self, output):
+        """Thông tin đã ghi cho một output (hoặc None)"""
+        return self._load_meta(output)
@@ -0,0 +1,262 @@
+"""
+N-way comparison utilities
+So sánh nhiều lần chạy / hàng đợi: chọn run, bảng metric dạng cột, chọn run tốt nhất
+"""
+
+import math
+from pathlib import Path
+import numpy as np
+from .data_utils import load_data
+from .metrics_utils import run_metrics
+from .aggregate_utils import scan_runs, sort_values
+
+
+# Metric so sánh: (key trong bảng, nhãn, nhãn ngắn cho bảng, giá trị lớn hơn là tốt hơn, format)
+COMPARISON_METRICS = [
+    ('avg_throughput', 'Throughput (Mbps)', 'Thr.\n(Mbps)', True, '{:.2f}'),
+    ('loss_rate', 'Loss Rate (%)', 'Loss\n(%)', False, '{:.2f}'),
+    ('avg_delay', 'Avg Delay (ms)', 'Delay\n(ms)', False, '{:.2f}'),
+    ('timeouts', 'Timeouts', 'RTO', False, '{:,.0f}'),
+    ('fast_retransmits', 'Fast Retransmits', 'Fast\nRetx', False, '{:,.0f}'),
+]
+
+# Sự kiện đếm từ state log: (loại sự kiện, nhãn)
+COMPARISON_EVENTS = [
+    ('TIMEOUT_EVENT', 'Timeouts'),
+    ('TRIPLE_DUP_ACK', 'Fast Retransmits'),
+    ('DUP_ACK', 'Dup ACKs'),
+]
+
+# Percentile CWND lưu trong bảng (hộp của boxplot: p5/p25/p50/p75/p95)
+CWND_PERCENTILES = (5, 25, 50, 75, 95)
+
+# Số điểm CWND tối đa mỗi run khi vẽ (min/max mỗi bucket)
+COMPARISON_MAX_POINTS = 2000
+
+# Màu cho các run khi không phân biệt được bằng hàng đợi (bảng tab10)
+RUN_PALETTE = ['#1F77B4', '#FF7F0E', '#2CA02C', '#D62728', '#9467BD',
+               '#8C564B', '#E377C2', '#7F7F7F', '#BCBD22', '#17BECF']
+
+QUEUE_ORDER = ['DropTail', 'RED']
+
+
+def make_dataset(label, data, color):
+    """Một cột của phép so sánh: {'label', 'data' (từ load_data), 'color'}"""
+    return {'label': label, 'data': data, 'color': color}
+
+
+def queue_datasets(analyzer, queues=QUEUE_ORDER):
+    """Các hàng đợi đã load của một analyzer (so sánh DropTail vs RED truyền thống)"""
+    return [make_dataset(q, analyzer.data[q], analyzer.colors.get(q, RUN_PALETTE[i % len(RUN_PALETTE)]))
+            for i, q in enumerate(queues)]
+
+
+def parse_run_spec(spec):
+    """
+    Parse '--run [LABEL=]PREFIX:QUEUE'
+
+    Returns:
+        dict: {'label', 'prefix', 'queue'} (label=None nếu không ghi)
+    """
+    label, sep, rest = spec.partition('=')
+    if not sep:
+        label, rest = None, spec
+    prefix, sep, queue = rest.rpartition(':')
+    if not sep or queue not in QUEUE_ORDER or not prefix:
+        raise ValueError(f"--run phải có dạng [LABEL=]PREFIX:QUEUE (QUEUE: DropTail/RED): {spec}")
+    return {'label': label, 'prefix': prefix, 'queue': queue}
+
+
+def select_runs(directories, where=None, queue=None):
+    """
+    Các lần chạy đã xong trong các thư mục sweep/results, lọc theo tham số
+
+    Args:
+        directories (list): Thư mục sweep/results
+        where (dict): Chỉ lấy job có tham số sweep khớp {tên: giá trị}
+        queue (str): Chỉ lấy hàng đợi này
+
+    Returns:
+        list: Mỗi run là dict {'results_dir', 'prefix', 'queue', 'params', 'label'}
+    """
+    where = where or {}
+    runs = []
+    for directory in directories:
+        for run in scan_runs(directory):
+            if run['status'] != 'done' or run['summary'] is None:
+                continue
+            if queue and run['queue'] != queue:
+                continue
+            if any(str(run['params'].get(k)) != str(v) for k, v in where.items()):
+                continue
+            params = dict(run['params'])
+            if run['seed'] is not None:
+                params['seed'] = run['seed']
+            runs.append({'results_dir': Path(directory), 'prefix': run['prefix'],
+                         'queue': run['queue'], 'params': params, 'label': None})
+    return runs
+
+
+def label_runs(runs, label_by=None):
+    """
+    Đặt nhãn cho các run chưa có nhãn từ các tham số khác nhau giữa các run
+
+    Args:
+        runs (list): Từ select_runs()/parse_run_spec()
+        label_by (list): Tham số dùng làm nhãn (mặc định: mọi tham số có nhiều giá trị)
+    """
+    if label_by is None:
+        keys = []
+        for run in runs:
+            for key in run.get('params', {}):
+                if key not in keys:
+                    keys.append(key)
+        # Chỉ so giữa các run có tham số đó (run thêm bằng --run không có tham số)
+        label_by = [k for k in keys
+                    if len({str(r['params'][k]) for r in runs if k in r.get('params', {})}) > 1]
+    show_queue = len({r['queue'] for r in runs}) > 1
+    for run in runs:
+        if run['label']:
+            continue
+        parts = [run['queue']] if show_queue else []
+        parts += [f"{k}={run['params'][k]}" for k in label_by if k in run.get('params', {})]
+        run['label'] = ' '.join(parts) or run['prefix']
+    # Nhãn trùng nhau (vd cùng tham số, khác thư mục): thêm prefix
+    labels = [r['label'] for r in runs]
+    for run in runs:
+        if labels.count(run['label']) > 1:
+            run['label'] = f"{run['label']} ({run['prefix']})"
+    return runs
+
+
+def sort_runs(runs):
+    """Sắp xếp run theo hàng đợi rồi theo giá trị tham số (5Mbps < 10Mbps)"""
+    keys = []
+    for run in runs:
+        for key in run.get('params', {}):
+            if key not in keys:
+                keys.append(key)
+    order = {k: {v: i for i, v in enumerate(sort_values({str(r['params'].get(k, '')) for r in runs}))}
+             for k in keys}
+
+    def run_key(run):
+        queue = QUEUE_ORDER.index(run['queue']) if run['queue'] in QUEUE_ORDER else len(QUEUE_ORDER)
+        return (queue, [order[k][str(run['params'].get(k, ''))] for k in keys], run['prefix'])
+    return sorted(runs, key=run_key)
+
+
+def run_colors(runs, colors):
+    """Màu theo hàng đợi khi mỗi hàng đợi chỉ có một run, ngược lại theo RUN_PALETTE"""
+    queues = [r['queue'] for r in runs]
+    if len(set(queues)) == len(queues) and all(q in colors for q in queues):
+        return [colors[q] for q in queues]
+    return [RUN_PALETTE[i % len(RUN_PALETTE)] for i in range(len(runs))]
+
+
+def load_datasets(runs, colors):
+    """
+    Load dữ liệu của các run
+
+    Args:
+        runs (list): Các run đã có nhãn (label_runs)
+        colors (dict): Color scheme
+
+    Returns:
+        list: Datasets (make_dataset) theo thứ tự của runs
+    """
+    return [make_dataset(run['label'], load_data(run['results_dir'], run['prefix'], run['queue']), color)
+            for run, color in zip(runs, run_colors(runs, colors))]
+
+
+def comparison_table(datasets, max_points=COMPARISON_MAX_POINTS):
+    """
+    Bảng metric dạng cột của các dataset, mỗi dòng là một dataset
+
+    Mọi metric (summary, số sự kiện, percentile/mean/max CWND) nằm trong
+    một bảng cột dùng chung cho biểu đồ, bảng và chọn run tốt nhất; chuỗi
+    CWND để vẽ được giảm điểm sẵn, nên chi phí vẽ không phụ thuộc độ dài trace.
+
+    Args:
+        datasets (list): Từ make_dataset()/queue_datasets()/load_datasets()
+        max_points (int): Số điểm CWND tối đa mỗi dataset trong 'series'
+
+    Returns:
+        dict: {'columns': {tên cột: ndarray}, 'n': số dataset,
+               'series': [(time, cwnd) đã giảm điểm], 'missing': {event: [bool]}}
+    """
+    n = len(datasets)
+    metrics = [run_metrics(d['data']) for d in datasets]
+    columns = {
+        'label': np.array([d['label'] for d in datasets], dtype=str),
+        'color': np.array([d['color'] for d in datasets], dtype=str),
+    }
+    summary_keys = [m[0] for m in COMPARISON_METRICS] + ['total_throughput', 'total_lost']
+    values = np.array([[d['data']['summary'].get(k, math.nan) for k in summary_keys]
+                       for d in datasets], dtype=float).reshape(n, len(summary_keys))
+    for j, key in enumerate(summary_keys):
+        columns[key] = values[:, j]
+
+    # Số sự kiện; nan khi loại sự kiện bị lọc khỏi log (khác với 0 thật)
+    missing = {}
+    for event, _ in COMPARISON_EVENTS:
+        counts = [m.event(event) for m in metrics]
+        missing[event] = [c is None for c in counts]
+        columns[f'events_{event}'] = np.array([math.nan if c is None else c for c in counts], dtype=float)
+
+    # Thống kê CWND lấy từ RunMetrics (dùng chung với dashboard/báo cáo của cùng run)
+    for p in CWND_PERCENTILES:
+        columns[f'cwnd_p{p}'] = np.array([m.cwnd_percentile(p) for m in metrics], dtype=float)
+    columns['cwnd_mean'] = np.array([m.cwnd_mean for m in metrics], dtype=float)
+    columns['cwnd_max'] = np.array([m.cwnd_max for m in metrics], dtype=float)
+
+    series = [m.decimated(max_points) for m in metrics]
+    return {'columns': columns, 'n': n, 'series': series, 'missing': missing}
+
+
+def best_index(table, metric, higher_is_better):
+    """
+    Dòng tốt nhất của một metric (bỏ qua nan)
+
+    Returns:
+        int: Chỉ số dòng, hoặc None nếu không có giá trị hoặc mọi dòng bằng nhau
+    """
+    values = table['columns'][metric]
+    valid = ~np.isnan(values)
+    if valid.sum() == 0 or (valid.sum() > 1 and np.ptp(values[valid]) == 0):
+        return None
+    scores = np.where(valid, values if higher_is_better else -values, -np.inf)
+    return int(np.argmax(scores))
+
+
+def winners(table):
+    """Dòng tốt nhất của từng metric trong COMPARISON_METRICS: {metric: index hoặc None}"""
+    return {key: best_index(table, key, higher) for key, _, _, higher, _ in COMPARISON_METRICS}
+
+
+def format_metric(table, metric, row):
+    """Giá trị đã format của một ô (n/a nếu thiếu)"""
+    fmt = next((f for k, _, _, _, f in COMPARISON_METRICS if k == metric), '{:.2f}')
+    value = table['columns'][metric][row]
+    return 'n/a' if math.isnan(value) else fmt.format(value)
+
+
+def print_comparison_table(table):
+    """In bảng so sánh ra terminal (★ = tốt nhất của cột)"""
+    best = winners(table)
+    headers = ['Run'] + [m[1] for m in COMPARISON_METRICS] + ['CWND p50', 'CWND p95']
+    rows = []
+    for i in range(table['n']):
+        row = [str(table['columns']['label'][i])]
+        for key, *_ in COMPARISON_METRICS:
+            cell = format_metric(table, key, i)
+            row.append(cell + (' ★' if best[key] == i else ''))
+        for key in ('cwnd_p50', 'cwnd_p95'):
+            value = table['columns'][key][i]
+            row.append('n/a' if math.isnan(value) else f"{value:.1f}")
+        rows.append(row)
+    widths = [max(len(h), *(len(r[c]) for r in rows)) if rows else len(h)
+              for c, h in enumerate(headers)]
+    print("   " + "  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("   " + "  ".join('-' * w for w in widths))
+    for row in rows:
+        print("   " + "  ".join(v.ljust(w) for v, w in zip(row, widths)))
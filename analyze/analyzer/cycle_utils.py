@@ -0,0 +1,190 @@
+"""
+Sawtooth cycle utilities
+Tách chuỗi CWND thành các chu kỳ tắc nghẽn tại mỗi lần giảm nhân (multiplicative decrease):
+đỉnh, đáy, thời lượng, tốc độ tăng và sự kiện gây ra (timeout / triple dup ACK) của từng chu kỳ
+"""
+
+import math
+import numpy as np
+from .data_utils import log_start
+from .state_utils import recovery_ids
+
+
+# Một đợt giảm là giảm nhân khi CWND rơi ít nhất ngần này phần của đỉnh (Reno: ~1/2, timeout: ~1)
+MIN_DROP_FRACTION = 0.3
+
+# Các đoạn giảm cách nhau bởi một lần tăng nhỏ hơn ngần này phần của đỉnh được gộp thành
+# một đợt giảm (trong fast recovery CWND phình theo từng dup ACK rồi xả dần; khi log có
+# STATE_CHANGE, mọi đoạn giảm trong cùng một đợt recovery luôn được gộp)
+RISE_TOLERANCE = 0.1
+
+# Sự kiện gây ra mỗi lần giảm: (mã trong cột 'trigger', loại sự kiện trong state log)
+CYCLE_TRIGGERS = ['triple_dup_ack', 'timeout', 'unknown']
+TRIGGER_EVENTS = {'triple_dup_ack': 'TRIPLE_DUP_ACK', 'timeout': 'TIMEOUT_EVENT'}
+
+# Màu trigger (key trong COLORS), giống marker Fast Retx/Timeout của timeline
+TRIGGER_COLOR_KEYS = {'triple_dup_ack': 'warning', 'timeout': 'danger', 'unknown': 'text'}
+
+# State log làm tròn thời gian tới ms (trace CWND tới µs): thời điểm sự kiện/chuyển trạng thái
+# trong log lệch tối đa nửa bước này so với mẫu CWND tương ứng
+EVENT_TIME_RESOLUTION = 1e-3
+
+
+def find_decreases(cwnd, recovery=None, min_drop=MIN_DROP_FRACTION, rise_tolerance=RISE_TOLERANCE):
+    """
+    Các lần giảm nhân trong chuỗi CWND (vector hoá, O(n))
+
+    Mỗi đoạn mẫu giảm liên tiếp là một "run"; các run liền nhau được gộp khi
+    CWND chỉ tăng lại ít hoặc khi cả hai nằm trong cùng một đợt fast recovery
+    (dup ACK inflation), rồi chỉ giữ các nhóm có độ giảm >= min_drop.
+
+    Args:
+        cwnd (ndarray): Chuỗi CWND
+        recovery (ndarray): Số thứ tự đợt recovery của từng mẫu, -1 ngoài recovery
+                            (state_utils.recovery_ids); None nếu log không có STATE_CHANGE
+
+    Returns:
+        tuple: (peak_idx, trough_idx) ndarray - mẫu bắt đầu giảm (đỉnh) và mẫu đáy của từng lần giảm
+    """
+    cwnd = np.asarray(cwnd, dtype=float)
+    none = np.empty(0, dtype=np.intp)
+    if len(cwnd) < 2:
+        return none, none
+    falling = np.diff(cwnd) < 0
+    edges = np.diff(np.r_[False, falling, False].astype(np.int8))
+    # Run r đi từ mẫu starts[r] (đỉnh cục bộ) xuống mẫu ends[r] (đáy cục bộ)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    if not len(starts):
+        return none, none
+
+    merge = cwnd[starts[1:]] - cwnd[ends[:-1]] < rise_tolerance * cwnd[starts[:-1]]
+    if recovery is not None:
+        same_episode = recovery[ends[:-1]] == recovery[starts[1:]]
+        merge |= same_episode & (recovery[starts[1:]] >= 0)
+    first = np.flatnonzero(np.r_[True, ~merge])
+
+    # Đỉnh: CWND lúc nhóm bắt đầu giảm (trước inflation); đáy: cuối run cuối của nhóm
+    peak_idx = starts[first]
+    trough_idx = ends[np.r_[first[1:], len(starts)] - 1]
+    significant = cwnd[trough_idx] <= (1 - min_drop) * cwnd[peak_idx]
+    return peak_idx[significant], trough_idx[significant]
+
+
+def match_triggers(metrics, t_start, t_end, slack=EVENT_TIME_RESOLUTION / 2):
+    """
+    Sự kiện gây ra mỗi lần giảm: sự kiện mất gói (timeout/triple dup ACK) cuối cùng
+    trong (t_start, t_end] (dời thêm slack vì thời gian trong log đã làm tròn) -
+    tìm bằng searchsorted trên bảng sự kiện đã sắp xếp
+
+    Returns:
+        ndarray: Mã trigger (chỉ số trong CYCLE_TRIGGERS); 'unknown' khi không có sự kiện
+                 (vd log đã lọc bỏ loại sự kiện đó, hoặc chu kỳ bắt đầu trước phần log còn lại)
+    """
+    unknown = CYCLE_TRIGGERS.index('unknown')
+    times = [metrics.event_times(TRIGGER_EVENTS[name]) for name in CYCLE_TRIGGERS[:unknown]]
+    loss_times = np.concatenate(times)
+    loss_codes = np.repeat(np.arange(len(times)), [len(t) for t in times])
+    codes = np.full(len(t_end), unknown, dtype=np.intp)
+    if not len(loss_times) or not len(t_end):
+        return codes
+    order = np.argsort(loss_times, kind='stable')
+    loss_times, loss_codes = loss_times[order], loss_codes[order]
+    last = np.searchsorted(loss_times, t_end + slack, side='right') - 1
+    found = last >= 0
+    found[found] = loss_times[last[found]] > t_start[found] + slack
+    codes[found] = loss_codes[last[found]]
+    first = log_start(metrics.data)
+    if first is not None:
+        codes[t_start < first] = unknown
+    return codes
+
+
+def cycle_table(metrics, min_drop=MIN_DROP_FRACTION, rise_tolerance=RISE_TOLERANCE):
+    """
+    Bảng chu kỳ sawtooth dạng cột, mỗi dòng là một chu kỳ đã kết thúc
+
+    Chu kỳ k bắt đầu ở đáy của lần giảm trước (chu kỳ đầu: mẫu CWND đầu tiên),
+    tăng tới đỉnh rồi kết thúc ở đáy của lần giảm k. Đoạn tăng cuối cùng chưa
+    kết thúc bằng một lần giảm không được tính.
+
+    Args:
+        metrics (RunMetrics): Metric của một hàng đợi
+        min_drop (float): Độ giảm tối thiểu (phần của đỉnh) để tính là giảm nhân
+        rise_tolerance (float): Lần tăng tối đa (phần của đỉnh) vẫn gộp vào cùng một đợt giảm
+
+    Returns:
+        dict: {'columns': {'start', 'peak_time', 'end', 'duration', 'start_cwnd', 'peak',
+               'trough', 'drop_ratio', 'slope', 'trigger'}, 'n', 'triggers'}
+               (CWND theo KB, slope theo KB/s từ đầu chu kỳ tới đỉnh)
+    """
+    time, cwnd = metrics.time, metrics.cwnd
+    states = metrics.states['table']
+    recovery = recovery_ids(states, time + EVENT_TIME_RESOLUTION / 2) if states['n'] else None
+    peak_idx, trough_idx = find_decreases(cwnd, recovery, min_drop, rise_tolerance)
+    start_idx = np.r_[0, trough_idx[:-1]].astype(np.intp)[:len(peak_idx)]
+
+    start, peak_time, end = time[start_idx], time[peak_idx], time[trough_idx]
+    start_cwnd, peak, trough = cwnd[start_idx], cwnd[peak_idx], cwnd[trough_idx]
+    growth = peak_time - start
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(growth > 0, (peak - start_cwnd) / growth, np.nan)
+        drop_ratio = np.where(peak > 0, trough / peak, np.nan)
+    columns = {
+        'start': start,
+        'peak_time': peak_time,
+        'end': end,
+        'duration': end - start,
+        'start_cwnd': start_cwnd,
+        'peak': peak,
+        'trough': trough,
+        'drop_ratio': drop_ratio,
+        'slope': slope,
+        'trigger': match_triggers(metrics, start, end),
+    }
+    return {'columns': columns, 'n': len(peak_idx), 'triggers': list(CYCLE_TRIGGERS)}
+
+
+def trigger_colors(colors, names=CYCLE_TRIGGERS):
+    """Màu của từng trigger theo color scheme"""
+    return [colors[TRIGGER_COLOR_KEYS[name]] for name in names]
+
+
+def cycle_csv_table(table):
+    """Bảng chu kỳ với cột trigger là tên thay vì mã (cho write_csv)"""
+    columns = dict(table['columns'])
+    columns['trigger'] = np.array(table['triggers'], dtype=str)[columns['trigger']]
+    return {'columns': columns, 'n': table['n']}
+
+
+def cycle_summary(table):
+    """
+    Thống kê chu kỳ theo từng trigger (và 'all')
+
+    Returns:
+        dict: {trigger: {'count', 'duration', 'peak', 'slope', 'drop_ratio'}} (trung vị);
+              chỉ gồm trigger có ít nhất một chu kỳ
+    """
+    columns = table['columns']
+    groups = [('all', np.ones(table['n'], dtype=bool))]
+    groups += [(name, columns['trigger'] == k) for k, name in enumerate(table['triggers'])]
+    summary = {}
+    for name, mask in groups:
+        if not mask.any():
+            continue
+        stats = {'count': int(mask.sum())}
+        for key in ('duration', 'peak', 'slope', 'drop_ratio'):
+            values = columns[key][mask]
+            values = values[~np.isnan(values)]
+            stats[key] = float(np.median(values)) if len(values) else math.nan
+        summary[name] = stats
+    return summary
+
+
+def print_cycle_summary(table):
+    """In số chu kỳ và trung vị thời lượng/đỉnh/tốc độ tăng/tỉ lệ giảm theo trigger"""
+    print(f"   {'Trigger':<16}{'Cycles':>8}{'Duration':>11}{'Peak':>10}{'Slope':>12}{'After/Peak':>12}")
+    for name, stats in cycle_summary(table).items():
+        print(f"   {name:<16}{stats['count']:>8,}{stats['duration']:>9.3f} s"
+              f"{stats['peak']:>7.1f} KB{stats['slope']:>7.1f} KB/s{stats['drop_ratio']:>12.2f}")
+    print("   (trung vị mỗi chu kỳ; slope = tốc độ tăng từ đầu chu kỳ tới đỉnh)")
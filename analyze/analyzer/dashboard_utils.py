@@ -4,10 +4,21 @@ Các hàm tạo dashboard và biểu đồ
 """
 
 import numpy as np
-import matplotlib.pyplot as plt
+from config.plot_config import get_pyplot
 from matplotlib.gridspec import GridSpec
 from matplotlib.patches import Rectangle
-from .data_utils import count_events
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
+from .data_utils import filter_label
+from .metrics_utils import run_metrics
+from .state_utils import state_colors, sample_states
+from .cycle_utils import trigger_colors
+from .fairness_utils import fairness_summary
+from .compare_utils import (
+    queue_datasets, comparison_table, winners, format_metric, COMPARISON_METRICS, COMPARISON_EVENTS
+)
+
+plt = get_pyplot()
 
 
 def create_dashboard(analyzer, queue_type, show_gui=False):
@@ -15,19 +26,22 @@ def create_dashboard(analyzer, queue_type, show_gui=False):
     data = analyzer.data[queue_type]
     summary = data['summary']
     colors = analyzer.colors
+    # Thêm một hàng fairness khi có per-flow byte samples (numFlows > 1)
+    fairness_rows = 1 if len(data['flow_bytes']) > 1 else 0
     
     # Tạo figure với kích thước lớn
-    fig = plt.figure(figsize=(20, 12))
+    fig = plt.figure(figsize=(20, 12 + 3.5 * fairness_rows))
     fig.patch.set_facecolor(colors['background'])
     
     # Tạo layout phức tạp hơn
-    gs = GridSpec(4, 3, figure=fig, hspace=0.5, wspace=0.35,
+    gs = GridSpec(4 + fairness_rows, 3, figure=fig, hspace=0.5, wspace=0.35,
                  left=0.06, right=0.96, top=0.90, bottom=0.06)
 
     # ===== 1. CWND Evolution =====
     ax1 = fig.add_subplot(gs[0:2, :])
-    time = np.array(data['time'])
-    cwnd = np.array(data['cwnd'])
+    metrics = run_metrics(data)
+    time, cwnd = metrics.time, metrics.cwnd
+    t_end = time[-1] if len(time) else 0
     
     ax1.plot(time, cwnd, linewidth=3, color=colors[queue_type], 
             label=f'{queue_type} CWND', alpha=0.9, zorder=3)
@@ -37,36 +51,38 @@ def create_dashboard(analyzer, queue_type, show_gui=False):
                     alpha=0.15, zorder=1)
     
     # Đánh dấu events
-    timeouts = [e for e in data['events'] if e['event'] == 'TIMEOUT_EVENT']
-    fast_retx = [e for e in data['events'] if e['event'] == 'TRIPLE_DUP_ACK']
-    
-    for event in timeouts[:10]:
-        t = event['time']
-        if t < max(time):
-            idx = np.argmin(np.abs(time - t))
-            ax1.axvline(x=t, color=colors['danger'], linestyle='--', 
-                      linewidth=2, alpha=0.6, zorder=4)
-            ax1.scatter([t], [cwnd[idx]], color=colors['danger'], 
-                      s=150, marker='X', edgecolors='white', linewidths=2, 
-                      zorder=5, label='Timeout' if event == timeouts[0] else '')
-    
-    for event in fast_retx[:10]:
-        t = event['time']
-        if t < max(time):
-            idx = np.argmin(np.abs(time - t))
-            ax1.scatter([t], [cwnd[idx]], color=colors['warning'], 
-                      s=100, marker='v', edgecolors='white', linewidths=2, 
-                      zorder=5, label='Fast Retransmit' if event == fast_retx[0] else '')
+    timeouts = metrics.event_times('TIMEOUT_EVENT')[:10]
+    timeouts = timeouts[timeouts < t_end]
+    fast_retx = metrics.event_times('TRIPLE_DUP_ACK')[:10]
+    fast_retx = fast_retx[fast_retx < t_end]
+    
+    for t in timeouts:
+        ax1.axvline(x=t, color=colors['danger'], linestyle='--', 
+                  linewidth=2, alpha=0.6, zorder=4)
+    if len(timeouts):
+        ax1.scatter(timeouts, metrics.cwnd_at(timeouts), color=colors['danger'], 
+                  s=150, marker='X', edgecolors='white', linewidths=2, 
+                  zorder=5, label='Timeout')
+    if len(fast_retx):
+        ax1.scatter(fast_retx, metrics.cwnd_at(fast_retx), color=colors['warning'], 
+                  s=100, marker='v', edgecolors='white', linewidths=2, 
+                  zorder=5, label='Fast Retransmit')
+    plot_warmup(ax1, metrics.warmup, colors['text'])
     
     ax1.set_xlabel('Time (seconds)', fontsize=13, fontweight='bold')
     ax1.set_ylabel('Congestion Window (KB)', fontsize=13, fontweight='bold')
     ax1.set_title(f'Congestion Window Evolution - {queue_type}', 
                  fontsize=16, fontweight='bold', pad=15)
+    trace_note = filter_label(data['trace_filters'])
+    if trace_note:
+        ax1.text(0.98, 0.02, f'Filtered trace: {trace_note}', transform=ax1.transAxes,
+                fontsize=9, ha='right', va='bottom', style='italic', alpha=0.7)
     ax1.legend(loc='upper right', fontsize=10, framealpha=0.9)
     ax1.grid(True, alpha=0.3, linestyle=':', linewidth=1)
     ax1.set_facecolor('white')
     
-    stats_text = f'Max: {np.max(cwnd):.1f} KB\nAvg: {np.mean(cwnd):.1f} KB\nMin: {np.min(cwnd):.1f} KB'
+    stats_text = (f'Max: {metrics.cwnd_max:.1f} KB\nAvg: {metrics.cwnd_mean:.1f} KB '
+                  f'(steady: {metrics.steady.cwnd_mean:.1f})\nMin: {metrics.cwnd_min:.1f} KB')
     ax1.text(0.02, 0.98, stats_text, transform=ax1.transAxes,
             fontsize=10, verticalalignment='top',
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.8))
@@ -97,25 +113,28 @@ def create_dashboard(analyzer, queue_type, show_gui=False):
 
     # ===== 3. Events Bar Chart =====
     ax4 = fig.add_subplot(gs[3, 0])
-    event_counts = count_events(data['events'])
-    
     events_to_plot = ['DUP_ACK', 'TRIPLE_DUP_ACK', 'TIMEOUT_EVENT', 'NEW_ACK']
     event_labels = ['Dup ACKs', 'Fast Retx', 'Timeouts', 'New ACKs']
-    event_values = [event_counts.get(e, 0) for e in events_to_plot]
+    # Sự kiện bị lọc khỏi log: lấy counter từ summary hoặc hiển thị n/a
+    counts = [metrics.event(e) for e in events_to_plot]
+    event_values = [c if c is not None else 0 for c in counts]
     event_colors = [colors['accent1'], colors['warning'], 
                    colors['danger'], colors['success']]
     
     bars = ax4.barh(event_labels, event_values, color=event_colors, 
                    alpha=0.8, edgecolor='white', linewidth=2)
     
-    for bar, val in zip(bars, event_values):
+    for bar, val, count in zip(bars, event_values, counts):
         width = bar.get_width()
-        ax4.text(width + max(event_values)*0.02, bar.get_y() + bar.get_height()/2,
-                f'{int(val)}', ha='left', va='center', 
-                fontsize=11, fontweight='bold')
+        ax4.text(width + max(max(event_values), 1)*0.02, bar.get_y() + bar.get_height()/2,
+                f'{int(val)}' if count is not None else 'n/a (filtered)',
+                ha='left', va='center', fontsize=11, fontweight='bold')
     
     ax4.set_xlabel('Count', fontsize=11, fontweight='bold')
-    ax4.set_title('TCP Events Statistics', fontsize=13, fontweight='bold', pad=12)
+    events_title = 'TCP Events Statistics'
+    if data['trace_filters'].get('events', 'all') != 'all':
+        events_title += f"\n(log: {data['trace_filters']['events']})"
+    ax4.set_title(events_title, fontsize=13, fontweight='bold', pad=12)
     ax4.grid(True, axis='x', alpha=0.3)
     ax4.set_facecolor('white')
     ax4.tick_params(labelsize=10)
@@ -125,17 +144,17 @@ def create_dashboard(analyzer, queue_type, show_gui=False):
     n, bins, patches = ax5.hist(cwnd, bins=30, color=colors[queue_type], 
                                 alpha=0.7, edgecolor='white', linewidth=1.5)
     
-    cm = plt.cm.get_cmap('RdYlGn')
+    cm = plt.get_cmap('RdYlGn')
     bin_centers = 0.5 * (bins[:-1] + bins[1:])
     col = bin_centers - min(bin_centers)
     col /= max(col)
     for c, p in zip(col, patches):
         plt.setp(p, 'facecolor', cm(c))
     
-    ax5.axvline(np.mean(cwnd), color='red', linestyle='--', 
-               linewidth=2.5, label=f'Mean: {np.mean(cwnd):.1f}', alpha=0.8)
-    ax5.axvline(np.median(cwnd), color='blue', linestyle='--', 
-               linewidth=2.5, label=f'Median: {np.median(cwnd):.1f}', alpha=0.8)
+    ax5.axvline(metrics.cwnd_mean, color='red', linestyle='--', 
+               linewidth=2.5, label=f'Mean: {metrics.cwnd_mean:.1f}', alpha=0.8)
+    ax5.axvline(metrics.cwnd_median, color='blue', linestyle='--', 
+               linewidth=2.5, label=f'Median: {metrics.cwnd_median:.1f}', alpha=0.8)
     
     ax5.set_xlabel('CWND (KB)', fontsize=11, fontweight='bold')
     ax5.set_ylabel('Frequency', fontsize=11, fontweight='bold')
@@ -178,6 +197,10 @@ def create_dashboard(analyzer, queue_type, show_gui=False):
     
     ax6.set_title('Summary Statistics', fontsize=13, fontweight='bold', pad=15)
 
+    # ===== 6. Fairness: phần băng thông từng flow và Jain index theo thời gian =====
+    if fairness_rows:
+        plot_fairness(fig.add_subplot(gs[4, :2]), fig.add_subplot(gs[4, 2]), metrics.fairness, colors)
+
     # Title removed - handled by Tkinter in GUI mode
     # if not show_gui:
     #     fig.suptitle(f'TCP Reno Performance Dashboard - {queue_type} Queue', 
@@ -194,239 +217,399 @@ def create_dashboard(analyzer, queue_type, show_gui=False):
 
 def create_comparison_dashboard(analyzer, show_gui=False):
     """Tạo dashboard so sánh DropTail vs RED"""
-    colors = analyzer.colors
-    dt_data = analyzer.data['DropTail']
-    red_data = analyzer.data['RED']
-    
-    fig = plt.figure(figsize=(24, 14))
+    output_file = analyzer.results_dir / f"{analyzer.prefix}_comparison_dashboard.png"
+    return create_multi_comparison_dashboard(queue_datasets(analyzer), output_file,
+                                             analyzer.colors, show_gui)
+
+
+def create_multi_comparison_dashboard(datasets, output_file, colors, show_gui=False, title=None):
+    """
+    Dashboard so sánh N dataset (hàng đợi, lần chạy, cấu hình...)
+
+    Layout tự co giãn theo N: tối đa 3 dataset thì CWND vẽ chồng trên một trục
+    và phân bố CWND là histogram, nhiều hơn thì CWND là small multiples (chung
+    trục y) và phân bố là boxplot từ percentile đã tính sẵn. Mọi metric lấy từ
+    một bảng cột (comparison_table), CWND đã được giảm điểm.
+
+    Args:
+        datasets (list): Từ compare_utils (make_dataset/queue_datasets/load_datasets)
+        output_file (Path): File PNG
+        colors (dict): Color scheme
+        show_gui (bool): Nếu True, không gọi plt.show()
+        title (str): Tiêu đề đồ thị CWND (mặc định: các nhãn nối bằng "vs")
+    """
+    table = comparison_table(datasets)
+    columns = table['columns']
+    n = table['n']
+    labels = list(columns['label'])
+    run_colors = list(columns['color'])
+    best = winners(table)
+    overlay = n <= 3
+
+    cwnd_cols = 1 if overlay else min(4, n)
+    cwnd_rows = 1 if overlay else -(-n // cwnd_cols)
+    # Tới 8 dataset giữ nguyên kích thước figure (số pixel quyết định thời gian vẽ/encode PNG)
+    extra = min(max(0, n - 8), 12)
+    fig = plt.figure(figsize=(24, 14 + 0.5 * extra))
     fig.patch.set_facecolor(colors['background'])
-    
+
     gs = GridSpec(3, 3, figure=fig, hspace=0.4, wspace=0.3,
-                 left=0.05, right=0.95, top=0.91, bottom=0.06)
+                 left=0.05, right=0.95, top=0.91, bottom=0.06,
+                 height_ratios=[1 + 0.4 * (cwnd_rows - 1), 1, 1 + 0.1 * extra])
 
     # ===== 1. CWND Comparison =====
-    ax1 = fig.add_subplot(gs[0, :])
-    
-    ax1.plot(dt_data['time'], dt_data['cwnd'], linewidth=3, 
-            color=colors['DropTail'], label='DropTail', alpha=0.85, zorder=3)
-    ax1.fill_between(dt_data['time'], 0, dt_data['cwnd'],
-                    color=colors['DropTail'], alpha=0.15, zorder=1)
-    
-    ax1.plot(red_data['time'], red_data['cwnd'], linewidth=3, 
-            color=colors['RED'], label='RED', alpha=0.85, zorder=3)
-    ax1.fill_between(red_data['time'], 0, red_data['cwnd'],
-                    color=colors['RED'], alpha=0.15, zorder=1)
-    
-    ax1.set_xlabel('Time (seconds)', fontsize=14, fontweight='bold')
-    ax1.set_ylabel('Congestion Window (KB)', fontsize=14, fontweight='bold')
-    ax1.set_title('CWND Evolution Comparison: DropTail vs RED', 
-                 fontsize=18, fontweight='bold', pad=18)
-    ax1.legend(loc='upper right', fontsize=13, framealpha=0.95)
-    ax1.grid(True, alpha=0.3, linestyle=':', linewidth=1.5)
-    ax1.set_facecolor('white')
-    ax1.tick_params(labelsize=12)
+    if title is None:
+        title = ' vs '.join(labels) if overlay else f'{n} runs'
+    if overlay:
+        ax1 = fig.add_subplot(gs[0, :])
+        for (time, cwnd), label, color, dataset in zip(table['series'], labels, run_colors, datasets):
+            ax1.plot(time, cwnd, linewidth=3, color=color, label=label, alpha=0.85, zorder=3)
+            ax1.fill_between(time, 0, cwnd, color=color, alpha=0.15, zorder=1)
+            plot_warmup(ax1, run_metrics(dataset['data']).warmup, color, shade=False,
+                        label=f'{label} warm-up end')
+        ax1.set_xlabel('Time (seconds)', fontsize=14, fontweight='bold')
+        ax1.set_ylabel('Congestion Window (KB)', fontsize=14, fontweight='bold')
+        ax1.set_title(f'CWND Evolution Comparison: {title}', fontsize=18, fontweight='bold', pad=18)
+        ax1.legend(loc='upper right', fontsize=13, framealpha=0.95)
+        ax1.grid(True, alpha=0.3, linestyle=':', linewidth=1.5)
+        ax1.set_facecolor('white')
+        ax1.tick_params(labelsize=12)
+    else:
+        cwnd_gs = gs[0, :].subgridspec(cwnd_rows, cwnd_cols, hspace=0.45, wspace=0.12)
+        ymax = np.nanmax(columns['cwnd_max']) * 1.05 if np.any(~np.isnan(columns['cwnd_max'])) else 1
+        t_end = max((t[-1] for t, _ in table['series'] if len(t)), default=1)
+        for i, ((time, cwnd), label, color) in enumerate(zip(table['series'], labels, run_colors)):
+            ax = fig.add_subplot(cwnd_gs[i // cwnd_cols, i % cwnd_cols])
+            ax.plot(time, cwnd, linewidth=1.5, color=color, alpha=0.9)
+            ax.fill_between(time, 0, cwnd, color=color, alpha=0.15)
+            ax.axhline(columns['cwnd_mean'][i], color=color, linestyle='--', linewidth=1.5, alpha=0.8)
+            plot_warmup(ax, run_metrics(datasets[i]['data']).warmup, colors['text'], label=None)
+            ax.set_xlim(0, t_end)
+            ax.set_ylim(0, ymax)
+            ax.set_title(label, fontsize=12, fontweight='bold', color=colors['text'])
+            ax.grid(True, alpha=0.3, linestyle=':')
+            ax.set_facecolor('white')
+            ax.tick_params(labelsize=9)
+            # Chung trục: chỉ cột trái/hàng cuối có nhãn trục
+            if i % cwnd_cols == 0:
+                ax.set_ylabel('CWND (KB)', fontsize=11, fontweight='bold')
+            else:
+                ax.tick_params(labelleft=False)
+            if i + cwnd_cols >= n:
+                ax.set_xlabel('Time (s)', fontsize=11)
+            else:
+                ax.tick_params(labelbottom=False)
+        fig.text(0.5, 0.935, f'CWND Evolution: {title} (--- mean)', ha='center',
+                fontsize=18, fontweight='bold', color=colors['text'])
+
+    tick_rotation = 0 if n <= 3 else 30
+    tick_align = 'center' if n <= 3 else 'right'
 
     # ===== 2. Performance Metrics Comparison =====
-    metrics = ['avg_throughput', 'loss_rate', 'avg_delay']
-    metric_labels = ['Throughput (Mbps)', 'Loss Rate (%)', 'Avg Delay (ms)']
-    metric_colors = [colors['success'], colors['danger'], colors['accent3']]
-    
-    for idx, (metric, label, color) in enumerate(zip(metrics, metric_labels, metric_colors)):
+    for idx, (metric, label) in enumerate([(m[0], m[1]) for m in COMPARISON_METRICS[:3]]):
         ax = fig.add_subplot(gs[1, idx])
-        
-        dt_val = dt_data['summary'].get(metric, 0)
-        red_val = red_data['summary'].get(metric, 0)
-        
-        bars = ax.bar(['DropTail', 'RED'], [dt_val, red_val],
-                     color=[colors['DropTail'], colors['RED']], 
-                     alpha=0.7, edgecolor='white', linewidth=2.5)
-        
-        for bar, val in zip(bars, [dt_val, red_val]):
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{val:.2f}', ha='center', va='bottom',
-                   fontsize=13, fontweight='bold')
-        
+        values = np.nan_to_num(columns[metric])
+        x = np.arange(n)
+        bars = ax.bar(x, values, color=run_colors, alpha=0.7, edgecolor='white', linewidth=2.5)
+        if best[metric] is not None and n > 2:
+            bars[best[metric]].set_edgecolor(colors['text'])
+            bars[best[metric]].set_alpha(0.95)
+        for i, bar in enumerate(bars):
+            text = format_metric(table, metric, i) + (' ★' if best[metric] == i and n > 2 else '')
+            ax.text(bar.get_x() + bar.get_width()/2., bar.get_height(), text,
+                   ha='center', va='bottom', fontsize=13 if n <= 4 else 9, fontweight='bold')
+        ax.set_xticks(x)
+        ax.set_xticklabels(labels, rotation=tick_rotation, ha=tick_align,
+                          fontsize=11 if n <= 4 else 9)
         ax.set_ylabel(label, fontsize=12, fontweight='bold')
         ax.set_title(label.split('(')[0].strip(), fontsize=14, fontweight='bold', pad=12)
         ax.grid(True, alpha=0.3, axis='y')
         ax.set_facecolor('white')
-        ax.tick_params(labelsize=11)
+        ax.tick_params(axis='y', labelsize=11)
 
     # ===== 3. Event Comparison =====
     ax4 = fig.add_subplot(gs[2, 0])
-    
-    dt_events = count_events(dt_data['events'])
-    red_events = count_events(red_data['events'])
-    
-    events = ['TIMEOUT_EVENT', 'TRIPLE_DUP_ACK', 'DUP_ACK']
-    event_labels = ['Timeouts', 'Fast Retransmits', 'Dup ACKs']
-    
-    x = np.arange(len(events))
-    width = 0.35
-    
-    dt_values = [dt_events.get(e, 0) for e in events]
-    red_values = [red_events.get(e, 0) for e in events]
-    
-    ax4.bar(x - width/2, dt_values, width, label='DropTail',
-           color=colors['DropTail'], alpha=0.8, edgecolor='white', linewidth=2)
-    ax4.bar(x + width/2, red_values, width, label='RED',
-           color=colors['RED'], alpha=0.8, edgecolor='white', linewidth=2)
-    
+    x = np.arange(len(COMPARISON_EVENTS))
+    width = 0.7 / n
+    for i, (label, color) in enumerate(zip(labels, run_colors)):
+        offset = (i - (n - 1) / 2) * width
+        counts = [columns[f'events_{e}'][i] for e, _ in COMPARISON_EVENTS]
+        ax4.bar(x + offset, np.nan_to_num(counts), width, label=label,
+               color=color, alpha=0.8, edgecolor='white', linewidth=2 if n <= 3 else 0.5)
+        # Đánh dấu các cột không có số liệu vì sự kiện bị lọc khỏi log
+        for xi, (event, _) in zip(x, COMPARISON_EVENTS):
+            if table['missing'][event][i]:
+                ax4.text(xi + offset, 0, 'n/a', ha='center', va='bottom',
+                        fontsize=9, style='italic', rotation=90)
+
     ax4.set_xlabel('Event Type', fontsize=12, fontweight='bold')
     ax4.set_ylabel('Count', fontsize=12, fontweight='bold')
     ax4.set_title('TCP Events Comparison', fontsize=14, fontweight='bold', pad=12)
     ax4.set_xticks(x)
-    ax4.set_xticklabels(event_labels, fontsize=10)
-    ax4.legend(fontsize=11)
+    ax4.set_xticklabels([label for _, label in COMPARISON_EVENTS], fontsize=10)
+    ax4.legend(fontsize=11 if n <= 3 else 8, ncol=1 if n <= 4 else 2)
     ax4.grid(True, alpha=0.3, axis='y')
     ax4.set_facecolor('white')
     ax4.tick_params(labelsize=10)
 
     # ===== 4. CWND Distribution Comparison =====
     ax5 = fig.add_subplot(gs[2, 1])
-    
-    ax5.hist(dt_data['cwnd'], bins=30, alpha=0.6, label='DropTail',
-            color=colors['DropTail'], edgecolor='white', linewidth=1)
-    ax5.hist(red_data['cwnd'], bins=30, alpha=0.6, label='RED',
-            color=colors['RED'], edgecolor='white', linewidth=1)
-    
-    ax5.axvline(np.mean(dt_data['cwnd']), color=colors['DropTail'], 
-               linestyle='--', linewidth=2.5, alpha=0.8,
-               label=f'DT Mean: {np.mean(dt_data["cwnd"]):.1f}')
-    ax5.axvline(np.mean(red_data['cwnd']), color=colors['RED'], 
-               linestyle='--', linewidth=2.5, alpha=0.8,
-               label=f'RED Mean: {np.mean(red_data["cwnd"]):.1f}')
-    
-    ax5.set_xlabel('CWND (KB)', fontsize=12, fontweight='bold')
-    ax5.set_ylabel('Frequency', fontsize=12, fontweight='bold')
+    if overlay:
+        cwnd_all = [run_metrics(d['data']).cwnd for d in datasets]
+        nonempty = [c for c in cwnd_all if len(c)]
+        edges = np.histogram_bin_edges(np.concatenate(nonempty), bins=30) if nonempty else 30
+        for i, (cwnd, label, color) in enumerate(zip(cwnd_all, labels, run_colors)):
+            counts, _ = np.histogram(cwnd, bins=edges)
+            ax5.stairs(counts, edges, fill=True, alpha=0.6, label=label,
+                      color=color, edgecolor='white', linewidth=1)
+            ax5.axvline(columns['cwnd_mean'][i], color=color, linestyle='--', linewidth=2.5,
+                       alpha=0.8, label=f"{label} Mean: {columns['cwnd_mean'][i]:.1f}")
+        ax5.set_xlabel('CWND (KB)', fontsize=12, fontweight='bold')
+        ax5.set_ylabel('Frequency', fontsize=12, fontweight='bold')
+        ax5.legend(fontsize=9)
+        ax5.grid(True, alpha=0.3, axis='y')
+    else:
+        # Boxplot từ percentile trong bảng (râu = p5/p95), không truyền dữ liệu thô
+        stats = [{'label': label, 'med': columns['cwnd_p50'][i],
+                  'q1': columns['cwnd_p25'][i], 'q3': columns['cwnd_p75'][i],
+                  'whislo': columns['cwnd_p5'][i], 'whishi': columns['cwnd_p95'][i],
+                  'mean': columns['cwnd_mean'][i], 'fliers': []}
+                 for i, label in enumerate(labels)]
+        boxes = ax5.bxp(stats, orientation='horizontal', showmeans=True, patch_artist=True,
+                        meanprops={'marker': 'D', 'markerfacecolor': 'white',
+                                   'markeredgecolor': colors['text']})
+        for patch, color in zip(boxes['boxes'], run_colors):
+            patch.set_facecolor(color)
+            patch.set_alpha(0.7)
+        ax5.invert_yaxis()
+        ax5.set_xlabel('CWND (KB), p5-p25-p50-p75-p95, ◆ mean', fontsize=12, fontweight='bold')
+        ax5.tick_params(axis='y', labelsize=9)
+        ax5.grid(True, alpha=0.3, axis='x')
     ax5.set_title('CWND Distribution Comparison', fontsize=14, fontweight='bold', pad=12)
-    ax5.legend(fontsize=9)
-    ax5.grid(True, alpha=0.3, axis='y')
     ax5.set_facecolor('white')
-    ax5.tick_params(labelsize=10)
+    ax5.tick_params(axis='x', labelsize=10)
 
     # ===== 5. Summary Comparison Table =====
+    # Mỗi dòng một dataset, ô tốt nhất của mỗi cột được tô (thay cho cột Winner hai phía)
     ax6 = fig.add_subplot(gs[2, 2])
     ax6.axis('off')
-    
-    table_data = [
-        ['Metric', 'DropTail', 'RED'],
-        ['Throughput (Mbps)', 
-         f"{dt_data['summary'].get('avg_throughput', 0):.2f}",
-         f"{red_data['summary'].get('avg_throughput', 0):.2f}"],
-        ['Loss Rate (%)', 
-         f"{dt_data['summary'].get('loss_rate', 0):.2f}",
-         f"{red_data['summary'].get('loss_rate', 0):.2f}"],
-        ['Avg Delay (ms)', 
-         f"{dt_data['summary'].get('avg_delay', 0):.2f}",
-         f"{red_data['summary'].get('avg_delay', 0):.2f}"],
-        ['Timeouts', 
-         f"{int(dt_data['summary'].get('timeouts', 0)):,}",
-         f"{int(red_data['summary'].get('timeouts', 0)):,}"],
-        ['Fast Retransmits', 
-         f"{int(dt_data['summary'].get('fast_retransmits', 0)):,}",
-         f"{int(red_data['summary'].get('fast_retransmits', 0)):,}"]
-    ]
-    
-    table = ax6.table(cellText=table_data, cellLoc='center', loc='center',
-                     colWidths=[0.4, 0.3, 0.3])
-    table.auto_set_font_size(False)
-    table.set_fontsize(10)
-    table.scale(1, 2.0)
-    
+    headers = ['Run'] + [m[2] for m in COMPARISON_METRICS]
+    table_data = [headers] + [[label] + [format_metric(table, m[0], i) for m in COMPARISON_METRICS]
+                              for i, label in enumerate(labels)]
+    mpl_table = ax6.table(cellText=table_data, cellLoc='center', loc='center',
+                          colWidths=[0.35] + [0.65 / len(COMPARISON_METRICS)] * len(COMPARISON_METRICS))
+    mpl_table.auto_set_font_size(False)
+    mpl_table.set_fontsize(10 if n <= 4 else 8)
+    mpl_table.scale(1, 2.2 if n <= 4 else 1.5)
+
     for i in range(len(table_data)):
-        for j in range(3):
-            cell = table[(i, j)]
+        for j in range(len(headers)):
+            cell = mpl_table[(i, j)]
             if i == 0:
                 cell.set_facecolor(colors['accent1'])
                 cell.set_text_props(weight='bold', color='white')
+            elif j > 0 and best[COMPARISON_METRICS[j - 1][0]] == i - 1:
+                cell.set_facecolor('#D5F5E3')
+                cell.set_text_props(weight='bold')
             elif i % 2 == 1:
                 cell.set_facecolor('#F0F0F0')
             else:
                 cell.set_facecolor('white')
+            if j == 0 and i > 0:
+                cell.set_text_props(weight='bold', color=run_colors[i - 1])
             cell.set_edgecolor(colors['grid'])
             cell.set_linewidth(2)
-            if j > 0 and i > 0:
-                cell.set_text_props(weight='bold')
-    
-    ax6.set_title('Performance Summary', fontsize=14, fontweight='bold', pad=15)
-    
-    # Title removed - handled by Tkinter in GUI mode
-    # if not show_gui:
-    #     fig.suptitle('TCP Reno: DropTail vs RED Queue Comparison', 
-    #                 fontsize=22, fontweight='bold', y=0.97)
 
-    output_file = analyzer.results_dir / f"{analyzer.prefix}_comparison_dashboard.png"
-    plt.savefig(output_file, dpi=300, bbox_inches='tight',
-               facecolor=colors['background'])
+    ax6.set_title('Performance Summary (best highlighted)', fontsize=14, fontweight='bold', pad=15)
+
+    # fig.savefig: plt.savefig còn gọi draw_idle(), vẽ lại cả figure thêm một lần
+    fig.savefig(output_file, dpi=300, bbox_inches='tight',
+                facecolor=colors['background'])
     print(f"\nComparison Dashboard saved: {output_file}")
     if not show_gui:
         plt.show()
     return fig
 
 
+def plot_fairness(ax_time, ax_flows, fairness, colors, max_flows=20):
+    """
+    Phần băng thông nút cổ chai của từng flow (stack) và Jain index theo thời gian (trục phải),
+    cùng phần băng thông trung bình của từng flow so với fair share
+    """
+    columns = fairness['columns']
+    has_capacity = not np.isnan(fairness['capacity'])
+    values = np.nan_to_num(fairness['share'] if has_capacity else fairness['rate'])
+    unit = 'Share of bottleneck' if has_capacity else 'Throughput (Mbps)'
+    palette = plt.get_cmap('tab20')(np.arange(len(values)) % 20)
+    ax_time.stackplot(columns['time'], values, colors=palette, alpha=0.75, linewidth=0)
+    ax_time.set_xlabel('Time (seconds)', fontsize=11, fontweight='bold')
+    ax_time.set_ylabel(unit, fontsize=11, fontweight='bold')
+    ax_time.set_title(f"Bottleneck Share per Flow ({len(fairness['flows'])} flows, "
+                     f"{fairness['window']:g} s window)", fontsize=13, fontweight='bold', pad=12)
+    ax_time.grid(True, alpha=0.3, linestyle=':')
+    ax_time.set_facecolor('white')
+    
+    ax_jain = ax_time.twinx()
+    ax_jain.plot(columns['time'], columns['jain'], color=colors['text'], linewidth=2.5,
+                label="Jain's index")
+    ax_jain.set_ylim(0, 1.05)
+    ax_jain.set_ylabel("Jain's fairness index", fontsize=11, fontweight='bold')
+    ax_jain.legend(loc='lower right', fontsize=9, framealpha=0.9)
+    
+    summary = fairness_summary(fairness)
+    mean = summary['share'] if has_capacity else np.nanmean(fairness['rate'], axis=1)
+    order = np.argsort(np.nan_to_num(mean))[::-1]
+    shown = order if len(order) <= max_flows else np.r_[order[:max_flows // 2], order[-(max_flows // 2):]]
+    ax_flows.bar(np.arange(len(shown)), mean[shown], color=palette[shown], alpha=0.85,
+                edgecolor='white')
+    if has_capacity and len(mean):
+        ax_flows.axhline(1 / len(mean), color=colors['danger'], linestyle='--', linewidth=2,
+                        label=f'Fair share {100 / len(mean):.1f}%')
+        ax_flows.legend(fontsize=9)
+    ax_flows.set_xticks(np.arange(len(shown)), [fairness['flows'][i] for i in shown], fontsize=8)
+    ax_flows.set_xlabel('Flow' + (' (top/bottom)' if len(shown) < len(order) else ''),
+                       fontsize=11, fontweight='bold')
+    ax_flows.set_ylabel(unit, fontsize=11, fontweight='bold')
+    ax_flows.set_title(f"Jain {summary['jain_mean']:.3f} (mean), {summary['jain_overall']:.3f} (overall)",
+                      fontsize=13, fontweight='bold', pad=12)
+    ax_flows.grid(True, axis='y', alpha=0.3)
+    ax_flows.set_facecolor('white')
+
+
+def plot_warmup(ax, warmup, color, shade=True, label='Warm-up end'):
+    """
+    Vạch điểm kết thúc warm-up (MSER-5) và tô vùng warm-up trên trục thời gian
+
+    Args:
+        ax: Trục có trục x là thời gian
+        warmup (dict): RunMetrics.warmup
+        color (str): Màu vạch/vùng
+        shade (bool): Tô vùng từ đầu khoảng quan sát tới điểm cắt
+        label (str): Nhãn legend (thêm thời điểm cắt); None: không vào legend
+    """
+    if warmup['cut'] <= warmup['start']:
+        return
+    if shade:
+        ax.axvspan(warmup['start'], warmup['cut'], color=color, alpha=0.07, zorder=0)
+    ax.axvline(warmup['cut'], color=color, linestyle='-.', linewidth=1.8, alpha=0.8, zorder=4,
+               label=f"{label} ({warmup['cut']:.2f} s)" if label else None)
+
+
+def plot_state_cwnd(ax, metrics, colors, linewidth=2.5):
+    """
+    CWND tô màu theo trạng thái FSM bằng một LineCollection
+    
+    Mỗi đoạn của collection là một lượt mẫu liên tiếp cùng trạng thái (nối tới
+    mẫu đầu của lượt sau để đường liền mạch), nên số đoạn bằng số khoảng
+    trạng thái chứ không bằng số mẫu.
+    
+    Returns:
+        list: Handle cho legend (một đường mỗi trạng thái có xuất hiện)
+    """
+    states = metrics.states
+    names = states['names']
+    palette = state_colors(colors, names)
+    codes = sample_states(states['table'], metrics.time)
+    bounds = np.r_[0, np.flatnonzero(np.diff(codes)) + 1, len(codes)]
+    points = np.column_stack([metrics.time, metrics.cwnd])
+    segments = [points[a:b + 1] for a, b in zip(bounds[:-1], bounds[1:])]
+    ax.add_collection(LineCollection(segments, colors=[palette[codes[a]] for a in bounds[:-1]],
+                                     linewidths=linewidth, alpha=0.9, zorder=3))
+    ax.autoscale_view()
+    present = np.unique(codes)
+    return [Line2D([], [], color=palette[k], linewidth=linewidth,
+                   label=f"{names[k]} ({states['fraction'][k] * 100:.0f}%)") for k in present]
+
+
+def plot_state_band(ax, states, colors):
+    """Dải trạng thái kiểu Gantt: một broken_barh cho mỗi trạng thái"""
+    columns = states['table']['columns']
+    for k, color in enumerate(state_colors(colors, states['names'])):
+        mask = columns['state'] == k
+        if mask.any():
+            ax.broken_barh(np.column_stack([columns['start'][mask], columns['duration'][mask]]),
+                           (0, 1), facecolors=color, edgecolor='none')
+    ax.set_ylim(0, 1)
+    ax.set_yticks([])
+
+
 def create_animated_timeline(analyzer, queue_type, show_gui=False):
     """Tạo timeline view với annotations"""
     data = analyzer.data[queue_type]
     colors = analyzer.colors
     
-    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(18, 10), 
-                                    gridspec_kw={'height_ratios': [3, 1]})
+    fig, (ax1, ax_state, ax2) = plt.subplots(3, 1, figsize=(18, 11), sharex=True,
+                                             gridspec_kw={'height_ratios': [3, 0.4, 1]})
     fig.patch.set_facecolor(colors['background'])
     
-    time = np.array(data['time'])
-    cwnd = np.array(data['cwnd'])
-    
-    ax1.plot(time, cwnd, linewidth=2.5, color=colors[queue_type], 
-            alpha=0.9, label='CWND')
+    metrics = run_metrics(data)
+    time, cwnd = metrics.time, metrics.cwnd
+    t_end = time[-1] if len(time) else 0
+    
+    # CWND tô màu theo trạng thái khi log có STATE_CHANGE, ngược lại một màu như cũ
+    state_handles = []
+    if metrics.states['table']['n'] and len(time):
+        state_handles = plot_state_cwnd(ax1, metrics, colors)
+    else:
+        ax1.plot(time, cwnd, linewidth=2.5, color=colors[queue_type], 
+                alpha=0.9, label='CWND')
     ax1.fill_between(time, 0, cwnd, color=colors[queue_type], alpha=0.2)
     
     # Mark events
-    timeouts = [e for e in data['events'] if e['event'] == 'TIMEOUT_EVENT']
-    fast_retx = [e for e in data['events'] if e['event'] == 'TRIPLE_DUP_ACK']
-    
-    for event in timeouts:
-        t = event['time']
-        if t < max(time):
-            idx = np.argmin(np.abs(time - t))
-            ax1.scatter([t], [cwnd[idx]], s=200, marker='X', 
-                      color=colors['danger'], edgecolors='white',
-                      linewidths=2, zorder=10, 
-                      label='Timeout' if event == timeouts[0] else '')
-            ax1.axvline(x=t, color=colors['danger'], 
-                      linestyle='--', alpha=0.3, linewidth=2)
-    
-    for event in fast_retx:
-        t = event['time']
-        if t < max(time):
-            idx = np.argmin(np.abs(time - t))
-            ax1.scatter([t], [cwnd[idx]], s=150, marker='v',
-                      color=colors['warning'], edgecolors='white',
-                      linewidths=2, zorder=10, 
-                      label='Fast Retx' if event == fast_retx[0] else '')
+    # Mỗi loại sự kiện là một scatter + một vlines (thay vì một artist mỗi sự kiện)
+    timeouts = metrics.event_times('TIMEOUT_EVENT')
+    timeouts = timeouts[timeouts < t_end]
+    fast_retx = metrics.event_times('TRIPLE_DUP_ACK')
+    fast_retx = fast_retx[fast_retx < t_end]
+    
+    if len(timeouts):
+        ax1.scatter(timeouts, metrics.cwnd_at(timeouts), s=200, marker='X', 
+                  color=colors['danger'], edgecolors='white',
+                  linewidths=2, zorder=10, label='Timeout')
+        ax1.vlines(timeouts, 0, 1, transform=ax1.get_xaxis_transform(),
+                  color=colors['danger'], linestyle='--', alpha=0.3, linewidth=2)
+    
+    if len(fast_retx):
+        ax1.scatter(fast_retx, metrics.cwnd_at(fast_retx), s=150, marker='v',
+                  color=colors['warning'], edgecolors='white',
+                  linewidths=2, zorder=10, label='Fast Retx')
+    plot_warmup(ax1, metrics.warmup, colors['text'])
     
     ax1.set_ylabel('CWND (KB)', fontsize=13, fontweight='bold')
     ax1.set_title(f'Detailed Timeline - {queue_type}', 
                  fontsize=16, fontweight='bold', pad=15)
-    ax1.legend(loc='upper right', fontsize=10, framealpha=0.95)
+    handles, _ = ax1.get_legend_handles_labels()
+    ax1.legend(handles=state_handles + handles, loc='upper right', fontsize=10, framealpha=0.95)
     ax1.grid(True, alpha=0.3, linestyle=':')
     ax1.set_facecolor('white')
     ax1.tick_params(labelsize=11)
     
     # Event density heatmap
-    event_times = [e['time'] for e in data['events']]
-    if event_times:
-        hist, bins = np.histogram(event_times, bins=50, range=(0, max(time)))
+    event_times = metrics.event_time_array
+    if len(event_times):
+        hist, bins = np.histogram(event_times, bins=50, range=(0, t_end))
         colors_map = plt.cm.YlOrRd(hist / max(hist) if max(hist) > 0 else hist)
         
         for i in range(len(bins)-1):
             ax2.add_patch(Rectangle((bins[i], 0), bins[i+1]-bins[i], 1,
                                    facecolor=colors_map[i], edgecolor='none'))
     
+    # Dải trạng thái FSM (Gantt)
+    if metrics.states['table']['n']:
+        plot_state_band(ax_state, metrics.states, colors)
+    else:
+        ax_state.text(0.5, 0.5, 'No STATE_CHANGE in log', transform=ax_state.transAxes,
+                     ha='center', va='center', fontsize=10, style='italic', alpha=0.7)
+        ax_state.set_yticks([])
+    ax_state.set_ylabel('State', fontsize=10, fontweight='bold')
+    ax_state.set_facecolor('white')
+    
     ax2.set_xlabel('Time (seconds)', fontsize=13, fontweight='bold')
-    ax2.set_ylabel('Event\nDensity', fontsize=10, fontweight='bold')
-    ax2.set_xlim(0, max(time))
+    density_label = 'Event\nDensity'
+    if data['trace_filters'].get('events', 'all') != 'all':
+        density_label += f"\n({data['trace_filters']['events']})"
+    ax2.set_ylabel(density_label, fontsize=10, fontweight='bold')
+    ax2.set_xlim(0, t_end)
     ax2.set_ylim(0, 1)
     ax2.set_yticks([])
     ax2.set_facecolor('white')
@@ -441,3 +624,275 @@ def create_animated_timeline(analyzer, queue_type, show_gui=False):
     if not show_gui:
         plt.show()
     return fig
+
+
+def create_cycle_plots(analyzer, queue_type, show_gui=False):
+    """Phân phối các chu kỳ sawtooth: đỉnh/đáy trên CWND và histogram theo trigger"""
+    colors = analyzer.colors
+    metrics = run_metrics(analyzer.data[queue_type])
+    table = metrics.cycles
+    columns = table['columns']
+    names = table['triggers']
+    palette = trigger_colors(colors, names)
+    
+    fig = plt.figure(figsize=(16, 11))
+    fig.patch.set_facecolor(colors['background'])
+    gs = GridSpec(3, 2, figure=fig, height_ratios=[1.2, 1, 1], hspace=0.4, wspace=0.2)
+    
+    # CWND (đã giảm điểm) với đỉnh và đáy của từng chu kỳ
+    ax = fig.add_subplot(gs[0, :])
+    time, cwnd = metrics.decimated(4000)
+    ax.plot(time, cwnd, color=colors[queue_type], linewidth=1.2, alpha=0.8, label='CWND')
+    for k, (name, color) in enumerate(zip(names, palette)):
+        mask = columns['trigger'] == k
+        if mask.any():
+            ax.scatter(columns['peak_time'][mask], columns['peak'][mask], s=45, marker='^',
+                      color=color, edgecolors='white', linewidths=0.8, zorder=5,
+                      label=f"Peak → {name} ({int(mask.sum())})")
+    if table['n']:
+        ax.scatter(columns['end'], columns['trough'], s=25, marker='v', color=colors['text'],
+                  alpha=0.6, zorder=5, label='Trough')
+    ax.set_title(f'Sawtooth Cycles - {queue_type} ({table["n"]:,} cycles)',
+                fontsize=15, fontweight='bold')
+    ax.set_xlabel('Time (s)', fontsize=11)
+    ax.set_ylabel('CWND (KB)', fontsize=11, fontweight='bold')
+    ax.legend(loc='upper right', fontsize=9, framealpha=0.95)
+    ax.grid(True, alpha=0.3, linestyle=':')
+    ax.set_facecolor('white')
+    
+    # Histogram chồng theo trigger
+    panels = [('peak', 'Peak CWND (KB)'), ('duration', 'Cycle Duration (s)'),
+              ('slope', 'Growth Slope (KB/s)'), ('drop_ratio', 'CWND After / Peak')]
+    for (key, label), cell in zip(panels, [gs[1, 0], gs[1, 1], gs[2, 0], gs[2, 1]]):
+        ax = fig.add_subplot(cell)
+        values = columns[key]
+        valid = ~np.isnan(values)
+        groups = [(values[valid & (columns['trigger'] == k)], name, color)
+                  for k, (name, color) in enumerate(zip(names, palette))]
+        groups = [g for g in groups if len(g[0])]
+        if groups:
+            bins = np.histogram_bin_edges(values[valid], bins=min(30, max(5, int(valid.sum()))))
+            ax.hist([g[0] for g in groups], bins=bins, stacked=True,
+                   color=[g[2] for g in groups], label=[g[1] for g in groups],
+                   edgecolor='white', linewidth=0.5)
+            median = np.median(values[valid])
+            ax.axvline(median, color=colors['text'], linestyle='--', linewidth=1.5,
+                      label=f'Median {median:.3g}')
+            ax.legend(fontsize=8, framealpha=0.95)
+        else:
+            ax.text(0.5, 0.5, 'No complete cycle', transform=ax.transAxes,
+                   ha='center', va='center', fontsize=10, style='italic', alpha=0.7)
+        ax.set_xlabel(label, fontsize=11, fontweight='bold')
+        ax.set_ylabel('Cycles', fontsize=10)
+        ax.grid(True, alpha=0.3, linestyle=':', axis='y')
+        ax.set_facecolor('white')
+    
+    output_file = analyzer.results_dir / f"{analyzer.prefix}_cycles_{queue_type}.png"
+    plt.savefig(output_file, dpi=300, bbox_inches='tight',
+               facecolor=colors['background'])
+    print(f"\nCycle plots saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
+
+
+def create_goodput_plot(analyzer, queue_type, interval, show_gui=False):
+    """Goodput theo thời gian chồng lên CWND, và byte truyền lại mỗi bin"""
+    colors = analyzer.colors
+    metrics = run_metrics(analyzer.data[queue_type])
+    tracker = metrics.retransmissions(interval)
+    table = tracker.table()
+    columns = table['columns']
+    stats = tracker.as_dict()
+    
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(16, 9), sharex=True,
+                                   gridspec_kw={'height_ratios': [3, 1]})
+    fig.patch.set_facecolor(colors['background'])
+    
+    # Goodput (bậc thang theo bin) trên trục trái, CWND trên trục phải
+    source = 'NEW_ACK' if table['goodput_source'] == 'ack' else 'new TX-DATA'
+    ax1.step(columns['time'], columns['goodput'], where='post', color=colors['accent3'],
+            linewidth=1.8, label=f'Goodput ({source}, {interval:g}s bins)')
+    ax1.step(columns['time'], columns['throughput'], where='post', color=colors['accent3'],
+            linewidth=1, alpha=0.4, linestyle='--', label='Sent (incl. retransmissions)')
+    ax1.set_ylabel('Rate (Mbps)', fontsize=12, fontweight='bold', color=colors['accent3'])
+    ax1.set_ylim(bottom=0)
+    ax_cwnd = ax1.twinx()
+    time, cwnd = metrics.decimated(4000)
+    ax_cwnd.plot(time, cwnd, color=colors[queue_type], linewidth=1.5, alpha=0.8, label='CWND')
+    ax_cwnd.set_ylabel('CWND (KB)', fontsize=12, fontweight='bold', color=colors[queue_type])
+    ax_cwnd.set_ylim(bottom=0)
+    handles = ax1.get_legend_handles_labels()[0] + ax_cwnd.get_legend_handles_labels()[0]
+    ax1.legend(handles=handles, loc='upper right', fontsize=10, framealpha=0.95)
+    ax1.set_title(f'Goodput vs CWND - {queue_type}  (avg goodput {stats["goodput"]:.2f} Mbps, '
+                 f'retransmitted {stats["retx_ratio"] * 100:.2f}% of bytes)',
+                 fontsize=15, fontweight='bold', pad=12)
+    ax1.grid(True, alpha=0.3, linestyle=':')
+    ax1.set_facecolor('white')
+    
+    # Byte truyền lại mỗi bin
+    ax2.bar(columns['time'], columns['retx'] / 1e3, width=interval, align='edge',
+           color=colors['danger'], alpha=0.8, label='Retransmitted')
+    ax2.set_ylabel('Retx (KB)', fontsize=11, fontweight='bold')
+    ax2.set_xlabel('Time (seconds)', fontsize=12, fontweight='bold')
+    ax2.legend(loc='upper right', fontsize=9, title=f"{stats['retx_segments']:,} segments, "
+              f"{stats['retx_bytes'] / 1e3:,.1f} KB wasted", title_fontsize=9)
+    ax2.grid(True, alpha=0.3, linestyle=':', axis='y')
+    ax2.set_facecolor('white')
+    
+    plt.tight_layout()
+    
+    output_file = analyzer.results_dir / f"{analyzer.prefix}_goodput_{queue_type}.png"
+    plt.savefig(output_file, dpi=300, bbox_inches='tight',
+               facecolor=colors['background'])
+    print(f"\nGoodput plot saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
+
+
+def create_rtt_plot(analyzer, queues, show_gui=False):
+    """RTT từng gói và quỹ đạo RTO (một hàng mỗi hàng đợi), đánh dấu timeout và timeout giả"""
+    colors = analyzer.colors
+    fig, axes = plt.subplots(len(queues), 1, figsize=(16, 4.5 * len(queues) + 1), sharex=True,
+                             squeeze=False)
+    fig.patch.set_facecolor(colors['background'])
+    
+    for ax, queue_type in zip(axes[:, 0], queues):
+        rtt = run_metrics(analyzer.data[queue_type]).rtt
+        columns, stats = rtt['samples']['columns'], rtt['stats']
+        ax.scatter(columns['time'], columns['rtt'] * 1e3, s=4, color=colors[queue_type],
+                  alpha=0.6, rasterized=True, label=f"RTT samples ({rtt['samples']['n']:,})")
+        if rtt['samples']['n']:
+            ax.axhline(stats['min'] * 1e3, color=colors['accent2'], linestyle=':', linewidth=1.5,
+                      label=f"min {stats['min'] * 1e3:.1f} ms")
+            ax.axhline(stats['p50'] * 1e3, color=colors['text'], linestyle='--', linewidth=1.5,
+                      label=f"p50 {stats['p50'] * 1e3:.1f} ms (queueing ≈ {stats['queueing'] * 1e3:.1f} ms)")
+        ax.set_ylabel('RTT (ms)', fontsize=12, fontweight='bold', color=colors[queue_type])
+        ax.set_ylim(bottom=0)
+        
+        # RTO (bậc thang) trên trục phải
+        ax_rto = ax.twinx()
+        times, rto = rtt['rto']
+        if len(rto):
+            # RTO trước thay đổi đầu tiên (oldRTO) kéo dài từ mẫu RTT đầu tiên
+            t_start = min(times[0], columns['time'][0]) if len(columns['time']) else times[0]
+            t_end = max(times[-1], columns['time'][-1]) if len(columns['time']) else times[-1]
+            ax_rto.step(np.r_[t_start, times[1:], t_end], np.r_[rto, rto[-1]], where='post',
+                       color=colors['accent3'], linewidth=1.8, label='RTO')
+        ax_rto.set_ylabel('RTO (s)', fontsize=12, fontweight='bold', color=colors['accent3'])
+        ax_rto.set_ylim(bottom=0)
+        
+        timeouts, spurious = rtt['timeouts'], rtt['spurious']
+        if len(timeouts[~spurious]):
+            ax.vlines(timeouts[~spurious], 0, 1, transform=ax.get_xaxis_transform(),
+                     color=colors['danger'], linestyle='--', alpha=0.6, linewidth=1.5, label='Timeout')
+        if spurious.any():
+            ax.vlines(timeouts[spurious], 0, 1, transform=ax.get_xaxis_transform(),
+                     color=colors['warning'], linewidth=2.5, label='Spurious timeout')
+        
+        handles = ax.get_legend_handles_labels()[0] + ax_rto.get_legend_handles_labels()[0]
+        ax.legend(handles=handles, loc='upper right', fontsize=9, framealpha=0.95)
+        ax.set_title(f"RTT / RTO - {queue_type}  ({rtt['samples']['karn_discarded']:,} samples "
+                    f"discarded by Karn's rule)", fontsize=14, fontweight='bold')
+        ax.grid(True, alpha=0.3, linestyle=':')
+        ax.set_facecolor('white')
+    axes[-1, 0].set_xlabel('Time (seconds)', fontsize=12, fontweight='bold')
+    
+    plt.tight_layout()
+    
+    name = queues[0] if len(queues) == 1 else 'comparison'
+    output_file = analyzer.results_dir / f"{analyzer.prefix}_rtt_{name}.png"
+    plt.savefig(output_file, dpi=300, bbox_inches='tight',
+               facecolor=colors['background'])
+    print(f"\nRTT plot saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
+
+
+def create_sync_plot(analyzer, queues, show_gui=False, max_ticks=10):
+    """Ma trận tương quan chéo CWND giữa các flow và raster các lần mất gói (một cột mỗi hàng đợi)"""
+    colors = analyzer.colors
+    fig, axes = plt.subplots(2, len(queues), figsize=(8 * len(queues) + 1, 13), squeeze=False,
+                             gridspec_kw={'height_ratios': [1.2, 1]})
+    fig.patch.set_facecolor(colors['background'])
+
+    for (ax_corr, ax_loss), queue_type in zip(axes.T, queues):
+        data = analyzer.data[queue_type]
+        if len(data['flow_cwnd']) < 2:
+            for ax in (ax_corr, ax_loss):
+                ax.text(0.5, 0.5, f'{queue_type}: không có per-flow CWND trace\n(chạy với --numFlows > 1)',
+                       ha='center', va='center', fontsize=12, transform=ax.transAxes)
+                ax.axis('off')
+            continue
+        sync = run_metrics(data).sync
+        flows = sync['flows']
+        ticks = np.unique(np.linspace(0, len(flows) - 1, min(len(flows), max_ticks)).round().astype(int))
+
+        image = ax_corr.imshow(sync['correlation']['peak'], cmap='RdBu_r', vmin=-1, vmax=1,
+                               interpolation='nearest')
+        ax_corr.set_xticks(ticks, [flows[i] for i in ticks], fontsize=8)
+        ax_corr.set_yticks(ticks, [flows[i] for i in ticks], fontsize=8)
+        ax_corr.grid(False)
+        ax_corr.set_xlabel('Flow', fontsize=11, fontweight='bold')
+        ax_corr.set_ylabel('Flow', fontsize=11, fontweight='bold')
+        fig.colorbar(image, ax=ax_corr, fraction=0.046, pad=0.04,
+                     label=f"Peak cross-correlation (±{sync['window'] * 1e3:g} ms)")
+        ax_corr.set_title(f"{queue_type} - sync index {sync['sync_index']:.3f} "
+                         f"(lag 0: {sync['mean_correlation']:.3f})", fontsize=14, fontweight='bold')
+
+        # Mỗi lần mất gói tô theo phần các flow khác mất gói cùng lúc (sọc dọc đậm = đồng bộ)
+        coincidence = sync['coincidence']
+        times = np.concatenate(sync['loss_times']) if flows else np.empty(0)
+        rows = np.repeat(np.arange(len(flows)), [len(t) for t in sync['loss_times']])
+        shared = coincidence['others'] / max(len(flows) - 1, 1)
+        points = ax_loss.scatter(times, rows, c=shared, cmap='Reds', vmin=0, vmax=1, marker='|',
+                                 s=60, linewidths=1.5, rasterized=True)
+        ax_loss.set_yticks(ticks, [flows[i] for i in ticks], fontsize=8)
+        ax_loss.set_ylim(len(flows) - 0.5, -0.5)
+        ax_loss.set_xlabel('Time (seconds)', fontsize=11, fontweight='bold')
+        ax_loss.set_ylabel('Flow', fontsize=11, fontweight='bold')
+        fig.colorbar(points, ax=ax_loss, fraction=0.046, pad=0.04, label='Share of other flows losing')
+        ax_loss.set_title(f"Loss events ({coincidence['losses']:,}): "
+                         f"{coincidence['fraction'] * 100:.1f}% of flows together "
+                         f"(independent: {coincidence['baseline'] * 100:.1f}%)",
+                         fontsize=12, fontweight='bold')
+        ax_loss.grid(True, alpha=0.3, linestyle=':')
+        ax_loss.set_facecolor('white')
+
+    plt.tight_layout()
+
+    name = queues[0] if len(queues) == 1 else 'comparison'
+    output_file = analyzer.results_dir / f"{analyzer.prefix}_sync_{name}.png"
+    plt.savefig(output_file, dpi=200, bbox_inches='tight',
+               facecolor=colors['background'])
+    print(f"\nSynchronization plot saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
+
+
+def show_cached_image(image_file, dpi, show_gui=False):
+    """
+    Hiển thị hình đã lưu (render cache trúng) thay vì vẽ lại
+
+    Args:
+        image_file (Path): File PNG đã có
+        dpi (int): dpi đã dùng khi lưu (để cửa sổ có kích thước như hình gốc)
+        show_gui (bool): Nếu True, không mở cửa sổ (chỉ cần file)
+    """
+    if show_gui:
+        return None
+    from PIL import Image
+    # Giữ uint8 (plt.imread đổi PNG sang float, chậm với ảnh 300 dpi)
+    with Image.open(image_file) as img:
+        image = np.asarray(img)
+    height, width = image.shape[:2]
+    fig = plt.figure(figsize=(width / dpi, height / dpi))
+    ax = fig.add_axes([0, 0, 1, 1])
+    ax.imshow(image, interpolation='antialiased')
+    ax.axis('off')
+    fig.canvas.manager.set_window_title(image_file.name)
+    plt.show()
+    return fig
@@ -5,7 +5,51 @@ Các hàm tiện ích cho load và parse dữ liệu
 
 import re
 import glob
+import warnings
+from collections import Counter
+from itertools import islice
 from pathlib import Path
+import numpy as np
+
+
+# Phần mở rộng file theo loại output của simulator
+SUFFIX_EXTENSIONS = {
+    'cwnd_trace': '.tr',
+    'flow_cwnd': '.tr',
+    'flow_bytes': '.tr',
+    'tcp_state': '.log',
+    'summary': '.txt',
+}
+
+# Nhóm sự kiện dùng cho --logEvents của simulator (giống g_eventCategory)
+EVENT_CATEGORIES = {
+    'STATE_CHANGE': 'state', 'EXIT_FAST_RECOVERY': 'state',
+    'UPDATE': 'state', 'SSTHRESH_UPDATE': 'state',
+    'DUP_ACK': 'loss', 'TRIPLE_DUP_ACK': 'loss', 'FAST_RECOVERY_DUP': 'loss',
+    'RTO_CHANGE': 'rto', 'TIMEOUT_EVENT': 'rto', 'TIMEOUT_IN_SS': 'rto',
+    'TX-DATA': 'tx', 'TX-SYN': 'tx',
+    'NEW_ACK': 'ack',
+}
+
+# Counter trong summary dùng thay cho số đếm từ log khi sự kiện bị lọc
+EVENT_SUMMARY_KEYS = {
+    'DUP_ACK': 'dup_acks',
+    'TRIPLE_DUP_ACK': 'fast_retransmits',
+    'TIMEOUT_EVENT': 'timeouts',
+    'STATE_CHANGE': 'state_changes',
+}
+
+# Số dòng mỗi khối khi đọc trace dạng cột số (iter_trace_chunks)
+TRACE_CHUNK_LINES = 1 << 18
+
+DEFAULT_TRACE_FILTERS = {
+    'events': 'all',
+    'cwndSampleInterval': 0.0,
+    'cwndMinChange': 0.0,
+    'maxLogMBytes': 0.0,
+    'logRotateCount': 3,
+    'log_rotations': 0,     # từ summary (State Log Rotations), không có trong header của log
+}
 
 
 def find_latest_file(results_dir, prefix, queue_type, suffix):
@@ -16,31 +60,20 @@ def find_latest_file(results_dir, prefix, queue_type, suffix):
         results_dir (Path): Thư mục chứa kết quả
         prefix (str): Prefix của files
         queue_type (str): Loại hàng đợi (DropTail/RED)
-        suffix (str): Suffix của file (vd: cwnd_trace, summary, tcp_state)
+        suffix (str): Suffix của file (vd: cwnd_trace, summary, tcp_state, flow_cwnd)
     
     Returns:
         Path: Đường dẫn đến file mới nhất hoặc None
     """
+    ext = SUFFIX_EXTENSIONS.get(suffix, '')
+
     # Tìm tất cả files match pattern với timestamp
-    pattern = f"{prefix}_*_{suffix}_{queue_type}"
-    if suffix == "cwnd_trace":
-        pattern += ".tr"
-    elif suffix == "tcp_state":
-        pattern += ".log"
-    elif suffix == "summary":
-        pattern += ".txt"
-    
+    pattern = f"{prefix}_*_{suffix}_{queue_type}{ext}"
     files = list(results_dir.glob(pattern))
     
     # Nếu không tìm thấy file với timestamp, thử tìm file cũ không có timestamp
     if not files:
-        old_pattern = f"{prefix}_{suffix}_{queue_type}"
-        if suffix == "cwnd_trace":
-            old_pattern += ".tr"
-        elif suffix == "tcp_state":
-            old_pattern += ".log"
-        elif suffix == "summary":
-            old_pattern += ".txt"
+        old_pattern = f"{prefix}_{suffix}_{queue_type}{ext}"
         old_file = results_dir / old_pattern
         if old_file.exists():
             return old_file
@@ -72,19 +105,21 @@ def load_data(results_dir, prefix, queue_type):
         'time': [],
         'state_changes': [],
         'events': [],
-        'summary': {}
+        'summary': {},
+        'flows': [],
+        'flow_cwnd': {},
+        'flow_bytes': {},
+        'state_files': [],
+        'trace_filters': dict(DEFAULT_TRACE_FILTERS)
     }
 
     # Load CWND trace
     cwnd_file = find_latest_file(results_dir, prefix, queue_type, "cwnd_trace")
     if cwnd_file and cwnd_file.exists():
         print(f"📄 Đang đọc: {cwnd_file.name}")
-        with open(cwnd_file, 'r') as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) == 2:
-                    data['time'].append(float(parts[0]))
-                    data['cwnd'].append(float(parts[1]))
+        for chunk in iter_trace_chunks(cwnd_file, 2):
+            data['time'].extend(chunk[:, 0].tolist())
+            data['cwnd'].extend(chunk[:, 1].tolist())
         print(f"✅ Đã tải {len(data['time'])} điểm dữ liệu CWND")
     else:
         print(f"❌ Không tìm thấy file CWND cho {queue_type}")
@@ -92,29 +127,33 @@ def load_data(results_dir, prefix, queue_type):
     # Load state changes
     state_file = find_latest_file(results_dir, prefix, queue_type, "tcp_state")
     if state_file and state_file.exists():
-        print(f"📄 Đang đọc: {state_file.name}")
-        with open(state_file, 'r') as f:
-            for line in f:
-                if line.startswith('#') or line.startswith('-'):
-                    continue
-                parts = line.strip().split()
-                if len(parts) >= 2:
-                    try:
-                        time = float(parts[0].rstrip('s:'))
-                        event = parts[1]
-                        detail = ' '.join(parts[2:]) if len(parts) > 2 else ''
-                        data['events'].append({
+        log_files = data['state_files'] = rotated_log_files(state_file)
+        print(f"📄 Đang đọc: {state_file.name}"
+              + (f" (+{len(log_files) - 1} rotated)" if len(log_files) > 1 else ""))
+        for line in _iter_log_lines(log_files):
+            if line.startswith('# filters:'):
+                data['trace_filters'] = parse_trace_filters(line)
+                continue
+            if line.startswith('#') or line.startswith('-'):
+                continue
+            parts = line.strip().split()
+            if len(parts) >= 2:
+                try:
+                    time = float(parts[0].rstrip('s:'))
+                    event = parts[1]
+                    detail = ' '.join(parts[2:]) if len(parts) > 2 else ''
+                    data['events'].append({
+                        'time': time,
+                        'event': event,
+                        'detail': detail
+                    })
+                    if event == 'STATE_CHANGE':
+                        data['state_changes'].append({
                             'time': time,
-                            'event': event,
                             'detail': detail
                         })
-                        if event == 'STATE_CHANGE':
-                            data['state_changes'].append({
-                                'time': time,
-                                'detail': detail
-                            })
-                    except ValueError:
-                        continue
+                except ValueError:
+                    continue
         print(f"✅ Đã tải {len(data['events'])} sự kiện")
     else:
         print(f"❌ Không tìm thấy file state log")
@@ -126,13 +165,356 @@ def load_data(results_dir, prefix, queue_type):
         with open(summary_file, 'r') as f:
             content = f.read()
             data['summary'] = parse_summary(content)
-        print(f"✅ Đã tải thống kê tổng hợp")
+            data['flows'] = parse_flow_stats(content)
+        # Số lần xoay vòng quyết định log còn đủ hay đã mất phần đầu (is_log_truncated)
+        data['trace_filters']['log_rotations'] = int(data['summary'].get('log_rotations', 0))
+        print(f"✅ Đã tải thống kê tổng hợp ({len(data['flows'])} flows)")
     else:
         print(f"❌ Không tìm thấy file summary")
 
+    # Load per-flow CWND trace (chỉ có khi numFlows > 1)
+    flow_file = find_latest_file(results_dir, prefix, queue_type, "flow_cwnd")
+    if flow_file and flow_file.exists():
+        print(f"📄 Đang đọc: {flow_file.name}")
+        data['flow_cwnd'] = load_flow_cwnd(flow_file)
+        print(f"✅ Đã tải CWND của {len(data['flow_cwnd'])} flows")
+
+    # Load per-flow byte samples (số byte được ACK tích luỹ, chỉ có khi numFlows > 1)
+    bytes_file = find_latest_file(results_dir, prefix, queue_type, "flow_bytes")
+    if bytes_file and bytes_file.exists():
+        print(f"📄 Đang đọc: {bytes_file.name}")
+        data['flow_bytes'] = load_flow_bytes(bytes_file)
+        print(f"✅ Đã tải byte theo thời gian của {len(data['flow_bytes'])} flows")
+
     return data
 
 
+def rotated_log_files(state_file):
+    """
+    Danh sách file state log theo thứ tự thời gian (file xoay vòng cũ nhất trước)
+    
+    Simulator xoay vòng log khi vượt --maxLogMBytes: .log -> .log.1 -> .log.2 ...
+    nên .log.N là cũ nhất và .log là mới nhất.
+    
+    Args:
+        state_file (Path): File *_tcp_state_<queue>.log
+    
+    Returns:
+        list: Các Path, cũ nhất trước
+    """
+    rotated = []
+    for path in state_file.parent.glob(state_file.name + '.*'):
+        suffix = path.name[len(state_file.name) + 1:]
+        if suffix.isdigit():
+            rotated.append((int(suffix), path))
+    rotated.sort(reverse=True)
+    return [path for _, path in rotated] + [state_file]
+
+
+def iter_trace_chunks(path, columns, chunk_lines=TRACE_CHUNK_LINES):
+    """
+    Đọc file trace dạng cột số theo từng khối dòng (bộ nhớ không phụ thuộc độ dài file)
+    
+    Dòng không có đúng số cột hoặc không phải số bị bỏ qua.
+    
+    Args:
+        path (Path): File trace (vd *_cwnd_trace_<queue>.tr: <time> <cwnd_kb>)
+        columns (int): Số cột mỗi dòng
+        chunk_lines (int): Số dòng mỗi khối
+    
+    Yields:
+        ndarray: shape (số dòng hợp lệ, columns)
+    """
+    with open(path, 'r') as f:
+        while True:
+            lines = list(islice(f, chunk_lines))
+            if not lines:
+                break
+            yield _parse_rows(lines, columns)
+
+
+def _parse_rows(lines, columns):
+    """Các dòng số -> ndarray; parse nhanh bằng np.loadtxt, từng dòng nếu có dòng lỗi"""
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)     # khối chỉ có dòng trống
+            rows = np.loadtxt(lines, ndmin=2)
+        if rows.size == 0 or rows.shape[1] == columns:
+            return rows.reshape(-1, columns)
+    except ValueError:
+        pass
+    rows = []
+    for line in lines:
+        parts = line.split()
+        if len(parts) == columns:
+            try:
+                rows.append([float(p) for p in parts])
+            except ValueError:
+                continue
+    return np.array(rows, dtype=float).reshape(-1, columns)
+
+
+def _iter_log_lines(paths):
+    """Đọc lần lượt các dòng của nhiều file log"""
+    for path in paths:
+        with open(path, 'r') as f:
+            for line in f:
+                yield line
+
+
+def iter_log_chunks(paths, chunk_lines=TRACE_CHUNK_LINES):
+    """
+    Đọc các file log (vd state log và các file xoay vòng) theo từng khối dòng
+
+    Yields:
+        list: Tối đa chunk_lines dòng, theo thứ tự các file
+    """
+    lines = _iter_log_lines(paths)
+    while True:
+        chunk = list(islice(lines, chunk_lines))
+        if not chunk:
+            break
+        yield chunk
+
+
+def parse_trace_filters(line):
+    """
+    Parse dòng header '# filters: events=... cwndSampleInterval=...'
+    
+    Args:
+        line (str): Dòng header trong state log
+    
+    Returns:
+        dict: Bộ lọc đã áp dụng khi chạy mô phỏng
+    """
+    filters = dict(DEFAULT_TRACE_FILTERS)
+    for key, value in re.findall(r'(\w+)=(\S+)', line):
+        if key not in filters:
+            continue
+        if key == 'events':
+            filters[key] = value
+        else:
+            try:
+                filters[key] = type(filters[key])(float(value))
+            except ValueError:
+                pass
+    return filters
+
+
+def is_log_truncated(trace_filters):
+    """
+    True nếu state log đã mất phần đầu do xoay vòng
+
+    Simulator chỉ giữ --logRotateCount file .log.N: khi số lần xoay vòng vượt
+    số file giữ lại, các file cũ nhất bị xoá (logRotateCount=0: log hiện tại bị
+    ghi đè), nên mọi thứ đọc từ log chỉ bắt đầu giữa lần chạy.
+    """
+    return trace_filters.get('log_rotations', 0) > trace_filters.get('logRotateCount', 3)
+
+
+def is_event_recorded(trace_filters, event):
+    """
+    Kiểm tra một loại sự kiện có được --logEvents ghi vào log hay không
+    
+    Args:
+        trace_filters (dict): data['trace_filters']
+        event (str): Tên sự kiện (vd: NEW_ACK)
+    
+    Returns:
+        bool: True nếu nhóm của sự kiện không bị lọc (log có thể đã bị cắt, xem is_event_logged)
+    """
+    events = trace_filters.get('events', 'all')
+    if events == 'all':
+        return True
+    category = EVENT_CATEGORIES.get(event)
+    return category is None or category in events.split(',')
+
+
+def is_event_logged(trace_filters, event):
+    """
+    Kiểm tra một loại sự kiện có được ghi đầy đủ vào log hay không
+    
+    Args:
+        trace_filters (dict): data['trace_filters']
+        event (str): Tên sự kiện (vd: NEW_ACK)
+    
+    Returns:
+        bool: True nếu sự kiện được ghi và log không bị cắt (số đếm từ log là đầy đủ)
+    """
+    return is_event_recorded(trace_filters, event) and not is_log_truncated(trace_filters)
+
+
+def is_filtered(trace_filters):
+    """True nếu log hoặc CWND trace đã bị lọc/lấy mẫu, hoặc log đã bị cắt do xoay vòng"""
+    return (trace_filters.get('events', 'all') != 'all'
+            or trace_filters.get('cwndSampleInterval', 0) > 0
+            or trace_filters.get('cwndMinChange', 0) > 0
+            or is_log_truncated(trace_filters))
+
+
+def filter_label(trace_filters):
+    """
+    Nhãn ngắn mô tả bộ lọc để ghi lên dashboard
+    
+    Args:
+        trace_filters (dict): data['trace_filters']
+    
+    Returns:
+        str: Chuỗi rỗng nếu không lọc, ngược lại vd 'events=state,loss | cwnd every 0.1s'
+    """
+    if not is_filtered(trace_filters):
+        return ''
+    parts = []
+    if trace_filters.get('events', 'all') != 'all':
+        parts.append(f"events={trace_filters['events']}")
+    if trace_filters.get('cwndSampleInterval', 0) > 0:
+        parts.append(f"cwnd every {trace_filters['cwndSampleInterval']:g}s")
+    if trace_filters.get('cwndMinChange', 0) > 0:
+        parts.append(f"cwnd Δ≥{trace_filters['cwndMinChange'] * 100:g}%")
+    if is_log_truncated(trace_filters):
+        parts.append(f"log truncated ({trace_filters['log_rotations']} rotations)")
+    return ' | '.join(parts)
+
+
+def log_start(data):
+    """
+    Thời điểm bắt đầu của phần log còn lại: sự kiện đầu tiên khi log bị cắt, ngược lại None
+    """
+    if not is_log_truncated(data.get('trace_filters', {})) or not data['events']:
+        return None
+    return data['events'][0]['time']
+
+
+def log_truncation_note(data):
+    """
+    Dòng ghi chú cho các phần phân tích từ state log khi log đã bị cắt
+
+    Returns:
+        str: Chuỗi rỗng nếu log đầy đủ
+    """
+    filters = data.get('trace_filters', {})
+    if not is_log_truncated(filters):
+        return ''
+    start = log_start(data)
+    since = f"chỉ từ t={start:.2f}s" if start is not None else "phần đầu lần chạy đã mất"
+    return (f"⚠️  Log bị cắt ({filters['log_rotations']} rotations > --logRotateCount="
+            f"{filters['logRotateCount']}): {since}")
+
+
+def event_count(data, event, event_counts=None):
+    """
+    Số lần xảy ra một sự kiện, có tính đến bộ lọc log
+    
+    Nếu sự kiện bị lọc khỏi log hoặc log đã bị cắt do xoay vòng, dùng counter
+    tương ứng trong summary (simulator luôn đếm đầy đủ), hoặc None nếu không có counter.
+    
+    Args:
+        data (dict): Dữ liệu của một hàng đợi
+        event (str): Tên sự kiện
+        event_counts (dict): Kết quả count_events() nếu đã tính sẵn
+    
+    Returns:
+        int or None: Số lần xảy ra, None nếu không xác định được
+    """
+    if is_event_logged(data.get('trace_filters', {}), event):
+        if event_counts is None:
+            event_counts = count_events(data['events'])
+        return event_counts.get(event, 0)
+    key = EVENT_SUMMARY_KEYS.get(event)
+    if key and key in data['summary']:
+        return int(data['summary'][key])
+    return None
+
+
+def _load_per_flow(path, value):
+    """Đọc trace dạng <time> <flow_id> <value> và tách theo flow: {flow_id: {'time', value}}"""
+    raw = np.loadtxt(path, ndmin=2)
+    if raw.size == 0:
+        return {}
+
+    # Sort ổn định theo flow id rồi cắt thành từng đoạn liên tiếp
+    order = np.argsort(raw[:, 1], kind='stable')
+    raw = raw[order]
+    flow_ids, starts = np.unique(raw[:, 1].astype(int), return_index=True)
+    bounds = list(starts[1:]) + [len(raw)]
+
+    flows = {}
+    for flow_id, start, end in zip(flow_ids, starts, bounds):
+        flows[int(flow_id)] = {
+            'time': raw[start:end, 0],
+            value: raw[start:end, 2]
+        }
+    return flows
+
+
+def load_flow_cwnd(path):
+    """
+    Load per-flow CWND trace (dòng: <time> <flow_id> <cwnd_kb>)
+    
+    Args:
+        path (Path): File *_flow_cwnd_<queue>.tr
+    
+    Returns:
+        dict: {flow_id: {'time': ndarray, 'cwnd': ndarray}}
+    """
+    return _load_per_flow(path, 'cwnd')
+
+
+def load_flow_bytes(path):
+    """
+    Load per-flow byte samples (dòng: <time> <flow_id> <acked_bytes>, tích luỹ, mỗi
+    flowSampleInterval giây)
+    
+    Args:
+        path (Path): File *_flow_bytes_<queue>.tr
+    
+    Returns:
+        dict: {flow_id: {'time': ndarray, 'bytes': ndarray}}
+    """
+    return _load_per_flow(path, 'bytes')
+
+
+def decimate_series(time, values, max_points):
+    """
+    Giảm số điểm của một chuỗi thời gian để vẽ, giữ lại min/max mỗi bucket
+    để không làm mất các đỉnh và đáy của đường răng cưa CWND
+    
+    Args:
+        time (array-like): Trục thời gian (tăng dần)
+        values (array-like): Giá trị tương ứng
+        max_points (int): Số điểm tối đa sau khi giảm
+    
+    Returns:
+        tuple: (time, values) dạng ndarray
+    """
+    time = np.asarray(time, dtype=float)
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    if n <= max_points or max_points < 4:
+        return time, values
+
+    # Mỗi bucket đóng góp 2 điểm: min và max, theo đúng thứ tự thời gian
+    n_buckets = max_points // 2
+    edges = np.linspace(0, n, n_buckets + 1).astype(int)
+    starts = edges[:-1]
+    bucket_id = np.repeat(np.arange(n_buckets), np.diff(edges))
+
+    # argmin/argmax theo bucket trong O(n): vị trí đầu tiên bằng min/max của bucket
+    counts = np.diff(edges)
+    buckets = np.arange(n_buckets)
+
+    def first_match(extreme):
+        hits = np.flatnonzero(values == np.repeat(extreme, counts))
+        return hits[np.searchsorted(bucket_id[hits], buckets)]
+
+    idx_min = first_match(np.minimum.reduceat(values, starts))
+    idx_max = first_match(np.maximum.reduceat(values, starts))
+
+    idx = np.sort(np.concatenate([idx_min, idx_max]))
+    idx = idx[np.concatenate(([True], np.diff(idx) > 0))]
+    return time[idx], values[idx]
+
+
 def parse_summary(content):
     """
     Parse summary file content
@@ -157,6 +539,8 @@ def parse_summary(content):
         'fast_retransmits': r'Total Fast Retransmits:\s+(\d+)',
         'fast_recoveries': r'Total Fast Recoveries:\s+(\d+)',
         'timeouts': r'Total Timeouts:\s+(\d+)',
+        'log_rotations': r'State Log Rotations:\s+(\d+)',
+        'stop_time': r'Stop Time:\s+([\d.]+)\s+s',
     }
 
     for key, pattern in patterns.items():
@@ -166,9 +550,55 @@ def parse_summary(content):
                 summary[key] = float(match.group(1))
             except ValueError:
                 summary[key] = 0
+
+    # Băng thông nút cổ chai (vd "Bottleneck Link: 5Mbps, 10ms delay") theo Mbps
+    match = re.search(r'Bottleneck Link:\s+([\d.]+)\s*([kKMG]?)bps', content)
+    if match:
+        scale = {'': 1e-6, 'k': 1e-3, 'K': 1e-3, 'M': 1.0, 'G': 1e3}[match.group(2)]
+        summary['bottleneck_mbps'] = float(match.group(1)) * scale
+
+    # Dừng sớm khi metric hội tụ (--convergenceStop), vd "Stop Time: 14.000 s (converged)"
+    match = re.search(r'Stop Time:\s+[\d.]+\s+s\s+\(([\w ]+)\)', content)
+    if match:
+        summary['converged'] = 1.0 if match.group(1) == 'converged' else 0.0
     return summary
 
 
+def parse_flow_stats(content):
+    """
+    Parse thống kê từng flow của FlowMonitor trong summary file
+    
+    Args:
+        content (str): Nội dung file summary
+    
+    Returns:
+        list: Mỗi phần tử là dict (flow_id, src, dst, tx, rx, lost,
+              loss_rate, throughput, delay)
+    """
+    pattern = re.compile(
+        r'Flow (\d+) \(([\d.]+) -> ([\d.]+)\)\s+'
+        r'Tx Packets:\s+(\d+)\s+'
+        r'Rx Packets:\s+(\d+)\s+'
+        r'Lost Packets:\s+(\d+) \(([\d.]+)%\)\s+'
+        r'Throughput:\s+([\d.]+) Mbps\s+'
+        r'Avg Delay:\s+([\d.]+) ms'
+    )
+    flows = []
+    for m in pattern.finditer(content):
+        flows.append({
+            'flow_id': int(m.group(1)),
+            'src': m.group(2),
+            'dst': m.group(3),
+            'tx': int(m.group(4)),
+            'rx': int(m.group(5)),
+            'lost': int(m.group(6)),
+            'loss_rate': float(m.group(7)),
+            'throughput': float(m.group(8)),
+            'delay': float(m.group(9)),
+        })
+    return flows
+
+
 def count_events(events):
     """
     Đếm số lượng mỗi loại sự kiện
@@ -179,8 +609,4 @@ def count_events(events):
     Returns:
         dict: Số lượng từng loại sự kiện
     """
-    counts = {}
-    for event in events:
-        event_type = event['event']
-        counts[event_type] = counts.get(event_type, 0) + 1
-    return counts
+    return dict(Counter(event['event'] for event in events))
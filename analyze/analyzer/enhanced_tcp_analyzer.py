@@ -5,13 +5,19 @@ Lớp chính cho phân tích TCP Reno
 
 from pathlib import Path
 from config.plot_config import COLORS
-from .data_utils import load_data, count_events
-from .dashboard_utils import (
-    create_dashboard,
-    create_comparison_dashboard,
-    create_animated_timeline
-)
+from .data_utils import load_data, count_events, log_truncation_note
+from .metrics_utils import run_metrics
+from .cache_utils import RenderCache, output_file, FIGURE_OPTIONS
 from .report_utils import print_analysis, create_infographic
+from .flow_utils import print_flow_table, create_flow_small_multiples
+from .html_utils import create_html_report
+from .cycle_utils import cycle_csv_table
+from .retx_utils import print_retransmissions, DEFAULT_GOODPUT_INTERVAL
+from .rtt_utils import print_rtt_analysis
+from .sync_utils import sync_pair_table, print_sync_analysis
+from .fairness_utils import fairness_table, print_fairness
+from .warmup_utils import steady_table, print_warmup
+from .aggregate_utils import write_csv
 
 
 class EnhancedTCPAnalyzer:
@@ -19,18 +25,20 @@ class EnhancedTCPAnalyzer:
     Lớp phân tích TCP Reno với visualization đẹp mắt
     """
     
-    def __init__(self, results_dir, prefix):
+    def __init__(self, results_dir, prefix, use_cache=True):
         """
         Khởi tạo analyzer
         
         Args:
             results_dir (str): Thư mục chứa kết quả
             prefix (str): Prefix của files
+            use_cache (bool): Dùng lại hình đã vẽ khi input/code/style không đổi
         """
         self.results_dir = Path(results_dir)
         self.prefix = prefix
         self.data = {}
         self.colors = COLORS
+        self.render_cache = RenderCache(self.results_dir, prefix, COLORS, reuse=use_cache)
     
     def load_data(self, queue_type):
         """
@@ -46,6 +54,41 @@ class EnhancedTCPAnalyzer:
         self.data[queue_type] = data
         return data
     
+    def ensure_data(self, *queue_types):
+        """Load dữ liệu của các hàng đợi chưa được load"""
+        for queue_type in queue_types:
+            if queue_type not in self.data:
+                self.load_data(queue_type)
+    
+    def metrics(self, queue_type):
+        """
+        Metric dẫn xuất của một hàng đợi (RunMetrics, tính lười và cache cùng dữ liệu)
+        
+        Args:
+            queue_type (str): Loại hàng đợi (DropTail/RED)
+        """
+        self.ensure_data(queue_type)
+        return run_metrics(self.data[queue_type])
+    
+    def _render_cached(self, kind, queue_type, func, queues, render, show_gui, options=None):
+        """
+        Vẽ một hình qua render cache: dùng lại file đã có nếu key không đổi
+        
+        Dữ liệu chỉ được load khi thực sự phải vẽ lại.
+        options: tham số của hình (ngoài FIGURE_OPTIONS) đưa vào key, vd độ rộng bin
+        """
+        output = output_file(self.results_dir, self.prefix, kind, queue_type)
+        ticket = self.render_cache.check(output, func, queues, dict(FIGURE_OPTIONS, **(options or {})))
+        if ticket['fresh']:
+            from .dashboard_utils import show_cached_image
+            print(f"\n♻️  {output.name}: input, code vẽ và style không đổi, dùng lại file đã có")
+            return show_cached_image(output, FIGURE_OPTIONS['dpi'], show_gui)
+        
+        self.ensure_data(*queues)
+        fig = render()
+        self.render_cache.record(ticket)
+        return fig
+    
     def create_dashboard(self, queue_type, show_gui=False):
         """
         Tạo dashboard cho một loại hàng đợi
@@ -54,18 +97,17 @@ class EnhancedTCPAnalyzer:
             queue_type (str): Loại hàng đợi
             show_gui (bool): Nếu True, không hiển thị tiêu đề (dùng cho GUI)
         """
-        if queue_type not in self.data:
-            self.load_data(queue_type)
-        
-        return create_dashboard(self, queue_type, show_gui)
+        # dashboard_utils import matplotlib: chỉ import khi vẽ
+        from .dashboard_utils import create_dashboard
+        return self._render_cached('dashboard', queue_type, create_dashboard, [queue_type],
+                                   lambda: create_dashboard(self, queue_type, show_gui), show_gui)
     
     def create_comparison_dashboard(self, show_gui=False):
         """Tạo dashboard so sánh DropTail vs RED"""
-        if 'DropTail' not in self.data or 'RED' not in self.data:
-            print("❌ Cần dữ liệu cả DropTail và RED để so sánh")
-            return
-        
-        return create_comparison_dashboard(self, show_gui)
+        from .dashboard_utils import create_comparison_dashboard
+        return self._render_cached('comparison', None, create_comparison_dashboard,
+                                   ['DropTail', 'RED'],
+                                   lambda: create_comparison_dashboard(self, show_gui), show_gui)
     
     def create_animated_timeline(self, queue_type, show_gui=False):
         """
@@ -75,10 +117,193 @@ class EnhancedTCPAnalyzer:
             queue_type (str): Loại hàng đợi
             show_gui (bool): Nếu True, không hiển thị tiêu đề (dùng cho GUI)
         """
-        if queue_type not in self.data:
-            self.load_data(queue_type)
+        from .dashboard_utils import create_animated_timeline
+        return self._render_cached('timeline', queue_type, create_animated_timeline, [queue_type],
+                                   lambda: create_animated_timeline(self, queue_type, show_gui),
+                                   show_gui)
+    
+    def create_cycle_plots(self, queue_type, show_gui=False):
+        """
+        Vẽ phân phối chu kỳ sawtooth (đỉnh, thời lượng, tốc độ tăng, tỉ lệ giảm theo trigger)
+        
+        Args:
+            queue_type (str): Loại hàng đợi
+            show_gui (bool): Nếu True, không gọi plt.show()
+        """
+        from .dashboard_utils import create_cycle_plots
+        return self._render_cached('cycles', queue_type, create_cycle_plots, [queue_type],
+                                   lambda: create_cycle_plots(self, queue_type, show_gui), show_gui)
+    
+    def export_cycle_table(self, queue_type):
+        """
+        Ghi bảng chu kỳ sawtooth ra {prefix}_cycles_{queue}.csv
+        
+        Args:
+            queue_type (str): Loại hàng đợi
+        
+        Returns:
+            Path: File CSV đã ghi
+        """
+        table = self.metrics(queue_type).cycles
+        path = self.results_dir / f"{self.prefix}_cycles_{queue_type}.csv"
+        write_csv(cycle_csv_table(table), path)
+        print(f"🪚 {table['n']:,} chu kỳ sawtooth → {path}")
+        self._print_log_note(queue_type)
+        return path
+    
+    def _print_log_note(self, queue_type):
+        """In ghi chú khi state log đã mất phần đầu do xoay vòng (log_truncation_note)"""
+        note = log_truncation_note(self.data[queue_type])
+        if note:
+            print(f"   {note}")
+    
+    def create_goodput_plot(self, queue_type, interval=DEFAULT_GOODPUT_INTERVAL, show_gui=False):
+        """
+        Vẽ goodput theo thời gian chồng lên CWND và byte truyền lại mỗi bin
+        
+        Args:
+            queue_type (str): Loại hàng đợi
+            interval (float): Độ rộng bin (s)
+            show_gui (bool): Nếu True, không gọi plt.show()
+        """
+        from .dashboard_utils import create_goodput_plot
+        return self._render_cached('goodput', queue_type, create_goodput_plot, [queue_type],
+                                   lambda: create_goodput_plot(self, queue_type, interval, show_gui),
+                                   show_gui, {'interval': interval})
+    
+    def export_goodput_table(self, queue_type, interval=DEFAULT_GOODPUT_INTERVAL):
+        """
+        Ghi goodput/truyền lại theo bin ra {prefix}_goodput_{queue}.csv và in các tổng
+        
+        Args:
+            queue_type (str): Loại hàng đợi
+            interval (float): Độ rộng bin (s)
+        
+        Returns:
+            Path: File CSV đã ghi
+        """
+        tracker = self.metrics(queue_type).retransmissions(interval)
+        path = self.results_dir / f"{self.prefix}_goodput_{queue_type}.csv"
+        write_csv(tracker.table(), path)
+        print(f"\n📦 RETRANSMISSIONS & GOODPUT ({queue_type}):")
+        self._print_log_note(queue_type)
+        print_retransmissions(tracker)
+        print(f"   💾 {path}")
+        return path
+    
+    def create_rtt_plot(self, *queue_types, show_gui=False):
+        """
+        Vẽ RTT từng gói và quỹ đạo RTO (một hàng mỗi hàng đợi), đánh dấu timeout giả
+        
+        Args:
+            queue_types (str): Các hàng đợi (mặc định: DropTail và RED, lưu *_rtt_comparison.png)
+            show_gui (bool): Nếu True, không gọi plt.show()
+        """
+        from .dashboard_utils import create_rtt_plot
+        queues = list(queue_types) or ['DropTail', 'RED']
+        name = queues[0] if len(queues) == 1 else 'comparison'
+        return self._render_cached('rtt', name, create_rtt_plot, queues,
+                                   lambda: create_rtt_plot(self, queues, show_gui), show_gui)
+    
+    def export_rtt_samples(self, queue_type):
+        """
+        Ghi các mẫu RTT ra {prefix}_rtt_{queue}.csv và in thống kê RTT/RTO
+        
+        Args:
+            queue_type (str): Loại hàng đợi
+        
+        Returns:
+            Path: File CSV đã ghi
+        """
+        rtt = self.metrics(queue_type).rtt
+        path = self.results_dir / f"{self.prefix}_rtt_{queue_type}.csv"
+        write_csv(rtt['samples'], path)
+        print(f"\n📡 RTT / RTO ({queue_type}):")
+        self._print_log_note(queue_type)
+        print_rtt_analysis(rtt)
+        print(f"   💾 {path}")
+        return path
+    
+    def create_sync_plot(self, *queue_types, show_gui=False):
+        """
+        Vẽ ma trận tương quan chéo CWND giữa các flow và raster mất gói (một cột mỗi hàng đợi)
+    
+        Args:
+            queue_types (str): Các hàng đợi (mặc định: DropTail và RED, lưu *_sync_comparison.png)
+            show_gui (bool): Nếu True, không gọi plt.show()
+        """
+        from .dashboard_utils import create_sync_plot
+        queues = list(queue_types) or ['DropTail', 'RED']
+        name = queues[0] if len(queues) == 1 else 'comparison'
+        return self._render_cached('sync', name, create_sync_plot, queues,
+                                   lambda: create_sync_plot(self, queues, show_gui), show_gui)
+    
+    def export_sync_table(self, queue_type):
+        """
+        Ghi tương quan / mất gói trùng nhau của từng cặp flow ra {prefix}_sync_{queue}.csv
+        và in sync index
+    
+        Args:
+            queue_type (str): Loại hàng đợi
+    
+        Returns:
+            Path: File CSV đã ghi (None khi không có per-flow CWND trace)
+        """
+        self.ensure_data(queue_type)
+        if len(self.data[queue_type]['flow_cwnd']) < 2:
+            print(f"❌ Không có per-flow CWND trace cho {queue_type} (chạy với --numFlows > 1)")
+            return None
+        sync = self.metrics(queue_type).sync
+        path = self.results_dir / f"{self.prefix}_sync_{queue_type}.csv"
+        write_csv(sync_pair_table(sync), path)
+        print(f"\n🔗 FLOW SYNCHRONIZATION ({queue_type}):")
+        print_sync_analysis(sync)
+        print(f"   💾 {path}")
+        return path
+    
+    def export_fairness_table(self, queue_type):
+        """
+        Ghi Jain index và phần băng thông từng flow theo thời gian ra {prefix}_fairness_{queue}.csv
+        
+        Args:
+            queue_type (str): Loại hàng đợi
         
-        return create_animated_timeline(self, queue_type, show_gui)
+        Returns:
+            Path: File CSV đã ghi (None khi không có per-flow byte samples)
+        """
+        self.ensure_data(queue_type)
+        if len(self.data[queue_type]['flow_bytes']) < 2:
+            print(f"❌ Không có per-flow byte samples cho {queue_type} (chạy với --numFlows > 1)")
+            return None
+        fairness = self.metrics(queue_type).fairness
+        path = self.results_dir / f"{self.prefix}_fairness_{queue_type}.csv"
+        write_csv(fairness_table(fairness), path)
+        print(f"\n⚖️  FAIRNESS ({queue_type}):")
+        print_fairness(fairness)
+        print(f"   💾 {path}")
+        return path
+    
+    def export_warmup_table(self, queue_type):
+        """
+        Ghi metric cả lần chạy và sau warm-up (MSER-5) ra {prefix}_warmup_{queue}.csv
+        
+        Args:
+            queue_type (str): Loại hàng đợi
+        
+        Returns:
+            Path: File CSV đã ghi (None khi không có CWND trace)
+        """
+        metrics = self.metrics(queue_type)
+        if len(metrics.time) < 2:
+            print(f"❌ Không có CWND trace cho {queue_type}")
+            return None
+        table = steady_table(metrics)
+        path = self.results_dir / f"{self.prefix}_warmup_{queue_type}.csv"
+        write_csv({'columns': table['columns'], 'n': table['n']}, path)
+        print(f"\n✂️  WARM-UP / STEADY STATE ({queue_type}):")
+        print_warmup(metrics)
+        print(f"   💾 {path}")
+        return path
     
     def print_analysis(self, queue_type):
         """
@@ -92,14 +317,47 @@ class EnhancedTCPAnalyzer:
         
         print_analysis(self, queue_type)
     
-    def create_infographic(self, show_gui=False):
+    def create_infographic(self, show_gui=False, workers=None):
         """Tạo infographic tổng hợp
         
         Args:
             show_gui: Nếu True, hiển thị giao diện trực tiếp thay vì lưu PDF
+            workers: Số process vẽ các trang song song (mặc định: min(5, số core))
+        """
+        create_infographic(self, show_gui=show_gui, workers=workers)
+
+    def print_flow_table(self, queue_type):
         """
-        if 'DropTail' not in self.data or 'RED' not in self.data:
-            print("❌ Cần dữ liệu cả hai loại hàng đợi")
-            return
+        In bảng tổng hợp các flow (dùng cho topology nhiều flow)
         
-        create_infographic(self, show_gui=show_gui)
+        Args:
+            queue_type (str): Loại hàng đợi
+        """
+        if queue_type not in self.data:
+            self.load_data(queue_type)
+        
+        return print_flow_table(self, queue_type)
+    
+    def create_flow_small_multiples(self, queue_type, show_gui=False):
+        """
+        Vẽ CWND của từng flow (tự động giảm số flow và số điểm)
+        
+        Args:
+            queue_type (str): Loại hàng đợi
+            show_gui (bool): Nếu True, không gọi plt.show()
+        """
+        if queue_type not in self.data:
+            self.load_data(queue_type)
+        
+        return create_flow_small_multiples(self, queue_type, show_gui)
+    
+    def create_html_report(self, *queue_types):
+        """
+        Xuất báo cáo HTML tự chứa (CWND, trạng thái, tần suất sự kiện, summary)
+        
+        Args:
+            queue_types (str): Các hàng đợi (mặc định: DropTail và RED)
+        """
+        queues = list(queue_types) or ['DropTail', 'RED']
+        self.ensure_data(*queues)
+        return create_html_report(self, queues)
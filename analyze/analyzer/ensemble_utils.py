@@ -0,0 +1,214 @@
+"""
+Multi-seed ensemble utilities
+Đưa CWND của nhiều lần chạy về chung một lưới thời gian và vẽ dải percentile
+"""
+
+import warnings
+import numpy as np
+from config.plot_config import get_pyplot
+from .aggregate_utils import scan_runs, scan_output_files
+
+plt = get_pyplot()
+
+
+ENSEMBLE_PERCENTILES = (10, 50, 90)
+
+QUEUE_ORDER = ['DropTail', 'RED']
+
+
+def find_ensemble_traces(directories, where=None):
+    """
+    Liệt kê CWND trace của các lần chạy, nhóm theo hàng đợi
+
+    Args:
+        directories (list): Thư mục sweep/results
+        where (dict): Chỉ lấy job có tham số sweep khớp {tên: giá trị}
+
+    Returns:
+        tuple: ({queue: [Path]}, [các điểm tham số khác nhau đã gộp])
+    """
+    where = where or {}
+    traces = {}
+    points = []
+    for directory in directories:
+        files = scan_output_files(directory, 'cwnd_trace')
+        for run in scan_runs(directory):
+            if run['status'] != 'done':
+                continue
+            if any(str(run['params'].get(k)) != str(v) for k, v in where.items()):
+                continue
+            path = files.get((run['prefix'], run['queue']))
+            if path is None:
+                continue
+            traces.setdefault(run['queue'], []).append(path)
+            point = {k: v for k, v in run['params'].items() if k not in where}
+            if point not in points:
+                points.append(point)
+    return traces, points
+
+
+def load_cwnd_trace(path):
+    """
+    Đọc CWND trace (dòng: <time> <cwnd_kb>)
+
+    Returns:
+        tuple: (time ndarray, cwnd ndarray), rỗng nếu file không có dữ liệu
+    """
+    raw = np.loadtxt(path, ndmin=2, usecols=(0, 1))
+    if raw.size == 0:
+        return np.empty(0), np.empty(0)
+    return raw[:, 0], raw[:, 1]
+
+
+def _trace_end(path):
+    """Thời điểm của mẫu cuối cùng (chỉ đọc đoạn cuối file)"""
+    with open(path, 'rb') as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(max(0, size - 4096))
+        lines = f.read().split(b'\n')
+    for line in reversed(lines):
+        parts = line.split()
+        if len(parts) >= 2:
+            try:
+                return float(parts[0])
+            except ValueError:
+                continue
+    return 0.0
+
+
+def resample_step(time, values, grid):
+    """
+    Lấy giá trị CWND tại các điểm của lưới (giữ giá trị mẫu gần nhất phía trước)
+
+    CWND là hàm bậc thang nên giữ giá trị (zero-order hold) thay vì nội suy
+    tuyến tính. Trước mẫu đầu tiên và sau mẫu cuối cùng là nan.
+
+    Args:
+        time (ndarray): Thời điểm các mẫu (tăng dần)
+        values (ndarray): Giá trị CWND
+        grid (ndarray): Lưới thời gian chung
+
+    Returns:
+        ndarray: Giá trị trên lưới (float32)
+    """
+    out = np.full(len(grid), np.nan, dtype=np.float32)
+    if len(time) == 0:
+        return out
+    idx = np.searchsorted(time, grid, side='right') - 1
+    valid = (idx >= 0) & (grid <= time[-1])
+    out[valid] = values[idx[valid]]
+    return out
+
+
+def build_ensemble(paths, grid_points=2000, t_end=None):
+    """
+    Ma trận CWND (số lần chạy x số điểm lưới) trên lưới thời gian chung
+
+    Mỗi trace được đọc, lấy mẫu lại rồi giải phóng trước khi đọc trace kế tiếp,
+    nên bộ nhớ chỉ phụ thuộc số lần chạy x grid_points (float32), không phụ
+    thuộc độ dài trace.
+
+    Args:
+        paths (list): Các CWND trace
+        grid_points (int): Số điểm của lưới thời gian
+        t_end (float): Cuối lưới (mặc định: mẫu cuối muộn nhất trong các trace)
+
+    Returns:
+        dict: {'grid': ndarray, 'matrix': ndarray float32, 'paths': list}
+    """
+    if t_end is None:
+        t_end = max((_trace_end(p) for p in paths), default=0.0)
+    grid = np.linspace(0.0, t_end, grid_points)
+    matrix = np.empty((len(paths), grid_points), dtype=np.float32)
+    for row, path in enumerate(paths):
+        time, cwnd = load_cwnd_trace(path)
+        matrix[row] = resample_step(time, cwnd, grid)
+    return {'grid': grid, 'matrix': matrix, 'paths': list(paths)}
+
+
+def ensemble_envelope(ensemble, percentiles=ENSEMBLE_PERCENTILES):
+    """
+    Mean và các percentile qua các lần chạy tại từng điểm của lưới
+
+    Args:
+        ensemble (dict): Kết quả của build_ensemble()
+        percentiles (tuple): Các percentile cần tính
+
+    Returns:
+        dict: {'grid', 'mean', 'p10', 'p50', 'p90', 'count'} (ndarray theo lưới)
+    """
+    matrix = ensemble['matrix']
+    count = np.sum(~np.isnan(matrix), axis=0)
+    envelope = {'grid': ensemble['grid'], 'count': count, 'runs': len(matrix)}
+    with warnings.catch_warnings():
+        # Cột toàn nan (chưa có run nào bắt đầu) -> nan, không cần cảnh báo
+        warnings.simplefilter('ignore', RuntimeWarning)
+        envelope['mean'] = np.nanmean(matrix, axis=0)
+        bands = np.nanpercentile(matrix, percentiles, axis=0)
+    for p, band in zip(percentiles, bands):
+        envelope[f'p{p}'] = band
+    return envelope
+
+
+def create_ensemble_plot(envelopes, output_file, colors, title_suffix='', show_gui=False):
+    """
+    Vẽ dải CWND p10-p90, median và mean của từng loại hàng đợi
+
+    Args:
+        envelopes (dict): {queue: envelope từ ensemble_envelope()}
+        output_file (Path): File PNG
+        colors (dict): Color scheme
+        title_suffix (str): Ghi chú thêm vào tiêu đề (vd điểm tham số)
+        show_gui (bool): Nếu True, không gọi plt.show()
+    """
+    queues = [q for q in QUEUE_ORDER if q in envelopes]
+    ncols = len(queues) + (1 if len(queues) > 1 else 0)
+    fig, axes = plt.subplots(1, ncols, figsize=(7 * ncols, 5.5), sharey=True, squeeze=False)
+    fig.patch.set_facecolor(colors['background'])
+
+    def _draw(ax, queue, env, detail=True):
+        color = colors[queue]
+        ax.fill_between(env['grid'], env['p10'], env['p90'], color=color, alpha=0.25,
+                        linewidth=0, label=f'{queue} p10-p90')
+        ax.plot(env['grid'], env['p50'], color=color, linewidth=2, label=f'{queue} median')
+        if detail:
+            ax.plot(env['grid'], env['mean'], color=colors['text'], linewidth=1.2,
+                    linestyle='--', label='mean')
+
+    for ax, queue in zip(axes[0], queues):
+        env = envelopes[queue]
+        _draw(ax, queue, env)
+        ax.set_title(f'{queue} ({env["runs"]} runs)', fontsize=13, fontweight='bold',
+                     color=colors[queue])
+
+    if len(queues) > 1:
+        ax = axes[0, -1]
+        for queue in queues:
+            _draw(ax, queue, envelopes[queue], detail=False)
+        ax.set_title('DropTail vs RED', fontsize=13, fontweight='bold')
+
+    for ax in axes[0]:
+        ax.set_xlabel('Time (seconds)', fontsize=11)
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.set_facecolor('white')
+        ax.legend(fontsize=9, loc='upper right')
+    axes[0, 0].set_ylabel('CWND (KB)', fontsize=11)
+
+    fig.suptitle(f'CWND Ensemble Envelope{title_suffix}', fontsize=15, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=200, bbox_inches='tight', facecolor=colors['background'])
+    print(f"\nEnsemble envelope saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
+
+
+def print_ensemble_summary(envelopes):
+    """In trung bình theo thời gian của mean/p10/p50/p90 cho từng hàng đợi"""
+    print(f"   {'Queue':<10}{'Runs':>6}{'Mean':>10}{'P10':>10}{'P50':>10}{'P90':>10}  (KB, trung bình theo thời gian)")
+    print(f"   {'─'*56}")
+    for queue in [q for q in QUEUE_ORDER if q in envelopes]:
+        env = envelopes[queue]
+        stats = [float(np.nanmean(env[k])) for k in ('mean', 'p10', 'p50', 'p90')]
+        print(f"   {queue:<10}{env['runs']:>6}" + ''.join(f"{v:>10.2f}" for v in stats))
@@ -0,0 +1,179 @@
+"""
+Fairness utilities
+Jain's fairness index và phần băng thông nút cổ chai của từng flow theo thời gian, từ số byte
+được ACK của từng flow lấy mẫu định kỳ (*_flow_bytes_<queue>.tr)
+"""
+
+import math
+import numpy as np
+
+
+# Độ rộng cửa sổ trượt (s) khi tính throughput từng flow; cửa sổ nhỏ cho nhiễu theo từng chu
+# kỳ sawtooth, cửa sổ lớn làm mờ các giai đoạn không công bằng ngắn
+DEFAULT_FAIRNESS_WINDOW = 1.0
+
+# Jain index dưới ngưỡng này được coi là không công bằng
+FAIR_INDEX = 0.9
+
+
+def jain_index(values, axis=None, mask=None):
+    """
+    Jain's fairness index (Σx)² / (n Σx²) theo một trục
+
+    1 khi mọi phần tử bằng nhau, 1/n khi chỉ một phần tử khác 0.
+
+    Args:
+        values (ndarray): Throughput (hoặc số byte) của từng flow
+        axis (int): Trục của các flow (None: toàn mảng)
+        mask (ndarray): Phần tử được tính (vd flow đã bắt đầu); None: mọi phần tử
+
+    Returns:
+        float|ndarray: nan khi không có phần tử hoặc mọi phần tử bằng 0
+    """
+    values = np.asarray(values, dtype=float)
+    mask = np.ones(values.shape, dtype=bool) if mask is None else mask
+    values = np.where(mask, values, 0.0)
+    n = mask.sum(axis=axis)
+    total = values.sum(axis=axis)
+    squares = (values ** 2).sum(axis=axis)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where((n > 0) & (squares > 0), total ** 2 / (n * squares), np.nan)
+
+
+def byte_matrix(flow_bytes):
+    """
+    Số byte tích luỹ của mọi flow trên cùng các thời điểm lấy mẫu
+
+    Simulator ghi mọi flow ở cùng các thời điểm; flow thiếu mẫu (vd file bị cắt)
+    giữ giá trị của mẫu trước đó (0 trước mẫu đầu tiên).
+
+    Args:
+        flow_bytes (dict): {flow_id: {'time', 'bytes'}} (data['flow_bytes'])
+
+    Returns:
+        tuple: (flow_ids list, times ndarray, cumulative ndarray shape (số flow, len(times)))
+    """
+    flow_ids = sorted(fid for fid, series in flow_bytes.items() if len(series['time']))
+    if not flow_ids:
+        return [], np.empty(0), np.empty((0, 0))
+    times = np.unique(np.concatenate([flow_bytes[fid]['time'] for fid in flow_ids]))
+    cumulative = np.zeros((len(flow_ids), len(times)))
+    for row, fid in zip(cumulative, flow_ids):
+        series = flow_bytes[fid]
+        slot = np.searchsorted(series['time'], times, side='right') - 1
+        row[:] = np.where(slot >= 0, series['bytes'][np.maximum(slot, 0)], 0.0)
+    return flow_ids, times, cumulative
+
+
+def fairness_series(flow_bytes, capacity_mbps=math.nan, window=DEFAULT_FAIRNESS_WINDOW):
+    """
+    Jain index và phần băng thông của từng flow theo cửa sổ trượt
+
+    Số byte mỗi cửa sổ là hiệu của số byte tích luỹ ở hai đầu cửa sổ, nên mọi
+    cửa sổ trượt được tính bằng một phép trừ hai lát mảng. Một flow chỉ được
+    tính trong cửa sổ khi nó đã bắt đầu (đã có byte được ACK) từ đầu cửa sổ:
+    flow mới bắt đầu giữa cửa sổ không kéo Jain index xuống, còn flow đã bắt
+    đầu mà bị bỏ đói (0 byte) thì có.
+
+    Args:
+        flow_bytes (dict): data['flow_bytes']
+        capacity_mbps (float): Băng thông nút cổ chai (Mbps, summary['bottleneck_mbps'])
+        window (float): Độ rộng cửa sổ (s), làm tròn tới số bước lấy mẫu
+
+    Returns:
+        dict: {'columns': {'time' (cuối cửa sổ), 'jain', 'active' (số flow), 'throughput' (Mbps,
+               tổng), 'utilization' (phần băng thông nút cổ chai)}, 'n', 'flows', 'rate' (Mbps,
+               shape (số flow, n)), 'share' (phần băng thông, nan khi flow chưa bắt đầu),
+               'capacity', 'window', 'cumulative', 'times'}
+    """
+    flow_ids, times, cumulative = byte_matrix(flow_bytes)
+    step = float(np.median(np.diff(times))) if len(times) > 1 else math.nan
+    width = max(1, int(round(window / step))) if step > 0 else 1
+    k = max(len(times) - width, 0)
+
+    start, end = times[:k], times[width:]
+    delta = cumulative[:, width:] - cumulative[:, :k]
+    active = cumulative[:, :k] > 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rate = delta * 8 / (end - start) / 1e6
+        share = np.where(active, rate / capacity_mbps, np.nan)
+    throughput = rate.sum(axis=0)
+    columns = {
+        'time': end,
+        'jain': jain_index(rate, axis=0, mask=active),
+        'active': active.sum(axis=0),
+        'throughput': throughput,
+        'utilization': throughput / capacity_mbps,
+    }
+    return {'columns': columns, 'n': k, 'flows': flow_ids, 'rate': rate, 'share': share,
+            'capacity': capacity_mbps, 'window': width * step if k else window,
+            'cumulative': cumulative, 'times': times}
+
+
+def fairness_summary(series):
+    """
+    Các số tổng của một lần chạy
+
+    Returns:
+        dict: {'flows', 'jain_mean' (trung bình theo thời gian, chỉ cửa sổ có >= 2 flow),
+               'jain_p10', 'unfair_time' (phần thời gian Jain < FAIR_INDEX),
+               'jain_overall' (Jain của số byte từng flow từ lúc flow cuối cùng bắt đầu tới hết),
+               'share' ndarray (phần băng thông trung bình của từng flow khi đã bắt đầu),
+               'utilization' (trung bình)}
+    """
+    columns = series['columns']
+    jain = columns['jain'][(columns['active'] >= 2) & ~np.isnan(columns['jain'])]
+    cumulative = series['cumulative']
+    summary = {
+        'flows': len(series['flows']),
+        'jain_mean': float(jain.mean()) if len(jain) else math.nan,
+        'jain_p10': float(np.percentile(jain, 10)) if len(jain) else math.nan,
+        'unfair_time': float((jain < FAIR_INDEX).mean()) if len(jain) else math.nan,
+        'jain_overall': math.nan,
+        'share': np.full(len(series['flows']), math.nan),
+        'utilization': math.nan,
+    }
+    if cumulative.size:
+        started = (cumulative > 0).all(axis=0)
+        if started.any():
+            first = int(np.argmax(started))
+            summary['jain_overall'] = float(jain_index(cumulative[:, -1] - cumulative[:, first]))
+    if series['n'] and not math.isnan(series['capacity']):
+        share = series['share']
+        valid = ~np.isnan(share)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            summary['share'] = np.where(valid, share, 0.0).sum(axis=1) / valid.sum(axis=1)
+        summary['utilization'] = float(columns['utilization'].mean())
+    return summary
+
+
+def fairness_table(series):
+    """
+    Bảng theo thời gian dạng cột cho write_csv: các cột của series và phần băng thông
+    của từng flow (cột share_<flow_id>)
+    """
+    columns = dict(series['columns'])
+    for fid, share in zip(series['flows'], series['share']):
+        columns[f'share_{fid}'] = share
+    return {'columns': columns, 'n': series['n']}
+
+
+def flow_jain_index(flows):
+    """Jain index của throughput trung bình các flow dữ liệu (FlowMonitor trong summary)"""
+    throughput = [f['throughput'] for f in flows]
+    return float(jain_index(throughput)) if len(throughput) >= 2 else math.nan
+
+
+def print_fairness(series):
+    """In Jain index (trung bình, p10, toàn bộ), thời gian không công bằng và phần băng thông"""
+    summary = fairness_summary(series)
+    print(f"   🧵 Flows:            {summary['flows']:>8,} (cửa sổ {series['window']:g} s)")
+    print(f"   ⚖️  Jain (mean/p10):  {summary['jain_mean']:>8.3f} / {summary['jain_p10']:.3f}")
+    print(f"   📦 Jain (toàn bộ):   {summary['jain_overall']:>8.3f} (byte từng flow khi mọi flow đã chạy)")
+    print(f"   ⏱️  Không công bằng:  {summary['unfair_time'] * 100:>7.1f}% thời gian (Jain < {FAIR_INDEX})")
+    if not math.isnan(series['capacity']):
+        share = summary['share'][~np.isnan(summary['share'])]
+        if len(share):
+            print(f"   🍰 Share / flow:     {share.min() * 100:>7.1f}% .. {share.max() * 100:.1f}% "
+                  f"nút cổ chai {series['capacity']:g} Mbps (fair: {100 / len(share):.1f}%)")
+        print(f"   📊 Utilization:      {summary['utilization'] * 100:>7.1f}%")
@@ -0,0 +1,184 @@
+"""
+Per-flow analysis utilities
+Bảng tổng hợp flow và small multiples cho topology nhiều flow
+"""
+
+import math
+import numpy as np
+from config.plot_config import get_pyplot
+from .data_utils import decimate_series
+
+
+FLOW_METRICS = ['throughput', 'loss_rate', 'delay']
+
+
+def split_data_flows(flows):
+    """
+    Tách flow dữ liệu khỏi flow ACK ngược chiều của FlowMonitor
+
+    FlowMonitor ghi cả hai chiều của mỗi kết nối TCP. Với mỗi cặp
+    (src -> dst, dst -> src), chiều có throughput lớn hơn là flow dữ liệu.
+
+    Args:
+        flows (list): Danh sách flow từ parse_flow_stats()
+
+    Returns:
+        list: Chỉ các flow dữ liệu
+    """
+    by_pair = {(f['src'], f['dst']): f for f in flows}
+    data_flows = []
+    for f in flows:
+        reverse = by_pair.get((f['dst'], f['src']))
+        if reverse is None or f['throughput'] >= reverse['throughput']:
+            data_flows.append(f)
+    return data_flows
+
+
+def build_flow_table(flows):
+    """
+    Tạo bảng cột (columnar) cho các flow dữ liệu và thống kê tổng hợp
+
+    Args:
+        flows (list): Danh sách flow từ parse_flow_stats()
+
+    Returns:
+        dict: {'columns': {tên cột: ndarray}, 'aggregate': {metric: {stat: value}}}
+    """
+    data_flows = split_data_flows(flows)
+    columns = {
+        'flow_id': np.array([f['flow_id'] for f in data_flows], dtype=int),
+        'tx': np.array([f['tx'] for f in data_flows], dtype=float),
+        'rx': np.array([f['rx'] for f in data_flows], dtype=float),
+        'lost': np.array([f['lost'] for f in data_flows], dtype=float),
+    }
+    for metric in FLOW_METRICS:
+        columns[metric] = np.array([f[metric] for f in data_flows], dtype=float)
+
+    aggregate = {}
+    for metric in FLOW_METRICS:
+        values = columns[metric]
+        if len(values) == 0:
+            aggregate[metric] = {}
+            continue
+        p10, p50, p90 = np.percentile(values, [10, 50, 90])
+        aggregate[metric] = {
+            'mean': float(np.mean(values)),
+            'std': float(np.std(values)),
+            'min': float(np.min(values)),
+            'p10': float(p10),
+            'p50': float(p50),
+            'p90': float(p90),
+            'max': float(np.max(values)),
+        }
+    aggregate['count'] = len(data_flows)
+    aggregate['total_throughput'] = float(np.sum(columns['throughput']))
+
+    return {'columns': columns, 'aggregate': aggregate}
+
+
+def print_flow_table(analyzer, queue_type, top=5):
+    """In bảng tổng hợp các flow và top/bottom flows theo throughput"""
+    data = analyzer.data[queue_type]
+    table = build_flow_table(data['flows'])
+    agg = table['aggregate']
+    cols = table['columns']
+
+    print(f"\n{'='*70}")
+    print(f"🧵 FLOW TABLE: {queue_type} Queue ({agg['count']} data flows)")
+    print(f"{'='*70}")
+
+    if agg['count'] == 0:
+        print("   ❌ Không có thống kê flow trong summary")
+        return table
+
+    print(f"   {'Metric':<18}{'Mean':>9}{'Std':>9}{'Min':>9}{'P10':>9}{'P50':>9}{'P90':>9}{'Max':>9}")
+    print(f"   {'─'*81}")
+    labels = {'throughput': 'Throughput (Mbps)', 'loss_rate': 'Loss (%)', 'delay': 'Delay (ms)'}
+    for metric in FLOW_METRICS:
+        s = agg[metric]
+        print(f"   {labels[metric]:<18}{s['mean']:>9.3f}{s['std']:>9.3f}{s['min']:>9.3f}"
+              f"{s['p10']:>9.3f}{s['p50']:>9.3f}{s['p90']:>9.3f}{s['max']:>9.3f}")
+    print(f"   📊 Total throughput: {agg['total_throughput']:.3f} Mbps")
+
+    order = np.argsort(cols['throughput'])[::-1]
+    n = min(top, len(order))
+    print(f"\n   🚀 Top {n} flows:")
+    for i in order[:n]:
+        print(f"      Flow {cols['flow_id'][i]:>4}: {cols['throughput'][i]:>7.3f} Mbps, "
+              f"loss {cols['loss_rate'][i]:>5.2f}%, delay {cols['delay'][i]:>7.2f} ms")
+    print(f"   🐢 Bottom {n} flows:")
+    for i in order[::-1][:n]:
+        print(f"      Flow {cols['flow_id'][i]:>4}: {cols['throughput'][i]:>7.3f} Mbps, "
+              f"loss {cols['loss_rate'][i]:>5.2f}%, delay {cols['delay'][i]:>7.2f} ms")
+    return table
+
+
+def select_flows(flow_ids, max_panels):
+    """Chọn tối đa max_panels flow, trải đều theo thứ tự flow id"""
+    flow_ids = sorted(flow_ids)
+    if len(flow_ids) <= max_panels:
+        return flow_ids
+    picks = np.unique(np.linspace(0, len(flow_ids) - 1, max_panels).round().astype(int))
+    return [flow_ids[i] for i in picks]
+
+
+def create_flow_small_multiples(analyzer, queue_type, show_gui=False,
+                                max_panels=36, max_points=400):
+    """
+    Vẽ CWND của từng flow thành lưới small multiples
+
+    Với nhiều flow, chỉ vẽ max_panels flow trải đều và mỗi chuỗi được
+    giảm còn tối đa max_points điểm.
+
+    Args:
+        analyzer: EnhancedTCPAnalyzer instance
+        queue_type (str): Loại hàng đợi
+        show_gui (bool): Nếu True, không gọi plt.show()
+        max_panels (int): Số panel tối đa
+        max_points (int): Số điểm tối đa mỗi panel
+    """
+    plt = get_pyplot()
+    data = analyzer.data[queue_type]
+    colors = analyzer.colors
+    flow_cwnd = data['flow_cwnd']
+
+    if not flow_cwnd:
+        print(f"❌ Không có per-flow CWND trace cho {queue_type} (chạy với --numFlows > 1)")
+        return None
+
+    selected = select_flows(flow_cwnd.keys(), max_panels)
+    n = len(selected)
+    ncols = int(math.ceil(math.sqrt(n)))
+    nrows = int(math.ceil(n / ncols))
+
+    fig, axes = plt.subplots(nrows, ncols, figsize=(3.2 * ncols + 2, 2.2 * nrows + 1.5),
+                             sharex=True, sharey=True, squeeze=False)
+    fig.patch.set_facecolor(colors['background'])
+
+    for ax, flow_id in zip(axes.flat, selected):
+        series = flow_cwnd[flow_id]
+        t, c = decimate_series(series['time'], series['cwnd'], max_points)
+        ax.plot(t, c, linewidth=1.2, color=colors[queue_type])
+        ax.fill_between(t, 0, c, color=colors[queue_type], alpha=0.15)
+        ax.set_title(f'Flow {flow_id}', fontsize=9, fontweight='bold')
+        ax.grid(True, alpha=0.3, linestyle=':')
+        ax.set_facecolor('white')
+        ax.tick_params(labelsize=7)
+
+    for ax in axes.flat[n:]:
+        ax.axis('off')
+
+    shown = f'{n} of {len(flow_cwnd)} flows' if n < len(flow_cwnd) else f'{n} flows'
+    fig.suptitle(f'Per-Flow CWND (KB) - {queue_type} ({shown})',
+                 fontsize=14, fontweight='bold')
+    fig.supxlabel('Time (seconds)', fontsize=11)
+    fig.supylabel('CWND (KB)', fontsize=11)
+    plt.tight_layout()
+
+    output_file = analyzer.results_dir / f"{analyzer.prefix}_flows_{queue_type}.png"
+    plt.savefig(output_file, dpi=200, bbox_inches='tight',
+                facecolor=colors['background'])
+    print(f"\nFlow small multiples saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
@@ -0,0 +1,433 @@
+"""
+Static HTML report utilities
+Báo cáo HTML một file: dữ liệu đã giảm điểm nhúng dạng base64 typed array, vẽ bằng JS inline
+"""
+
+import base64
+import datetime
+import json
+import numpy as np
+from .data_utils import filter_label
+from .metrics_utils import run_metrics
+from .state_utils import state_intervals, STATE_NAMES
+
+
+# Số điểm CWND tối đa mỗi hàng đợi (min/max mỗi bucket, giữ đỉnh răng cưa)
+HTML_MAX_POINTS = 4000
+
+# Số bin của đồ thị tần suất sự kiện
+HTML_EVENT_BINS = 400
+
+# Sự kiện được nhúng thời điểm chính xác (vẽ marker), tối đa HTML_MAX_MARKERS mỗi loại
+MARKER_EVENTS = ['TIMEOUT_EVENT', 'TRIPLE_DUP_ACK']
+HTML_MAX_MARKERS = 2000
+
+# Sự kiện không đưa vào đồ thị tần suất (chỉ là header của log)
+IGNORED_EVENTS = {'QUEUE_SETUP', 'TRACE_SETUP'}
+
+SUMMARY_ROWS = [
+    ('total_throughput', 'Total Throughput (Mbps)'),
+    ('avg_throughput', 'Throughput/Flow (Mbps)'),
+    ('total_tx', 'Packets Sent'),
+    ('total_rx', 'Packets Received'),
+    ('total_lost', 'Packets Lost'),
+    ('loss_rate', 'Loss Rate (%)'),
+    ('avg_delay', 'Average Delay (ms)'),
+    ('state_changes', 'State Changes'),
+    ('dup_acks', 'Duplicate ACKs'),
+    ('fast_retransmits', 'Fast Retransmits'),
+    ('fast_recoveries', 'Fast Recoveries'),
+    ('timeouts', 'Timeouts'),
+]
+
+
+def encode_array(values, dtype='<f4'):
+    """Mã hóa mảng số thành base64 của typed array little-endian (Float32Array, Uint32Array...)"""
+    return base64.b64encode(np.ascontiguousarray(values, dtype=dtype).tobytes()).decode('ascii')
+
+
+def event_series(metrics, t_end, bins=HTML_EVENT_BINS, max_markers=HTML_MAX_MARKERS):
+    """
+    Tần suất từng loại sự kiện theo thời gian và thời điểm của các sự kiện quan trọng
+
+    Args:
+        metrics (RunMetrics): Metric của hàng đợi (run_metrics)
+        t_end (float): Cuối trục thời gian
+        bins (int): Số bin
+        max_markers (int): Số marker tối đa mỗi loại (lấy đều nếu nhiều hơn)
+
+    Returns:
+        tuple: ({loại: counts ndarray}, {loại: times ndarray}, {loại: tổng số})
+    """
+    counts = metrics.event_bins(bins, t_end)
+    rates, markers = {}, {}
+    for k, kind in enumerate(metrics.event_kinds):
+        if kind in IGNORED_EVENTS:
+            continue
+        rates[kind] = counts[k]
+        if kind in MARKER_EVENTS:
+            marker_times = metrics.event_times(kind)
+            if len(marker_times) > max_markers:
+                marker_times = marker_times[np.linspace(0, len(marker_times) - 1, max_markers).astype(int)]
+            markers[kind] = marker_times
+    # Loại có counter trong summary lấy từ summary khi log bị lọc/cắt (metrics.event)
+    totals = {kind: metrics.event(kind) for kind in metrics.event_counts}
+    return rates, markers, {kind: metrics.event_counts[kind] if n is None else n for kind, n in totals.items()}
+
+
+def build_report_data(analyzer, queues, max_points=HTML_MAX_POINTS, bins=HTML_EVENT_BINS):
+    """
+    Dữ liệu nhúng vào báo cáo HTML (đã giảm điểm, mảng số mã hóa base64)
+
+    Args:
+        analyzer: EnhancedTCPAnalyzer (dữ liệu các hàng đợi đã load)
+        queues (list): Các hàng đợi đưa vào báo cáo
+        max_points (int): Số điểm CWND tối đa mỗi hàng đợi
+        bins (int): Số bin của đồ thị tần suất sự kiện
+
+    Returns:
+        dict: Dữ liệu dạng JSON-serializable
+    """
+    t_end = 0.0
+    for queue in queues:
+        data = analyzer.data[queue]
+        if data['time']:
+            t_end = max(t_end, data['time'][-1])
+        if data['events']:
+            t_end = max(t_end, data['events'][-1]['time'])
+
+    report = {
+        'prefix': analyzer.prefix,
+        'generated': datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        't_end': t_end,
+        'bins': bins,
+        'states': STATE_NAMES,
+        'summary_rows': SUMMARY_ROWS,
+        'queues': {},
+    }
+    for queue in queues:
+        data = analyzer.data[queue]
+        metrics = run_metrics(data)
+        time, cwnd = metrics.decimated(max_points)
+        state_t, state_s = state_intervals(data['state_changes'])
+        rates, markers, totals = event_series(metrics, t_end, bins)
+        report['queues'][queue] = {
+            'color': analyzer.colors.get(queue, '#555555'),
+            'cwnd': {'t': encode_array(time), 'v': encode_array(cwnd), 'raw': len(data['cwnd'])},
+            'state': {'t': encode_array(state_t), 's': encode_array(state_s, '<u1')},
+            'rates': {kind: encode_array(c, '<u4') for kind, c in rates.items()},
+            'markers': {kind: encode_array(t) for kind, t in markers.items()},
+            'event_counts': totals,
+            'summary': data['summary'],
+            'flows': len(data['flows']),
+            'trace_note': filter_label(data['trace_filters']),
+        }
+    return report
+
+
+def create_html_report(analyzer, queues, output_file=None, max_points=HTML_MAX_POINTS):
+    """
+    Xuất báo cáo HTML tự chứa (không cần server/CDN, mở offline được)
+
+    Args:
+        analyzer: EnhancedTCPAnalyzer instance
+        queues (list): Các hàng đợi (dữ liệu phải được load trước)
+        output_file (Path): File HTML (mặc định: {prefix}_report[_queue].html)
+        max_points (int): Số điểm CWND tối đa mỗi hàng đợi
+
+    Returns:
+        Path: File đã ghi
+    """
+    if output_file is None:
+        suffix = '' if len(queues) > 1 else f'_{queues[0]}'
+        output_file = analyzer.results_dir / f"{analyzer.prefix}_report{suffix}.html"
+
+    report = build_report_data(analyzer, queues, max_points)
+    payload = json.dumps(report, separators=(',', ':'), default=float)
+    # Không để chuỗi "</" đóng thẻ <script> sớm
+    payload = payload.replace('</', '<\\/')
+    title = f"TCP Reno Report - {analyzer.prefix} ({' vs '.join(queues)})"
+    html = (HTML_TEMPLATE
+            .replace('__TITLE__', title)
+            .replace('__DATA__', payload))
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(html)
+
+    print(f"\nHTML report saved: {output_file} ({len(html) / 1024:.1f} KB)")
+    return output_file
+
+
+HTML_TEMPLATE = r"""<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>__TITLE__</title>
+<style>
+  body { font-family: 'DejaVu Sans', Arial, sans-serif; background: #F7F7F7; color: #2C3E50; margin: 0; padding: 20px 30px; }
+  h1 { font-size: 24px; margin: 0 0 4px; }
+  h2 { font-size: 17px; margin: 26px 0 8px; }
+  .meta { color: #7F8C8D; font-size: 12px; }
+  .card { background: white; border: 1px solid #E0E0E0; border-radius: 6px; padding: 12px 16px; margin-bottom: 14px; }
+  canvas { width: 100%; display: block; cursor: crosshair; }
+  .legend span { display: inline-block; margin-right: 18px; font-size: 13px; }
+  .legend i { display: inline-block; width: 14px; height: 4px; margin-right: 6px; vertical-align: middle; }
+  .hint { color: #7F8C8D; font-size: 12px; }
+  #readout { font-family: monospace; font-size: 12px; min-height: 16px; }
+  table { border-collapse: collapse; font-size: 13px; }
+  th, td { padding: 5px 14px; border-bottom: 1px solid #E0E0E0; text-align: right; }
+  th:first-child, td:first-child { text-align: left; }
+  th { background: #ECF0F1; }
+  button, select { font-size: 12px; }
+</style>
+</head>
+<body>
+<h1>__TITLE__</h1>
+<div class="meta" id="meta"></div>
+
+<div class="card">
+  <div class="legend" id="legend"></div>
+  <div class="hint">Kéo chuột để zoom vùng thời gian · cuộn chuột để zoom quanh con trỏ · double-click hoặc <button id="reset">Reset</button> để xem toàn bộ</div>
+  <div id="readout"></div>
+  <h2>Congestion Window (KB)</h2>
+  <canvas id="cwnd" height="320"></canvas>
+  <h2>TCP State</h2>
+  <canvas id="state" height="90"></canvas>
+  <h2>Event Rate (events/s) <select id="kind"></select></h2>
+  <canvas id="rate" height="180"></canvas>
+</div>
+
+<div class="card">
+  <h2>Summary</h2>
+  <table id="summary"></table>
+  <h2>Event Counts</h2>
+  <table id="events"></table>
+</div>
+
+<script id="report-data" type="application/json">__DATA__</script>
+<script>
+(function () {
+  'use strict';
+  var R = JSON.parse(document.getElementById('report-data').textContent);
+  var STATE_COLORS = ['#4D96FF', '#6BCB77', '#F77F00'];
+  var PAD = {l: 60, r: 15, t: 10, b: 24};
+
+  function decode(s, Type) {
+    var bin = atob(s), bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) bytes[i] = bin.charCodeAt(i);
+    return new Type(bytes.buffer);
+  }
+
+  var queues = Object.keys(R.queues).map(function (name) {
+    var q = R.queues[name];
+    var rates = {};
+    Object.keys(q.rates).forEach(function (k) { rates[k] = decode(q.rates[k], Uint32Array); });
+    var markers = {};
+    Object.keys(q.markers).forEach(function (k) { markers[k] = decode(q.markers[k], Float32Array); });
+    return {name: name, color: q.color, t: decode(q.cwnd.t, Float32Array), v: decode(q.cwnd.v, Float32Array),
+            st: decode(q.state.t, Float32Array), ss: decode(q.state.s, Uint8Array),
+            rates: rates, markers: markers, q: q};
+  });
+
+  var full = {x0: 0, x1: R.t_end || 1};
+  var view = {x0: full.x0, x1: full.x1};
+
+  // Chỉ số đầu tiên có t[i] >= x
+  function lower(t, x) {
+    var lo = 0, hi = t.length;
+    while (lo < hi) { var mid = (lo + hi) >> 1; if (t[mid] < x) lo = mid + 1; else hi = mid; }
+    return lo;
+  }
+
+  function setup(canvas) {
+    var ratio = window.devicePixelRatio || 1;
+    var w = canvas.clientWidth, h = canvas.height / (canvas._ratio || 1);
+    canvas._ratio = ratio;
+    canvas.width = w * ratio; canvas.height = h * ratio;
+    var ctx = canvas.getContext('2d');
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.clearRect(0, 0, w, h);
+    return {ctx: ctx, w: w, h: h};
+  }
+
+  function xScale(g) { return function (x) { return PAD.l + (x - view.x0) / (view.x1 - view.x0) * (g.w - PAD.l - PAD.r); }; }
+
+  function ticks(lo, hi, n) {
+    var step = Math.pow(10, Math.floor(Math.log10((hi - lo) / n || 1)));
+    [1, 2, 5, 10].some(function (m) { if ((hi - lo) / (step * m) <= n) { step *= m; return true; } return false; });
+    var out = [];
+    for (var v = Math.ceil(lo / step) * step; v <= hi + 1e-12; v += step) out.push(+v.toPrecision(10));
+    return out;
+  }
+
+  function axes(g, ymax, drawY) {
+    var ctx = g.ctx, X = xScale(g);
+    ctx.strokeStyle = '#E0E0E0'; ctx.fillStyle = '#7F8C8D'; ctx.font = '11px sans-serif'; ctx.lineWidth = 1;
+    ticks(view.x0, view.x1, 10).forEach(function (x) {
+      var px = X(x);
+      ctx.beginPath(); ctx.moveTo(px, PAD.t); ctx.lineTo(px, g.h - PAD.b); ctx.stroke();
+      ctx.fillText(x + 's', px - 10, g.h - 8);
+    });
+    if (drawY) {
+      ticks(0, ymax, 5).forEach(function (y) {
+        var py = g.h - PAD.b - y / ymax * (g.h - PAD.t - PAD.b);
+        ctx.beginPath(); ctx.moveTo(PAD.l, py); ctx.lineTo(g.w - PAD.r, py); ctx.stroke();
+        ctx.fillText(y, 5, py + 4);
+      });
+    }
+  }
+
+  function drawCwnd() {
+    var g = setup(document.getElementById('cwnd')), ctx = g.ctx, X = xScale(g);
+    var ymax = 1;
+    queues.forEach(function (q) {
+      var a = Math.max(0, lower(q.t, view.x0) - 1), b = Math.min(q.t.length, lower(q.t, view.x1) + 1);
+      for (var i = a; i < b; i++) if (q.v[i] > ymax) ymax = q.v[i];
+    });
+    ymax *= 1.08;
+    axes(g, ymax, true);
+    var Y = function (y) { return g.h - PAD.b - y / ymax * (g.h - PAD.t - PAD.b); };
+    ctx.save(); ctx.beginPath(); ctx.rect(PAD.l, 0, g.w - PAD.l - PAD.r, g.h); ctx.clip();
+    queues.forEach(function (q) {
+      var a = Math.max(0, lower(q.t, view.x0) - 1), b = Math.min(q.t.length, lower(q.t, view.x1) + 1);
+      // Không vẽ nhiều điểm hơn số pixel: giữ min/max mỗi cột pixel
+      ctx.strokeStyle = q.color; ctx.lineWidth = 1.5; ctx.beginPath();
+      var lastPx = -1, lo = 0, hi = 0, first = true;
+      for (var i = a; i < b; i++) {
+        var px = Math.round(X(q.t[i])), py = Y(q.v[i]);
+        if (px !== lastPx || first) {
+          if (!first) { ctx.lineTo(lastPx, lo); ctx.lineTo(lastPx, hi); }
+          if (first) ctx.moveTo(px, py); else ctx.lineTo(px, py);
+          lastPx = px; lo = hi = py; first = false;
+        } else { lo = Math.min(lo, py); hi = Math.max(hi, py); }
+      }
+      ctx.stroke();
+      var row = 0;
+      Object.keys(q.markers).forEach(function (kind) {
+        var m = q.markers[kind], timeout = kind === 'TIMEOUT_EVENT';
+        ctx.fillStyle = q.color;
+        for (var j = lower(m, view.x0); j < m.length && m[j] <= view.x1; j++) {
+          var mx = X(m[j]), my = PAD.t + 4 + row * 10 + queues.indexOf(q) * 22;
+          ctx.beginPath();
+          if (timeout) { ctx.moveTo(mx - 5, my); ctx.lineTo(mx + 5, my); ctx.lineTo(mx, my + 8); }
+          else { ctx.rect(mx - 1, my, 2, 7); }
+          ctx.fill();
+        }
+        row++;
+      });
+    });
+    ctx.restore();
+  }
+
+  function drawState() {
+    var g = setup(document.getElementById('state')), ctx = g.ctx, X = xScale(g);
+    axes(g, 1, false);
+    var rowH = (g.h - PAD.t - PAD.b) / Math.max(queues.length, 1);
+    queues.forEach(function (q, k) {
+      var y = PAD.t + k * rowH;
+      ctx.fillStyle = '#2C3E50'; ctx.font = '11px sans-serif'; ctx.fillText(q.name, 5, y + rowH / 2 + 4);
+      for (var i = 0; i < q.st.length; i++) {
+        var end = i + 1 < q.st.length ? q.st[i + 1] : full.x1;
+        if (end < view.x0 || q.st[i] > view.x1) continue;
+        var x0 = Math.max(X(q.st[i]), PAD.l), x1 = Math.min(X(end), g.w - PAD.r);
+        ctx.fillStyle = STATE_COLORS[q.ss[i]] || '#BDC3C7';
+        ctx.fillRect(x0, y + 2, Math.max(x1 - x0, 1), rowH - 4);
+      }
+    });
+  }
+
+  var kindSelect = document.getElementById('kind');
+  function drawRate() {
+    var g = setup(document.getElementById('rate')), ctx = g.ctx, X = xScale(g);
+    var kind = kindSelect.value, width = full.x1 / R.bins, ymax = 1;
+    queues.forEach(function (q) {
+      var c = q.rates[kind]; if (!c) return;
+      for (var i = 0; i < c.length; i++) if (c[i] / width > ymax) ymax = c[i] / width;
+    });
+    ymax *= 1.08;
+    axes(g, Math.round(ymax), true);
+    ctx.save(); ctx.beginPath(); ctx.rect(PAD.l, 0, g.w - PAD.l - PAD.r, g.h); ctx.clip();
+    queues.forEach(function (q) {
+      var c = q.rates[kind]; if (!c) return;
+      ctx.strokeStyle = q.color; ctx.lineWidth = 1.5; ctx.beginPath();
+      for (var i = 0; i < c.length; i++) {
+        var px = X((i + 0.5) * width), py = g.h - PAD.b - c[i] / width / ymax * (g.h - PAD.t - PAD.b);
+        if (i === 0) ctx.moveTo(px, py); else ctx.lineTo(px, py);
+      }
+      ctx.stroke();
+    });
+    ctx.restore();
+  }
+
+  function drawAll() { drawCwnd(); drawState(); drawRate(); }
+
+  function setView(x0, x1) {
+    x0 = Math.max(full.x0, x0); x1 = Math.min(full.x1, x1);
+    if (x1 - x0 < (full.x1 - full.x0) * 1e-5) return;
+    view.x0 = x0; view.x1 = x1; drawAll();
+  }
+
+  function toTime(canvas, clientX) {
+    var r = canvas.getBoundingClientRect();
+    return view.x0 + (clientX - r.left - PAD.l) / (r.width - PAD.l - PAD.r) * (view.x1 - view.x0);
+  }
+
+  var readout = document.getElementById('readout');
+  ['cwnd', 'state', 'rate'].forEach(function (id) {
+    var canvas = document.getElementById(id), start = null;
+    canvas.addEventListener('mousedown', function (e) { start = toTime(canvas, e.clientX); });
+    canvas.addEventListener('mouseup', function (e) {
+      if (start === null) return;
+      var end = toTime(canvas, e.clientX);
+      if (Math.abs(end - start) > (view.x1 - view.x0) * 0.005) setView(Math.min(start, end), Math.max(start, end));
+      start = null;
+    });
+    canvas.addEventListener('wheel', function (e) {
+      e.preventDefault();
+      var t = toTime(canvas, e.clientX), f = e.deltaY > 0 ? 1.25 : 0.8;
+      setView(t - (t - view.x0) * f, t + (view.x1 - t) * f);
+    }, {passive: false});
+    canvas.addEventListener('dblclick', function () { setView(full.x0, full.x1); });
+    canvas.addEventListener('mousemove', function (e) {
+      var t = toTime(canvas, e.clientX);
+      readout.textContent = 't = ' + t.toFixed(3) + ' s   ' + queues.map(function (q) {
+        var i = Math.max(0, lower(q.t, t) - 1);
+        return q.name + ': ' + (q.v.length ? q.v[i].toFixed(2) + ' KB' : '-');
+      }).join('   ');
+    });
+  });
+  document.getElementById('reset').addEventListener('click', function () { setView(full.x0, full.x1); });
+
+  // Legend, metadata, tables
+  document.getElementById('meta').textContent = 'Prefix ' + R.prefix + ' · generated ' + R.generated + ' · ' +
+    queues.map(function (q) { return q.name + ': ' + q.q.cwnd.raw + ' CWND samples (' + q.t.length + ' embedded)'; }).join(' · ');
+  var legend = queues.map(function (q) { return '<span><i style="background:' + q.color + '"></i>' + q.name + '</span>'; });
+  R.states.forEach(function (s, i) { legend.push('<span><i style="background:' + STATE_COLORS[i] + '"></i>' + s + '</span>'); });
+  legend.push('<span>▼ Timeout</span><span>| Triple Dup ACK</span>');
+  document.getElementById('legend').innerHTML = legend.join('');
+
+  var kinds = {};
+  queues.forEach(function (q) { Object.keys(q.rates).forEach(function (k) { kinds[k] = true; }); });
+  Object.keys(kinds).sort().forEach(function (k) {
+    var o = document.createElement('option'); o.value = o.textContent = k; kindSelect.appendChild(o);
+  });
+  if (kinds.DUP_ACK) kindSelect.value = 'DUP_ACK';
+  kindSelect.addEventListener('change', drawRate);
+
+  function fmt(v) { return v === undefined ? '-' : (Math.round(v) === v ? v.toLocaleString() : v.toFixed(3)); }
+  var head = '<tr><th>Metric</th>' + queues.map(function (q) { return '<th style="color:' + q.color + '">' + q.name + '</th>'; }).join('') + '</tr>';
+  document.getElementById('summary').innerHTML = head + R.summary_rows.map(function (row) {
+    return '<tr><td>' + row[1] + '</td>' + queues.map(function (q) { return '<td>' + fmt(q.q.summary[row[0]]) + '</td>'; }).join('') + '</tr>';
+  }).join('') + '<tr><td>Flows</td>' + queues.map(function (q) { return '<td>' + q.q.flows + '</td>'; }).join('') + '</tr>';
+  var eventKinds = {};
+  queues.forEach(function (q) { Object.keys(q.q.event_counts).forEach(function (k) { eventKinds[k] = true; }); });
+  document.getElementById('events').innerHTML = head.replace('Metric', 'Event') + Object.keys(eventKinds).sort().map(function (k) {
+    return '<tr><td>' + k + '</td>' + queues.map(function (q) { return '<td>' + fmt(q.q.event_counts[k]) + '</td>'; }).join('') + '</tr>';
+  }).join('') + '<tr><td>Trace filters</td>' + queues.map(function (q) { return '<td>' + (q.q.trace_note || '-') + '</td>'; }).join('') + '</tr>';
+
+  window.addEventListener('resize', drawAll);
+  drawAll();
+})();
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,263 @@
+"""
+Run metrics utilities
+Metric của một lần chạy được tính lười (lần đầu truy cập) và cache cùng dữ liệu đã parse
+"""
+
+import math
+from functools import cached_property
+import numpy as np
+from .data_utils import decimate_series, event_count, is_event_logged, log_start
+from .state_utils import state_analysis
+from .cycle_utils import cycle_table
+from .retx_utils import load_segments, tracker_from_segments, DEFAULT_GOODPUT_INTERVAL
+from .rtt_utils import rtt_analysis
+from .sync_utils import sync_analysis
+from .fairness_utils import fairness_series
+from .warmup_utils import warmup_analysis, truncate_data
+
+
+class RunMetrics:
+    """
+    Các metric dẫn xuất từ dữ liệu của một hàng đợi (kết quả load_data)
+
+    Mỗi metric được tính một lần khi được dùng lần đầu rồi giữ lại, nên
+    print_analysis, dashboard, timeline, comparison, infographic và báo cáo
+    HTML dùng chung kết quả thay vì tự tính lại. Các phép tính gom theo lượt
+    duyệt dữ liệu: CWND đổi sang ndarray một lần và sắp xếp một lần (mọi
+    percentile/median đọc từ mảng đã sắp xếp); danh sách sự kiện được duyệt
+    một lần thành mảng thời gian + mã loại (số đếm, thời điểm từng loại và
+    histogram theo thời gian đều lấy từ hai mảng này). TX-DATA/NEW_ACK của
+    state log chỉ được đọc lại một lần thành mảng (segments); truyền lại,
+    goodput ở mọi độ rộng bin và RTT đều tính từ các mảng đó.
+
+    Dữ liệu không được sửa sau khi load, nên cache không bao giờ cần làm mới.
+    """
+
+    def __init__(self, data, full=None):
+        """
+        Args:
+            data (dict): Dữ liệu của một hàng đợi (load_data, hoặc truncate_data)
+            full (RunMetrics): Metric của cả lần chạy khi data là phần sau warm-up
+                (dùng lại segments đã đọc)
+        """
+        self.data = data
+        self.full = full
+        # Metric từ state log chỉ đếm từ điểm cắt warm-up (None: cả lần chạy)
+        self.start = data.get('warmup_cut')
+        self._decimated = {}
+        self._event_times = {}
+        self._event_bins = {}
+        self._retransmissions = {}
+
+    # ----- CWND -----
+
+    @cached_property
+    def time(self):
+        return np.asarray(self.data['time'], dtype=float)
+
+    @cached_property
+    def cwnd(self):
+        return np.asarray(self.data['cwnd'], dtype=float)
+
+    @cached_property
+    def cwnd_sorted(self):
+        return np.sort(self.cwnd)
+
+    @cached_property
+    def cwnd_mean(self):
+        return float(self.cwnd.mean()) if len(self.cwnd) else math.nan
+
+    @cached_property
+    def cwnd_std(self):
+        return float(self.cwnd.std()) if len(self.cwnd) else math.nan
+
+    @property
+    def cwnd_max(self):
+        return float(self.cwnd_sorted[-1]) if len(self.cwnd) else math.nan
+
+    @property
+    def cwnd_min(self):
+        return float(self.cwnd_sorted[0]) if len(self.cwnd) else math.nan
+
+    @property
+    def cwnd_median(self):
+        return self.cwnd_percentile(50)
+
+    def cwnd_percentile(self, p):
+        """Percentile CWND (nội suy tuyến tính giống np.percentile) từ mảng đã sắp xếp"""
+        values = self.cwnd_sorted
+        if not len(values):
+            return math.nan
+        pos = (len(values) - 1) * p / 100.0
+        lo = int(math.floor(pos))
+        hi = min(lo + 1, len(values) - 1)
+        return float(values[lo] + (values[hi] - values[lo]) * (pos - lo))
+
+    @cached_property
+    def stability(self):
+        """Độ ổn định CWND (%): 100 - biến thiên trung bình giữa hai mẫu liên tiếp / CWND trung bình"""
+        if len(self.cwnd) < 2 or not self.cwnd_mean:
+            return 0.0
+        variation = np.abs(np.diff(self.cwnd)).mean() / self.cwnd_mean
+        return max(0.0, 100 - variation * 100)
+
+    def decimated(self, max_points):
+        """(time, cwnd) đã giảm điểm để vẽ (decimate_series), cache theo max_points"""
+        if max_points not in self._decimated:
+            self._decimated[max_points] = decimate_series(self.time, self.cwnd, max_points)
+        return self._decimated[max_points]
+
+    def cwnd_at(self, times):
+        """CWND của mẫu gần nhất với mỗi thời điểm (cho marker sự kiện trên đường CWND)"""
+        times = np.asarray(times, dtype=float)
+        if not len(self.time) or not len(times):
+            return np.empty(0)
+        if len(self.time) == 1:
+            return np.full(len(times), self.cwnd[0])
+        right = np.clip(np.searchsorted(self.time, times), 1, len(self.time) - 1)
+        left = right - 1
+        nearer_left = np.abs(self.time[left] - times) <= np.abs(self.time[right] - times)
+        return self.cwnd[np.where(nearer_left, left, right)]
+
+    @cached_property
+    def span(self):
+        """(đầu, cuối) khoảng quan sát: từ mẫu CWND đầu tiên (flow bắt đầu) tới mẫu/sự kiện cuối cùng"""
+        series = [a for a in (self.time, self.event_time_array) if len(a)]
+        if not series:
+            return 0.0, 0.0
+        return float(series[0][0]), float(max(a[-1] for a in series))
+
+    @cached_property
+    def log_span(self):
+        """span của các metric từ state log: bắt đầu từ sự kiện đầu tiên còn lại khi log bị cắt (log_start)"""
+        start, end = self.span
+        first = log_start(self.data)
+        return (max(start, first), end) if first is not None else (start, end)
+
+    @cached_property
+    def states(self):
+        """Khoảng trạng thái FSM, thời gian mỗi trạng thái, đợt recovery, ma trận chuyển (state_analysis)"""
+        return state_analysis(self.data['state_changes'], *self.log_span)
+
+    @cached_property
+    def cycles(self):
+        """Bảng chu kỳ sawtooth: đỉnh, đáy, thời lượng, tốc độ tăng, trigger (cycle_table)"""
+        return cycle_table(self)
+
+    @cached_property
+    def segments(self):
+        """
+        (tx, ack): mọi TX-DATA (time/seq/size) và NEW_ACK (time/ack) của state log (load_segments)
+
+        Luôn là của cả log (cần phần trước điểm cắt để biết snd_max và Ack cao nhất);
+        retransmissions và rtt chỉ đếm từ start.
+        """
+        if self.full is not None:
+            return self.full.segments
+        return load_segments(self.data['state_files'])
+
+    def retransmissions(self, interval=DEFAULT_GOODPUT_INTERVAL):
+        """Truyền lại và goodput theo bin thời gian (RetransmissionTracker), cache theo interval"""
+        if interval not in self._retransmissions:
+            self._retransmissions[interval] = tracker_from_segments(*self.segments, interval, self.start)
+        return self._retransmissions[interval]
+
+    @cached_property
+    def rtt(self):
+        """RTT từng gói (luật Karn), quỹ đạo RTO và timeout giả (rtt_analysis)"""
+        rto_changes = [e for e in self.data['events'] if e['event'] == 'RTO_CHANGE']
+        return rtt_analysis(*self.segments, rto_changes, self.event_times('TIMEOUT_EVENT'), self.start)
+
+    @cached_property
+    def sync(self):
+        """Đồng bộ giữa các flow: tương quan chéo CWND và mất gói trùng nhau (sync_analysis)"""
+        return sync_analysis(self.data['flow_cwnd'])
+
+    @cached_property
+    def fairness(self):
+        """Jain index và phần băng thông nút cổ chai của từng flow theo thời gian (fairness_series)"""
+        return fairness_series(self.data['flow_bytes'], self.data['summary'].get('bottleneck_mbps', math.nan))
+
+    # ----- Warm-up -----
+
+    @cached_property
+    def warmup(self):
+        """Điểm kết thúc warm-up (MSER-5 trên CWND và goodput theo bin, warmup_analysis)"""
+        return warmup_analysis(self)
+
+    @cached_property
+    def steady(self):
+        """
+        RunMetrics của phần sau warm-up: mọi metric ở trên tính lại trên dữ liệu
+        đã cắt (truncate_data); retransmissions và rtt chỉ đếm TX-DATA/NEW_ACK từ
+        điểm cắt, event không dùng counter của summary (của cả lần chạy).
+        """
+        return RunMetrics(truncate_data(self.data, self.warmup['cut']), full=self)
+
+    # ----- Events -----
+
+    @cached_property
+    def _events(self):
+        """Một lượt duyệt danh sách sự kiện: (times ndarray, codes ndarray, [loại])"""
+        events = self.data['events']
+        index = {}
+        times = np.fromiter((e['time'] for e in events), dtype=float, count=len(events))
+        codes = np.fromiter((index.setdefault(e['event'], len(index)) for e in events),
+                            dtype=np.intp, count=len(events))
+        return times, codes, list(index)
+
+    @property
+    def event_kinds(self):
+        return self._events[2]
+
+    @property
+    def event_time_array(self):
+        return self._events[0]
+
+    @cached_property
+    def event_counts(self):
+        """Số lượng từng loại sự kiện trong log (như count_events)"""
+        times, codes, kinds = self._events
+        return dict(zip(kinds, np.bincount(codes, minlength=len(kinds)).tolist()))
+
+    def event(self, name):
+        """
+        Số sự kiện một loại; None nếu loại đó bị lọc khỏi log (như event_count)
+
+        Sau warm-up, loại không có trong log là None: counter của summary là của cả lần chạy.
+        """
+        if self.start is not None and not is_event_logged(self.data.get('trace_filters', {}), name):
+            return None
+        return event_count(self.data, name, self.event_counts)
+
+    def event_times(self, name):
+        """Thời điểm các sự kiện một loại (ndarray, theo thứ tự log)"""
+        if name not in self._event_times:
+            times, codes, kinds = self._events
+            self._event_times[name] = times[codes == kinds.index(name)] if name in kinds else np.empty(0)
+        return self._event_times[name]
+
+    def event_bins(self, bins, t_end):
+        """
+        Số sự kiện mỗi loại theo bin thời gian đều trên [0, t_end]
+
+        Returns:
+            ndarray: shape (số loại, bins), hàng theo thứ tự event_kinds
+        """
+        key = (bins, t_end)
+        if key not in self._event_bins:
+            times, codes, kinds = self._events
+            edges = np.linspace(0.0, max(t_end, 1e-9), bins + 1)
+            slot = np.clip(np.searchsorted(edges, times, side='right') - 1, 0, bins - 1)
+            # Một lần bincount cho mọi loại: chỉ số = loại * bins + bin
+            counts = np.bincount(codes * bins + slot, minlength=len(kinds) * bins)
+            self._event_bins[key] = counts.reshape(len(kinds), bins)
+        return self._event_bins[key]
+
+
+def run_metrics(data):
+    """RunMetrics của một dữ liệu đã load (tạo lần đầu rồi lưu trong data['metrics'])"""
+    metrics = data.get('metrics')
+    if metrics is None:
+        metrics = data['metrics'] = RunMetrics(data)
+    return metrics
@@ -0,0 +1,324 @@
+"""
+Retransmission and goodput utilities
+Phát hiện segment truyền lại từ các dòng TX-DATA (Seq/Size) của state log và tính goodput theo
+thời gian từ NEW_ACK; đọc log theo từng khối nên dùng được cho log rất dài
+"""
+
+import re
+import numpy as np
+from .data_utils import iter_log_chunks, TRACE_CHUNK_LINES
+from .stream_utils import FixedHistogram
+
+
+# Sequence number TCP là số 32 bit, quay vòng về 0 sau 2^32 - 1
+SEQ_MODULUS = 1 << 32
+
+# Độ rộng bin mặc định (s) của goodput/truyền lại theo thời gian
+DEFAULT_GOODPUT_INTERVAL = 0.1
+
+_TX_DATA = re.compile(r'^\s*([\d.]+)s?:?\s+TX-DATA\s+Seq=(\d+)\s+Size=(\d+)', re.M)
+_NEW_ACK = re.compile(r'^\s*([\d.]+)s?:?\s+NEW_ACK\s+Ack=(\d+)', re.M)
+
+
+def parse_segments(lines):
+    """
+    Các dòng TX-DATA và NEW_ACK của một khối log (một lượt regex trên cả khối)
+
+    Returns:
+        tuple: (tx ndarray shape (n, 3): time/seq/size, ack ndarray shape (m, 2): time/ack)
+    """
+    text = ''.join(lines)
+    tx = np.array(_TX_DATA.findall(text), dtype=float).reshape(-1, 3)
+    ack = np.array(_NEW_ACK.findall(text), dtype=float).reshape(-1, 2)
+    return tx, ack
+
+
+def unwrap_sequence(seq, previous=None):
+    """
+    Bỏ quay vòng 32 bit của chuỗi sequence number (giống np.unwrap cho số nguyên)
+
+    Mỗi bước giữa hai giá trị liên tiếp được đưa về [-2^31, 2^31), nên cả
+    truyền lại (lùi) lẫn vượt qua 2^32 (tiến) đều đúng.
+
+    Args:
+        seq (ndarray): Sequence number thô (0 .. 2^32 - 1)
+        previous (int): Giá trị đã unwrap cuối cùng của khối trước (None: khối đầu tiên)
+
+    Returns:
+        ndarray: int64, tăng liên tục qua các lần quay vòng
+    """
+    seq = np.asarray(seq, dtype=np.int64)
+    if not len(seq):
+        return seq
+    reference = int(seq[0]) if previous is None else int(previous)
+    steps = np.diff(np.r_[reference, seq])
+    steps = (steps + SEQ_MODULUS // 2) % SEQ_MODULUS - SEQ_MODULUS // 2
+    return reference + np.cumsum(steps)
+
+
+def retransmitted_bytes(seq, sizes, high_water=None):
+    """
+    Số byte của mỗi segment đã được gửi trước đó (0: truyền lần đầu)
+
+    Byte cao nhất đã gửi trước mỗi segment (snd_max) là cumulative max của
+    seq + size, nên phần dưới mức đó là truyền lại.
+
+    Args:
+        seq (ndarray): Sequence number đã unwrap (unwrap_sequence), theo thứ tự log
+        sizes (ndarray): Kích thước segment (byte)
+        high_water (int): snd_max sau khối trước (None: khối đầu tiên)
+
+    Returns:
+        tuple: (overlap ndarray int64, snd_max sau khối này)
+    """
+    end = seq + sizes
+    high = seq[0] if high_water is None else high_water
+    prior = np.maximum.accumulate(np.r_[high, end[:-1]])
+    return np.clip(prior - seq, 0, sizes), int(max(prior[-1], end[-1]))
+
+
+class RetransmissionTracker:
+    """
+    Số byte gửi / truyền lại / được ACK theo bin thời gian, cập nhật theo từng khối
+
+    Một segment là truyền lại khi phần đầu của nó nằm dưới byte cao nhất đã
+    gửi trước đó (snd_max, retransmitted_bytes). Cách này tương đương việc tìm
+    sequence number lặp lại nhưng chạy O(n) và chỉ giữ vài số giữa các khối;
+    segment gửi lại một phần (đóng gói lại) chỉ tính phần byte trùng.
+
+    Goodput là số byte mới được ACK (Ack tăng) mỗi bin; khi log không ghi
+    NEW_ACK (--logEvents) thì dùng số byte mới được gửi.
+
+    Với start (vd điểm cắt warm-up), các dòng trước start chỉ cập nhật
+    snd_max và Ack cao nhất, không được đếm.
+    """
+
+    def __init__(self, interval=DEFAULT_GOODPUT_INTERVAL, start=None):
+        self.interval = float(interval)
+        self.start = -np.inf if start is None else float(start)
+        self.sent = FixedHistogram(self.interval)
+        self.retx = FixedHistogram(self.interval)
+        self.acked = FixedHistogram(self.interval)
+        self.segments = 0
+        self.retx_segments = 0
+        self.t_first = np.inf
+        self.t_last = -np.inf
+        self._last_seq = None
+        self._high_water = None
+        self._last_ack = None
+        self._ack_high = None
+        self._merged_duration = 0.0
+
+    def _seen(self, times):
+        self.t_first = min(self.t_first, float(times[0]))
+        self.t_last = max(self.t_last, float(times[-1]))
+
+    def _counted(self, times, *columns):
+        """Các dòng từ start (times, [cột])"""
+        times = np.asarray(times, dtype=float)
+        keep = times >= self.start
+        return times[keep], [c[keep] for c in columns]
+
+    def update_tx(self, times, seqs, sizes):
+        """Thêm một khối TX-DATA (theo thứ tự log)"""
+        if not len(times):
+            return self
+        seq = unwrap_sequence(seqs, self._last_seq)
+        sizes = np.asarray(sizes, dtype=np.int64)
+        overlap, self._high_water = retransmitted_bytes(seq, sizes, self._high_water)
+        self._last_seq = int(seq[-1])
+        times, (sizes, overlap) = self._counted(times, sizes, overlap)
+        if not len(times):
+            return self
+
+        self.segments += len(seq)
+        self.retx_segments += int(np.count_nonzero(overlap))
+        self.sent.update(times, sizes)
+        self.retx.update(times, overlap)
+        self._seen(times)
+        return self
+
+    def update_acks(self, times, acks):
+        """Thêm một khối NEW_ACK (theo thứ tự log)"""
+        if not len(times):
+            return self
+        ack = unwrap_sequence(acks, self._last_ack)
+        # Ack tích luỹ chỉ tăng: byte mới = phần vượt mức Ack cao nhất trước đó
+        high = np.maximum.accumulate(np.r_[ack[0] if self._ack_high is None else self._ack_high, ack])
+        advance = np.diff(high)
+        self._last_ack = int(ack[-1])
+        self._ack_high = int(high[-1])
+        times, (advance,) = self._counted(times, advance)
+        if not len(times):
+            return self
+        self.acked.update(times, advance)
+        self._seen(times)
+        return self
+
+    def merge(self, other):
+        """
+        Cộng dồn một tracker khác cùng interval (vd gộp các seed)
+
+        Chỉ dùng cho tổng: thời lượng được cộng lại, nên goodput gộp là trung bình
+        theo thời gian của các run; bảng theo bin là tổng các run.
+        """
+        for name in ('sent', 'retx', 'acked'):
+            getattr(self, name).merge(getattr(other, name))
+        self.segments += other.segments
+        self.retx_segments += other.retx_segments
+        self._merged_duration += other.duration
+        return self
+
+    @property
+    def sent_bytes(self):
+        return float(self.sent.counts.sum())
+
+    @property
+    def retx_bytes(self):
+        return float(self.retx.counts.sum())
+
+    @property
+    def acked_bytes(self):
+        return float(self.acked.counts.sum())
+
+    @property
+    def goodput_source(self):
+        return 'ack' if len(self.acked.counts) else 'tx'
+
+    @property
+    def duration(self):
+        """
+        Khoảng thời gian có TX-DATA/NEW_ACK (s, tính từ start nếu có), cộng thời
+        lượng các tracker đã merge
+        """
+        t_first = self.start if np.isfinite(self.start) else self.t_first
+        span = self.t_last - t_first if self.t_last >= t_first else 0.0
+        return span + self._merged_duration
+
+    def retx_ratio(self):
+        """Phần byte gửi là truyền lại (0..1); nan khi không có TX-DATA"""
+        return self.retx_bytes / self.sent_bytes if self.sent_bytes else np.nan
+
+    def goodput_mbps(self):
+        """Goodput trung bình (Mbps) trên khoảng có dữ liệu"""
+        useful = self.acked_bytes if self.goodput_source == 'ack' else self.sent_bytes - self.retx_bytes
+        return useful * 8 / self.duration / 1e6 if self.duration > 0 else np.nan
+
+    def table(self):
+        """
+        Bảng theo bin thời gian dạng cột
+
+        Returns:
+            dict: {'columns': {'time' (đầu bin), 'sent', 'retx', 'acked' (byte), 'retx_ratio',
+                   'goodput', 'throughput' (Mbps)}, 'n', 'interval', 'goodput_source'}
+        """
+        hists = [self.sent, self.retx, self.acked]
+        present = [h for h in hists if len(h.counts)]
+        if not present:
+            lo, hi = 0, 0
+        else:
+            lo = min(h.offset for h in present)
+            hi = max(h.offset + len(h.counts) for h in present)
+        aligned = []
+        for h in hists:
+            counts = np.zeros(hi - lo)
+            if len(h.counts):
+                counts[h.offset - lo:h.offset - lo + len(h.counts)] = h.counts
+            aligned.append(counts)
+        sent, retx, acked = aligned
+        useful = acked if self.goodput_source == 'ack' else sent - retx
+        scale = 8 / self.interval / 1e6
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ratio = np.where(sent > 0, retx / sent, np.nan)
+        columns = {
+            'time': self.interval * np.arange(lo, hi),
+            'sent': sent,
+            'retx': retx,
+            'acked': acked,
+            'retx_ratio': ratio,
+            'goodput': useful * scale,
+            'throughput': sent * scale,
+        }
+        return {'columns': columns, 'n': hi - lo, 'interval': self.interval,
+                'goodput_source': self.goodput_source}
+
+    def as_dict(self):
+        """Các tổng: segments, retx_segments, sent/retx/acked bytes, retx_ratio, goodput (Mbps)"""
+        return {
+            'segments': self.segments,
+            'retx_segments': self.retx_segments,
+            'sent_bytes': self.sent_bytes,
+            'retx_bytes': self.retx_bytes,
+            'acked_bytes': self.acked_bytes,
+            'retx_ratio': self.retx_ratio(),
+            'goodput': self.goodput_mbps(),
+            'goodput_source': self.goodput_source,
+        }
+
+
+def load_segments(log_files, chunk_lines=TRACE_CHUNK_LINES):
+    """
+    Toàn bộ TX-DATA và NEW_ACK của một state log (parse theo khối, ghép một lần)
+
+    Returns:
+        tuple: (tx ndarray (n, 3): time/seq/size, ack ndarray (m, 2): time/ack)
+    """
+    tx, ack = [np.empty((0, 3))], [np.empty((0, 2))]
+    for lines in iter_log_chunks(log_files, chunk_lines):
+        chunk_tx, chunk_ack = parse_segments(lines)
+        tx.append(chunk_tx)
+        ack.append(chunk_ack)
+    return np.concatenate(tx), np.concatenate(ack)
+
+
+def tracker_from_segments(tx, ack, interval=DEFAULT_GOODPUT_INTERVAL, start=None):
+    """
+    RetransmissionTracker từ các mảng TX-DATA/NEW_ACK đã parse (load_segments)
+
+    Dùng khi mảng đã có trong bộ nhớ (RunMetrics.segments): đổi độ rộng bin chỉ
+    cần tính lại histogram trên cùng các mảng, không đọc lại log.
+
+    Args:
+        tx (ndarray): (n, 3) time/seq/size
+        ack (ndarray): (m, 2) time/ack
+        interval (float): Độ rộng bin thời gian (s)
+        start (float): Chỉ đếm các dòng từ thời điểm này (None: cả log)
+
+    Returns:
+        RetransmissionTracker
+    """
+    tracker = RetransmissionTracker(interval, start)
+    tracker.update_tx(tx[:, 0], tx[:, 1], tx[:, 2])
+    tracker.update_acks(ack[:, 0], ack[:, 1])
+    return tracker
+
+
+def retransmission_analysis(log_files, interval=DEFAULT_GOODPUT_INTERVAL, chunk_lines=TRACE_CHUNK_LINES):
+    """
+    Truyền lại và goodput của một state log (cùng các file xoay vòng), đọc từng khối
+
+    Args:
+        log_files (list): Các file log, cũ nhất trước (data_utils.rotated_log_files)
+        interval (float): Độ rộng bin thời gian (s)
+        chunk_lines (int): Số dòng mỗi khối
+
+    Returns:
+        RetransmissionTracker
+    """
+    tracker = RetransmissionTracker(interval)
+    for lines in iter_log_chunks(log_files, chunk_lines):
+        tx, ack = parse_segments(lines)
+        tracker.update_tx(tx[:, 0], tx[:, 1], tx[:, 2])
+        tracker.update_acks(ack[:, 0], ack[:, 1])
+    return tracker
+
+
+def print_retransmissions(tracker):
+    """In số segment truyền lại, byte lãng phí và goodput"""
+    stats = tracker.as_dict()
+    ratio = stats['retx_ratio'] * 100
+    print(f"   📤 Segments sent:    {stats['segments']:>8,} ({stats['sent_bytes'] / 1e6:.2f} MB)")
+    print(f"   🔁 Retransmitted:    {stats['retx_segments']:>8,} ({ratio:.2f}% bytes)")
+    print(f"   🗑️  Bytes wasted:     {stats['retx_bytes'] / 1e3:>8,.1f} KB")
+    source = 'NEW_ACK' if stats['goodput_source'] == 'ack' else 'TX-DATA mới (log không ghi NEW_ACK)'
+    print(f"   ✅ Goodput:          {stats['goodput']:>8.3f} Mbps (từ {source})")
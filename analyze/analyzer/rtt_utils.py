@@ -0,0 +1,272 @@
+"""
+RTT / RTO utilities
+Dựng lại mẫu RTT từng gói bằng cách ghép mỗi NEW_ACK với lần gửi đầu tiên của segment nó xác
+nhận (TX-DATA, bỏ mẫu theo luật Karn), quỹ đạo RTO từ RTO_CHANGE và phát hiện timeout giả
+"""
+
+import re
+import math
+import numpy as np
+from .retx_utils import unwrap_sequence, retransmitted_bytes, SEQ_MODULUS
+
+
+# State log làm tròn thời gian tới ms: mỗi mẫu RTT có sai số cỡ ±1 ms
+LOG_TIME_RESOLUTION = 1e-3
+
+_RTO_CHANGE = re.compile(r'oldRTO=\+?([\d.eE+-]+)(\w*)\s+newRTO=\+?([\d.eE+-]+)(\w*)')
+_TIME_UNITS = {'': 1.0, 's': 1.0, 'ms': 1e-3, 'us': 1e-6, 'ns': 1e-9}
+
+
+def _seconds(value, unit):
+    return float(value) * _TIME_UNITS.get(unit, 1.0)
+
+
+def rto_series(rto_changes):
+    """
+    Quỹ đạo RTO dạng bậc thang từ các sự kiện RTO_CHANGE ("oldRTO=1s newRTO=2s")
+
+    Args:
+        rto_changes (list): Sự kiện {'time', 'detail'} loại RTO_CHANGE, theo thứ tự log
+
+    Returns:
+        tuple: (times, rto) ndarray (s) - RTO bằng rto[i] từ times[i]; điểm đầu là oldRTO
+               của thay đổi đầu tiên, tại cùng thời điểm
+    """
+    times, values = [], []
+    for change in rto_changes:
+        match = _RTO_CHANGE.search(change['detail'])
+        if not match:
+            continue
+        if not values:
+            times.append(change['time'])
+            values.append(_seconds(match.group(1), match.group(2)))
+        times.append(change['time'])
+        values.append(_seconds(match.group(3), match.group(4)))
+    return np.array(times, dtype=float), np.array(values, dtype=float)
+
+
+def _overlapped(f_seq, f_end, r_seq, r_end):
+    """
+    Segment gửi lần đầu nào bị một lần truyền lại chồng lên (dù chỉ một phần)
+
+    Segment gửi lần đầu luôn nằm trên snd_max nên seq/end của chúng tăng dần;
+    mỗi lần truyền lại đánh dấu các segment gốc mà nó chồng lên bằng mảng
+    hiệu (+1 tại đầu, -1 sau cuối, rồi cumsum).
+    """
+    lo = np.searchsorted(f_end, r_seq, side='right')
+    hi = np.maximum(np.searchsorted(f_seq, r_end, side='left'), lo)
+    marks = np.zeros(len(f_seq) + 1, dtype=np.int64)
+    np.add.at(marks, lo, 1)
+    np.add.at(marks, hi, -1)
+    return np.cumsum(marks)[:-1] > 0
+
+
+class RttTracker:
+    """
+    Mẫu RTT từng gói tính dần theo từng khối log (vector hoá trong mỗi khối)
+
+    Mỗi NEW_ACK làm Ack tăng xác nhận một dải byte mới; mẫu RTT là thời điểm
+    ACK trừ thời điểm gửi lần đầu của segment cuối cùng được xác nhận trọn
+    (searchsorted trên end của các segment gửi lần đầu). Theo luật Karn, ACK
+    nào xác nhận một segment đã bị truyền lại thì không cho mẫu (không biết
+    ACK trả lời lần gửi nào).
+
+    Giữa các khối chỉ giữ các segment gửi lần đầu chưa được ACK trọn (cửa sổ
+    gửi), nên bộ nhớ phụ thuộc CWND chứ không phụ thuộc độ dài log. Trong một
+    khối, TX-DATA được xử lý trước NEW_ACK: một ACK không thể xác nhận segment
+    gửi sau nó, và truyền lại chỉ gửi lại byte chưa được ACK, nên kết quả
+    không phụ thuộc cách chia khối.
+
+    Với start (vd điểm cắt warm-up), chỉ ACK từ start mới cho mẫu và được đếm;
+    các dòng trước đó vẫn cập nhật cửa sổ gửi.
+    """
+
+    def __init__(self, start=None):
+        self.start = -np.inf if start is None else float(start)
+        self.n = 0
+        self.acks = 0
+        self.karn_discarded = 0
+        self._first_seq = None
+        self._last_seq = None
+        self._high_water = None
+        self._last_ack = None
+        self._ack_high = None
+        self._pending_ack = np.empty((0, 2))
+        # Cửa sổ: segment gửi lần đầu chưa được ACK trọn
+        self._time = np.empty(0)
+        self._seq = np.empty(0, dtype=np.int64)
+        self._end = np.empty(0, dtype=np.int64)
+        self._retx = np.empty(0, dtype=bool)
+
+    def _update_tx(self, tx):
+        seq = unwrap_sequence(tx[:, 1], self._last_seq)
+        sizes = tx[:, 2].astype(np.int64)
+        overlap, self._high_water = retransmitted_bytes(seq, sizes, self._high_water)
+        if self._first_seq is None:
+            self._first_seq = int(seq[0])
+        self._last_seq = int(seq[-1])
+        first = overlap == 0
+        self._time = np.r_[self._time, tx[first, 0]]
+        self._seq = np.r_[self._seq, seq[first]]
+        self._end = np.r_[self._end, seq[first] + sizes[first]]
+        self._retx = np.r_[self._retx, np.zeros(int(first.sum()), dtype=bool)]
+        if not first.all():
+            self._retx |= _overlapped(self._seq, self._end, seq[~first], seq[~first] + sizes[~first])
+
+    def _update_acks(self, ack):
+        acked = unwrap_sequence(ack[:, 1], self._last_ack)
+        if self._last_ack is None:
+            # Ack cùng hệ số với seq (cùng vòng 2^32 với TX-DATA đầu tiên)
+            acked += SEQ_MODULUS * round((self._first_seq - acked[0]) / SEQ_MODULUS)
+        self._last_ack = int(acked[-1])
+        # ACK đầu tiên của log là mốc (không tăng)
+        high = np.maximum.accumulate(np.r_[acked[0] if self._ack_high is None else self._ack_high, acked])
+        previous, high = high[:-1], high[1:]
+        self._ack_high = int(high[-1])
+        advancing = acked > previous
+        a_time, a_high, a_prev = ack[advancing, 0], acked[advancing], previous[advancing]
+
+        # Segment cuối cùng được xác nhận trọn, và segment đầu tiên chưa được xác nhận trước ACK này
+        last = np.searchsorted(self._end, a_high, side='right') - 1
+        start = np.searchsorted(self._end, a_prev, side='right')
+        covers = (last >= start) & (a_time >= self.start)
+        last, start, a_time = last[covers], start[covers], a_time[covers]
+        retx_before = np.r_[0, np.cumsum(self._retx)]
+        karn = retx_before[last + 1] - retx_before[start] > 0
+        rtt = a_time - self._time[last]
+        keep = ~karn & (rtt >= 0)
+        columns = {'time': a_time[keep], 'rtt': rtt[keep], 'seq': self._end[last[keep]]}
+        self.n += int(keep.sum())
+        self.acks += int(covers.sum())
+        self.karn_discarded += int(karn.sum())
+
+        # Bỏ các segment đã được ACK trọn khỏi cửa sổ
+        acked_through = np.searchsorted(self._end, self._ack_high, side='right')
+        self._time, self._seq = self._time[acked_through:], self._seq[acked_through:]
+        self._end, self._retx = self._end[acked_through:], self._retx[acked_through:]
+        return columns
+
+    def update(self, tx, ack):
+        """
+        Thêm một khối TX-DATA/NEW_ACK (parse_segments, theo thứ tự log)
+
+        Returns:
+            dict: Các mẫu mới {'time' (thời điểm ACK), 'rtt' (s), 'seq' (end của segment)}
+        """
+        if len(tx):
+            self._update_tx(tx)
+        if len(ack):
+            self._pending_ack = np.concatenate([self._pending_ack, ack])
+        if self._first_seq is None or not len(self._pending_ack):
+            # Chưa có TX-DATA để gióng vòng 2^32 của Ack: giữ ACK tới khối sau
+            return {'time': np.empty(0), 'rtt': np.empty(0), 'seq': np.empty(0, dtype=np.int64)}
+        ack, self._pending_ack = self._pending_ack, np.empty((0, 2))
+        return self._update_acks(ack)
+
+
+def rtt_samples(tx, ack, start=None):
+    """
+    Mẫu RTT từng gói của cả log (RttTracker với một khối)
+
+    Args:
+        tx (ndarray): (n, 3) time/seq/size (load_segments)
+        ack (ndarray): (m, 2) time/ack
+        start (float): Chỉ lấy mẫu của ACK từ thời điểm này (None: cả log)
+
+    Returns:
+        dict: {'columns': {'time' (thời điểm ACK), 'rtt' (s), 'seq' (end của segment)}, 'n',
+               'acks' (số ACK xác nhận trọn ít nhất một segment), 'karn_discarded'}
+    """
+    tracker = RttTracker(start)
+    columns = tracker.update(tx, ack)
+    return {'columns': columns, 'n': tracker.n, 'acks': tracker.acks,
+            'karn_discarded': tracker.karn_discarded}
+
+
+def spurious_timeouts(timeouts, tx, ack, min_rtt, slack=LOG_TIME_RESOLUTION):
+    """
+    Timeout giả: ACK cho segment được truyền lại tới sớm hơn một RTT tối thiểu sau
+    lần truyền lại, nên nó trả lời lần gửi gốc (gói gốc không mất, chỉ bị trễ)
+
+    Args:
+        timeouts (ndarray): Thời điểm TIMEOUT_EVENT
+        tx, ack (ndarray): Từ load_segments
+        min_rtt (float): RTT nhỏ nhất đo được (s)
+        slack (float): Sai số thời gian của log
+
+    Returns:
+        ndarray: bool cho từng timeout
+    """
+    timeouts = np.asarray(timeouts, dtype=float)
+    spurious = np.zeros(len(timeouts), dtype=bool)
+    if not len(timeouts) or not len(tx) or not len(ack) or math.isnan(min_rtt):
+        return spurious
+    seq = unwrap_sequence(tx[:, 1])
+    sizes = tx[:, 2].astype(np.int64)
+    overlap, _ = retransmitted_bytes(seq, sizes)
+    retx = overlap > 0
+    r_time, r_end = tx[retx, 0], seq[retx] + sizes[retx]
+    acked = unwrap_sequence(ack[:, 1])
+    acked += SEQ_MODULUS * round((seq[0] - acked[0]) / SEQ_MODULUS)
+    high = np.maximum.accumulate(acked)
+
+    # Lần truyền lại đầu tiên từ lúc timeout, rồi ACK đầu tiên xác nhận trọn segment đó
+    k = np.searchsorted(r_time, timeouts - slack, side='left')
+    found = k < len(r_time)
+    j = np.full(len(timeouts), len(high))
+    j[found] = np.searchsorted(high, r_end[k[found]], side='left')
+    found &= j < len(high)
+    early = ack[j[found], 0] - r_time[k[found]] + slack < min_rtt
+    spurious[found] = early
+    return spurious
+
+
+def rtt_stats(samples):
+    """min/mean/p50/p90/p99/max RTT (s) và trễ hàng đợi ước lượng (p50 - min)"""
+    rtt = samples['columns']['rtt']
+    if not len(rtt):
+        return {k: math.nan for k in ('min', 'mean', 'p50', 'p90', 'p99', 'max', 'queueing')}
+    p50, p90, p99 = np.percentile(rtt, [50, 90, 99])
+    return {'min': float(rtt.min()), 'mean': float(rtt.mean()), 'p50': float(p50), 'p90': float(p90),
+            'p99': float(p99), 'max': float(rtt.max()), 'queueing': float(p50 - rtt.min())}
+
+
+def rtt_analysis(tx, ack, rto_changes, timeouts, start=None):
+    """
+    RTT từng gói, quỹ đạo RTO và timeout giả của một hàng đợi
+
+    Args:
+        tx, ack (ndarray): TX-DATA và NEW_ACK của state log (load_segments)
+        rto_changes (list): Sự kiện RTO_CHANGE
+        timeouts (ndarray): Thời điểm TIMEOUT_EVENT
+        start (float): Chỉ lấy mẫu RTT của ACK từ thời điểm này (None: cả log)
+
+    Returns:
+        dict: {'samples' (rtt_samples), 'stats' (rtt_stats), 'rto': (times, rto),
+               'timeouts' ndarray, 'spurious' bool ndarray}
+    """
+    samples = rtt_samples(tx, ack, start)
+    stats = rtt_stats(samples)
+    timeouts = np.asarray(timeouts, dtype=float)
+    return {
+        'samples': samples,
+        'stats': stats,
+        'rto': rto_series(rto_changes),
+        'timeouts': timeouts,
+        'spurious': spurious_timeouts(timeouts, tx, ack, stats['min']),
+    }
+
+
+def print_rtt_analysis(rtt):
+    """In thống kê RTT, số mẫu bị bỏ theo luật Karn, RTO và timeout giả"""
+    samples, stats = rtt['samples'], rtt['stats']
+    print(f"   📏 RTT samples:      {samples['n']:>8,} ({samples['karn_discarded']:,} bỏ theo luật Karn)")
+    if samples['n']:
+        print(f"   ⏱️  RTT min / p50:    {stats['min'] * 1e3:>8.1f} / {stats['p50'] * 1e3:.1f} ms")
+        print(f"   ⏱️  RTT p90 / p99:    {stats['p90'] * 1e3:>8.1f} / {stats['p99'] * 1e3:.1f} ms")
+        print(f"   🧱 Queueing (p50-min): {stats['queueing'] * 1e3:>6.1f} ms")
+    times, rto = rtt['rto']
+    if len(rto):
+        print(f"   ⏲️  RTO range:        {rto.min():>8.2f} .. {rto.max():.2f} s ({len(rto) - 1} thay đổi)")
+    if len(rtt['timeouts']):
+        print(f"   ⏰ Timeouts:         {len(rtt['timeouts']):>8,} ({int(rtt['spurious'].sum())} giả)")
@@ -0,0 +1,193 @@
+"""
+TCP FSM state utilities
+Khoảng thời gian của từng trạng thái (SlowStart/CongestionAvoidance/FastRecovery) từ các sự kiện
+STATE_CHANGE: thời gian mỗi trạng thái, các đợt recovery và ma trận chuyển trạng thái
+"""
+
+import re
+import numpy as np
+
+
+STATE_NAMES = ['SlowStart', 'CongestionAvoidance', 'FastRecovery']
+
+# Màu trạng thái (key trong COLORS), giống STATE_COLORS của báo cáo HTML
+STATE_COLOR_KEYS = {
+    'SlowStart': 'accent3',
+    'CongestionAvoidance': 'accent2',
+    'FastRecovery': 'warning',
+}
+
+RECOVERY_STATE = 'FastRecovery'
+
+_TRANSITION = re.compile(r'(\w+)\s*->\s*(\w+)')
+
+
+def state_colors(colors, names=STATE_NAMES):
+    """Màu của từng trạng thái theo color scheme"""
+    return [colors[STATE_COLOR_KEYS[name]] for name in names]
+
+
+def parse_transitions(state_changes, names=STATE_NAMES):
+    """
+    Các chuyển trạng thái từ sự kiện STATE_CHANGE ("A -> B [Reason...]")
+
+    Returns:
+        tuple: (times, from_codes, to_codes) ndarray; bỏ qua trạng thái không có trong names
+    """
+    index = {name: i for i, name in enumerate(names)}
+    times, old_codes, new_codes = [], [], []
+    for change in state_changes:
+        match = _TRANSITION.search(change['detail'])
+        if not match or match.group(1) not in index or match.group(2) not in index:
+            continue
+        times.append(change['time'])
+        old_codes.append(index[match.group(1)])
+        new_codes.append(index[match.group(2)])
+    return (np.array(times, dtype=float), np.array(old_codes, dtype=np.intp),
+            np.array(new_codes, dtype=np.intp))
+
+
+def state_intervals(state_changes, names=STATE_NAMES):
+    """
+    Chuỗi trạng thái FSM dạng điểm bắt đầu (dùng cho dải trạng thái của báo cáo HTML)
+
+    Returns:
+        tuple: (times ndarray, codes ndarray) - trạng thái codes[i] bắt đầu tại times[i];
+               trạng thái trước thay đổi đầu tiên bắt đầu tại 0
+    """
+    times, old, new = parse_transitions(state_changes, names)
+    if not len(times):
+        return np.empty(0), np.empty(0, dtype=np.uint8)
+    return np.r_[0.0, times], np.r_[old[0], new].astype(np.uint8)
+
+
+def state_table(state_changes, t_start, t_end, names=STATE_NAMES):
+    """
+    Bảng khoảng trạng thái dạng cột, các khoảng liên tiếp cùng trạng thái được gộp
+
+    Trạng thái trước thay đổi đầu tiên (from của chuyển đầu tiên) bắt đầu tại
+    t_start; trạng thái cuối kéo dài tới t_end.
+
+    Args:
+        state_changes (list): data['state_changes']
+        t_start (float): Đầu khoảng quan sát (vd mẫu CWND đầu tiên)
+        t_end (float): Cuối khoảng quan sát
+
+    Returns:
+        dict: {'columns': {'start', 'end', 'duration', 'state'}, 'n', 'names'}
+    """
+    times, old, new = parse_transitions(state_changes, names)
+    if not len(times):
+        columns = {'start': np.empty(0), 'end': np.empty(0), 'duration': np.empty(0),
+                   'state': np.empty(0, dtype=np.intp)}
+        return {'columns': columns, 'n': 0, 'names': list(names)}
+    starts = np.r_[min(t_start, times[0]), times]
+    states = np.r_[old[0], new]
+    # Gộp các khoảng liền nhau cùng trạng thái (vd A -> A, hoặc log xoay vòng lặp lại)
+    keep = np.r_[True, states[1:] != states[:-1]]
+    starts, states = starts[keep], states[keep]
+    ends = np.r_[starts[1:], max(t_end, starts[-1])]
+    columns = {'start': starts, 'end': ends, 'duration': ends - starts, 'state': states}
+    return {'columns': columns, 'n': len(starts), 'names': list(names)}
+
+
+def time_in_state(table):
+    """Tổng thời gian (s) ở mỗi trạng thái, theo thứ tự table['names']"""
+    columns = table['columns']
+    return np.bincount(columns['state'], weights=columns['duration'], minlength=len(table['names']))
+
+
+def recovery_episodes(table, state=RECOVERY_STATE):
+    """
+    Các đợt ở trạng thái recovery và cách mỗi đợt kết thúc
+
+    Returns:
+        dict: {'durations' ndarray, 'count', 'total', 'mean', 'median', 'max',
+               'ended_by': {trạng thái kế tiếp hoặc 'end of run': số đợt}}
+    """
+    names = table['names']
+    columns = table['columns']
+    if state not in names or not table['n']:
+        durations = np.empty(0)
+        return {'durations': durations, 'count': 0, 'total': 0.0, 'mean': np.nan,
+                'median': np.nan, 'max': np.nan, 'ended_by': {}}
+    index = np.flatnonzero(columns['state'] == names.index(state))
+    durations = columns['duration'][index]
+    # Trạng thái ngay sau mỗi đợt; đợt cuối có thể kéo dài tới hết lần chạy
+    following = np.r_[columns['state'], -1][index + 1]
+    ended_by = {}
+    for code, count in zip(*np.unique(following, return_counts=True)):
+        ended_by['end of run' if code < 0 else names[code]] = int(count)
+    return {
+        'durations': durations,
+        'count': len(durations),
+        'total': float(durations.sum()),
+        'mean': float(durations.mean()) if len(durations) else np.nan,
+        'median': float(np.median(durations)) if len(durations) else np.nan,
+        'max': float(durations.max()) if len(durations) else np.nan,
+        'ended_by': ended_by,
+    }
+
+
+def transition_matrix(state_changes, names=STATE_NAMES):
+    """Số lần chuyển từ trạng thái hàng sang trạng thái cột (np.add.at)"""
+    _, old, new = parse_transitions(state_changes, names)
+    matrix = np.zeros((len(names), len(names)), dtype=int)
+    np.add.at(matrix, (old, new), 1)
+    return matrix
+
+
+def state_analysis(state_changes, t_start, t_end, names=STATE_NAMES):
+    """
+    Toàn bộ phân tích trạng thái của một hàng đợi
+
+    Returns:
+        dict: {'table', 'names', 'occupancy' (s), 'fraction', 'episodes', 'transitions'}
+    """
+    table = state_table(state_changes, t_start, t_end, names)
+    occupancy = time_in_state(table)
+    total = occupancy.sum()
+    return {
+        'table': table,
+        'names': list(names),
+        'occupancy': occupancy,
+        'fraction': occupancy / total if total > 0 else np.zeros(len(names)),
+        'episodes': recovery_episodes(table),
+        'transitions': transition_matrix(state_changes, names),
+    }
+
+
+def sample_states(table, times):
+    """Mã trạng thái tại mỗi thời điểm (mẫu trước khoảng đầu tiên lấy trạng thái đầu tiên)"""
+    columns = table['columns']
+    slot = np.searchsorted(columns['start'], times, side='right') - 1
+    return columns['state'][np.clip(slot, 0, table['n'] - 1)]
+
+
+def recovery_ids(table, times, state=RECOVERY_STATE):
+    """Số thứ tự khoảng recovery chứa mỗi thời điểm (-1 khi không ở trạng thái recovery)"""
+    columns = table['columns']
+    if state not in table['names'] or not table['n']:
+        return np.full(len(times), -1, dtype=np.intp)
+    slot = np.clip(np.searchsorted(columns['start'], times, side='right') - 1, 0, table['n'] - 1)
+    return np.where(columns['state'][slot] == table['names'].index(state), slot, -1)
+
+
+def print_state_analysis(states):
+    """In thời gian mỗi trạng thái, các đợt recovery và ma trận chuyển trạng thái"""
+    names = states['names']
+    for name, seconds, fraction in zip(names, states['occupancy'], states['fraction']):
+        print(f"   ⏱️  {name:<20} {seconds:>8.2f} s ({fraction * 100:5.1f}%)")
+    episodes = states['episodes']
+    if episodes['count']:
+        ended = ', '.join(f"{k}: {v}" for k, v in episodes['ended_by'].items())
+        print(f"   🔁 Recovery episodes: {episodes['count']:>7,} (mean {episodes['mean']:.3f} s, "
+              f"median {episodes['median']:.3f} s, max {episodes['max']:.3f} s)")
+        print(f"   ↪️  Exited to:         {ended}")
+    else:
+        print(f"   🔁 Recovery episodes: {0:>7}")
+    short = [''.join(c for c in name if c.isupper()) for name in names]
+    print("   🔀 Transitions (hàng → cột):")
+    print(f"      {'':>4}" + ''.join(f"{s:>6}" for s in short))
+    for s, row in zip(short, states['transitions']):
+        print(f"      {s:>4}" + ''.join(f"{v:>6,}" for v in row))
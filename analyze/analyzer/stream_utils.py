@@ -0,0 +1,424 @@
+"""
+Streaming statistics utilities
+Thống kê một lượt qua dữ liệu theo từng khối: moment (Welford/Chan), quantile xấp xỉ (t-digest),
+histogram bin cố định. Bộ nhớ không phụ thuộc độ dài trace, kết quả từng phần gộp được với nhau.
+"""
+
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from .data_utils import (find_latest_file, iter_trace_chunks, parse_flow_stats, rotated_log_files,
+                         TRACE_CHUNK_LINES)
+
+
+# Số centroid của t-digest ~ compression / 2; sai số quantile ở đuôi (p99) < 0.1% rank
+TDIGEST_COMPRESSION = 200
+
+# Số giá trị giữ trong buffer trước khi gộp vào các centroid
+TDIGEST_BUFFER = 1 << 16
+
+# Độ rộng bin của histogram: CWND theo KB, RTT theo ms (state log làm tròn thời gian tới ms)
+CWND_BIN_WIDTH = 1.0
+RTT_BIN_WIDTH = 1.0
+
+# Quantile in trong bảng thống kê
+REPORT_QUANTILES = (0.5, 0.9, 0.99)
+
+
+def _as_chunk(values, weights):
+    """(values, weights) dạng float ndarray 1 chiều, bỏ giá trị nan"""
+    values = np.asarray(values, dtype=float).ravel()
+    weights = np.ones_like(values) if weights is None else np.asarray(weights, dtype=float).ravel()
+    keep = ~np.isnan(values) & (weights > 0)
+    return values[keep], weights[keep]
+
+
+class RunningStats:
+    """
+    Số lượng, mean, phương sai, min/max tính dần theo từng khối
+
+    Mỗi khối được tóm tắt bằng NumPy (n, mean, M2) rồi gộp vào trạng thái
+    hiện tại bằng công thức của Chan et al. (dạng tổng quát theo khối của
+    Welford), nên ổn định số học và hai RunningStats bất kỳ gộp được với
+    nhau (merge) cho kết quả như khi tính trên toàn bộ dữ liệu.
+    Hỗ trợ trọng số (vd delay trung bình của flow, trọng số = số gói nhận).
+    """
+
+    def __init__(self):
+        self.count = 0.0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values, weights=None):
+        values, weights = _as_chunk(values, weights)
+        if not len(values):
+            return self
+        n = weights.sum()
+        mean = float(np.dot(weights, values) / n)
+        m2 = float(np.dot(weights, (values - mean) ** 2))
+        self._combine(float(n), mean, m2, float(values.min()), float(values.max()))
+        return self
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+        return self
+
+    def _combine(self, n, mean, m2, vmin, vmax):
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += m2 + delta * delta * self.count * n / total
+        self.count = total
+        self.min = min(self.min, vmin)
+        self.max = max(self.max, vmax)
+
+    @property
+    def variance(self):
+        """Phương sai tổng thể (ddof=0, như np.var)"""
+        return self.m2 / self.count if self.count else math.nan
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance) if self.count else math.nan
+
+
+class TDigest:
+    """
+    Quantile xấp xỉ gộp được (merging t-digest, hàm tỉ lệ k1 = δ/2π·asin(2q-1))
+
+    Giá trị mới vào buffer; khi buffer đầy, buffer và các centroid hiện có
+    được sắp xếp rồi gom theo phần nguyên của k(q) tại giữa mỗi phần tử:
+    mỗi centroid trải không quá một đơn vị k, nên centroid ở hai đuôi nhỏ
+    (p1/p99 chính xác) còn ở giữa lớn. Phép gom thực hiện bằng np.add.reduceat,
+    không lặp Python theo từng giá trị. Gộp hai digest = nối centroid rồi gom lại.
+    """
+
+    def __init__(self, compression=TDIGEST_COMPRESSION, buffer_size=TDIGEST_BUFFER):
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def update(self, values, weights=None):
+        values, weights = _as_chunk(values, weights)
+        if not len(values):
+            return self
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self._buffer.append((values, weights))
+        self._buffered += len(values)
+        if self._buffered >= self.buffer_size:
+            self.compress()
+        return self
+
+    def merge(self, other):
+        other.compress()
+        if len(other.means):
+            self._buffer.append((other.means, other.weights))
+            self._buffered += len(other.means)
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.compress()
+        return self
+
+    def compress(self):
+        """Gộp buffer vào các centroid"""
+        if not self._buffer:
+            return self
+        means = np.concatenate([self.means] + [v for v, _ in self._buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self._buffer])
+        self._buffer, self._buffered = [], 0
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        k = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * q - 1, -1, 1))
+        cluster = np.floor(k)
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+        return self
+
+    @property
+    def count(self):
+        return float(self.weights.sum()) + sum(float(w.sum()) for _, w in self._buffer)
+
+    def quantile(self, q):
+        """Giá trị tại quantile q (0..1), nội suy giữa tâm các centroid; nan nếu rỗng"""
+        self.compress()
+        if not len(self.means):
+            return math.nan
+        cumulative = np.cumsum(self.weights)
+        total = cumulative[-1]
+        centers = cumulative - self.weights / 2
+        return float(np.interp(np.asarray(q) * total,
+                               np.r_[0.0, centers, total],
+                               np.r_[self.min, self.means, self.max]))
+
+    def cdf(self, x):
+        """Tỉ lệ giá trị <= x (ước lượng)"""
+        self.compress()
+        if not len(self.means):
+            return math.nan
+        cumulative = np.cumsum(self.weights)
+        total = cumulative[-1]
+        centers = cumulative - self.weights / 2
+        return np.interp(x, np.r_[self.min, self.means, self.max],
+                         np.r_[0.0, centers, total]) / total
+
+    def __getstate__(self):
+        # Gửi giữa các process: chỉ cần centroid, không gửi buffer thô
+        self.compress()
+        return self.__dict__
+
+
+class FixedHistogram:
+    """
+    Histogram với bin có độ rộng cố định, neo tại origin
+
+    Mảng đếm tự mở rộng theo khoảng giá trị gặp được (bộ nhớ tỉ lệ với
+    khoảng giá trị / width, không với số mẫu). Hai histogram cùng width và
+    origin gộp được bằng cách cộng số đếm.
+    """
+
+    def __init__(self, width, origin=0.0):
+        self.width = float(width)
+        self.origin = float(origin)
+        self.offset = 0                 # chỉ số bin của counts[0]
+        self.counts = np.zeros(0)
+
+    def _grow(self, lo, hi):
+        if not len(self.counts):
+            self.offset, self.counts = lo, np.zeros(hi - lo + 1)
+            return
+        new_lo, new_hi = min(lo, self.offset), max(hi, self.offset + len(self.counts) - 1)
+        if new_lo == self.offset and new_hi == self.offset + len(self.counts) - 1:
+            return
+        counts = np.zeros(new_hi - new_lo + 1)
+        counts[self.offset - new_lo:self.offset - new_lo + len(self.counts)] = self.counts
+        self.offset, self.counts = new_lo, counts
+
+    def update(self, values, weights=None):
+        values, weights = _as_chunk(values, weights)
+        if not len(values):
+            return self
+        index = np.floor((values - self.origin) / self.width).astype(np.int64)
+        lo, hi = int(index.min()), int(index.max())
+        self._grow(lo, hi)
+        self.counts += np.bincount(index - self.offset, weights=weights, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        if (other.width, other.origin) != (self.width, self.origin):
+            raise ValueError("Chỉ gộp được histogram cùng width và origin")
+        if len(other.counts):
+            self._grow(other.offset, other.offset + len(other.counts) - 1)
+            start = other.offset - self.offset
+            self.counts[start:start + len(other.counts)] += other.counts
+        return self
+
+    @property
+    def edges(self):
+        return self.origin + self.width * np.arange(self.offset, self.offset + len(self.counts) + 1)
+
+    def rebin(self, bins):
+        """(counts, edges) gộp thành khoảng bins bin (để vẽ), mỗi bin mới gồm nhiều bin gốc"""
+        if not len(self.counts):
+            return np.zeros(0), np.zeros(1)
+        factor = max(1, math.ceil(len(self.counts) / bins))
+        padded = np.pad(self.counts, (0, (-len(self.counts)) % factor))
+        return padded.reshape(-1, factor).sum(axis=1), self.edges[0] + self.width * factor * np.arange(len(padded) // factor + 1)
+
+
+class StreamSummary:
+    """Thống kê streaming của một đại lượng: RunningStats + TDigest + FixedHistogram"""
+
+    def __init__(self, bin_width, compression=TDIGEST_COMPRESSION):
+        self.stats = RunningStats()
+        self.digest = TDigest(compression)
+        self.histogram = FixedHistogram(bin_width)
+
+    def update(self, values, weights=None):
+        values, weights = _as_chunk(values, weights)
+        self.stats.update(values, weights)
+        self.digest.update(values, weights)
+        self.histogram.update(values, weights)
+        return self
+
+    def merge(self, other):
+        self.stats.merge(other.stats)
+        self.digest.merge(other.digest)
+        self.histogram.merge(other.histogram)
+        return self
+
+    @property
+    def count(self):
+        return self.stats.count
+
+    def quantile(self, q):
+        return self.digest.quantile(q)
+
+    def as_dict(self, quantiles=REPORT_QUANTILES):
+        """{'count', 'mean', 'std', 'min', 'max', 'p50', 'p90', 'p99', ...}"""
+        row = {
+            'count': self.stats.count,
+            'mean': self.stats.mean if self.stats.count else math.nan,
+            'std': self.stats.std,
+            'min': self.stats.min if self.stats.count else math.nan,
+            'max': self.stats.max if self.stats.count else math.nan,
+        }
+        for q in quantiles:
+            row[f'p{q * 100:g}'] = self.quantile(q)
+        return row
+
+
+def summarize_trace(path, column=1, columns=2, bin_width=CWND_BIN_WIDTH, chunk_lines=TRACE_CHUNK_LINES):
+    """
+    Thống kê streaming một cột của file trace, đọc từng khối
+
+    Args:
+        path (Path): File trace
+        column (int): Cột cần thống kê (mặc định cột CWND của *_cwnd_trace_*.tr)
+        columns (int): Số cột mỗi dòng
+        bin_width (float): Độ rộng bin histogram
+        chunk_lines (int): Số dòng mỗi khối
+
+    Returns:
+        StreamSummary
+    """
+    summary = StreamSummary(bin_width)
+    for chunk in iter_trace_chunks(path, columns, chunk_lines):
+        summary.update(chunk[:, column])
+    return summary
+
+
+def flow_delay_stats(flows):
+    """
+    Delay trung bình theo gói (ms) của mọi flow: trung bình delay từng flow (FlowMonitor),
+    trọng số = số gói nhận
+
+    Summary chỉ có delay trung bình của từng flow nên chỉ mean là theo gói; quantile theo
+    gói lấy từ RTT từng gói (summarize_run).
+    """
+    stats = RunningStats()
+    if flows:
+        stats.update([f['delay'] for f in flows], [f['rx'] for f in flows])
+    return stats
+
+
+def summarize_run(results_dir, prefix, queue_type, chunk_lines=TRACE_CHUNK_LINES):
+    """
+    Thống kê streaming CWND, RTT, delay và truyền lại/goodput của một lần chạy
+
+    CWND trace và state log đều được đọc theo khối và không giữ trong bộ nhớ:
+    mỗi khối TX-DATA/NEW_ACK cập nhật RetransmissionTracker và RttTracker (chỉ
+    giữ các segment chưa được ACK giữa các khối), mẫu RTT mới vào StreamSummary.
+
+    Returns:
+        dict: {'cwnd': StreamSummary, 'rtt': StreamSummary (ms, từng gói, đã bỏ mẫu theo luật Karn),
+               'delay': RunningStats (ms, mean theo gói), 'retx': RetransmissionTracker}
+    """
+    # retx_utils/rtt_utils dùng FixedHistogram của module này
+    from .data_utils import iter_log_chunks
+    from .retx_utils import RetransmissionTracker, parse_segments
+    from .rtt_utils import RttTracker
+    cwnd = StreamSummary(CWND_BIN_WIDTH)
+    cwnd_file = find_latest_file(results_dir, prefix, queue_type, "cwnd_trace")
+    if cwnd_file and cwnd_file.exists():
+        cwnd = summarize_trace(cwnd_file, chunk_lines=chunk_lines)
+    summary_file = find_latest_file(results_dir, prefix, queue_type, "summary")
+    flows = []
+    if summary_file and summary_file.exists():
+        flows = parse_flow_stats(summary_file.read_text())
+    state_file = find_latest_file(results_dir, prefix, queue_type, "tcp_state")
+    log_files = rotated_log_files(state_file) if state_file and state_file.exists() else []
+    retx = RetransmissionTracker()
+    tracker = RttTracker()
+    rtt = StreamSummary(RTT_BIN_WIDTH)
+    for lines in iter_log_chunks(log_files, chunk_lines):
+        tx, ack = parse_segments(lines)
+        retx.update_tx(tx[:, 0], tx[:, 1], tx[:, 2])
+        retx.update_acks(ack[:, 0], ack[:, 1])
+        rtt.update(tracker.update(tx, ack)['rtt'] * 1e3)
+    return {'cwnd': cwnd, 'rtt': rtt, 'delay': flow_delay_stats(flows), 'retx': retx}
+
+
+def _summarize_run_job(job):
+    results_dir, prefix, queue_type, chunk_lines = job
+    return summarize_run(results_dir, prefix, queue_type, chunk_lines)
+
+
+def summarize_runs(runs, workers=None, chunk_lines=TRACE_CHUNK_LINES):
+    """
+    Thống kê streaming nhiều lần chạy song song (mỗi worker một run)
+
+    Args:
+        runs (list): Mỗi run là dict {'results_dir', 'prefix', 'queue', ...}
+        workers (int): Số process (mặc định: số core)
+
+    Returns:
+        list: Kết quả summarize_run theo thứ tự runs
+    """
+    jobs = [(r['results_dir'], r['prefix'], r['queue'], chunk_lines) for r in runs]
+    workers = max(1, min(workers or os.cpu_count() or 1, len(jobs)))
+    if workers == 1:
+        return [_summarize_run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_summarize_run_job, jobs))
+
+
+def pooled(results, key):
+    """Gộp thống kê của nhiều run (vd mọi seed của một cấu hình) thành một"""
+    first = results[0][key]
+    if key == 'retx':
+        merged = type(first)(first.interval)
+    elif isinstance(first, RunningStats):
+        merged = RunningStats()
+    else:
+        merged = StreamSummary(first.histogram.width)
+    for result in results:
+        merged.merge(result[key])
+    return merged
+
+
+def print_stream_table(rows):
+    """
+    In bảng thống kê streaming
+
+    Args:
+        rows (list): (nhãn, {'cwnd': StreamSummary, 'rtt': StreamSummary, 'delay': RunningStats,
+                             'retx': RetransmissionTracker})
+    """
+    headers = ['Run', 'Samples', 'CWND mean', 'std', 'min', 'p50', 'p90', 'p99', 'max',
+               'RTT p50', 'RTT p99', 'Delay mean', 'Retx %', 'Goodput']
+
+    def fmt(value, spec='.1f'):
+        return 'n/a' if value is None or math.isnan(value) else format(value, spec)
+
+    table = []
+    for label, result in rows:
+        c = result['cwnd'].as_dict()
+        t = result['rtt'].as_dict()
+        d = result['delay']
+        r = result['retx']
+        table.append([label, fmt(c['count'], ',.0f'), fmt(c['mean']), fmt(c['std']), fmt(c['min']),
+                      fmt(c['p50']), fmt(c['p90']), fmt(c['p99']), fmt(c['max']),
+                      fmt(t['p50']), fmt(t['p99']), fmt(d.mean if d.count else math.nan, '.2f'),
+                      fmt(r.retx_ratio() * 100, '.2f'), fmt(r.goodput_mbps(), '.3f')])
+    widths = [max(len(h), *(len(r[i]) for r in table)) if table else len(h)
+              for i, h in enumerate(headers)]
+    print("   " + "  ".join(h.ljust(w) for h, w in zip(headers, widths)))
+    print("   " + "  ".join('-' * w for w in widths))
+    for row in table:
+        print("   " + "  ".join(v.ljust(w) for v, w in zip(row, widths)))
+    print("   (CWND: KB; RTT: ms, từng gói của flow được trace (luật Karn); Delay mean: ms, trung bình")
+    print("    theo gói từ delay trung bình từng flow (FlowMonitor) với trọng số số gói nhận;")
+    print("    Retx %: phần byte TX-DATA là truyền lại, Goodput: Mbps từ NEW_ACK của flow trong state log)")
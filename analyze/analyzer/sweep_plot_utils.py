@@ -0,0 +1,233 @@
+"""
+Sweep visualization utilities
+Heatmap và đồ thị đáp ứng theo tham số sweep, vẽ từ bảng đã gộp (aggregate_utils)
+"""
+
+import math
+import numpy as np
+from config.plot_config import get_pyplot
+from matplotlib.colors import TwoSlopeNorm
+from .aggregate_utils import group_by, select_rows, sort_values, parse_quantity
+
+plt = get_pyplot()
+
+
+QUEUE_ORDER = ['DropTail', 'RED']
+
+# Nhãn và chiều "tốt" của từng metric (True = càng lớn càng tốt)
+METRIC_INFO = {
+    'total_throughput': ('Throughput (Mbps)', True),
+    'avg_throughput': ('Throughput/Flow (Mbps)', True),
+    'loss_rate': ('Loss Rate (%)', False),
+    'avg_delay': ('Avg Delay (ms)', False),
+    'timeouts': ('Timeouts', False),
+    'fast_retransmits': ('Fast Retransmits', False),
+    'dup_acks': ('Dup ACKs', False),
+    'elapsed': ('Run Time (s)', False),
+}
+
+DEFAULT_SWEEP_METRICS = ['total_throughput', 'loss_rate', 'avg_delay']
+
+
+def metric_label(metric):
+    """Nhãn hiển thị của metric"""
+    return METRIC_INFO.get(metric, (metric.replace('_', ' ').title(), True))[0]
+
+
+def _queues(table):
+    present = set(table['columns']['queue'].tolist())
+    return [q for q in QUEUE_ORDER if q in present]
+
+
+def _grid_means(table, x, y, metric, x_values, y_values):
+    """Ma trận mean (y x x) của một metric trên trục cố định (ô trống = nan)"""
+    grouped = group_by(table, [y, x], [metric])
+    matrix = np.full((len(y_values), len(x_values)), np.nan)
+    y_pos = {v: i for i, v in enumerate(y_values)}
+    x_pos = {v: j for j, v in enumerate(x_values)}
+    cols = grouped['columns']
+    for g in range(grouped['n']):
+        matrix[y_pos[cols[y][g]], x_pos[cols[x][g]]] = cols[f'{metric}_mean'][g]
+    return matrix
+
+
+def _annotate(ax, matrix, image):
+    """Ghi giá trị lên từng ô (chỉ khi lưới đủ nhỏ để đọc được)"""
+    if matrix.size > 144:
+        return
+    norm = image.norm
+    for (i, j), value in np.ndenumerate(matrix):
+        if math.isnan(value):
+            continue
+        shade = norm(value)
+        color = 'white' if shade < 0.25 or shade > 0.75 else 'black'
+        ax.text(j, i, f'{value:.3g}', ha='center', va='center', fontsize=8, color=color)
+
+
+def create_sweep_heatmaps(table, x, y, output_file, colors, metrics=None, show_gui=False):
+    """
+    Heatmap của các metric theo hai tham số sweep, DropTail và RED cạnh nhau
+
+    Mỗi ô là trung bình qua các seed (và các tham số khác). Hai hàng đợi dùng
+    chung thang màu; khi có cả hai, cột cuối là hiệu RED - DropTail.
+
+    Args:
+        table (dict): Bảng từ build_table()
+        x (str): Tham số trên trục hoành (vd 'bottleneck_bandwidth')
+        y (str): Tham số trên trục tung (vd 'tcp_queue_size')
+        output_file (Path): File PNG
+        colors (dict): Color scheme
+        metrics (list): Metric cần vẽ (mặc định: throughput, loss, delay)
+        show_gui (bool): Nếu True, không gọi plt.show()
+    """
+    metrics = metrics or DEFAULT_SWEEP_METRICS
+    for name in (x, y):
+        if name not in table['columns']:
+            raise KeyError(f"Không có cột '{name}' (tham số sweep: {', '.join(table['params'])})")
+
+    queues = _queues(table)
+    x_values = sort_values(set(table['columns'][x].tolist()))
+    y_values = sort_values(set(table['columns'][y].tolist()))
+    show_diff = len(queues) == 2
+    ncols = len(queues) + (1 if show_diff else 0)
+
+    fig, axes = plt.subplots(len(metrics), ncols, squeeze=False,
+                             figsize=(4.2 * ncols + 1.5, 3.4 * len(metrics) + 1.2))
+    fig.patch.set_facecolor(colors['background'])
+
+    for row, metric in enumerate(metrics):
+        higher_better = METRIC_INFO.get(metric, ('', True))[1]
+        cmap = 'viridis' if higher_better else 'viridis_r'
+        matrices = {q: _grid_means(select_rows(table, table['columns']['queue'] == q),
+                                   x, y, metric, x_values, y_values) for q in queues}
+        finite = np.concatenate([m[~np.isnan(m)] for m in matrices.values()])
+        vmin, vmax = (finite.min(), finite.max()) if finite.size else (0.0, 1.0)
+        if vmax <= vmin:
+            # Metric không đổi trên cả lưới: mở rộng thang màu để colorbar đọc được
+            pad = abs(vmin) * 0.05 or 1.0
+            vmin, vmax = vmin - pad, vmax + pad
+
+        for col, queue in enumerate(queues):
+            ax = axes[row, col]
+            image = ax.imshow(matrices[queue], origin='lower', aspect='auto', cmap=cmap,
+                              vmin=vmin, vmax=vmax)
+            _annotate(ax, matrices[queue], image)
+            ax.set_title(f'{queue} - {metric_label(metric)}', fontsize=11, fontweight='bold',
+                         color=colors[queue])
+            cbar = fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+            cbar.formatter.set_useOffset(False)
+
+        if show_diff:
+            ax = axes[row, ncols - 1]
+            diff = matrices['RED'] - matrices['DropTail']
+            bound = np.nanmax(np.abs(diff)) if np.any(~np.isnan(diff)) else 0.0
+            bound = bound if bound > 1e-12 else 1.0
+            # Xanh = RED tốt hơn theo chiều "tốt" của metric
+            image = ax.imshow(diff, origin='lower', aspect='auto',
+                              cmap='RdYlGn' if higher_better else 'RdYlGn_r',
+                              norm=TwoSlopeNorm(vcenter=0.0, vmin=-bound, vmax=bound))
+            _annotate(ax, diff, image)
+            ax.set_title('RED - DropTail', fontsize=11, fontweight='bold',
+                         color=colors['text'])
+            cbar = fig.colorbar(image, ax=ax, fraction=0.046, pad=0.04)
+            cbar.formatter.set_useOffset(False)
+
+        for ax in axes[row]:
+            ax.set_xticks(range(len(x_values)))
+            ax.set_xticklabels(x_values, rotation=45 if len(x_values) > 6 else 0, fontsize=8)
+            ax.set_yticks(range(len(y_values)))
+            ax.set_yticklabels(y_values, fontsize=8)
+            ax.set_xlabel(x, fontsize=9)
+            ax.set_ylabel(y, fontsize=9)
+            ax.grid(False)
+
+    fig.suptitle(f'Sweep Heatmaps: {y} x {x} ({table["n"]} runs)',
+                 fontsize=15, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=200, bbox_inches='tight', facecolor=colors['background'])
+    print(f"\nSweep heatmaps saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
+
+
+def _x_positions(values):
+    """Vị trí trên trục hoành: giá trị số nếu mọi giá trị là số, ngược lại thứ tự"""
+    numeric = np.array([parse_quantity(v) for v in values])
+    if len(values) and not np.any(np.isnan(numeric)):
+        return numeric, True
+    return np.arange(len(values), dtype=float), False
+
+
+def create_sweep_lines(table, x, output_file, colors, metrics=None, by=None,
+                       confidence=0.95, show_gui=False):
+    """
+    Đồ thị metric theo một tham số sweep với dải tin cậy qua các seed
+
+    Args:
+        table (dict): Bảng từ build_table()
+        x (str): Tham số trên trục hoành
+        output_file (Path): File PNG
+        colors (dict): Color scheme
+        metrics (list): Metric cần vẽ (mặc định: throughput, loss, delay)
+        by (str): Tham số thứ hai tách thành nhiều đường (kiểu nét khác nhau)
+        confidence (float): Độ tin cậy của dải CI
+        show_gui (bool): Nếu True, không gọi plt.show()
+    """
+    metrics = metrics or DEFAULT_SWEEP_METRICS
+    for name in [x] + ([by] if by else []):
+        if name not in table['columns']:
+            raise KeyError(f"Không có cột '{name}' (tham số sweep: {', '.join(table['params'])})")
+
+    keys = ['queue', x] + ([by] if by else [])
+    grouped = group_by(table, keys, metrics, confidence)
+    cols = grouped['columns']
+    x_values = sort_values(set(cols[x].tolist()))
+    positions, numeric = _x_positions(x_values)
+    x_pos = dict(zip(x_values, positions))
+    by_values = sort_values(set(cols[by].tolist())) if by else [None]
+    linestyles = ['-', '--', ':', '-.']
+    markers = ['o', 's', '^', 'D', 'v', 'P']
+
+    fig, axes = plt.subplots(1, len(metrics), squeeze=False,
+                             figsize=(5.2 * len(metrics) + 1, 4.6))
+    fig.patch.set_facecolor(colors['background'])
+
+    for ax, metric in zip(axes[0], metrics):
+        for queue in _queues(table):
+            for k, value in enumerate(by_values):
+                mask = cols['queue'] == queue
+                if by:
+                    mask &= cols[by] == value
+                if not np.any(mask):
+                    continue
+                order = np.argsort([x_pos[v] for v in cols[x][mask]])
+                xs = np.array([x_pos[v] for v in cols[x][mask]])[order]
+                mean = cols[f'{metric}_mean'][mask][order]
+                ci = np.nan_to_num(cols[f'{metric}_ci'][mask][order])
+                label = queue if not by else f'{queue}, {by}={value}'
+                ax.plot(xs, mean, color=colors[queue], linestyle=linestyles[k % len(linestyles)],
+                        marker=markers[k % len(markers)], markersize=5, linewidth=2, label=label)
+                ax.fill_between(xs, mean - ci, mean + ci, color=colors[queue], alpha=0.18)
+
+        if numeric and positions.min() > 0 and positions.max() / positions.min() >= 20:
+            ax.set_xscale('log')
+        ax.set_xticks(positions)
+        ax.set_xticklabels(x_values, rotation=45 if len(x_values) > 6 else 0, fontsize=8)
+        ax.minorticks_off()
+        ax.set_xlabel(x, fontsize=10)
+        ax.set_ylabel(metric_label(metric), fontsize=10)
+        ax.set_title(metric_label(metric), fontsize=12, fontweight='bold')
+        ax.grid(True, alpha=0.3, linestyle='--')
+        ax.set_facecolor('white')
+    axes[0, 0].legend(fontsize=8, loc='best')
+
+    level = int(round(confidence * 100))
+    fig.suptitle(f'Sweep Response: metrics vs {x} (mean ± {level}% CI, {table["n"]} runs)',
+                 fontsize=14, fontweight='bold')
+    plt.tight_layout()
+    plt.savefig(output_file, dpi=200, bbox_inches='tight', facecolor=colors['background'])
+    print(f"\nSweep response plot saved: {output_file}")
+    if not show_gui:
+        plt.show()
+    return fig
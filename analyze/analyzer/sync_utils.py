@@ -0,0 +1,242 @@
+"""
+Flow synchronization utilities
+Đo mức đồng bộ giữa các flow (global synchronization): tương quan chéo CWND từng cặp flow
+(FFT) và tỉ lệ các lần mất gói trùng thời điểm giữa các flow
+"""
+
+import math
+import numpy as np
+from .cycle_utils import find_decreases
+
+
+# Bước lưới thời gian chung (s) khi lấy mẫu lại CWND của các flow
+DEFAULT_SYNC_STEP = 0.01
+
+# Cửa sổ (s) để hai lần giảm CWND được coi là trùng nhau, và độ trễ tối đa khi tìm đỉnh tương
+# quan chéo (các flow có RTT khác nhau nên phản ứng với cùng một đợt drop lệch nhau vài RTT)
+DEFAULT_SYNC_WINDOW = 0.1
+
+# Sync index từ ngưỡng này trở lên được coi là đồng bộ
+SYNCHRONIZED_INDEX = 0.5
+
+
+def resample_flows(flow_cwnd, step=DEFAULT_SYNC_STEP):
+    """
+    Lấy mẫu lại CWND của mọi flow lên một lưới thời gian chung
+
+    CWND giữ nguyên giữa hai lần thay đổi, nên giá trị tại mỗi điểm lưới là mẫu
+    cuối cùng trước nó (searchsorted). Lưới chỉ phủ khoảng mọi flow đều có dữ
+    liệu (từ flow bắt đầu muộn nhất tới flow kết thúc sớm nhất).
+
+    Args:
+        flow_cwnd (dict): {flow_id: {'time', 'cwnd'}} (data['flow_cwnd'])
+        step (float): Bước lưới (s)
+
+    Returns:
+        tuple: (flow_ids list, grid ndarray, matrix ndarray shape (số flow, len(grid)))
+    """
+    flow_ids = sorted(fid for fid, series in flow_cwnd.items() if len(series['time']))
+    if not flow_ids:
+        return [], np.empty(0), np.empty((0, 0))
+    t0 = max(flow_cwnd[fid]['time'][0] for fid in flow_ids)
+    t1 = min(flow_cwnd[fid]['time'][-1] for fid in flow_ids)
+    grid = np.arange(t0, t1, step) if t1 > t0 else np.empty(0)
+    matrix = np.empty((len(flow_ids), len(grid)))
+    for row, fid in zip(matrix, flow_ids):
+        series = flow_cwnd[fid]
+        row[:] = series['cwnd'][np.searchsorted(series['time'], grid, side='right') - 1]
+    return flow_ids, grid, matrix
+
+
+def cross_correlation(matrix, max_lag):
+    """
+    Tương quan chéo chuẩn hoá của mọi cặp hàng (Pearson theo từng độ trễ), qua FFT
+
+    Mỗi chuỗi được FFT một lần; tương quan của cặp (i, j) ở mọi độ trễ là
+    irfft(conj(F_i) * F_j), nên chi phí là O(N² T log T) thay vì O(N² T²),
+    và mỗi lượt chỉ giữ các cặp của một hàng trong bộ nhớ.
+
+    Args:
+        matrix (ndarray): shape (N, T), các chuỗi trên cùng lưới
+        max_lag (int): Độ trễ tối đa (số bước lưới) khi tìm đỉnh
+
+    Returns:
+        dict: {'zero_lag', 'peak' (N, N) - tương quan ở độ trễ 0 và lớn nhất trong ±max_lag,
+               'lag' (N, N) - độ trễ (số bước) của đỉnh, dương khi j đi sau i};
+              nan cho chuỗi hằng
+    """
+    n, length = matrix.shape
+    zero_lag = np.full((n, n), np.nan)
+    peak = np.full((n, n), np.nan)
+    lag = np.zeros((n, n), dtype=np.intp)
+    if not n or length < 2:
+        return {'zero_lag': zero_lag, 'peak': peak, 'lag': lag}
+
+    centered = matrix - matrix.mean(axis=1, keepdims=True)
+    norm = np.sqrt((centered ** 2).sum(axis=1))
+    valid = norm > 0
+    centered[valid] /= norm[valid, None]
+    # Đệm tới >= 2T - 1 để tương quan vòng không chồng lên nhau
+    nfft = 1 << (2 * length - 1).bit_length()
+    spectra = np.fft.rfft(centered, nfft, axis=1)
+    max_lag = min(int(max_lag), length - 1)
+    lags = np.r_[np.arange(-max_lag, 0), np.arange(max_lag + 1)]
+
+    for i in np.flatnonzero(valid):
+        others = i + np.flatnonzero(valid[i:])
+        corr = np.fft.irfft(spectra[i].conj() * spectra[others], nfft, axis=1)[:, lags]
+        best = corr.argmax(axis=1)
+        zero_lag[i, others] = zero_lag[others, i] = corr[:, max_lag]
+        peak[i, others] = peak[others, i] = corr[np.arange(len(others)), best]
+        lag[i, others] = lags[best]
+        lag[others, i] = -lags[best]
+    return {'zero_lag': zero_lag, 'peak': peak, 'lag': lag}
+
+
+def flow_losses(flow_cwnd, flow_ids):
+    """
+    Thời điểm các lần giảm nhân CWND của từng flow (find_decreases)
+
+    Trace per-flow không ghi sự kiện mất gói nên mỗi lần giảm nhân được coi là
+    một lần flow đó phát hiện mất gói (timeout hoặc triple dup ACK).
+    """
+    losses = []
+    for fid in flow_ids:
+        series = flow_cwnd[fid]
+        peak_idx, _ = find_decreases(series['cwnd'])
+        losses.append(np.asarray(series['time'], dtype=float)[peak_idx])
+    return losses
+
+
+def loss_coincidence(loss_times, window=DEFAULT_SYNC_WINDOW, duration=None):
+    """
+    Mức trùng nhau của các lần mất gói giữa các flow
+
+    Với mỗi flow j, một searchsorted trên thời điểm mất gói của j cho biết mọi
+    lần mất gói (của mọi flow) có lần nào của j trong ±window hay không.
+    Mức nền 'baseline' là phần đó khi các flow mất gói độc lập (Poisson với
+    tần suất mất gói của từng flow): fraction cao hơn hẳn baseline là đồng bộ.
+
+    Args:
+        loss_times (list): ndarray thời điểm mất gói (đã sắp xếp) của từng flow
+        window (float): Cửa sổ trùng nhau (s)
+        duration (float): Thời lượng quan sát (s) cho baseline (None: từ lần mất gói đầu tới cuối)
+
+    Returns:
+        dict: {'matrix' (N, N) - phần lần mất gói của flow i có flow j mất gói cùng lúc,
+               'rate' - phần lần mất gói có ít nhất một flow khác cùng lúc,
+               'fraction' - trung bình phần các flow khác mất gói cùng lúc, 'baseline', 'losses',
+               'others' - số flow khác mất gói cùng lúc với từng lần, theo thứ tự np.concatenate(loss_times)}
+    """
+    n = len(loss_times)
+    counts = np.array([len(t) for t in loss_times], dtype=np.intp)
+    matrix = np.full((n, n), np.nan)
+    if n < 2 or not counts.sum():
+        return {'matrix': matrix, 'rate': math.nan, 'fraction': math.nan, 'baseline': math.nan,
+                'losses': int(counts.sum()), 'others': np.zeros(counts.sum(), dtype=np.intp)}
+    times = np.concatenate(loss_times)
+    owner = np.repeat(np.arange(n), counts)
+    hits = np.zeros((len(times), n), dtype=bool)
+    for j, t_j in enumerate(loss_times):
+        if not len(t_j):
+            continue
+        k = np.minimum(np.searchsorted(t_j, times - window, side='left'), len(t_j) - 1)
+        hits[:, j] = np.abs(t_j[k] - times) <= window
+    hits[np.arange(len(times)), owner] = False
+
+    coincident = np.zeros((n, n))
+    np.add.at(coincident, owner, hits)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        matrix = coincident / counts[:, None]
+    np.fill_diagonal(matrix, np.nan)
+    others = hits.sum(axis=1)
+
+    if duration is None:
+        duration = times.max() - times.min()
+    # P(flow j có ít nhất một lần mất gói trong cửa sổ 2*window) nếu mất gói là Poisson
+    chance = 1 - np.exp(-counts * 2 * window / duration) if duration > 0 else np.ones(n)
+    baseline = (chance.sum() - chance[owner]) / (n - 1)
+    return {'matrix': matrix, 'rate': float((others > 0).mean()),
+            'fraction': float((others / (n - 1)).mean()), 'baseline': float(baseline.mean()),
+            'losses': len(times), 'others': others}
+
+
+def _off_diagonal_mean(matrix):
+    values = matrix[~np.eye(len(matrix), dtype=bool)]
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if len(values) else math.nan
+
+
+def sync_analysis(flow_cwnd, step=DEFAULT_SYNC_STEP, window=DEFAULT_SYNC_WINDOW):
+    """
+    Đồng bộ giữa các flow của một hàng đợi
+
+    Sync index là trung bình tương quan chéo lớn nhất (trong ±window) của mọi
+    cặp flow: ~0 khi các flow độc lập, tiến tới 1 khi mọi flow tăng/giảm CWND
+    cùng nhịp (global synchronization).
+
+    Args:
+        flow_cwnd (dict): data['flow_cwnd']
+        step (float): Bước lưới lấy mẫu lại (s)
+        window (float): Cửa sổ trùng nhau / độ trễ tối đa (s)
+
+    Returns:
+        dict: {'flows', 'step', 'window', 'grid_points', 'correlation' (cross_correlation, lag theo s),
+               'coincidence' (loss_coincidence), 'loss_times', 'sync_index', 'mean_correlation'}
+    """
+    flow_ids, grid, matrix = resample_flows(flow_cwnd, step)
+    correlation = cross_correlation(matrix, int(round(window / step)))
+    correlation['lag'] = correlation['lag'] * step
+    loss_times = flow_losses(flow_cwnd, flow_ids)
+    span = (max(flow_cwnd[fid]['time'][-1] for fid in flow_ids)
+            - min(flow_cwnd[fid]['time'][0] for fid in flow_ids)) if flow_ids else None
+    return {
+        'flows': flow_ids,
+        'step': step,
+        'window': window,
+        'grid_points': len(grid),
+        'correlation': correlation,
+        'coincidence': loss_coincidence(loss_times, window, span),
+        'loss_times': loss_times,
+        'sync_index': _off_diagonal_mean(correlation['peak']),
+        'mean_correlation': _off_diagonal_mean(correlation['zero_lag']),
+    }
+
+
+def sync_pair_table(sync):
+    """
+    Bảng cặp flow dạng cột (cho write_csv)
+
+    Returns:
+        dict: {'columns': {'flow_a', 'flow_b', 'correlation' (độ trễ 0), 'peak', 'lag' (s),
+               'coincidence_ab', 'coincidence_ba'}, 'n'}
+    """
+    a, b = np.triu_indices(len(sync['flows']), k=1)
+    flows = np.array(sync['flows'], dtype=int)
+    correlation, coincidence = sync['correlation'], sync['coincidence']['matrix']
+    columns = {
+        'flow_a': flows[a],
+        'flow_b': flows[b],
+        'correlation': correlation['zero_lag'][a, b],
+        'peak': correlation['peak'][a, b],
+        'lag': correlation['lag'][a, b],
+        'coincidence_ab': coincidence[a, b],
+        'coincidence_ba': coincidence[b, a],
+    }
+    return {'columns': columns, 'n': len(a)}
+
+
+def print_sync_analysis(sync):
+    """In sync index, tương quan trung bình và tỉ lệ mất gói trùng nhau"""
+    coincidence = sync['coincidence']
+    print(f"   🧵 Flows:            {len(sync['flows']):>8,} ({sync['grid_points']:,} điểm lưới "
+          f"{sync['step'] * 1e3:g} ms)")
+    verdict = '⚠️  đồng bộ' if sync['sync_index'] >= SYNCHRONIZED_INDEX else '✅ không đồng bộ'
+    print(f"   🔗 Sync index:       {sync['sync_index']:>8.3f} ({verdict}; "
+          f"tương quan đỉnh trong ±{sync['window'] * 1e3:g} ms)")
+    print(f"   📈 Corr (lag 0):     {sync['mean_correlation']:>8.3f}")
+    print(f"   💥 Loss events:      {coincidence['losses']:>8,} (giảm nhân CWND của từng flow)")
+    print(f"   🤝 Coincident:       {coincidence['rate'] * 100:>7.1f}% có flow khác mất gói trong "
+          f"±{sync['window'] * 1e3:g} ms")
+    print(f"   👥 Flows cùng lúc:   {coincidence['fraction'] * 100:>7.1f}% số flow khác trung bình "
+          f"(độc lập: {coincidence['baseline'] * 100:.1f}%)")
@@ -0,0 +1,225 @@
+"""
+Virtualized page viewer
+Cửa sổ Tk cuộn qua nhiều trang ảnh: chỉ nạp/vẽ trang đang hiển thị, giữ số trang có giới hạn
+"""
+
+import tkinter as tk
+from collections import OrderedDict
+from pathlib import Path
+
+
+# Kích thước trang (px) khi chưa có ảnh nào được vẽ: figure 16x11 inch ở 100 dpi
+DEFAULT_PAGE_SIZE = (1600, 1100)
+
+# Ảnh thu nhỏ dùng làm placeholder nhỏ hơn ảnh gốc bao nhiêu lần
+THUMB_FACTOR = 8
+
+TITLE_HEIGHT = 70
+PAGE_GAP = 40
+MARGIN = 20
+
+
+def thumb_path(image_file):
+    """File ảnh thu nhỏ đi kèm một trang"""
+    image_file = Path(image_file)
+    return image_file.with_name(f"{image_file.stem}_thumb{image_file.suffix}")
+
+
+def write_thumbnail(image_file, factor=THUMB_FACTOR):
+    """Ghi ảnh thu nhỏ (placeholder độ phân giải thấp) của một trang PNG"""
+    from PIL import Image
+    with Image.open(image_file) as img:
+        img.reduce(factor).save(thumb_path(image_file))
+
+
+class PageViewer:
+    """
+    Cửa sổ cuộn hiển thị các trang ảnh theo kiểu virtualized
+
+    Mỗi trang là một ô có kích thước cố định trên một tk.Canvas. Chỉ các trang
+    nằm trong vùng nhìn thấy (và trang kế tiếp) mới được nạp ảnh; trang chưa
+    có ảnh được gửi cho submit() để vẽ ở background. Trong lúc chờ, ô hiển
+    thị ảnh thu nhỏ phóng to (nếu có) hoặc khung trống. Tối đa max_images ảnh
+    đầy đủ được giữ trong bộ nhớ (LRU).
+    """
+
+    def __init__(self, pages, submit=None, title="Pages", max_images=3, footer=''):
+        """
+        Args:
+            pages (list): Mỗi trang là dict {'title', 'path', 'ready', 'size'}
+                          (ready=False: chưa có ảnh, cần gọi submit)
+            submit (callable): submit(index) -> Future, vẽ trang ở background
+            title (str): Tiêu đề cửa sổ
+            max_images (int): Số ảnh đầy đủ tối đa giữ trong bộ nhớ
+            footer (str): Dòng hướng dẫn ở cuối
+        """
+        self.pages = pages
+        self.submit = submit
+        self.max_images = max(1, max_images)
+        self.images = OrderedDict()     # index -> PhotoImage đầy đủ (LRU)
+        self.placeholders = {}          # index -> PhotoImage thu nhỏ đã phóng to
+        self.pending = {}               # index -> Future
+        self._update_job = None
+        self._polling = False
+
+        self.root = tk.Tk()
+        self.root.title(title)
+        self.root.geometry("1400x800")
+        self.root.protocol("WM_DELETE_WINDOW", self.close)
+
+        frame = tk.Frame(self.root)
+        frame.pack(fill=tk.BOTH, expand=1)
+        self.canvas = tk.Canvas(frame, bg='white')
+        scrollbar = tk.Scrollbar(frame, orient=tk.VERTICAL, command=self._yview)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=1)
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+
+        self._layout(title, footer)
+
+        self.canvas.bind('<Configure>', lambda e: self.schedule_update())
+        self.canvas.bind_all('<MouseWheel>', lambda e: self._scroll(int(-1 * (e.delta / 120))))
+        self.canvas.bind_all('<Button-4>', lambda e: self._scroll(-1))
+        self.canvas.bind_all('<Button-5>', lambda e: self._scroll(1))
+
+    def _layout(self, title, footer):
+        """Vẽ khung của mọi trang (tiêu đề + ô ảnh) với kích thước cố định"""
+        c = self.canvas
+        width = max(p['size'][0] for p in self.pages) + 2 * MARGIN
+        c.create_text(width // 2, 35, text=title, font=('Arial', 24, 'bold'), fill='#2C3E50')
+        y = 80
+        for page in self.pages:
+            w, h = page['size']
+            c.create_rectangle(MARGIN, y, width - MARGIN, y + TITLE_HEIGHT - 15,
+                               fill='#E3F2FD', outline='#90A4AE', width=2)
+            c.create_text(width // 2, y + (TITLE_HEIGHT - 15) // 2, text=page['title'],
+                          font=('Arial', 18, 'bold'), fill='#2C3E50')
+            y += TITLE_HEIGHT
+            page['top'], page['bottom'] = y, y + h
+            page['frame'] = c.create_rectangle(MARGIN, y, MARGIN + w, y + h,
+                                               fill='#F4F6F7', outline='#BDC3C7')
+            page['item'] = c.create_image(MARGIN, y, anchor='nw')
+            # Trạng thái nằm trên ảnh để vẫn đọc được khi đang hiện placeholder
+            page['status'] = c.create_text(MARGIN + w // 2, y + h // 2, text='',
+                                           font=('Arial', 14, 'italic'), fill='#7F8C8D')
+            y += h + PAGE_GAP
+        if footer:
+            c.create_text(width // 2, y, text=footer, font=('Arial', 10, 'italic'), fill='#7F8C8D')
+            y += 40
+        c.configure(scrollregion=(0, 0, width, y))
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self.schedule_update()
+
+    def _scroll(self, units):
+        self.canvas.yview_scroll(units, 'units')
+        self.schedule_update()
+
+    def schedule_update(self):
+        """Gộp nhiều sự kiện cuộn liên tiếp thành một lần cập nhật"""
+        if self._update_job is None:
+            self._update_job = self.root.after(30, self._update)
+
+    def visible_pages(self):
+        """Chỉ số các trang giao với vùng nhìn thấy, cộng một trang kế tiếp để nạp trước"""
+        top = self.canvas.canvasy(0)
+        bottom = self.canvas.canvasy(self.canvas.winfo_height())
+        visible = [i for i, p in enumerate(self.pages) if p['bottom'] >= top and p['top'] <= bottom]
+        if visible and visible[-1] + 1 < len(self.pages):
+            visible.append(visible[-1] + 1)
+        return visible
+
+    def _update(self):
+        self._update_job = None
+        visible = self.visible_pages()
+        # Placeholder phóng to tốn bộ nhớ như ảnh đầy đủ: chỉ giữ cho trang đang hiển thị
+        for index in [i for i in self.placeholders if i not in visible]:
+            del self.placeholders[index]
+            self.canvas.itemconfigure(self.pages[index]['item'], image='')
+        for index in visible:
+            page = self.pages[index]
+            if index in self.images:
+                self.images.move_to_end(index)
+                continue
+            if page['ready']:
+                # Nạp từng trang một để cửa sổ vẫn phản hồi khi cuộn nhanh
+                self._show_placeholder(index, 'Loading...')
+                self.root.after(1, self._load, index)
+            else:
+                self._show_placeholder(index, '⏳ Rendering...')
+                if self.submit is not None and index not in self.pending:
+                    self.pending[index] = self.submit(index)
+                    if not self._polling:
+                        self._polling = True
+                        self.root.after(100, self._poll)
+
+    def _show_placeholder(self, index, status):
+        page = self.pages[index]
+        self.canvas.itemconfigure(page['status'], text=status)
+        if index in self.placeholders:
+            return
+        thumb = thumb_path(page['path'])
+        if not thumb.exists():
+            return
+        try:
+            small = tk.PhotoImage(master=self.root, file=str(thumb))
+        except tk.TclError:
+            return
+        image = small.zoom(THUMB_FACTOR)
+        self.placeholders[index] = image
+        self.canvas.itemconfigure(page['item'], image=image)
+
+    def _load(self, index):
+        """Nạp ảnh đầy đủ của một trang vào ô (nếu trang vẫn còn trong vùng nhìn thấy)"""
+        if index in self.images or index not in self.visible_pages():
+            return
+        page = self.pages[index]
+        try:
+            image = tk.PhotoImage(master=self.root, file=str(page['path']))
+        except tk.TclError as e:
+            self.canvas.itemconfigure(page['status'], text=f'❌ {e}')
+            return
+        self.images[index] = image
+        self.placeholders.pop(index, None)
+        self.canvas.itemconfigure(page['item'], image=image)
+        self.canvas.itemconfigure(page['status'], text='')
+        self._evict()
+
+    def _evict(self):
+        """Giải phóng ảnh đầy đủ ít dùng gần đây nhất khi vượt max_images (trừ trang đang hiển thị)"""
+        visible = set(self.visible_pages())
+        for index in list(self.images):
+            if len(self.images) <= self.max_images:
+                break
+            if index in visible:
+                continue
+            del self.images[index]
+            self.canvas.itemconfigure(self.pages[index]['item'], image='')
+
+    def _poll(self):
+        """Kiểm tra các trang đang vẽ ở background (Tk chỉ được gọi từ main thread)"""
+        for index, future in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[index]
+            page = self.pages[index]
+            error = future.exception()
+            if error is not None:
+                self.canvas.itemconfigure(page['status'], text=f'❌ {error}')
+                continue
+            page['ready'] = True
+            self.placeholders.pop(index, None)
+            self.schedule_update()
+        self._polling = bool(self.pending)
+        if self._polling:
+            self.root.after(100, self._poll)
+
+    def close(self):
+        for future in self.pending.values():
+            future.cancel()
+        self.root.destroy()
+
+    def run(self):
+        self.schedule_update()
+        self.root.mainloop()
@@ -0,0 +1,264 @@
+"""
+Warm-up (steady-state) utilities
+Phát hiện giai đoạn khởi động (slow start ban đầu) bằng MSER-5 trên CWND và goodput theo bin
+thời gian, và cắt dữ liệu của một lần chạy tại điểm đó để tính metric ở trạng thái ổn định
+"""
+
+import math
+import numpy as np
+from .retx_utils import DEFAULT_GOODPUT_INTERVAL
+from .fairness_utils import fairness_summary
+
+
+# Số bin mỗi batch của MSER-5 (trung bình 5 quan sát liên tiếp trước khi tìm điểm cắt)
+MSER_BATCH = 5
+
+# Chỉ xét điểm cắt trong nửa đầu chuỗi: MSER luôn nhỏ khi còn rất ít quan sát, và điểm cắt
+# rơi vào giới hạn này nghĩa là lần chạy chưa đạt trạng thái ổn định (cần chạy lâu hơn)
+MAX_TRUNCATION = 0.5
+
+# Metric so sánh cả lần chạy với phần sau warm-up: (key, nhãn, đơn vị, format)
+STEADY_METRICS = [
+    ('cwnd_mean', 'Average CWND', 'KB', '{:.2f}'),
+    ('cwnd_std', 'Std Deviation', 'KB', '{:.2f}'),
+    ('cwnd_median', 'Median CWND', 'KB', '{:.2f}'),
+    ('stability', 'Stability', '%', '{:.1f}'),
+    ('loss_events', 'Loss events', '/s', '{:.3f}'),
+    ('goodput', 'Goodput', 'Mbps', '{:.3f}'),
+    ('retx_ratio', 'Retransmitted', '% bytes', '{:.2f}'),
+    ('jain_mean', 'Jain index', '', '{:.3f}'),
+]
+
+
+def time_average(time, values, step):
+    """
+    Trung bình theo thời gian của chuỗi giữ giá trị giữa hai mẫu (CWND) trên các bin đều
+
+    Tích phân tích luỹ được tính một lần (cumsum) rồi đọc tại các biên bin
+    bằng searchsorted, nên chi phí là O(n + số bin). Chỉ các bin nằm trọn
+    trong khoảng có dữ liệu được giữ; biên bin là bội của step (cùng lưới với
+    bảng goodput của RetransmissionTracker).
+
+    Args:
+        time (ndarray): Thời điểm các mẫu (tăng dần)
+        values (ndarray): Giá trị, giữ nguyên tới mẫu kế tiếp
+        step (float): Độ rộng bin (s)
+
+    Returns:
+        tuple: (đầu bin ndarray, trung bình ndarray)
+    """
+    time = np.asarray(time, dtype=float)
+    values = np.asarray(values, dtype=float)
+    if len(time) < 2:
+        return np.empty(0), np.empty(0)
+    first = math.ceil(time[0] / step - 1e-9)
+    last = math.floor(time[-1] / step + 1e-9)
+    if last - first < 1:
+        return np.empty(0), np.empty(0)
+    edges = step * np.arange(first, last + 1)
+    area = np.r_[0.0, np.cumsum(values[:-1] * np.diff(time))]
+    slot = np.clip(np.searchsorted(time, edges, side='right') - 1, 0, len(time) - 1)
+    integral = area[slot] + values[slot] * (edges - time[slot])
+    return edges[:-1], np.diff(integral) / step
+
+
+def mser(values, batch=MSER_BATCH, max_fraction=MAX_TRUNCATION):
+    """
+    MSER-k: số quan sát đầu cần bỏ để sai số chuẩn của trung bình phần còn lại nhỏ nhất
+
+    Quan sát được gom thành batch trung bình k phần tử; với mỗi số batch bị
+    bỏ d, MSER(d) = Σ (Y_i - Ȳ_d)² / (m - d)² trên các batch còn lại. Tổng và
+    tổng bình phương của mọi phần đuôi lấy từ cumsum đảo ngược nên mọi d được
+    đánh giá trong một lượt O(n).
+
+    Args:
+        values (ndarray): Chuỗi quan sát cách đều
+        batch (int): Số quan sát mỗi batch (5: MSER-5)
+        max_fraction (float): Phần tối đa của chuỗi được phép bỏ
+
+    Returns:
+        dict: {'index' (số quan sát bỏ đi), 'statistic' (MSER theo số batch bỏ), 'batches',
+               'reliable' (False khi điểm cắt chạm giới hạn max_fraction)}
+    """
+    values = np.asarray(values, dtype=float)
+    m = len(values) // batch
+    if m < 2:
+        return {'index': 0, 'statistic': np.empty(0), 'batches': m, 'reliable': False}
+    means = values[:m * batch].reshape(m, batch).mean(axis=1)
+    tail_sum = np.cumsum(means[::-1])[::-1]
+    tail_sq = np.cumsum((means ** 2)[::-1])[::-1]
+    remaining = np.arange(m, 0, -1)
+    statistic = np.maximum(tail_sq - tail_sum ** 2 / remaining, 0.0) / remaining ** 2
+    limit = max(1, int(m * max_fraction))
+    statistic = statistic[:limit]
+    cut = int(np.argmin(statistic))
+    return {'index': cut * batch, 'statistic': statistic, 'batches': m,
+            'reliable': limit > 1 and cut < limit - 1}
+
+
+def detect_warmup(time, values, batch=MSER_BATCH):
+    """
+    Điểm cắt MSER của một chuỗi theo bin thời gian
+
+    Returns:
+        dict: {'time', 'values', 'cut' (s; đầu chuỗi khi không đủ dữ liệu), 'statistic', 'reliable'}
+    """
+    result = mser(values, batch)
+    cut = float(time[result['index']]) if len(time) else math.nan
+    return {'time': time, 'values': values, 'cut': cut,
+            'statistic': result['statistic'], 'reliable': result['reliable']}
+
+
+def warmup_analysis(metrics, step=DEFAULT_GOODPUT_INTERVAL, batch=MSER_BATCH):
+    """
+    Điểm kết thúc warm-up của một lần chạy
+
+    MSER-5 chạy trên CWND trung bình theo bin và trên goodput theo bin (khi log
+    ghi TX-DATA/NEW_ACK); điểm cắt chung là điểm muộn nhất trong các chuỗi, để
+    mọi metric sau điểm cắt đều đã qua giai đoạn khởi động.
+
+    Args:
+        metrics (RunMetrics): Metric của lần chạy
+        step (float): Độ rộng bin (s)
+        batch (int): Số bin mỗi batch
+
+    Returns:
+        dict: {'cut' (s), 'start' (đầu khoảng quan sát), 'series': {'cwnd', 'goodput'} (detect_warmup),
+               'step', 'batch', 'reliable'}
+    """
+    start = metrics.span[0]
+    series = {}
+    bins, cwnd = time_average(metrics.time, metrics.cwnd, step)
+    if len(bins):
+        series['cwnd'] = detect_warmup(bins, cwnd, batch)
+    table = metrics.retransmissions(step).table()
+    if table['n'] > 1:
+        # Bin cuối thường chỉ có một phần dữ liệu
+        columns = table['columns']
+        series['goodput'] = detect_warmup(columns['time'][:-1], columns['goodput'][:-1], batch)
+    cuts = [s['cut'] for s in series.values() if not math.isnan(s['cut'])]
+    return {
+        'cut': max(cuts + [start]),
+        'start': start,
+        'series': series,
+        'step': step,
+        'batch': batch,
+        'reliable': bool(series) and all(s['reliable'] for s in series.values()),
+    }
+
+
+def _after(series, t, key):
+    keep = np.asarray(series['time']) >= t
+    return {'time': series['time'][keep], key: series[key][keep]}
+
+
+def truncate_data(data, t):
+    """
+    Bản sao dữ liệu của một hàng đợi chỉ gồm phần từ thời điểm t (bỏ warm-up)
+
+    CWND giữ giá trị tại t làm mẫu đầu tiên; sự kiện, chuyển trạng thái và
+    trace per-flow chỉ giữ phần từ t. Trạng thái FSM tại t được suy ra từ
+    phía "from" của lần chuyển đầu tiên còn lại (state_table). Summary
+    (FlowMonitor) và state log trên đĩa là của cả lần chạy: RunMetrics trên
+    dữ liệu này chỉ đếm TX-DATA/NEW_ACK từ 'warmup_cut'.
+
+    Args:
+        data (dict): Dữ liệu từ load_data
+        t (float): Thời điểm cắt (s)
+
+    Returns:
+        dict: Dữ liệu cùng cấu trúc, thêm 'warmup_cut'
+    """
+    time = np.asarray(data['time'], dtype=float)
+    first = int(np.searchsorted(time, t, side='left'))
+    times, cwnd = list(data['time'][first:]), list(data['cwnd'][first:])
+    if first > 0 and (not times or times[0] > t):
+        times.insert(0, float(t))
+        cwnd.insert(0, data['cwnd'][first - 1])
+    truncated = {key: value for key, value in data.items() if key != 'metrics'}
+    truncated.update({
+        'time': times,
+        'cwnd': cwnd,
+        'events': [e for e in data['events'] if e['time'] >= t],
+        'state_changes': [c for c in data['state_changes'] if c['time'] >= t],
+        'flow_cwnd': {fid: _after(s, t, 'cwnd') for fid, s in data['flow_cwnd'].items()},
+        'flow_bytes': {fid: _after(s, t, 'bytes') for fid, s in data['flow_bytes'].items()},
+        'warmup_cut': float(t),
+    })
+    return truncated
+
+
+def _headline(run, interval):
+    """Các metric của STEADY_METRICS cho một RunMetrics (cả lần chạy hoặc sau warm-up)"""
+    t0, t1 = run.span
+    duration = t1 - t0
+    losses = len(run.event_times('TIMEOUT_EVENT')) + len(run.event_times('TRIPLE_DUP_ACK'))
+    tracker = run.retransmissions(interval)
+    values = {
+        'cwnd_mean': run.cwnd_mean,
+        'cwnd_std': run.cwnd_std,
+        'cwnd_median': run.cwnd_median,
+        'stability': run.stability,
+        'loss_events': losses / duration if duration > 0 else math.nan,
+        'goodput': float(tracker.goodput_mbps()),
+        'retx_ratio': float(tracker.retx_ratio() * 100),
+        'jain_mean': math.nan,
+    }
+    if len(run.data['flow_bytes']) > 1:
+        values['jain_mean'] = fairness_summary(run.fairness)['jain_mean']
+    return values
+
+
+def steady_table(metrics):
+    """
+    Bảng metric cả lần chạy và sau warm-up dạng cột (cho write_csv)
+
+    Metric sau warm-up được tính lại bởi metrics.steady (RunMetrics trên dữ
+    liệu đã cắt). Goodput ở cả hai cột là số byte được ACK trong khoảng chia
+    cho độ dài khoảng (goodput_mbps), không phải trung bình các bin (bin đầu
+    và cuối chỉ có một phần). Số sự kiện được quy về mỗi giây vì hai khoảng
+    có độ dài khác nhau.
+
+    Returns:
+        dict: {'columns': {'metric', 'label', 'unit', 'full', 'steady', 'change' (%)}, 'n'}
+    """
+    full = _headline(metrics, metrics.warmup['step'])
+    steady = _headline(metrics.steady, metrics.warmup['step'])
+    rows = [m for m in STEADY_METRICS if not (math.isnan(full[m[0]]) and math.isnan(steady[m[0]]))]
+    full_values = np.array([full[key] for key, *_ in rows], dtype=float)
+    steady_values = np.array([steady[key] for key, *_ in rows], dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        change = np.where(full_values != 0, (steady_values - full_values) / np.abs(full_values) * 100, np.nan)
+    columns = {
+        'metric': [key for key, *_ in rows],
+        'label': [label for _, label, *_ in rows],
+        'unit': [unit for _, _, unit, _ in rows],
+        'full': full_values,
+        'steady': steady_values,
+        'change': change,
+    }
+    return {'columns': columns, 'n': len(rows), 'formats': [fmt for *_, fmt in rows]}
+
+
+def print_warmup(metrics):
+    """In điểm cắt warm-up của từng chuỗi và bảng metric cả lần chạy / sau warm-up"""
+    warmup = metrics.warmup
+    t0, t1 = metrics.span
+    cut = warmup['cut']
+    share = (cut - t0) / (t1 - t0) * 100 if t1 > t0 else 0.0
+    print(f"   ✂️  Warm-up cut:      {cut:>8.2f} s ({share:.1f}% thời gian quan sát, "
+          f"MSER-{warmup['batch']} trên bin {warmup['step'] * 1e3:g} ms)")
+    for name, series in warmup['series'].items():
+        print(f"      • {name:<8} {series['cut']:>8.2f} s")
+    if not warmup['reliable']:
+        print(f"   ⚠️  Điểm cắt chạm giới hạn {MAX_TRUNCATION:.0%} chuỗi: chưa đạt trạng thái ổn định, "
+              f"nên chạy lâu hơn")
+    table = steady_table(metrics)
+    columns = table['columns']
+    print(f"   {'Metric':<22}{'Toàn bộ':>12}{'Steady':>12}{'Δ':>9}")
+    for i in range(table['n']):
+        fmt = table['formats'][i]
+        label = f"{columns['label'][i]} ({columns['unit'][i]})" if columns['unit'][i] else columns['label'][i]
+        change = columns['change'][i]
+        change = f"{change:+.1f}%" if not math.isnan(change) else 'n/a'
+        print(f"   {label:<22}{fmt.format(columns['full'][i]):>12}{fmt.format(columns['steady'][i]):>12}{change:>9}")
@@ -1,30 +1,9 @@
 """
 Cấu hình giao diện hiển thị cho matplotlib và seaborn.
-Chỉ cần import file này là tự động áp dụng style cho toàn bộ biểu đồ.
+Import file này chỉ lấy COLORS (không import matplotlib). Style được áp dụng khi
+gọi init_style() hoặc get_pyplot(), tức chỉ khi thực sự vẽ hình.
 """
 
-import matplotlib.pyplot as plt
-from matplotlib import rcParams
-import seaborn as sns
-
-# Thiết lập font chữ
-rcParams['font.family'] = 'sans-serif'
-rcParams['font.sans-serif'] = ['DejaVu Sans', 'Symbola']
-
-# Cấu hình style nền biểu đồ
-plt.style.use('seaborn-v0_8-darkgrid')
-
-# Thiết lập bảng màu mặc định
-sns.set_palette("husl")
-
-# (Tuỳ chọn) bạn có thể thêm các cấu hình mở rộng khác, ví dụ:
-rcParams['figure.figsize'] = (10, 6)       # kích thước mặc định
-rcParams['axes.titlesize'] = 14            # cỡ chữ tiêu đề
-rcParams['axes.labelsize'] = 12            # cỡ chữ nhãn trục
-rcParams['legend.fontsize'] = 10           # cỡ chữ chú thích
-rcParams['xtick.labelsize'] = 10
-rcParams['ytick.labelsize'] = 10
-
 # Color scheme for TCP analysis
 COLORS = {
     'DropTail': '#FF6B6B',      # Đỏ cam
@@ -40,3 +19,40 @@ COLORS = {
     'success': '#06FFA5'         # Xanh mint
 }
 
+_style_ready = False
+
+
+def init_style():
+    """Import matplotlib/seaborn và áp dụng style cho toàn bộ biểu đồ (chỉ lần đầu)"""
+    global _style_ready
+    if _style_ready:
+        return
+    import matplotlib.pyplot as plt
+    from matplotlib import rcParams
+    import seaborn as sns
+
+    # Thiết lập font chữ
+    rcParams['font.family'] = 'sans-serif'
+    rcParams['font.sans-serif'] = ['DejaVu Sans', 'Symbola']
+
+    # Cấu hình style nền biểu đồ
+    plt.style.use('seaborn-v0_8-darkgrid')
+
+    # Thiết lập bảng màu mặc định
+    sns.set_palette("husl")
+
+    # (Tuỳ chọn) bạn có thể thêm các cấu hình mở rộng khác, ví dụ:
+    rcParams['figure.figsize'] = (10, 6)       # kích thước mặc định
+    rcParams['axes.titlesize'] = 14            # cỡ chữ tiêu đề
+    rcParams['axes.labelsize'] = 12            # cỡ chữ nhãn trục
+    rcParams['legend.fontsize'] = 10           # cỡ chữ chú thích
+    rcParams['xtick.labelsize'] = 10
+    rcParams['ytick.labelsize'] = 10
+    _style_ready = True
+
+
+def get_pyplot():
+    """matplotlib.pyplot với style đã được áp dụng"""
+    init_style()
+    import matplotlib.pyplot as plt
+    return plt
@@ -6,13 +6,407 @@ Phân tích kết quả mô phỏng TCP Reno với đồ họa đẹp mắt
 Main entry point for the application
 """
 
+import contextlib
+import io
 import sys
+import time
 import argparse
-from analyzer.enhanced_tcp_analyzer import EnhancedTCPAnalyzer
+from pathlib import Path
+
+
+DEFAULT_AGGREGATE_METRICS = 'total_throughput,loss_rate,avg_delay,timeouts,jain_index'
+
+
+def aggregate_main(argv):
+    """Entry point cho 'main.py aggregate': gộp kết quả nhiều lần chạy"""
+    parser = argparse.ArgumentParser(
+        prog='main.py aggregate',
+        description='Gộp kết quả sweep thành một bảng (mỗi dòng một lần chạy), group-by, pivot, mean/CI',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+🎨 Examples:
+  # Trung bình ± 95% CI theo mọi tham số sweep và hàng đợi (gộp các seed)
+  python3 main.py aggregate ../results/sweeps/sweep_20251113_210137
+
+  # Gộp theo băng thông, chỉ throughput và loss, pivot queue size x hàng đợi
+  python3 main.py aggregate ../results/sweeps/sweep_* --group-by bottleneck_bandwidth,queue \
+                            --metrics total_throughput,loss_rate \
+                            --pivot tcp_queue_size:queue:total_throughput
+
+  # Heatmap băng thông x queue size (DropTail | RED | hiệu), đường mean ± CI theo băng thông
+  python3 main.py aggregate ../results/sweeps/sweep_20251113_210137 \
+                            --heatmap bottleneck_bandwidth:tcp_queue_size \
+                            --lines bottleneck_bandwidth:tcp_queue_size
+        """
+    )
+    parser.add_argument('dirs', nargs='+', help='Thư mục sweep (hoặc thư mục results)')
+    parser.add_argument('--group-by', default=None,
+                        help='Các cột để gộp, cách nhau bởi dấu phẩy (mặc định: tham số sweep + queue)')
+    parser.add_argument('--metrics', default=DEFAULT_AGGREGATE_METRICS,
+                        help=f'Các metric cần tính (mặc định: {DEFAULT_AGGREGATE_METRICS})')
+    parser.add_argument('--pivot', action='append', default=[], metavar='ROW:COL:METRIC',
+                        help='In bảng pivot mean của METRIC theo ROW x COL')
+    parser.add_argument('--confidence', type=float, default=0.95, choices=[0.90, 0.95, 0.99],
+                        help='Độ tin cậy của CI (mặc định: 0.95)')
+    parser.add_argument('--all-status', action='store_true',
+                        help='Lấy cả job failed/cancelled (mặc định chỉ job done)')
+    parser.add_argument('--heatmap', action='append', default=[], metavar='X:Y',
+                        help='Heatmap metric theo hai tham số sweep, DropTail và RED cạnh nhau')
+    parser.add_argument('--lines', action='append', default=[], metavar='X[:BY]',
+                        help='Đồ thị metric theo tham số X với dải CI (tách đường theo BY)')
+    parser.add_argument('--plots', action='store_true',
+                        help='Tự vẽ heatmap cho hai tham số sweep đầu tiên và đồ thị cho từng tham số')
+    parser.add_argument('--plot-metrics', default=None,
+                        help='Metric cho heatmap/đồ thị (mặc định: total_throughput,loss_rate,avg_delay)')
+    parser.add_argument('--out-dir', default=None,
+                        help='Thư mục ghi CSV (mặc định: thư mục đầu tiên)')
+    args = parser.parse_args(argv)
+
+    from analyzer.aggregate_utils import build_table, group_by, pivot, write_csv
+    from analyzer.aggregate_utils import print_group_table, print_pivot
+
+    start = time.time()
+    table = build_table(args.dirs, status=None if args.all_status else 'done')
+    print(f"\n{'='*70}")
+    print(f"📊 AGGREGATE: {table['n']} runs từ {len(args.dirs)} thư mục "
+          f"({time.time() - start:.2f}s)")
+    print(f"{'='*70}")
+    if table['n'] == 0:
+        print("❌ Không tìm thấy lần chạy nào (cần sweep_manifest.json hoặc summary file)")
+        return 1
+
+    keys = args.group_by.split(',') if args.group_by else table['params'] + ['queue']
+    metrics = [m for m in args.metrics.split(',') if m]
+    try:
+        grouped = group_by(table, keys, metrics, args.confidence)
+        pivots = []
+        for spec in args.pivot:
+            parts = spec.split(':')
+            if len(parts) != 3:
+                parser.error(f"--pivot phải có dạng ROW:COL:METRIC: {spec}")
+            pivots.append(pivot(table, *parts, confidence=args.confidence))
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+
+    print(f"\n📋 Group by: {', '.join(keys)}\n")
+    print_group_table(grouped)
+    for result in pivots:
+        print()
+        print_pivot(result)
+
+    out_dir = Path(args.out_dir or args.dirs[0])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    runs_csv = write_csv(table, out_dir / 'aggregate_runs.csv')
+    groups_csv = write_csv(grouped, out_dir / 'aggregate_groups.csv')
+    print(f"\n💾 Đã lưu: {runs_csv}")
+    print(f"💾 Đã lưu: {groups_csv}")
+
+    heatmaps = [spec.split(':') for spec in args.heatmap]
+    lines = [spec.split(':') for spec in args.lines]
+    if args.plots:
+        params = table['params']
+        if len(params) >= 2:
+            heatmaps.append(params[:2])
+        lines += [[p] for p in params]
+    if not heatmaps and not lines:
+        return 0
+
+    # Vẽ từ bảng đã gộp: thời gian vẽ không phụ thuộc kích thước trace
+    from config.plot_config import COLORS
+    from analyzer.sweep_plot_utils import create_sweep_heatmaps, create_sweep_lines
+
+    plot_metrics = args.plot_metrics.split(',') if args.plot_metrics else None
+    try:
+        for spec in heatmaps:
+            if len(spec) != 2:
+                parser.error(f"--heatmap phải có dạng X:Y: {':'.join(spec)}")
+            x, y = spec
+            create_sweep_heatmaps(table, x, y, out_dir / f"sweep_heatmap_{x}_{y}.png",
+                                  COLORS, metrics=plot_metrics)
+        for spec in lines:
+            if len(spec) not in (1, 2):
+                parser.error(f"--lines phải có dạng X hoặc X:BY: {':'.join(spec)}")
+            x, by = spec[0], spec[1] if len(spec) == 2 else None
+            name = f"sweep_lines_{x}" + (f"_by_{by}" if by else '')
+            create_sweep_lines(table, x, out_dir / f"{name}.png", COLORS,
+                               metrics=plot_metrics, by=by, confidence=args.confidence)
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+        return 1
+    return 0
+
+
+def ensemble_main(argv):
+    """Entry point cho 'main.py ensemble': dải CWND qua nhiều seed"""
+    parser = argparse.ArgumentParser(
+        prog='main.py ensemble',
+        description='CWND ensemble: mean và dải p10/p50/p90 qua nhiều lần chạy (seed)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+🎨 Examples:
+  # Mọi seed của một điểm tham số trong sweep
+  python3 main.py ensemble ../results/sweeps/sweep_20251113_210137 \
+                           --where bottleneck_bandwidth=5Mbps --where tcp_queue_size=25
+        """
+    )
+    parser.add_argument('dirs', nargs='+', help='Thư mục sweep (hoặc thư mục results)')
+    parser.add_argument('--where', action='append', default=[], metavar='KEY=VALUE',
+                        help='Chỉ lấy các job có tham số sweep bằng giá trị này')
+    parser.add_argument('--grid-points', type=int, default=2000,
+                        help='Số điểm của lưới thời gian chung (mặc định: 2000)')
+    parser.add_argument('--t-end', type=float, default=None,
+                        help='Cuối lưới thời gian (giây, mặc định: mẫu cuối muộn nhất)')
+    parser.add_argument('--out-dir', default=None,
+                        help='Thư mục lưu hình (mặc định: thư mục đầu tiên)')
+    parser.add_argument('--gui', action='store_true',
+                        help='Không gọi plt.show() (dùng khi nhúng vào GUI)')
+    args = parser.parse_args(argv)
+
+    where = {}
+    for item in args.where:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"--where phải có dạng KEY=VALUE: {item}")
+        where[key.strip()] = value.strip()
+
+    from config.plot_config import COLORS
+    from analyzer.ensemble_utils import (
+        find_ensemble_traces, build_ensemble, ensemble_envelope,
+        create_ensemble_plot, print_ensemble_summary
+    )
+
+    traces, points = find_ensemble_traces(args.dirs, where)
+    print(f"\n{'='*70}")
+    print("🌊 CWND ENSEMBLE: " + ', '.join(f"{q} {len(p)} runs" for q, p in traces.items()))
+    print(f"{'='*70}")
+    if not traces:
+        print("❌ Không tìm thấy CWND trace nào khớp")
+        return 1
+    if len(points) > 1:
+        print(f"⚠️  Đang gộp {len(points)} điểm tham số khác nhau, dùng --where để chọn một điểm")
+
+    start = time.time()
+    envelopes = {}
+    for queue, paths in traces.items():
+        ensemble = build_ensemble(paths, args.grid_points, args.t_end)
+        envelopes[queue] = ensemble_envelope(ensemble)
+    print(f"⏱️  Resample + percentile: {time.time() - start:.2f}s\n")
+    print_ensemble_summary(envelopes)
+
+    suffix = (' - ' + ', '.join(f'{k}={v}' for k, v in where.items())) if where else ''
+    name = 'ensemble_cwnd' + ''.join(f"_{k}-{v}" for k, v in where.items()) + '.png'
+    out_dir = Path(args.out_dir or args.dirs[0])
+    out_dir.mkdir(parents=True, exist_ok=True)
+    create_ensemble_plot(envelopes, out_dir / name, COLORS, suffix, show_gui=args.gui)
+    return 0
+
+
+def compare_main(argv):
+    """Entry point cho 'main.py compare': dashboard so sánh N lần chạy"""
+    parser = argparse.ArgumentParser(
+        prog='main.py compare',
+        description='So sánh N lần chạy / cấu hình trên một dashboard (layout tự co giãn theo N)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+🎨 Examples:
+  # DropTail với các queue size khác nhau của một sweep (seed 1)
+  python3 main.py compare ../results/sweeps/sweep_20251113_210137 --queue DropTail --where seed=1
+
+  # Các lần chạy bất kỳ trong results/, đặt nhãn
+  python3 main.py compare --run "baseline=P2P-project:DropTail" --run "red=P2P-project_20251113_210137:RED"
+        """
+    )
+    parser.add_argument('dirs', nargs='*', help='Thư mục sweep/results để chọn lần chạy')
+    parser.add_argument('--run', action='append', default=[], metavar='[LABEL=]PREFIX:QUEUE',
+                        help='Thêm một lần chạy trong --results-dir (lặp lại cho nhiều run)')
+    parser.add_argument('--results-dir', default='../results/',
+                        help='Thư mục của các --run (mặc định: ../results/)')
+    parser.add_argument('--where', action='append', default=[], metavar='KEY=VALUE',
+                        help='Chỉ lấy các job có tham số sweep (hoặc seed) bằng giá trị này')
+    parser.add_argument('--queue', choices=['DropTail', 'RED'],
+                        help='Chỉ lấy hàng đợi này từ các thư mục')
+    parser.add_argument('--label-by', default=None,
+                        help='Tham số dùng làm nhãn, cách nhau bởi dấu phẩy (mặc định: tham số có nhiều giá trị)')
+    parser.add_argument('--out', default=None,
+                        help='File PNG (mặc định: comparison_<N>runs.png trong thư mục đầu tiên)')
+    parser.add_argument('--gui', action='store_true',
+                        help='Không gọi plt.show() (dùng khi nhúng vào GUI)')
+    args = parser.parse_args(argv)
+
+    where = {}
+    for item in args.where:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"--where phải có dạng KEY=VALUE: {item}")
+        where[key.strip()] = value.strip()
+
+    from config.plot_config import COLORS
+    from analyzer.compare_utils import (
+        select_runs, parse_run_spec, label_runs, sort_runs, load_datasets,
+        comparison_table, print_comparison_table
+    )
+    runs = []
+    if args.dirs:
+        runs = sort_runs(select_runs(args.dirs, where, args.queue))
+    for spec in args.run:
+        try:
+            run = parse_run_spec(spec)
+        except ValueError as e:
+            parser.error(str(e))
+        runs.append(dict(run, results_dir=Path(args.results_dir), params={}))
+    if not runs:
+        print("❌ Không có lần chạy nào để so sánh (thêm thư mục hoặc --run)")
+        return 1
+    label_runs(runs, args.label_by.split(',') if args.label_by else None)
+
+    print(f"\n{'='*70}")
+    print(f"⚖️  SO SÁNH {len(runs)} LẦN CHẠY")
+    print(f"{'='*70}")
+    start = time.time()
+    with contextlib.redirect_stdout(io.StringIO()):
+        datasets = load_datasets(runs, COLORS)
+    print(f"⏱️  Load: {time.time() - start:.2f}s\n")
+    print_comparison_table(comparison_table(datasets))
+
+    out = Path(args.out) if args.out else Path(args.dirs[0] if args.dirs else args.results_dir) / f"comparison_{len(runs)}runs.png"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    from analyzer.dashboard_utils import create_multi_comparison_dashboard
+    start = time.time()
+    create_multi_comparison_dashboard(datasets, out, COLORS, show_gui=args.gui)
+    print(f"⏱️  Vẽ: {time.time() - start:.2f}s")
+    return 0
+
+
+def stats_main(argv):
+    """Entry point cho 'main.py stats': thống kê streaming CWND/delay (không load trace vào bộ nhớ)"""
+    parser = argparse.ArgumentParser(
+        prog='main.py stats',
+        description='Mean/std/p50/p90/p99 của CWND và delay, tỉ lệ truyền lại và goodput, '
+                    'đọc trace/log theo từng khối (bộ nhớ cố định)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+🎨 Examples:
+  # Lần chạy mặc định trong ../results/ (cả hai hàng đợi)
+  python3 main.py stats
+
+  # Mọi job của một sweep, song song, gộp theo hàng đợi
+  python3 main.py stats ../results/sweeps/sweep_20251113_210137 --where tcp_queue_size=25
+        """
+    )
+    parser.add_argument('dirs', nargs='*', help='Thư mục sweep/results (mặc định: --results-dir/--prefix)')
+    parser.add_argument('--results-dir', default='../results/',
+                        help='Thư mục chứa kết quả khi không truyền thư mục')
+    parser.add_argument('--prefix', default='P2P-project',
+                        help='Prefix của files khi không truyền thư mục')
+    parser.add_argument('--queue', choices=['DropTail', 'RED'],
+                        help='Chỉ thống kê hàng đợi này')
+    parser.add_argument('--where', action='append', default=[], metavar='KEY=VALUE',
+                        help='Chỉ lấy các job có tham số sweep (hoặc seed) bằng giá trị này')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Số worker process (mặc định: số core)')
+    args = parser.parse_args(argv)
+
+    where = {}
+    for item in args.where:
+        key, sep, value = item.partition('=')
+        if not sep:
+            parser.error(f"--where phải có dạng KEY=VALUE: {item}")
+        where[key.strip()] = value.strip()
+
+    from analyzer.stream_utils import summarize_runs, pooled, print_stream_table
+    if args.dirs:
+        from analyzer.compare_utils import select_runs, sort_runs, label_runs
+        runs = label_runs(sort_runs(select_runs(args.dirs, where, args.queue)))
+    else:
+        runs = [{'results_dir': Path(args.results_dir), 'prefix': args.prefix, 'queue': q, 'label': q}
+                for q in ([args.queue] if args.queue else ['DropTail', 'RED'])]
+    if not runs:
+        print("❌ Không có lần chạy nào để thống kê")
+        return 1
+
+    print(f"\n{'='*70}")
+    print(f"📐 STREAMING STATS: {len(runs)} lần chạy")
+    print(f"{'='*70}")
+    start = time.time()
+    results = summarize_runs(runs, args.jobs)
+    rows = [(run['label'], result) for run, result in zip(runs, results)]
+    # Gộp các run cùng hàng đợi (merge t-digest/moment/histogram, không đọc lại trace)
+    queues = [q for q in ['DropTail', 'RED'] if q in {r['queue'] for r in runs}]
+    for queue in queues:
+        group = [result for run, result in zip(runs, results) if run['queue'] == queue]
+        if len(group) > 1:
+            rows.append((f"{queue} (pooled, {len(group)} runs)",
+                         {key: pooled(group, key) for key in ('cwnd', 'rtt', 'delay', 'retx')}))
+    print_stream_table(rows)
+    print(f"\n⏱️  {time.time() - start:.2f}s")
+    return 0
+
+
+def batch_main(argv):
+    """Entry point cho 'main.py batch': vẽ hình hàng loạt, không mở cửa sổ"""
+    parser = argparse.ArgumentParser(
+        prog='main.py batch',
+        description='Vẽ dashboard/timeline/comparison cho mọi lần chạy trong thư mục (song song, backend Agg)',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+🎨 Examples:
+  # Mọi hình cho mọi job của một sweep, dùng mọi core
+  python3 main.py batch ../results/sweeps/sweep_20251113_210137
+
+  # Chỉ dashboard, 4 worker, bỏ qua hình đã mới hơn dữ liệu
+  python3 main.py batch ../results/sweeps/sweep_20251113_210137 --kinds dashboard --jobs 4 --skip-existing
+        """
+    )
+    parser.add_argument('results_dir', help='Thư mục kết quả (vd thư mục sweep)')
+    parser.add_argument('--kinds', default=','.join(['dashboard', 'timeline', 'comparison']),
+                        help='Các loại hình: dashboard,timeline,comparison')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Số worker process (mặc định: số core)')
+    parser.add_argument('--prefix', action='append', default=[],
+                        help='Chỉ vẽ prefix này (lặp lại cho nhiều prefix)')
+    parser.add_argument('--skip-existing', action='store_true',
+                        help='Bỏ qua hình đã mới hơn file dữ liệu')
+    args = parser.parse_args(argv)
+
+    # Backend Agg trước khi import pyplot: không cửa sổ nào chặn tiến trình
+    from analyzer.batch_utils import use_headless_backend, run_batch, BATCH_KINDS
+    use_headless_backend()
+
+    kinds = [k for k in args.kinds.split(',') if k]
+    for kind in kinds:
+        if kind not in BATCH_KINDS:
+            parser.error(f"Loại hình không hợp lệ: {kind} (chọn trong {', '.join(BATCH_KINDS)})")
+
+    print(f"\n{'='*70}")
+    print(f"🖼️  BATCH RENDER: {args.results_dir}")
+    print(f"{'='*70}")
+    results = run_batch(args.results_dir, kinds, args.jobs, args.skip_existing, args.prefix or None)
+    failed = [r for r in results if r['error']]
+    if failed:
+        print(f"❌ {len(failed)} runs lỗi: {', '.join(r['prefix'] for r in failed)}")
+    return 1 if failed or not results else 0
 
 
 def main():
     """Main function"""
+    # Subcommand sweep: không cần matplotlib, import riêng
+    if len(sys.argv) > 1 and sys.argv[1] == 'sweep':
+        from sweep.cli import sweep_main
+        return sweep_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'aggregate':
+        return aggregate_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'ensemble':
+        return ensemble_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        return batch_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'compare':
+        return compare_main(sys.argv[2:])
+    if len(sys.argv) > 1 and sys.argv[1] == 'stats':
+        return stats_main(sys.argv[2:])
+
+    from analyzer.enhanced_tcp_analyzer import EnhancedTCPAnalyzer
+
     parser = argparse.ArgumentParser(
         description='TCP Reno Visual Analyzer - Enhanced Version',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -30,8 +424,50 @@ def main():
   # Timeline chi tiết
   python3 main.py --queue RED --timeline
   
+  # Bảng flow + CWND từng flow (topology nhiều flow)
+  python3 main.py --queue DropTail --flows
+  
+  # Chu kỳ sawtooth: bảng CSV + phân phối theo trigger (timeout / triple dup ACK)
+  python3 main.py --queue DropTail --cycles
+  
+  # Truyền lại + goodput theo bin 50 ms, chồng lên CWND
+  python3 main.py --queue RED --goodput --interval 0.05
+  
+  # RTT từng gói + RTO, DropTail và RED trên cùng một hình
+  python3 main.py --compare --rtt
+  
+  # Đồng bộ giữa các flow (tương quan chéo CWND, mất gói trùng nhau), DropTail vs RED
+  python3 main.py --compare --sync
+  
+  # Jain's fairness index + phần băng thông từng flow theo thời gian (CSV; panel trên dashboard)
+  python3 main.py --queue DropTail --fairness --dashboard
+  
+  # Bỏ warm-up (MSER-5): metric cả lần chạy và sau warm-up (CSV); điểm cắt vẽ trên dashboard
+  python3 main.py --compare --warmup
+  
+  # Báo cáo HTML một file, mở offline (zoom bằng chuột)
+  python3 main.py --compare --html
+  
   # Full analysis
   python3 main.py --compare --dashboard --infographic --print
+  
+  # Parameter sweep song song (xem: python3 main.py sweep --help)
+  python3 main.py sweep --param bottleneck_bandwidth=2Mbps,5Mbps --seeds 1-3
+  
+  # Gộp kết quả sweep: mean ± CI theo tham số (xem: python3 main.py aggregate --help)
+  python3 main.py aggregate ../results/sweeps/sweep_20251113_210137
+  
+  # Dải CWND p10/p50/p90 qua các seed (xem: python3 main.py ensemble --help)
+  python3 main.py ensemble ../results/sweeps/sweep_20251113_210137 --where tcp_queue_size=25
+  
+  # Vẽ hình hàng loạt không mở cửa sổ (xem: python3 main.py batch --help)
+  python3 main.py batch ../results/sweeps/sweep_20251113_210137
+  
+  # So sánh N lần chạy trên một dashboard (xem: python3 main.py compare --help)
+  python3 main.py compare ../results/sweeps/sweep_20251113_210137 --queue DropTail --where seed=1
+  
+  # p50/p99 CWND và delay trên trace lớn, bộ nhớ cố định (xem: python3 main.py stats --help)
+  python3 main.py stats ../results/sweeps/sweep_20251113_210137
         """
     )
 
@@ -51,13 +487,35 @@ def main():
                        help='Tạo infographic tổng hợp')
     parser.add_argument('--gui', action='store_true',
                        help='Hiển thị infographic trực tiếp (thêm với --infographic)')
+    parser.add_argument('--jobs', type=int, default=None,
+                       help='Số process vẽ các trang infographic song song (mặc định: min(5, số core))')
+    parser.add_argument('--no-cache', action='store_true',
+                       help='Luôn vẽ lại dashboard/timeline/infographic (bỏ qua render cache)')
     parser.add_argument('--print', action='store_true',
                        help='In phân tích chi tiết ra terminal')
+    parser.add_argument('--flows', action='store_true',
+                       help='Bảng tổng hợp flow và CWND từng flow (small multiples)')
+    parser.add_argument('--html', action='store_true',
+                       help='Xuất báo cáo HTML tự chứa (mặc định cả hai hàng đợi)')
+    parser.add_argument('--cycles', action='store_true',
+                       help='Bảng chu kỳ sawtooth (CSV) và phân phối đỉnh/thời lượng/tốc độ tăng theo trigger')
+    parser.add_argument('--goodput', action='store_true',
+                       help='Truyền lại và goodput theo thời gian từ TX-DATA/NEW_ACK (CSV + hình chồng lên CWND)')
+    parser.add_argument('--interval', type=float, default=0.1,
+                       help='Độ rộng bin (s) của --goodput (mặc định: 0.1)')
+    parser.add_argument('--rtt', action='store_true',
+                       help='RTT từng gói (luật Karn) và quỹ đạo RTO từ state log, đánh dấu timeout giả')
+    parser.add_argument('--sync', action='store_true',
+                       help='Đồng bộ giữa các flow: tương quan chéo CWND (FFT) và mất gói trùng nhau (cần --numFlows > 1)')
+    parser.add_argument('--fairness', action='store_true',
+                       help="Jain's fairness index và phần băng thông từng flow theo thời gian (CSV, cần --numFlows > 1)")
+    parser.add_argument('--warmup', action='store_true',
+                       help='Phát hiện warm-up (MSER-5 trên CWND và goodput): metric cả lần chạy và sau warm-up (CSV)')
 
     args = parser.parse_args()
 
     # Create analyzer
-    analyzer = EnhancedTCPAnalyzer(args.results_dir, args.prefix)
+    analyzer = EnhancedTCPAnalyzer(args.results_dir, args.prefix, use_cache=not args.no_cache)
 
     print("\n" + "="*70)
     print("🎨 TCP RENO VISUAL ANALYZER - ENHANCED")
@@ -70,14 +528,13 @@ def main():
                 print("\n📊 Đang tạo infographic tương tác (GUI mode)...")
             else:
                 print("\n📊 Đang tạo infographic tổng hợp...")
-            analyzer.load_data('DropTail')
-            analyzer.load_data('RED')
-            analyzer.create_infographic(show_gui=args.gui)
+            # Dữ liệu chỉ được load khi có trang phải vẽ lại (render cache)
+            analyzer.create_infographic(show_gui=args.gui, workers=args.jobs)
 
-        elif args.compare:
-            # Compare mode
-            analyzer.load_data('DropTail')
-            analyzer.load_data('RED')
+        elif args.compare or (args.html and not args.queue):
+            # Compare mode (dashboard tự load dữ liệu khi không dùng lại được cache)
+            if args.print or args.flows:
+                analyzer.ensure_data('DropTail', 'RED')
             
             if args.print:
                 print("\n📋 PHÂN TÍCH DROPTAIL:")
@@ -88,10 +545,48 @@ def main():
             if args.dashboard:
                 print("\n📊 Đang tạo comparison dashboard...")
                 analyzer.create_comparison_dashboard()
+            
+            if args.flows:
+                for queue_type in ('DropTail', 'RED'):
+                    analyzer.print_flow_table(queue_type)
+                    analyzer.create_flow_small_multiples(queue_type)
+            
+            if args.cycles:
+                for queue_type in ('DropTail', 'RED'):
+                    analyzer.export_cycle_table(queue_type)
+                    analyzer.create_cycle_plots(queue_type)
+            
+            if args.goodput:
+                for queue_type in ('DropTail', 'RED'):
+                    analyzer.export_goodput_table(queue_type, args.interval)
+                    analyzer.create_goodput_plot(queue_type, args.interval)
+            
+            if args.rtt:
+                for queue_type in ('DropTail', 'RED'):
+                    analyzer.export_rtt_samples(queue_type)
+                analyzer.create_rtt_plot('DropTail', 'RED')
+            
+            if args.sync:
+                for queue_type in ('DropTail', 'RED'):
+                    analyzer.export_sync_table(queue_type)
+                analyzer.create_sync_plot('DropTail', 'RED')
+            
+            if args.fairness:
+                for queue_type in ('DropTail', 'RED'):
+                    analyzer.export_fairness_table(queue_type)
+            
+            if args.warmup:
+                for queue_type in ('DropTail', 'RED'):
+                    analyzer.export_warmup_table(queue_type)
+            
+            if args.html:
+                print("\n🌐 Đang xuất báo cáo HTML...")
+                analyzer.create_html_report('DropTail', 'RED')
 
         elif args.queue:
             # Single queue mode
-            analyzer.load_data(args.queue)
+            if args.print or args.flows:
+                analyzer.load_data(args.queue)
             
             if args.print:
                 analyzer.print_analysis(args.queue)
@@ -103,9 +598,41 @@ def main():
             if args.timeline:
                 print(f"\n⏱️ Đang tạo timeline cho {args.queue}...")
                 analyzer.create_animated_timeline(args.queue)
+            
+            if args.flows:
+                analyzer.print_flow_table(args.queue)
+                print(f"\n🧵 Đang tạo per-flow CWND cho {args.queue}...")
+                analyzer.create_flow_small_multiples(args.queue)
+            
+            if args.cycles:
+                print(f"\n🪚 Đang tách chu kỳ sawtooth cho {args.queue}...")
+                analyzer.export_cycle_table(args.queue)
+                analyzer.create_cycle_plots(args.queue)
+            
+            if args.goodput:
+                analyzer.export_goodput_table(args.queue, args.interval)
+                analyzer.create_goodput_plot(args.queue, args.interval)
+            
+            if args.rtt:
+                analyzer.export_rtt_samples(args.queue)
+                analyzer.create_rtt_plot(args.queue)
+            
+            if args.sync:
+                if analyzer.export_sync_table(args.queue):
+                    analyzer.create_sync_plot(args.queue)
+            
+            if args.fairness:
+                analyzer.export_fairness_table(args.queue)
+            
+            if args.warmup:
+                analyzer.export_warmup_table(args.queue)
+            
+            if args.html:
+                print(f"\n🌐 Đang xuất báo cáo HTML cho {args.queue}...")
+                analyzer.create_html_report(args.queue)
         
         else:
-            print("\n❌ Lỗi: Phải chọn --queue <type> hoặc --compare hoặc --infographic")
+            print("\n❌ Lỗi: Phải chọn --queue <type> hoặc --compare hoặc --infographic hoặc --html")
             print("📖 Dùng --help để xem hướng dẫn")
             return 1
 
@@ -0,0 +1,13 @@
+"""
+Parameter Sweep Package
+Chạy lưới tham số ns-3 song song (không phụ thuộc matplotlib)
+"""
+
+from .grid import expand_grid, parse_assignment, parse_setting, parse_values
+from .runner import run_sweep, run_job, ns3_command
+from .cache import SimCache
+from .journal import Journal, replay, resumable_results
+
+__all__ = ['expand_grid', 'parse_assignment', 'parse_setting', 'parse_values',
+           'run_sweep', 'run_job', 'ns3_command', 'SimCache',
+           'Journal', 'replay', 'resumable_results']
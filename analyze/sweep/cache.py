@@ -0,0 +1,282 @@
+"""
+Content-addressed simulation result cache
+Cache kết quả mô phỏng theo hash của tham số, mã nguồn simulator và run id
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+from pathlib import Path
+
+
+# Các option không ảnh hưởng tới kết quả mô phỏng (chỉ đổi nơi/tên file output)
+NON_RESULT_PARAMS = {'results_dir', 'prefix_file_name', 'realtime_plot'}
+
+META_NAME = 'meta.json'
+
+DEFAULT_BUDGET_MB = 2048
+
+# Option khai báo trong tcp_reno.cc: cmd.AddValue("name", "help", variable)
+_ADD_VALUE = re.compile(r'cmd\.AddValue\s*\(\s*"(\w+)"\s*,\s*"(?:[^"\\]|\\.)*"\s*,\s*(\w+)\s*\)')
+
+# Giá trị bool mà CommandLine của ns-3 chấp nhận
+_BOOL_VALUES = {'true': 'true', '1': 'true', 't': 'true', 'false': 'false', '0': 'false', 'f': 'false'}
+
+
+def source_hash(path):
+    """SHA-256 của file mã nguồn simulator (tcp_reno.cc)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def simulator_defaults(source):
+    """
+    Giá trị mặc định của các option simulator, đọc từ mã nguồn tcp_reno.cc
+
+    Mỗi option cmd.AddValue("name", ..., variable) lấy giá trị khởi tạo của biến
+    ("type variable = value;"); option không tìm được giá trị khởi tạo bị bỏ qua.
+
+    Args:
+        source (str): Nội dung tcp_reno.cc
+
+    Returns:
+        dict: {tên option: (kiểu C++, giá trị dạng chuỗi)}
+    """
+    defaults = {}
+    for name, variable in _ADD_VALUE.findall(source):
+        match = re.search(rf'\b([\w:]+)\s+{variable}\s*=\s*("(?:[^"\\]|\\.)*"|[^;]+);', source)
+        if match:
+            ctype, value = match.group(1), match.group(2).strip()
+            defaults[name] = (ctype, value[1:-1] if value.startswith('"') else value)
+    return defaults
+
+
+def canonical_value(ctype, value):
+    """
+    Dạng chuẩn của giá trị option theo kiểu C++ của nó, để cùng một giá trị viết
+    khác nhau (vd "20" và "20.0", "1" và "true") cho cùng key
+    """
+    value = str(value).strip()
+    if ctype == 'bool':
+        return _BOOL_VALUES.get(value.lower(), value)
+    if ctype in ('double', 'float') or ctype.startswith(('uint', 'int')):
+        try:
+            return repr(float(value))
+        except ValueError:
+            return value
+    return value
+
+
+def split_output_name(name, prefix):
+    """
+    Tách tên file output thành (timestamp, phần còn lại)
+
+    vd "P2P-project_20251113_210137_summary_RED.txt" -> ("20251113_210137", "summary_RED.txt")
+
+    Returns:
+        tuple: (timestamp hoặc '', tên không có prefix/timestamp) hoặc None nếu không khớp prefix
+    """
+    if not name.startswith(prefix + '_'):
+        return None
+    rest = name[len(prefix) + 1:]
+    parts = rest.split('_', 2)
+    if len(parts) == 3 and parts[0].isdigit() and parts[1].isdigit():
+        return f"{parts[0]}_{parts[1]}", parts[2]
+    return '', rest
+
+
+def _link_or_copy(src, dst):
+    """Hard link nếu cùng filesystem (không tốn dung lượng), ngược lại copy"""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+class SimCache:
+    """
+    Cache kết quả mô phỏng trong results/.sim_cache/<key>/
+
+    Mỗi entry chứa các file output (bỏ prefix và timestamp) và meta.json.
+    meta.json được ghi cuối cùng nên chỉ entry hoàn chỉnh mới được dùng.
+    Khi vượt budget, các entry ít được dùng gần đây nhất bị xóa (LRU).
+    """
+
+    def __init__(self, root, source_file, budget_mb=DEFAULT_BUDGET_MB):
+        """
+        Args:
+            root (str|Path): Thư mục cache
+            source_file (str|Path): tcp_reno.cc (hash của nó và giá trị mặc định của các
+                option là một phần của key)
+            budget_mb (float): Dung lượng tối đa của cache (MB)
+
+        Raises:
+            FileNotFoundError: Nếu không có tcp_reno.cc (không thể phân biệt các bản build,
+                nên không dùng cache)
+        """
+        source_file = Path(source_file)
+        if not source_file.is_file():
+            raise FileNotFoundError(f"Không tìm thấy mã nguồn simulator {source_file}, không thể dùng cache")
+        self.root = Path(root)
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self.source_sha = source_hash(source_file)
+        self.defaults = simulator_defaults(source_file.read_text(errors='replace'))
+
+    def key(self, params):
+        """
+        Key của một lần chạy
+
+        Tham số được bổ sung giá trị mặc định của simulator rồi chuẩn hóa theo kiểu,
+        nên cùng một kịch bản (vd GUI truyền mọi option, sweep chỉ truyền option
+        được đặt) cho cùng key.
+
+        Args:
+            params (dict): Tham số simulator (kể cả queueType và run)
+
+        Returns:
+            str: SHA-256 hex
+        """
+        resolved = {name: value for name, (_, value) in self.defaults.items()}
+        resolved.update(params)
+        canonical = {k: canonical_value(self.defaults.get(k, ('', ''))[0], v)
+                     for k, v in resolved.items() if k not in NON_RESULT_PARAMS}
+        run = canonical.pop('run', '0')
+        payload = json.dumps({'params': canonical, 'source': self.source_sha, 'run': run},
+                             sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry(self, key):
+        return self.root / key
+
+    def lookup(self, key):
+        """Trả về meta của entry hoàn chỉnh, hoặc None nếu chưa có"""
+        meta_path = self._entry(key) / META_NAME
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_meta(self, key, meta):
+        meta_path = self._entry(key) / META_NAME
+        tmp = meta_path.with_suffix('.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f, indent=2)
+        os.replace(tmp, meta_path)
+
+    def restore(self, key, dest_dir, prefix, timestamp=None):
+        """
+        Copy kết quả đã cache vào dest_dir với prefix và timestamp mới
+
+        Args:
+            key (str): Key của entry
+            dest_dir (str|Path): Thư mục kết quả đích
+            prefix (str): Prefix file (vd "P2P-project" hoặc "sweep-0007")
+            timestamp (str): Timestamp cho tên file (mặc định: hiện tại)
+
+        Returns:
+            list: Các file đã tạo, hoặc None nếu cache miss
+        """
+        meta = self.lookup(key)
+        if meta is None:
+            return None
+        dest_dir = Path(dest_dir)
+        dest_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = timestamp or time.strftime('%Y%m%d_%H%M%S')
+
+        created = []
+        for name in meta['files']:
+            dst = dest_dir / f"{prefix}_{timestamp}_{name}"
+            if dst.exists():
+                dst.unlink()
+            _link_or_copy(self._entry(key) / name, dst)
+            created.append(dst)
+
+        meta['last_used'] = time.time()
+        meta['hits'] = meta.get('hits', 0) + 1
+        self._write_meta(key, meta)
+        return created
+
+    def store(self, key, params, paths, prefix):
+        """
+        Lưu output của một lần chạy thành công vào cache
+
+        Args:
+            key (str): Key của lần chạy
+            params (dict): Tham số simulator (ghi vào meta để tra cứu)
+            paths (list): Các file output của lần chạy
+            prefix (str): Prefix file của lần chạy
+
+        Returns:
+            bool: True nếu đã lưu
+        """
+        files = []
+        timestamp = ''
+        for path in sorted(Path(p) for p in paths):
+            split = split_output_name(path.name, prefix)
+            if split is None or not path.is_file():
+                continue
+            timestamp, name = split
+            files.append((path, name))
+        if not files:
+            return False
+
+        entry = self._entry(key)
+        if entry.exists():
+            shutil.rmtree(entry)
+        entry.mkdir(parents=True)
+        size = 0
+        for path, name in files:
+            _link_or_copy(path, entry / name)
+            size += path.stat().st_size
+
+        now = time.time()
+        self._write_meta(key, {
+            'key': key,
+            'params': {k: str(v) for k, v in params.items() if k not in NON_RESULT_PARAMS},
+            'source_sha': self.source_sha,
+            'files': [name for _, name in files],
+            'size': size,
+            'original_timestamp': timestamp,
+            'created': now,
+            'last_used': now,
+            'hits': 0,
+        })
+        return True
+
+    def entries(self):
+        """Danh sách meta của mọi entry hoàn chỉnh"""
+        if not self.root.exists():
+            return []
+        metas = []
+        for entry in self.root.iterdir():
+            meta = self.lookup(entry.name) if entry.is_dir() else None
+            if meta is not None:
+                metas.append(meta)
+        return metas
+
+    def evict(self):
+        """
+        Xóa entry cũ (LRU theo last_used) cho tới khi cache nằm trong budget
+
+        Returns:
+            int: Số entry đã xóa
+        """
+        metas = sorted(self.entries(), key=lambda m: m.get('last_used', 0))
+        total = sum(m.get('size', 0) for m in metas)
+        removed = 0
+        for meta in metas:
+            if total <= self.budget_bytes:
+                break
+            shutil.rmtree(self._entry(meta['key']), ignore_errors=True)
+            total -= meta.get('size', 0)
+            removed += 1
+        return removed
@@ -0,0 +1,199 @@
+"""
+Command line interface for parameter sweeps
+python main.py sweep --param bottleneck_bandwidth=2Mbps,5Mbps --seeds 1-5
+"""
+
+import argparse
+import signal
+import threading
+import time
+from pathlib import Path
+
+from .grid import parse_assignment, parse_setting, parse_values, expand_grid
+from .cache import SimCache, DEFAULT_BUDGET_MB
+from .journal import Journal, JOURNAL_NAME, replay, resumable_results
+from .runner import (
+    default_workers, ns3_command, job_params, run_sweep, summarize_manifest
+)
+
+
+def find_ns3_dir(start):
+    """Tìm thư mục ns-3 (chứa script ./ns3) từ vị trí project trở lên"""
+    for path in [start] + list(start.parents):
+        if (path / 'ns3').exists():
+            return path
+    return None
+
+
+def build_parser():
+    """Parser cho subcommand sweep"""
+    parser = argparse.ArgumentParser(
+        prog='main.py sweep',
+        description='Parameter sweep - chạy nhiều mô phỏng ns-3 song song',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+🎨 Examples:
+  # Sweep băng thông bottleneck x queue size, 2 loại hàng đợi, 5 seeds
+  python3 main.py sweep --param bottleneck_bandwidth=2Mbps,5Mbps,10Mbps \\
+                        --param tcp_queue_size=10-50:10 --seeds 1-5
+
+  # Chỉ RED, cố định 10 flows, 4 job song song
+  python3 main.py sweep --param error_p=0,0.001,0.01 --queues RED \\
+                        --set numFlows=10 --jobs 4
+
+  # Dừng từng job khi throughput và đỉnh CWND đã hội tụ (CI 95% < 5%), tối đa 200s
+  python3 main.py sweep --param tcp_queue_size=10,25,50 --set duration=200 \\
+                        --set convergenceStop=true --set convTolerance=0.05
+
+  # Xem danh sách lệnh mà không chạy
+  python3 main.py sweep --param tcp_queue_size=10,25 --dry-run
+
+  # Tiếp tục sweep bị gián đoạn (chỉ chạy các job chưa xong), chạy lại cả job lỗi
+  python3 main.py sweep --resume ../results/sweeps/sweep_20251113_210137 --retry-failed
+        """
+    )
+    parser.add_argument('--param', action='append', default=[], metavar='KEY=V1,V2',
+                        help='Tham số cần sweep (lặp lại cho nhiều tham số), hỗ trợ a-b[:step]')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='Tham số cố định cho mọi job (giá trị giữ nguyên, vd logEvents=state,loss)')
+    parser.add_argument('--queues', default='DropTail,RED',
+                        help='Các loại hàng đợi (mặc định: DropTail,RED)')
+    parser.add_argument('--seeds', default='1',
+                        help='Run id cho RNG, vd 1-5 hoặc 1,3,7 (mặc định: 1)')
+    parser.add_argument('--jobs', type=int, default=default_workers(),
+                        help=f'Số mô phỏng chạy đồng thời (mặc định: {default_workers()} = số core)')
+    parser.add_argument('--ns3-dir', default=None,
+                        help='Thư mục ns-3 (mặc định: tự tìm từ vị trí project)')
+    parser.add_argument('--results-dir', default='../results/sweeps',
+                        help='Thư mục chứa các sweep')
+    parser.add_argument('--name', default=None,
+                        help='Tên sweep (mặc định: sweep_<timestamp>)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Luôn chạy lại ns-3, không dùng cache kết quả')
+    parser.add_argument('--cache-dir', default='../results/.sim_cache',
+                        help='Thư mục cache kết quả mô phỏng')
+    parser.add_argument('--cache-budget', type=float, default=DEFAULT_BUDGET_MB,
+                        help=f'Dung lượng tối đa của cache (MB, mặc định: {DEFAULT_BUDGET_MB})')
+    parser.add_argument('--resume', default=None, metavar='SWEEP_DIR',
+                        help='Tiếp tục sweep từ journal trong SWEEP_DIR (grid/queues/seeds lấy từ journal)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Khi resume, chạy lại cả các job đã thất bại')
+    parser.add_argument('--timeout', type=float, default=None, metavar='SECONDS',
+                        help='Thời gian chạy tối đa mỗi job, quá hạn bị dừng và tính là failed')
+    parser.add_argument('--no-build', action='store_true',
+                        help='Không build ns-3 trước khi chạy')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='Chỉ in danh sách job và lệnh')
+    return parser
+
+
+def sweep_main(argv):
+    """Entry point cho 'main.py sweep'"""
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    previous = {}
+    if args.resume:
+        # Resume: spec của sweep lấy từ journal, bỏ qua --param/--set/--queues/--seeds
+        out_dir = Path(args.resume)
+        journal_path = out_dir / JOURNAL_NAME
+        if not journal_path.exists():
+            parser.error(f"Không tìm thấy journal: {journal_path}")
+        spec, records = replay(journal_path)
+        if spec is None:
+            parser.error(f"Journal không có thông tin sweep: {journal_path}")
+        name, grid, base = spec['name'], spec['grid'], spec['base_params']
+        queues, seeds = spec['queues'], spec['seeds']
+        previous = resumable_results(records, args.retry_failed)
+        if args.timeout is None:
+            args.timeout = spec.get('timeout')
+    else:
+        try:
+            grid = dict(parse_assignment(p) for p in args.param)
+            base = dict(parse_setting(item) for item in args.set)
+        except ValueError as e:
+            parser.error(str(e))
+
+        queues = parse_values(args.queues)
+        for queue in queues:
+            if queue not in ('DropTail', 'RED'):
+                parser.error(f"Loại hàng đợi không hợp lệ: {queue}")
+        seeds = parse_values(args.seeds)
+        if not all(s.isdigit() for s in seeds):
+            parser.error("--seeds phải là số nguyên, vd 1-5 hoặc 1,3,7")
+
+        name = args.name or time.strftime('sweep_%Y%m%d_%H%M%S')
+        out_dir = Path(args.results_dir) / name
+        if (out_dir / JOURNAL_NAME).exists():
+            parser.error(f"Sweep {out_dir} đã tồn tại (dùng --resume {out_dir})")
+    jobs = expand_grid(grid, queues, seeds, base, prefix=name.replace('_', '-'))
+
+    project_dir = Path(__file__).resolve().parent.parent.parent
+    ns3_dir = Path(args.ns3_dir) if args.ns3_dir else find_ns3_dir(project_dir)
+
+    print(f"\n{'='*70}")
+    print(f"🧪 PARAMETER SWEEP: {name}")
+    print(f"{'='*70}")
+    for key, values in grid.items():
+        print(f"   📐 {key}: {', '.join(values)}")
+    print(f"   📦 Queues: {', '.join(queues)}   🎲 Seeds: {', '.join(seeds)}")
+    print(f"   🧮 Total jobs: {len(jobs)}   ⚙️  Workers: {args.jobs}")
+    if args.timeout:
+        print(f"   ⏱️  Timeout: {args.timeout:g}s/job")
+    print(f"   📁 Output: {out_dir}")
+
+    if args.dry_run:
+        for job in jobs:
+            print(f"   {job['prefix']}: {' '.join(ns3_command(ns3_dir or Path('.'), job_params(job, out_dir)))}")
+        return 0
+
+    if ns3_dir is None:
+        print("❌ Không tìm thấy thư mục ns-3 (dùng --ns3-dir)")
+        return 1
+
+    # Ctrl+C / SIGTERM (nút Stop trên GUI): dừng các job đang chạy, bỏ qua job còn lại
+    stop_event = threading.Event()
+
+    def _stop(signum, frame):
+        print("\n⏹️ Đang dừng sweep...", flush=True)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _stop)
+    signal.signal(signal.SIGTERM, _stop)
+
+    cache = None
+    if not args.no_cache:
+        try:
+            cache = SimCache(args.cache_dir, project_dir / 'tcp_reno.cc', args.cache_budget)
+        except FileNotFoundError as e:
+            print(f"⚠️  Tắt cache kết quả: {e}")
+
+    spec = {'name': name, 'grid': grid, 'base_params': base,
+            'queues': queues, 'seeds': seeds}
+    journal = Journal(out_dir / JOURNAL_NAME)
+    if args.resume:
+        journal.append('resume', retry_failed=args.retry_failed, kept=len(previous))
+    else:
+        journal.append('sweep', timeout=args.timeout, **spec)
+
+    try:
+        manifest = run_sweep(jobs, ns3_dir, out_dir, workers=args.jobs, stop_event=stop_event,
+                             manifest_extra=spec, build=not args.no_build, cache=cache,
+                             journal=journal, previous=previous, timeout=args.timeout)
+    finally:
+        journal.close()
+
+    counts = summarize_manifest(manifest)
+    print(f"\n{'='*70}")
+    print(f"✅ Done: {counts.get('done', 0)}   ❌ Failed: {counts.get('failed', 0)}   "
+          f"⏹️ Cancelled: {counts.get('cancelled', 0)}   ♻️ Cache hits: {counts.get('cached', 0)}")
+    if 'elapsed' in manifest:
+        print(f"⏱️  Elapsed: {manifest['elapsed']:.1f}s")
+    if counts.get('converged'):
+        print(f"⏹️  Dừng sớm (hội tụ): {counts['converged']} jobs")
+    print(f"📄 Manifest: {out_dir / 'sweep_manifest.json'}")
+    if counts.get('done', 0) != len(jobs):
+        print(f"⏯️  Tiếp tục: python3 main.py sweep --resume {out_dir}"
+              f"{'' if not counts.get('failed') else ' [--retry-failed]'}")
+    print(f"{'='*70}\n")
+    return 0 if counts.get('done', 0) == len(jobs) else 1
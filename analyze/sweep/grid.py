@@ -0,0 +1,109 @@
+"""
+Parameter grid utilities
+Mở rộng lưới tham số thành danh sách job mô phỏng
+"""
+
+import itertools
+
+
+def parse_values(text):
+    """
+    Parse danh sách giá trị của một tham số
+
+    Hỗ trợ danh sách cách nhau bởi dấu phẩy ("2Mbps,5Mbps") và khoảng số
+    nguyên "a-b" hoặc "a-b:step" ("1-5", "10-50:10").
+
+    Args:
+        text (str): Chuỗi giá trị
+
+    Returns:
+        list: Các giá trị dạng chuỗi, giữ nguyên thứ tự
+    """
+    values = []
+    for item in text.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        start, sep, rest = item.partition('-')
+        if sep and start.isdigit():
+            end, _, step = rest.partition(':')
+            if end.isdigit() and (not step or step.isdigit()):
+                values.extend(str(v) for v in range(int(start), int(end) + 1, int(step or 1)))
+                continue
+        values.append(item)
+    return values
+
+
+def parse_assignment(text):
+    """
+    Parse "key=v1,v2,..." thành (key, [values])
+
+    Raises:
+        ValueError: Nếu thiếu dấu '=' hoặc không có giá trị
+    """
+    key, sep, value = text.partition('=')
+    key = key.strip().lstrip('-')
+    if not sep or not key:
+        raise ValueError(f"Tham số không hợp lệ '{text}' (dùng key=v1,v2)")
+    values = parse_values(value)
+    if not values:
+        raise ValueError(f"Tham số '{key}' không có giá trị")
+    return key, values
+
+
+def parse_setting(text):
+    """
+    Parse "key=value" của một tham số cố định thành (key, value)
+
+    Chỉ tách ở dấu '=' đầu tiên, giá trị được giữ nguyên (vd "logEvents=state,loss,rto"
+    hoặc giá trị có dấu cách) vì simulator tự parse giá trị của option.
+
+    Raises:
+        ValueError: Nếu thiếu dấu '=' hoặc tên tham số rỗng
+    """
+    key, sep, value = text.partition('=')
+    key = key.strip().lstrip('-')
+    if not sep or not key:
+        raise ValueError(f"Tham số không hợp lệ '{text}' (dùng key=value)")
+    return key, value
+
+
+def expand_grid(grid, queues, seeds, base_params=None, prefix='sweep'):
+    """
+    Mở rộng lưới tham số thành danh sách job
+
+    Mỗi tổ hợp (tham số × hàng đợi × seed) là một lần chạy ns-3 với prefix
+    riêng, vd "sweep-0007".
+
+    Args:
+        grid (dict): {tên tham số: [giá trị]} (thứ tự key được giữ nguyên)
+        queues (list): Các loại hàng đợi (queueType)
+        seeds (list): Các run id của RngSeedManager (--run)
+        base_params (dict): Tham số cố định cho mọi job
+        prefix (str): Prefix chung cho file kết quả
+
+    Returns:
+        list: Mỗi job là dict (index, prefix, queue, seed, point, params)
+    """
+    base_params = dict(base_params or {})
+    keys = list(grid.keys())
+    points = [dict(zip(keys, combo)) for combo in itertools.product(*(grid[k] for k in keys))]
+
+    jobs = []
+    for point in points:
+        for queue in queues:
+            for seed in seeds:
+                index = len(jobs)
+                params = dict(base_params)
+                params.update(point)
+                params['queueType'] = queue
+                params['run'] = str(seed)
+                jobs.append({
+                    'index': index,
+                    'prefix': f"{prefix}-{index:04d}",
+                    'queue': queue,
+                    'seed': int(seed),
+                    'point': point,
+                    'params': params,
+                })
+    return jobs
@@ -0,0 +1,99 @@
+"""
+Append-only sweep job journal
+Ghi lại trạng thái từng job để tiếp tục sweep sau khi bị gián đoạn
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+
+JOURNAL_NAME = 'sweep_journal.jsonl'
+
+# Trạng thái cuối cùng của một job (queued/running chỉ là trạng thái trung gian)
+FINAL_STATES = {'done', 'failed', 'cancelled'}
+
+
+class Journal:
+    """
+    Journal dạng JSON Lines, chỉ ghi thêm (append-only)
+
+    Dòng đầu là spec của sweep (grid, queues, seeds, base params), mỗi dòng sau
+    là một lần đổi trạng thái của một job. Mỗi dòng được fsync ngay nên khi
+    máy hoặc GUI chết giữa chừng, journal vẫn phản ánh đúng các job đã xong.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path (str|Path): File journal (thường là <sweep>/sweep_journal.jsonl)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a')
+
+    def append(self, event, **fields):
+        """Ghi một record và fsync"""
+        record = {'t': round(time.time(), 3), 'event': event}
+        record.update(fields)
+        line = json.dumps(record, separators=(',', ':')) + '\n'
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def job(self, entry, state, **fields):
+        """Ghi trạng thái mới của một job"""
+        self.append('job', prefix=entry['prefix'], state=state, **fields)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+def replay(path):
+    """
+    Đọc lại journal
+
+    Dòng cuối có thể bị ghi dở nếu tiến trình chết giữa chừng, dòng hỏng được bỏ qua.
+
+    Args:
+        path (str|Path): File journal
+
+    Returns:
+        tuple: (spec dict hoặc None, {prefix: record mới nhất của job})
+    """
+    spec = None
+    jobs = {}
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get('event') == 'sweep' and spec is None:
+                spec = record
+            elif record.get('event') == 'job':
+                jobs[record['prefix']] = record
+    return spec, jobs
+
+
+def resumable_results(records, retry_failed=False):
+    """
+    Chọn các job không cần chạy lại khi resume
+
+    Job 'done' luôn được giữ; job 'failed' được giữ trừ khi retry_failed.
+    Job đang 'queued'/'running'/'cancelled' lúc bị gián đoạn sẽ chạy lại.
+
+    Args:
+        records (dict): {prefix: record} từ replay()
+        retry_failed (bool): Chạy lại cả các job thất bại
+
+    Returns:
+        dict: {prefix: record} của các job được giữ nguyên kết quả
+    """
+    keep = {'done'} if retry_failed else {'done', 'failed'}
+    return {prefix: r for prefix, r in records.items() if r.get('state') in keep}
@@ -0,0 +1,358 @@
+"""
+Parallel ns-3 sweep runner
+Chạy các job mô phỏng song song trên một pool giới hạn số worker
+"""
+
+import json
+import os
+import re
+import shlex
+import signal
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+
+
+# Chương trình ns-3 (đường dẫn tương đối trong thư mục ns-3)
+PROGRAM = 'scratch/tcp_reno_project/tcp_reno'
+
+MANIFEST_NAME = 'sweep_manifest.json'
+
+# Các trường kết quả của job (ghi vào manifest và journal)
+RESULT_FIELDS = ('status', 'returncode', 'elapsed', 'log', 'error', 'cached', 'stop_time', 'converged')
+
+# Dòng thời điểm dừng trong summary file, vd "Stop Time: 14.000 s (converged)"
+_STOP_TIME = re.compile(r'Stop Time:\s+([\d.]+)\s+s\s+\(([\w ]+)\)')
+
+
+def default_workers():
+    """Số worker mặc định: số core khả dụng của tiến trình"""
+    try:
+        return max(1, len(os.sched_getaffinity(0)))
+    except AttributeError:
+        return max(1, os.cpu_count() or 1)
+
+
+def ns3_command(ns3_dir, params, no_build=True):
+    """
+    Tạo lệnh chạy ns-3 cho một bộ tham số
+
+    Gọi script ./ns3 bằng Python hiện tại để chạy giống nhau trên mọi OS. Chương trình
+    và các option được truyền cho ./ns3 run như một chuỗi (./ns3 tách lại bằng shlex), nên
+    mỗi option được quote để giá trị có dấu cách hoặc ký tự đặc biệt không bị tách.
+
+    Args:
+        ns3_dir (Path): Thư mục gốc ns-3
+        params (dict): {tên option simulator: giá trị}
+        no_build (bool): Thêm --no-build (đã build một lần trước khi sweep)
+
+    Returns:
+        list: argv cho subprocess
+    """
+    args = ' '.join(shlex.quote(f"--{key}={value}") for key, value in params.items())
+    cmd = [sys.executable, str(Path(ns3_dir) / 'ns3'), 'run']
+    if no_build:
+        cmd.append('--no-build')
+    cmd.append(f"{PROGRAM} {args}")
+    return cmd
+
+
+def build_ns3(ns3_dir):
+    """
+    Build ns-3 một lần trước khi chạy song song
+
+    Các job sau đó dùng --no-build nên không tranh chấp lock của hệ thống build.
+
+    Returns:
+        tuple: (thành công, output)
+    """
+    result = subprocess.run([sys.executable, str(Path(ns3_dir) / 'ns3'), 'build'],
+                            cwd=str(ns3_dir), stdout=subprocess.PIPE,
+                            stderr=subprocess.STDOUT, text=True)
+    return result.returncode == 0, result.stdout
+
+
+def job_params(job, out_dir):
+    """Tham số đầy đủ của job: thêm thư mục kết quả, prefix, tắt realtime plot"""
+    params = dict(job['params'])
+    params['results_dir'] = str(Path(out_dir).resolve()) + '/'
+    params['prefix_file_name'] = job['prefix']
+    params['realtime_plot'] = 'false'
+    return params
+
+
+def _tail(path, lines=5):
+    """Vài dòng cuối của file log (để ghi lỗi vào manifest)"""
+    try:
+        with open(path, 'r', errors='replace') as f:
+            return ''.join(f.readlines()[-lines:]).strip()
+    except OSError:
+        return ''
+
+
+def _terminate(process):
+    """
+    Dừng tiến trình ns-3 cùng các tiến trình con của nó
+
+    ./ns3 run là wrapper Python chạy binary mô phỏng như tiến trình con, nên trên
+    POSIX mỗi job có process group riêng và cả group bị dừng.
+    """
+    try:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGTERM)
+        else:
+            process.terminate()
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        if os.name == 'posix':
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+    return process.wait()
+
+
+def stop_info(job, out_dir):
+    """
+    Thời điểm dừng thực tế của một job từ summary file (--convergenceStop có thể dừng trước --duration)
+
+    Returns:
+        dict: {'stop_time' (s), 'converged' (bool)}; cả hai là None khi không có summary
+              hoặc summary không ghi Stop Time (simulator cũ)
+    """
+    for path in Path(out_dir).glob(f"{job['prefix']}_*_summary_{job['queue']}.txt"):
+        match = _STOP_TIME.search(path.read_text(errors='replace'))
+        if match:
+            return {'stop_time': float(match.group(1)), 'converged': match.group(2) == 'converged'}
+    return {'stop_time': None, 'converged': None}
+
+
+def clear_job_outputs(job, out_dir):
+    """Xóa output dở dang của một job (vd job đang chạy khi sweep bị gián đoạn)"""
+    for path in Path(out_dir).glob(f"{job['prefix']}_*"):
+        if path.is_file():
+            path.unlink()
+
+
+def run_job(job, ns3_dir, out_dir, stop_event=None, timeout=None):
+    """
+    Chạy một job ns-3, ghi stdout/stderr vào logs/<prefix>.log
+
+    Args:
+        job (dict): Job từ expand_grid()
+        ns3_dir (Path): Thư mục gốc ns-3
+        out_dir (Path): Thư mục kết quả của sweep
+        stop_event (threading.Event): Khi được set, job đang chạy bị dừng
+        timeout (float): Thời gian chạy tối đa của job (giây), None = không giới hạn
+
+    Returns:
+        dict: Kết quả (status, returncode, elapsed, log, error)
+    """
+    log_dir = Path(out_dir) / 'logs'
+    log_path = log_dir / f"{job['prefix']}.log"
+    cmd = ns3_command(ns3_dir, job_params(job, out_dir))
+    clear_job_outputs(job, out_dir)
+
+    start = time.time()
+    timed_out = False
+    with open(log_path, 'w') as log:
+        log.write(f"# {' '.join(cmd)}\n")
+        log.flush()
+        try:
+            process = subprocess.Popen(cmd, cwd=str(ns3_dir), stdout=log,
+                                       stderr=subprocess.STDOUT,
+                                       start_new_session=(os.name == 'posix'))
+        except OSError as e:
+            return {'status': 'failed', 'returncode': None, 'elapsed': 0.0,
+                    'log': str(log_path), 'error': str(e)}
+
+        while True:
+            try:
+                returncode = process.wait(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                if stop_event is not None and stop_event.is_set():
+                    returncode = _terminate(process)
+                    break
+                if timeout and time.time() - start > timeout:
+                    timed_out = True
+                    returncode = _terminate(process)
+                    break
+
+    elapsed = time.time() - start
+    result = {'status': 'done', 'returncode': returncode, 'elapsed': round(elapsed, 3),
+              'log': str(log_path), 'error': ''}
+
+    if timed_out:
+        result['status'] = 'failed'
+        result['error'] = f"Timed out after {timeout:g}s"
+    elif stop_event is not None and stop_event.is_set() and returncode != 0:
+        result['status'] = 'cancelled'
+    elif returncode != 0:
+        result['status'] = 'failed'
+        result['error'] = _tail(log_path)
+    elif not list(Path(out_dir).glob(f"{job['prefix']}_*_summary_{job['queue']}.txt")):
+        result['status'] = 'failed'
+        result['error'] = 'Simulator exited without writing a summary file'
+    return result
+
+
+def write_manifest(out_dir, manifest):
+    """Ghi manifest (ghi file tạm rồi đổi tên để không bị hỏng khi dừng giữa chừng)"""
+    path = Path(out_dir) / MANIFEST_NAME
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+    return path
+
+
+def run_sweep(jobs, ns3_dir, out_dir, workers=None, stop_event=None,
+              manifest_extra=None, build=True, cache=None, journal=None,
+              previous=None, timeout=None):
+    """
+    Chạy toàn bộ job trên ThreadPoolExecutor với tối đa `workers` ns-3 song song
+
+    Mỗi thread chỉ chờ một tiến trình ns-3 nên thread là đủ, phần tính toán
+    nằm ở các tiến trình con. Manifest được cập nhật sau mỗi job.
+
+    Args:
+        jobs (list): Danh sách job từ expand_grid()
+        ns3_dir (Path): Thư mục gốc ns-3
+        out_dir (Path): Thư mục kết quả của sweep
+        workers (int): Số job chạy đồng thời (mặc định: số core)
+        stop_event (threading.Event): Dừng sweep (job chưa chạy được bỏ qua)
+        manifest_extra (dict): Thông tin thêm cho manifest (grid, base params, ...)
+        build (bool): Build ns-3 một lần trước khi chạy
+        cache (SimCache): Cache kết quả; job đã có trong cache không chạy lại ns-3
+        journal (Journal): Journal ghi trạng thái từng job (để resume)
+        previous (dict): {prefix: record journal} của các job giữ nguyên kết quả (resume)
+        timeout (float): Thời gian chạy tối đa mỗi job (giây)
+
+    Returns:
+        dict: Manifest cuối cùng
+    """
+    out_dir = Path(out_dir)
+    (out_dir / 'logs').mkdir(parents=True, exist_ok=True)
+    workers = workers or default_workers()
+    stop_event = stop_event or threading.Event()
+    previous = previous or {}
+
+    manifest = dict(manifest_extra or {})
+    manifest.update({
+        'ns3_dir': str(ns3_dir),
+        'workers': workers,
+        'timeout': timeout,
+        'started': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'jobs': [dict(job, status='queued') for job in jobs],
+    })
+
+    # Resume: giữ nguyên kết quả các job đã xong trong lần chạy trước
+    for entry in manifest['jobs']:
+        record = previous.get(entry['prefix'])
+        if record is not None:
+            entry.update({k: record.get(k) for k in RESULT_FIELDS})
+            entry['status'] = record['state']
+            entry['resumed'] = True
+    pending = [e for e in manifest['jobs'] if e['status'] == 'queued']
+    write_manifest(out_dir, manifest)
+
+    if journal is not None:
+        for entry in pending:
+            journal.job(entry, 'queued')
+
+    if cache is not None:
+        for entry in pending:
+            entry['cache_key'] = cache.key(entry['params'])
+        misses = sum(1 for e in pending if cache.lookup(e['cache_key']) is None)
+        print(f"♻️  Cache: {len(pending) - misses}/{len(pending)} jobs đã có kết quả")
+        build = build and misses > 0
+    elif not pending:
+        build = False
+
+    if build:
+        print("🔨 Building ns-3 (một lần cho cả sweep)...")
+        ok, output = build_ns3(ns3_dir)
+        if not ok:
+            print(output[-2000:])
+            print("❌ Build ns-3 thất bại, dừng sweep")
+            manifest['finished'] = time.strftime('%Y-%m-%d %H:%M:%S')
+            manifest['error'] = 'ns-3 build failed'
+            write_manifest(out_dir, manifest)
+            return manifest
+
+    if previous:
+        print(f"⏯️  Resume: {len(jobs) - len(pending)} jobs giữ nguyên, {len(pending)} jobs còn lại")
+    print(f"🚀 Chạy {len(pending)} jobs với {workers} worker(s)...")
+    lock = threading.Lock()
+    sweep_start = time.time()
+    finished = 0
+
+    def _run(entry):
+        if stop_event.is_set():
+            return entry, {'status': 'cancelled', 'returncode': None, 'elapsed': 0.0,
+                           'log': '', 'error': ''}
+        if cache is not None and cache.lookup(entry['cache_key']) is not None:
+            clear_job_outputs(entry, out_dir)
+        if cache is not None and cache.restore(entry['cache_key'], out_dir, entry['prefix']):
+            return entry, dict({'status': 'done', 'returncode': 0, 'elapsed': 0.0,
+                                'log': '', 'error': '', 'cached': True}, **stop_info(entry, out_dir))
+        with lock:
+            entry['status'] = 'running'
+        if journal is not None:
+            journal.job(entry, 'running')
+        result = run_job(entry, ns3_dir, out_dir, stop_event, timeout)
+        result['cached'] = False
+        if result['status'] == 'done':
+            result.update(stop_info(entry, out_dir))
+        if cache is not None and result['status'] == 'done':
+            cache.store(entry['cache_key'], entry['params'],
+                        Path(out_dir).glob(f"{entry['prefix']}_*"), entry['prefix'])
+        return entry, result
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_run, entry) for entry in pending]
+        for future in as_completed(futures):
+            entry, result = future.result()
+            with lock:
+                entry.update(result)
+                finished += 1
+                write_manifest(out_dir, manifest)
+            if journal is not None:
+                journal.job(entry, entry['status'],
+                            **{k: entry.get(k) for k in RESULT_FIELDS if k != 'status'})
+            emoji = {'done': '✅', 'failed': '❌', 'cancelled': '⏹️'}[entry['status']]
+            timing = 'cache hit' if entry.get('cached') else f"{entry['elapsed']:.1f}s"
+            if entry.get('converged'):
+                timing += f", converged @ {entry['stop_time']:g}s"
+            print(f"   {'♻️' if entry.get('cached') else emoji} [{finished}/{len(pending)}] "
+                  f"{entry['prefix']} {entry['queue']} run={entry['seed']} {entry['point']} "
+                  f"({timing})", flush=True)
+            if entry['status'] == 'failed' and entry['error']:
+                print(f"      {entry['error'].splitlines()[-1]}", flush=True)
+
+    manifest['finished'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    manifest['elapsed'] = round(time.time() - sweep_start, 3)
+    write_manifest(out_dir, manifest)
+
+    if cache is not None:
+        removed = cache.evict()
+        if removed:
+            print(f"🧹 Cache: đã xóa {removed} kết quả cũ (vượt budget)")
+    return manifest
+
+
+def summarize_manifest(manifest):
+    """Đếm số job theo trạng thái"""
+    counts = {}
+    for job in manifest.get('jobs', []):
+        counts[job['status']] = counts.get(job['status'], 0) + 1
+        if job.get('cached'):
+            counts['cached'] = counts.get('cached', 0) + 1
+        if job.get('converged'):
+            counts['converged'] = counts.get('converged', 0) + 1
+    return counts
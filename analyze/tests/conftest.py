@@ -0,0 +1,11 @@
+"""
+Cấu hình pytest: chạy từ thư mục analyze/ (python -m pytest tests) hoặc từ gốc project
+"""
+
+import sys
+from pathlib import Path
+
+# analyzer/ và sweep/ là package cấp cao nhất trong analyze/ (giống khi chạy main.py)
+ANALYZE_DIR = Path(__file__).resolve().parent.parent
+if str(ANALYZE_DIR) not in sys.path:
+    sys.path.insert(0, str(ANALYZE_DIR))
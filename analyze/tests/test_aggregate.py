@@ -0,0 +1,105 @@
+"""
+Tests cho analyzer/aggregate_utils.py: t-table, mean/CI, group_by
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from analyzer.aggregate_utils import (t_critical, mean_ci, parse_quantity,
+                                      sort_values, group_by, select_rows)
+
+
+def test_t_critical_table_values():
+    assert t_critical(1) == 12.706
+    assert t_critical(9) == 2.262
+    assert t_critical(30, 0.99) == 2.750
+    assert t_critical(4, 0.90) == 2.132
+    assert math.isnan(t_critical(0))
+
+
+def test_t_critical_large_df_interpolates():
+    assert t_critical(40) == pytest.approx(2.021)
+    assert t_critical(120) == pytest.approx(1.980)
+    assert 2.000 < t_critical(50) < 2.021
+    assert 1.980 < t_critical(100) < 2.000
+    assert t_critical(10 ** 6) == 1.960
+    assert t_critical(math.inf) == 1.960
+
+
+def test_t_critical_rejects_unknown_confidence():
+    with pytest.raises(ValueError):
+        t_critical(5, 0.975)
+
+
+def test_mean_ci():
+    values = [1.0, 2.0, 3.0, 4.0, np.nan]
+    result = mean_ci(values)
+    assert result['n'] == 4 and result['mean'] == 2.5
+    assert result['std'] == pytest.approx(np.std([1, 2, 3, 4], ddof=1))
+    assert result['ci'] == pytest.approx(3.182 * result['std'] / 2)
+
+    single = mean_ci([7.0])
+    assert single['n'] == 1 and single['mean'] == 7.0
+    assert math.isnan(single['std']) and math.isnan(single['ci'])
+    assert mean_ci([])['n'] == 0
+
+
+def test_parse_quantity_and_sort_values():
+    assert parse_quantity('5Mbps') == 5e6
+    assert parse_quantity('10ms') == pytest.approx(0.01)
+    assert parse_quantity('25') == 25.0
+    assert math.isnan(parse_quantity('DropTail'))
+    assert math.isnan(parse_quantity('5furlongs'))
+    assert sort_values(['10Mbps', 'RED', '5Mbps', '500kbps']) == ['500kbps', '5Mbps', '10Mbps', 'RED']
+
+
+def _table():
+    bandwidth = ['10Mbps', '5Mbps', '10Mbps', '5Mbps', '5Mbps', '10Mbps', '2Mbps']
+    queue = ['RED', 'RED', 'RED', 'RED', 'DropTail', 'DropTail', 'RED']
+    throughput = [9.0, 4.0, 8.0, 4.5, 3.0, np.nan, 1.5]
+    return {'columns': {'bw': np.array(bandwidth), 'queue': np.array(queue),
+                        'tput': np.array(throughput)},
+            'params': ['bw'], 'metrics': ['tput'], 'n': len(bandwidth)}
+
+
+def test_group_by_orders_numerically_and_matches_mean_ci():
+    grouped = group_by(_table(), ['bw'])
+    cols = grouped['columns']
+    assert list(cols['bw']) == ['2Mbps', '5Mbps', '10Mbps']
+    assert list(cols['tput_n']) == [1, 3, 2]  # nan bị bỏ qua
+    for k, values in enumerate([[1.5], [4.0, 4.5, 3.0], [9.0, 8.0]]):
+        expected = mean_ci(values)
+        assert cols['tput_mean'][k] == pytest.approx(expected['mean'])
+        if expected['n'] > 1:
+            assert cols['tput_std'][k] == pytest.approx(expected['std'])
+            assert cols['tput_ci'][k] == pytest.approx(expected['ci'])
+    # Nhóm chỉ có một giá trị: không có std/CI
+    assert math.isnan(cols['tput_std'][0]) and math.isnan(cols['tput_ci'][0])
+
+
+def test_group_by_multiple_keys_and_filter():
+    table = _table()
+    grouped = group_by(table, ['queue', 'bw'])
+    labels = list(zip(grouped['columns']['queue'], grouped['columns']['bw']))
+    assert labels == [('DropTail', '5Mbps'), ('DropTail', '10Mbps'),
+                      ('RED', '2Mbps'), ('RED', '5Mbps'), ('RED', '10Mbps')]
+    # Nhóm chỉ toàn nan
+    assert grouped['columns']['tput_n'][1] == 0 and math.isnan(grouped['columns']['tput_mean'][1])
+
+    red = select_rows(table, table['columns']['queue'] == 'RED')
+    assert red['n'] == 5
+    assert group_by(red, [])['columns']['tput_mean'][0] == pytest.approx(np.mean([9, 4, 8, 4.5, 1.5]))
+
+
+def test_group_by_constant_group_has_zero_std():
+    table = {'columns': {'k': np.array(['a'] * 3), 'm': np.array([0.1] * 3)},
+             'metrics': ['m'], 'n': 3}
+    grouped = group_by(table, ['k'])
+    assert grouped['columns']['m_std'][0] == 0.0 and grouped['columns']['m_ci'][0] == 0.0
+
+
+def test_group_by_unknown_column():
+    with pytest.raises(KeyError):
+        group_by(_table(), ['missing'])
@@ -0,0 +1,46 @@
+"""
+Tests cho analyzer/data_utils.py: bộ lọc trace và log bị cắt do xoay vòng
+"""
+
+from analyzer.data_utils import (DEFAULT_TRACE_FILTERS, parse_trace_filters, is_event_logged,
+                                 is_event_recorded, is_log_truncated, filter_label, event_count,
+                                 log_truncation_note)
+
+
+def _data(**filters):
+    return {'trace_filters': dict(DEFAULT_TRACE_FILTERS, **filters),
+            'events': [{'time': 4.5, 'event': 'DUP_ACK'}, {'time': 5.0, 'event': 'DUP_ACK'}],
+            'summary': {'dup_acks': 40, 'timeouts': 2}}
+
+
+def test_parse_trace_filters_header():
+    filters = parse_trace_filters("# filters: events=state,loss cwndSampleInterval=0.1 logRotateCount=0")
+    assert filters['events'] == 'state,loss' and filters['cwndSampleInterval'] == 0.1
+    assert filters['logRotateCount'] == 0 and filters['log_rotations'] == 0
+
+
+def test_rotations_within_kept_files_are_complete():
+    data = _data(log_rotations=3, logRotateCount=3)
+    assert not is_log_truncated(data['trace_filters'])
+    assert event_count(data, 'DUP_ACK') == 2
+    assert filter_label(data['trace_filters']) == '' and log_truncation_note(data) == ''
+
+
+def test_truncated_log_uses_summary_counters():
+    data = _data(log_rotations=5, logRotateCount=3)
+    assert is_log_truncated(data['trace_filters'])
+    assert is_event_recorded(data['trace_filters'], 'DUP_ACK')
+    assert not is_event_logged(data['trace_filters'], 'DUP_ACK')
+    assert event_count(data, 'DUP_ACK') == 40
+    # Không có counter trong summary: không xác định
+    assert event_count(data, 'NEW_ACK') is None
+    assert filter_label(data['trace_filters']) == 'log truncated (5 rotations)'
+    assert 't=4.50s' in log_truncation_note(data)
+
+
+def test_rotate_count_zero_truncates_on_first_rotation():
+    data = _data(events='state,loss', log_rotations=1, logRotateCount=0)
+    assert is_log_truncated(data['trace_filters'])
+    assert filter_label(data['trace_filters']) == 'events=state,loss | log truncated (1 rotations)'
+    assert not is_event_recorded(data['trace_filters'], 'TIMEOUT_EVENT')
+    assert event_count(data, 'TIMEOUT_EVENT') == 2
@@ -0,0 +1,41 @@
+"""
+Tests cho analyzer/ensemble_utils.py: lấy mẫu lại zero-order hold và envelope
+"""
+
+import numpy as np
+
+from analyzer.ensemble_utils import resample_step, build_ensemble, ensemble_envelope
+
+
+def test_resample_step_holds_previous_sample():
+    time = np.array([1.0, 2.0, 4.0])
+    values = np.array([10.0, 20.0, 5.0])
+    grid = np.array([0.0, 0.5, 1.0, 1.5, 2.0, 3.9, 4.0, 4.5])
+    out = resample_step(time, values, grid)
+    assert out.dtype == np.float32
+    # Trước mẫu đầu và sau mẫu cuối là nan, tại thời điểm mẫu lấy đúng giá trị mẫu
+    np.testing.assert_array_equal(out, [np.nan, np.nan, 10, 10, 20, 20, 5, np.nan])
+
+
+def test_resample_step_empty_trace():
+    assert np.isnan(resample_step(np.empty(0), np.empty(0), np.linspace(0, 1, 5))).all()
+
+
+def test_build_ensemble_and_envelope(tmp_path):
+    paths = []
+    for k, rows in enumerate([[(0.0, 1.0), (1.0, 3.0), (2.0, 3.0)],
+                              [(0.5, 2.0), (2.0, 4.0)]]):
+        path = tmp_path / f"run{k}_cwnd_trace_RED.txt"
+        path.write_text(''.join(f"{t} {c}\n" for t, c in rows))
+        paths.append(path)
+
+    ensemble = build_ensemble(paths, grid_points=5)
+    np.testing.assert_allclose(ensemble['grid'], [0.0, 0.5, 1.0, 1.5, 2.0])
+    np.testing.assert_array_equal(ensemble['matrix'], [[1, 1, 3, 3, 3],
+                                                       [np.nan, 2, 2, 2, 4]])
+
+    envelope = ensemble_envelope(ensemble, percentiles=(50,))
+    assert envelope['runs'] == 2
+    np.testing.assert_array_equal(envelope['count'], [1, 2, 2, 2, 2])
+    np.testing.assert_allclose(envelope['mean'], [1.0, 1.5, 2.5, 2.5, 3.5])
+    np.testing.assert_allclose(envelope['p50'], envelope['mean'])
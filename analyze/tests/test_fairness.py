@@ -0,0 +1,77 @@
+"""
+Tests cho analyzer/fairness_utils.py: Jain index, ma trận byte, cửa sổ trượt
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from analyzer.fairness_utils import (jain_index, byte_matrix, fairness_series,
+                                     fairness_summary, flow_jain_index)
+
+
+def test_jain_index_bounds():
+    assert jain_index([3.0, 3.0, 3.0, 3.0]) == pytest.approx(1.0)
+    assert jain_index([0.0, 5.0, 0.0, 0.0]) == pytest.approx(0.25)
+    assert jain_index([1.0, 2.0]) == pytest.approx(9 / 10)
+
+
+def test_jain_index_all_zero_and_empty():
+    assert np.isnan(jain_index([0.0, 0.0, 0.0]))
+    assert np.isnan(jain_index(np.empty(0)))
+
+
+def test_jain_index_mask_and_axis():
+    values = np.array([[1.0, 4.0, 0.0],
+                       [1.0, 0.0, 0.0],
+                       [0.0, 0.0, 0.0]])
+    mask = np.array([[True, True, False],
+                     [True, True, False],
+                     [False, True, False]])
+    # Theo cột: cột 0 có 2 flow bằng nhau, cột 1 chỉ một flow khác 0 trong 3, cột 2 không có flow nào
+    result = jain_index(values, axis=0, mask=mask)
+    np.testing.assert_allclose(result, [1.0, 1 / 3, np.nan])
+    # Phần tử bị che không được tính dù có giá trị
+    assert jain_index([2.0, 2.0, 100.0], mask=np.array([True, True, False])) == pytest.approx(1.0)
+
+
+def test_flow_jain_index_needs_two_flows():
+    assert flow_jain_index([{'throughput': 1.0}, {'throughput': 3.0}]) == pytest.approx(0.8)
+    assert math.isnan(flow_jain_index([{'throughput': 1.0}]))
+
+
+def _flow_bytes():
+    times = np.arange(5.0)
+    return {0: {'time': times, 'bytes': np.array([1, 125001, 250001, 375001, 500001.0])},
+            # flow 1 bắt đầu lúc 2-3s và bị thiếu mẫu cuối
+            1: {'time': times[:4], 'bytes': np.array([0, 0, 0, 125000.0])},
+            2: {'time': np.empty(0), 'bytes': np.empty(0)}}
+
+
+def test_byte_matrix_holds_missing_samples():
+    flow_ids, times, cumulative = byte_matrix(_flow_bytes())
+    assert flow_ids == [0, 1]
+    np.testing.assert_array_equal(times, np.arange(5.0))
+    np.testing.assert_array_equal(cumulative[1], [0, 0, 0, 125000, 125000])
+
+
+def test_fairness_series_counts_started_flows_only():
+    flow_bytes = _flow_bytes()
+    flow_bytes[1] = {'time': np.arange(5.0), 'bytes': np.array([0, 0, 0, 125000, 187500.0])}
+    series = fairness_series(flow_bytes, capacity_mbps=2.0, window=1.0)
+    columns = series['columns']
+    assert series['n'] == 4
+    np.testing.assert_array_equal(columns['time'], [1, 2, 3, 4])
+    np.testing.assert_array_equal(columns['active'], [1, 1, 1, 2])
+    np.testing.assert_allclose(series['rate'], [[1, 1, 1, 1], [0, 0, 1, 0.5]])
+    # Flow 1 chưa bắt đầu ở đầu cửa sổ 2-3s nên không được tính
+    np.testing.assert_allclose(columns['jain'], [1, 1, 1, 0.9])
+    np.testing.assert_allclose(columns['utilization'], [0.5, 0.5, 1.0, 0.75])
+    np.testing.assert_allclose(series['share'][1], [np.nan, np.nan, np.nan, 0.25])
+
+    summary = fairness_summary(series)
+    assert summary['jain_mean'] == pytest.approx(0.9)
+    assert summary['unfair_time'] == 0.0
+    assert summary['jain_overall'] == pytest.approx(0.9)
+    np.testing.assert_allclose(summary['share'], [0.5, 0.25])
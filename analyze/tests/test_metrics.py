@@ -0,0 +1,98 @@
+"""
+Tests cho analyzer/metrics_utils.py: RunMetrics trên dữ liệu tổng hợp
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from analyzer.data_utils import count_events
+from analyzer.metrics_utils import RunMetrics
+
+
+def _data(**extra):
+    rng = np.random.default_rng(1)
+    time = np.arange(200) * 0.05
+    events = [{'time': 0.5, 'event': 'DUP_ACK'}, {'time': 1.2, 'event': 'TRIPLE_DUP_ACK'},
+              {'time': 1.3, 'event': 'DUP_ACK'}, {'time': 7.9, 'event': 'TIMEOUT_EVENT'},
+              {'time': 9.9, 'event': 'DUP_ACK'}]
+    data = {'time': time, 'cwnd': rng.uniform(1, 50, len(time)), 'events': events,
+            'summary': {'timeouts': 4, 'dup_acks': 99}, 'trace_filters': {}}
+    data.update(extra)
+    return data
+
+
+@pytest.mark.parametrize('p', [0, 10, 25, 50, 90, 99, 100])
+def test_cwnd_percentile_matches_numpy(p):
+    metrics = RunMetrics(_data())
+    assert metrics.cwnd_percentile(p) == pytest.approx(np.percentile(metrics.cwnd, p))
+
+
+def test_cwnd_basic_stats():
+    data = _data()
+    metrics = RunMetrics(data)
+    assert metrics.cwnd_median == pytest.approx(np.median(data['cwnd']))
+    assert metrics.cwnd_min == data['cwnd'].min() and metrics.cwnd_max == data['cwnd'].max()
+    assert metrics.cwnd_mean == pytest.approx(np.mean(data['cwnd']))
+    variation = np.abs(np.diff(data['cwnd'])).mean() / np.mean(data['cwnd'])
+    assert metrics.stability == pytest.approx(max(0.0, 100 - variation * 100))
+
+
+def test_empty_and_constant_cwnd():
+    empty = RunMetrics(_data(time=[], cwnd=[]))
+    assert math.isnan(empty.cwnd_median) and math.isnan(empty.cwnd_max)
+    assert empty.stability == 0.0
+    constant = RunMetrics(_data(time=[0.0, 1.0, 2.0], cwnd=[8.0, 8.0, 8.0]))
+    assert constant.stability == 100.0
+
+
+def test_event_counts_times_and_bins():
+    data = _data()
+    metrics = RunMetrics(data)
+    assert metrics.event_counts == count_events(data['events'])
+    np.testing.assert_array_equal(metrics.event_times('DUP_ACK'), [0.5, 1.3, 9.9])
+    assert len(metrics.event_times('NEW_ACK')) == 0
+    assert metrics.event('DUP_ACK') == 3
+
+    bins = metrics.event_bins(5, 10.0)
+    assert bins.shape == (len(metrics.event_kinds), 5)
+    row = metrics.event_kinds.index('DUP_ACK')
+    assert bins[row].tolist() == [2, 0, 0, 0, 1]
+    assert bins.sum() == len(data['events'])
+
+
+def test_event_uses_summary_counter_when_filtered():
+    # Log chỉ giữ sự kiện 'state': số đếm loss/rto lấy từ summary
+    metrics = RunMetrics(_data(trace_filters={'events': 'state'}))
+    assert metrics.event('DUP_ACK') == 99
+    assert metrics.event('TIMEOUT_EVENT') == 4
+    assert metrics.event('TRIPLE_DUP_ACK') is None
+
+
+def test_steady_metrics_count_from_cut():
+    # Segment 2000 gửi lúc 0.01s, truyền lại lúc 0.5s (sau điểm cắt 0.3s)
+    tx = np.array([(0.0, 1000, 1000), (0.01, 2000, 1000), (0.02, 3000, 1000),
+                   (0.5, 2000, 1000), (0.71, 4000, 1000)])
+    ack = np.array([(0.0, 1000), (0.06, 2000), (0.7, 4000), (0.8, 5000)])
+    full = RunMetrics(_data(trace_filters={'events': 'state'}))
+    full.segments = (tx, ack)
+    steady = RunMetrics(dict(full.data, warmup_cut=0.3), full=full)
+    tracker = steady.retransmissions(0.1)
+    # Vẫn nhận ra lần truyền lại dù lần gửi gốc nằm trước điểm cắt
+    assert tracker.sent_bytes == 2000 and tracker.retx_bytes == 1000 and tracker.acked_bytes == 3000
+    assert full.retransmissions(0.1).acked_bytes == 4000
+    samples = steady.rtt['samples']
+    assert samples['n'] == 1 and samples['karn_discarded'] == 1
+    np.testing.assert_allclose(samples['columns']['rtt'], [0.09])
+    # Counter của summary là của cả lần chạy: không dùng cho phần sau warm-up
+    assert full.event('DUP_ACK') == 99 and steady.event('DUP_ACK') is None
+
+
+def test_cwnd_at_nearest_sample():
+    metrics = RunMetrics(_data(time=[0.0, 1.0, 3.0], cwnd=[1.0, 2.0, 3.0]))
+    result = metrics.cwnd_at([-1.0, 0.4, 0.6, 1.9, 2.1, 10.0])
+    np.testing.assert_array_equal(result, [1, 1, 2, 2, 3, 3])
+    # Cách đều hai mẫu: lấy mẫu phía trước
+    assert metrics.cwnd_at([0.5])[0] == 1.0
+    assert len(metrics.cwnd_at([])) == 0
@@ -0,0 +1,73 @@
+"""
+Tests cho analyzer/rtt_utils.py: mẫu RTT theo luật Karn, RTO, timeout giả
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from analyzer.rtt_utils import RttTracker, rtt_samples, rtt_stats, rto_series, spurious_timeouts
+
+# time/seq/size: segment 2000 bị truyền lại lúc 0.5s
+TX = np.array([(0.0, 1000, 1000), (0.01, 2000, 1000), (0.02, 3000, 1000),
+               (0.5, 2000, 1000), (0.71, 4000, 1000)])
+# time/ack: ACK đầu là mốc (không tăng)
+ACK = np.array([(0.0, 1000), (0.06, 2000), (0.7, 4000), (0.8, 5000)])
+
+
+def test_rtt_samples_karn():
+    samples = rtt_samples(TX, ACK)
+    # ACK 4000 xác nhận segment đã truyền lại: bị loại theo luật Karn
+    assert samples['n'] == 2 and samples['acks'] == 3 and samples['karn_discarded'] == 1
+    np.testing.assert_allclose(samples['columns']['rtt'], [0.06, 0.09])
+    np.testing.assert_allclose(samples['columns']['time'], [0.06, 0.8])
+    np.testing.assert_array_equal(samples['columns']['seq'], [2000, 5000])
+
+
+def test_rtt_samples_sequence_wrap():
+    # Cùng luồng gói nhưng số thứ tự vượt qua 2^32
+    shift = 2 ** 32 - 2500
+    tx, ack = TX.copy(), ACK.copy()
+    tx[:, 1] = (tx[:, 1] + shift) % 2 ** 32
+    ack[:, 1] = (ack[:, 1] + shift) % 2 ** 32
+    samples = rtt_samples(tx, ack)
+    np.testing.assert_allclose(samples['columns']['rtt'], [0.06, 0.09])
+    assert samples['karn_discarded'] == 1
+
+
+def test_rtt_tracker_chunked_matches_batch():
+    batch = rtt_samples(TX, ACK)
+    # Khối đầu chỉ có ACK mốc (chưa có TX-DATA): ACK được giữ tới khối sau
+    chunks = [(TX[:0], ACK[:1]), (TX[:2], ACK[1:2]), (TX[2:4], ACK[2:3]), (TX[4:], ACK[3:])]
+    tracker = RttTracker()
+    rtt = np.concatenate([tracker.update(tx, ack)['rtt'] for tx, ack in chunks])
+    np.testing.assert_allclose(rtt, batch['columns']['rtt'])
+    assert (tracker.n, tracker.acks, tracker.karn_discarded) == (2, 3, 1)
+    # Mọi segment đã được ACK: cửa sổ rỗng
+    assert len(tracker._end) == 0
+
+
+def test_rtt_samples_empty_and_stats():
+    assert rtt_samples(np.empty((0, 3)), ACK)['n'] == 0
+    stats = rtt_stats(rtt_samples(TX, ACK))
+    assert stats['min'] == pytest.approx(0.06) and stats['max'] == pytest.approx(0.09)
+    assert stats['queueing'] == pytest.approx(stats['p50'] - stats['min'])
+    assert math.isnan(rtt_stats(rtt_samples(TX[:0], ACK))['p99'])
+
+
+def test_rto_series_units():
+    changes = [{'time': 1.0, 'detail': 'oldRTO=+1s newRTO=+2s'},
+               {'time': 1.5, 'detail': 'no rto here'},
+               {'time': 3.0, 'detail': 'oldRTO=+2s newRTO=+200ms'}]
+    times, rto = rto_series(changes)
+    np.testing.assert_array_equal(times, [1.0, 1.0, 3.0])
+    np.testing.assert_allclose(rto, [1.0, 2.0, 0.2])
+
+
+def test_spurious_timeouts():
+    # Truyền lại lúc 0.5s được xác nhận lúc 0.7s: giả nếu RTT tối thiểu lớn hơn 0.2s
+    assert spurious_timeouts([0.5], TX, ACK, min_rtt=0.06).tolist() == [False]
+    assert spurious_timeouts([0.5], TX, ACK, min_rtt=0.3).tolist() == [True]
+    # Không có lần truyền lại nào sau timeout
+    assert spurious_timeouts([0.9], TX, ACK, min_rtt=0.3).tolist() == [False]
@@ -0,0 +1,100 @@
+"""
+Tests cho analyzer/stream_utils.py: gộp moment (Welford/Chan), t-digest, histogram
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from analyzer.stream_utils import (RunningStats, TDigest, FixedHistogram, StreamSummary,
+                                   summarize_trace)
+
+
+def _rank_error(values, estimate, q):
+    """|tỉ lệ giá trị <= estimate - q| trên dữ liệu đầy đủ"""
+    ordered = np.sort(values)
+    return abs(np.searchsorted(ordered, estimate, side='right') / len(ordered) - q)
+
+
+def test_running_stats_chunked_matches_numpy():
+    values = np.random.default_rng(0).normal(1e6, 3.0, 10_001)
+    stats = RunningStats()
+    for chunk in np.array_split(values, 7):
+        stats.update(chunk)
+    assert stats.count == len(values)
+    assert stats.mean == pytest.approx(np.mean(values), rel=1e-12)
+    assert stats.variance == pytest.approx(np.var(values), rel=1e-9)
+    assert stats.min == values.min() and stats.max == values.max()
+
+
+def test_running_stats_merge_and_nan():
+    rng = np.random.default_rng(1)
+    a, b = rng.exponential(2.0, 500), rng.exponential(5.0, 1500)
+    left = RunningStats().update(np.r_[a, np.nan])
+    right = RunningStats().update(b)
+    merged = left.merge(right).merge(RunningStats())
+    both = np.r_[a, b]
+    assert merged.count == len(both)
+    assert merged.mean == pytest.approx(both.mean())
+    assert merged.std == pytest.approx(both.std())
+    assert math.isnan(RunningStats().std)
+
+
+def test_running_stats_weighted():
+    values, weights = np.array([1.0, 2.0, 4.0]), np.array([3.0, 0.0, 1.0])
+    stats = RunningStats().update(values, weights)
+    mean = np.average(values, weights=weights)
+    assert stats.count == 4 and stats.mean == pytest.approx(mean)
+    assert stats.variance == pytest.approx(np.average((values - mean) ** 2, weights=weights))
+    # Trọng số 0 không ảnh hưởng min/max
+    assert stats.max == 4.0 and stats.min == 1.0
+
+
+@pytest.mark.parametrize('q', [0.01, 0.5, 0.99])
+def test_tdigest_rank_error(q):
+    values = np.random.default_rng(2).lognormal(0.0, 1.0, 100_000)
+    digest = TDigest(buffer_size=4096)
+    for chunk in np.array_split(values, 50):
+        digest.update(chunk)
+    assert digest.count == len(values)
+    assert _rank_error(values, digest.quantile(q), q) < 0.005
+    assert digest.quantile(0) == values.min() and digest.quantile(1) == values.max()
+
+
+def test_tdigest_merge_and_cdf():
+    rng = np.random.default_rng(3)
+    a, b = rng.normal(0, 1, 60_000), rng.normal(3, 1, 40_000)
+    merged = TDigest().update(a).merge(TDigest().update(b))
+    both = np.r_[a, b]
+    for q in (0.01, 0.5, 0.99):
+        assert _rank_error(both, merged.quantile(q), q) < 0.005
+    assert merged.cdf(np.median(both)) == pytest.approx(0.5, abs=0.005)
+    # Số centroid bị chặn theo compression, không theo số mẫu
+    assert len(merged.means) < 2 * merged.compression
+    assert math.isnan(TDigest().quantile(0.5))
+
+
+def test_fixed_histogram_grow_and_merge():
+    left = FixedHistogram(1.0).update([0.5, 2.2, 2.9])
+    right = FixedHistogram(1.0).update([-1.5, 5.0])
+    left.merge(right)
+    assert left.offset == -2
+    np.testing.assert_array_equal(left.counts, [1, 0, 1, 0, 2, 0, 0, 1])
+    np.testing.assert_array_equal(left.edges, np.arange(-2, 7))
+    with pytest.raises(ValueError):
+        left.merge(FixedHistogram(0.5))
+
+
+def test_summarize_trace_chunks(tmp_path):
+    rng = np.random.default_rng(4)
+    time, cwnd = np.arange(1000) * 0.01, rng.uniform(1, 60, 1000)
+    path = tmp_path / 'run_cwnd_trace_RED.tr'
+    np.savetxt(path, np.c_[time, cwnd], fmt='%.6f')
+    summary = summarize_trace(path, chunk_lines=97)
+    assert isinstance(summary, StreamSummary)
+    row = summary.as_dict()
+    assert row['count'] == 1000
+    assert row['mean'] == pytest.approx(cwnd.mean(), abs=1e-6)
+    assert summary.histogram.counts.sum() == 1000
+    assert _rank_error(np.round(cwnd, 6), row['p50'], 0.5) < 0.005
@@ -0,0 +1,63 @@
+"""
+Tests cho sweep/grid.py và lệnh ns-3 của sweep/runner.py
+"""
+
+import shlex
+
+import pytest
+
+from sweep.grid import parse_values, parse_assignment, parse_setting, expand_grid
+from sweep.runner import ns3_command, PROGRAM
+
+
+def test_parse_values_list_and_ranges():
+    assert parse_values("2Mbps, 5Mbps,,10Mbps") == ['2Mbps', '5Mbps', '10Mbps']
+    assert parse_values("1-5") == ['1', '2', '3', '4', '5']
+    assert parse_values("10-50:10") == ['10', '20', '30', '40', '50']
+    assert parse_values("1-3,7") == ['1', '2', '3', '7']
+
+
+def test_parse_values_keeps_non_ranges():
+    # Dấu '-' không nằm giữa hai số nguyên: giữ nguyên giá trị
+    assert parse_values("-1,1e-3,a-b") == ['-1', '1e-3', 'a-b']
+
+
+def test_parse_assignment():
+    assert parse_assignment("--tcp_queue_size=10-30:10") == ('tcp_queue_size', ['10', '20', '30'])
+    with pytest.raises(ValueError):
+        parse_assignment("tcp_queue_size")
+    with pytest.raises(ValueError):
+        parse_assignment("tcp_queue_size=")
+
+
+def test_parse_setting_keeps_raw_value():
+    assert parse_setting("logEvents=state,loss,rto") == ('logEvents', 'state,loss,rto')
+    assert parse_setting("--s_delay_spread=1 ms") == ('s_delay_spread', '1 ms')
+    # Chỉ tách ở dấu '=' đầu tiên
+    assert parse_setting("note=a=b") == ('note', 'a=b')
+
+
+@pytest.mark.parametrize('text', ['numFlows', '=3', '  =3', '--=3'])
+def test_parse_setting_rejects_missing_key_or_equals(text):
+    with pytest.raises(ValueError):
+        parse_setting(text)
+
+
+def test_expand_grid_order_and_params():
+    grid = {'bw': ['2Mbps', '5Mbps'], 'q': ['10', '20']}
+    jobs = expand_grid(grid, ['DropTail', 'RED'], ['1', '2'], {'numFlows': '4'}, prefix='s')
+    assert len(jobs) == 2 * 2 * 2 * 2
+    assert [j['index'] for j in jobs] == list(range(len(jobs)))
+    assert jobs[0]['prefix'] == 's-0000' and jobs[-1]['prefix'] == 's-0015'
+    first = jobs[0]
+    assert first['point'] == {'bw': '2Mbps', 'q': '10'}
+    assert first['params'] == {'numFlows': '4', 'bw': '2Mbps', 'q': '10', 'queueType': 'DropTail', 'run': '1'}
+    # Seed thay đổi nhanh nhất, rồi tới hàng đợi, rồi tới điểm của lưới
+    assert [(j['queue'], j['seed']) for j in jobs[:4]] == [('DropTail', 1), ('DropTail', 2), ('RED', 1), ('RED', 2)]
+
+
+def test_ns3_command_quotes_values():
+    cmd = ns3_command('/opt/ns3', {'logEvents': 'state,loss', 's_delay_spread': '1 ms'})
+    assert cmd[2:4] == ['run', '--no-build']
+    # ./ns3 run tách chuỗi chương trình bằng shlex
+    assert shlex.split(cmd[-1]) == [PROGRAM, '--logEvents=state,loss', '--s_delay_spread=1 ms']
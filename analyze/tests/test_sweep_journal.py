@@ -0,0 +1,92 @@
+"""
+Tests cho sweep/journal.py và resume sweep (main.py sweep --resume)
+"""
+
+import json
+import textwrap
+
+from sweep.cli import sweep_main
+from sweep.journal import Journal, JOURNAL_NAME, replay, resumable_results
+
+
+# ./ns3 giả: ghi summary như simulator, thất bại khi --fail=1 trừ khi đã có file 'fixed'
+FAKE_NS3 = textwrap.dedent('''
+    import shlex, sys
+    from pathlib import Path
+    here = Path(__file__).parent
+    opts = dict(arg[2:].split('=', 1) for arg in shlex.split(sys.argv[-1])[1:])
+    with open(here / 'calls.txt', 'a') as f:
+        f.write(opts['prefix_file_name'] + '\\n')
+    if opts.get('fail') == '1' and not (here / 'fixed').exists():
+        sys.exit(3)
+    name = f"{opts['prefix_file_name']}_20260101_000000_summary_{opts['queueType']}.txt"
+    Path(opts['results_dir'], name).write_text('Total Throughput: 1.0 Mbps\\n')
+''')
+
+
+def _records(*states):
+    return {f"s-{i:04d}": {'event': 'job', 'prefix': f"s-{i:04d}", 'state': s} for i, s in enumerate(states)}
+
+
+def test_resumable_results_keeps_done_and_failed():
+    records = _records('done', 'failed', 'running', 'queued', 'cancelled')
+    assert sorted(resumable_results(records)) == ['s-0000', 's-0001']
+    assert sorted(resumable_results(records, retry_failed=True)) == ['s-0000']
+
+
+def test_replay_latest_state_and_truncated_line(tmp_path):
+    path = tmp_path / JOURNAL_NAME
+    journal = Journal(path)
+    journal.append('sweep', name='s', grid={'q': ['1']})
+    journal.job({'prefix': 's-0000'}, 'queued')
+    journal.job({'prefix': 's-0000'}, 'running')
+    journal.job({'prefix': 's-0000'}, 'done', returncode=0)
+    journal.job({'prefix': 's-0001'}, 'running')
+    journal.close()
+    # Tiến trình chết khi đang ghi dòng cuối
+    with open(path, 'a') as f:
+        f.write('{"event":"job","prefix":"s-0001","sta')
+
+    spec, records = replay(path)
+    assert spec['name'] == 's' and spec['grid'] == {'q': ['1']}
+    assert records['s-0000']['state'] == 'done' and records['s-0000']['returncode'] == 0
+    assert records['s-0001']['state'] == 'running'
+
+
+def _sweep(tmp_path, *argv):
+    return sweep_main(['--ns3-dir', str(tmp_path / 'ns3'), '--no-build', '--no-cache',
+                       '--jobs', '2', *argv])
+
+
+def _calls(tmp_path):
+    path = tmp_path / 'ns3' / 'calls.txt'
+    return path.read_text().split() if path.exists() else []
+
+
+def test_resume_and_retry_failed(tmp_path):
+    (tmp_path / 'ns3').mkdir()
+    (tmp_path / 'ns3' / 'ns3').write_text(FAKE_NS3)
+    out_dir = tmp_path / 'sweeps' / 'sw'
+
+    # 2 giá trị fail x 1 hàng đợi x 2 seeds: 2 job thất bại
+    assert _sweep(tmp_path, '--param', 'fail=0,1', '--queues', 'RED', '--seeds', '1-2',
+                  '--results-dir', str(tmp_path / 'sweeps'), '--name', 'sw') == 1
+    assert len(_calls(tmp_path)) == 4
+    manifest = json.loads((out_dir / 'sweep_manifest.json').read_text())
+    failed = sorted(j['prefix'] for j in manifest['jobs'] if j['status'] == 'failed')
+    assert failed == ['sw-0002', 'sw-0003']
+
+    # Resume không --retry-failed: job xong và job lỗi đều được giữ, không chạy lại gì
+    assert _sweep(tmp_path, '--resume', str(out_dir)) == 1
+    assert len(_calls(tmp_path)) == 4
+
+    # --retry-failed: chỉ chạy lại job lỗi
+    (tmp_path / 'ns3' / 'fixed').touch()
+    assert _sweep(tmp_path, '--resume', str(out_dir), '--retry-failed') == 0
+    assert sorted(_calls(tmp_path)[4:]) == failed
+    manifest = json.loads((out_dir / 'sweep_manifest.json').read_text())
+    assert all(j['status'] == 'done' for j in manifest['jobs'])
+    assert sum(1 for j in manifest['jobs'] if j.get('resumed')) == 2
+
+    _, records = replay(out_dir / JOURNAL_NAME)
+    assert {r['state'] for r in records.values()} == {'done'}
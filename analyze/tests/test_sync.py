@@ -0,0 +1,66 @@
+"""
+Tests cho analyzer/sync_utils.py: tương quan chéo qua FFT, lưới chung, mất gói trùng nhau
+"""
+
+import numpy as np
+import pytest
+
+from analyzer.sync_utils import cross_correlation, resample_flows, loss_coincidence
+
+T = 400
+
+
+def _shifted_rows(shift=3):
+    a = np.random.default_rng(5).normal(size=T + shift)
+    # Hàng 1 lặp lại hàng 0 trễ 'shift' bước; hàng 2 là hằng
+    return np.vstack([a[shift:shift + T], a[:T], np.ones(T)])
+
+
+def _pearson_at_lag(x, y, lag):
+    """Tương quan như cross_correlation: sum x[t] * y[t + lag] trên chuỗi đã chuẩn hoá toàn bộ"""
+    x = (x - x.mean()) / np.linalg.norm(x - x.mean())
+    y = (y - y.mean()) / np.linalg.norm(y - y.mean())
+    return np.dot(x[:len(x) - lag], y[lag:]) if lag >= 0 else np.dot(x[-lag:], y[:len(y) + lag])
+
+
+def test_cross_correlation_lag_and_peak():
+    result = cross_correlation(_shifted_rows(), max_lag=10)
+    assert result['lag'][0, 1] == 3 and result['lag'][1, 0] == -3
+    assert result['peak'][0, 1] == pytest.approx(result['peak'][1, 0])
+    assert result['peak'][0, 1] > 0.98
+    assert result['peak'][0, 0] == pytest.approx(1.0) and result['lag'][0, 0] == 0
+    # Chuỗi hằng: không xác định
+    assert np.isnan(result['peak'][2]).all() and np.isnan(result['zero_lag'][:, 2]).all()
+
+
+def test_cross_correlation_matches_direct_sum():
+    matrix = _shifted_rows()
+    result = cross_correlation(matrix, max_lag=10)
+    assert result['zero_lag'][0, 1] == pytest.approx(_pearson_at_lag(matrix[0], matrix[1], 0))
+    assert result['peak'][0, 1] == pytest.approx(_pearson_at_lag(matrix[0], matrix[1], 3))
+
+
+def test_cross_correlation_lag_limited():
+    # Độ trễ thật nằm ngoài ±max_lag: đỉnh không thể ở độ trễ 3
+    result = cross_correlation(_shifted_rows(), max_lag=2)
+    assert abs(result['lag'][0, 1]) <= 2 and result['peak'][0, 1] < 0.5
+
+
+def test_resample_flows_common_window():
+    flow_cwnd = {1: {'time': np.array([0.0, 0.5, 2.0]), 'cwnd': np.array([1.0, 2.0, 3.0])},
+                 0: {'time': np.array([0.2, 1.0]), 'cwnd': np.array([5.0, 6.0])},
+                 2: {'time': np.empty(0), 'cwnd': np.empty(0)}}
+    flow_ids, grid, matrix = resample_flows(flow_cwnd, step=0.2)
+    assert flow_ids == [0, 1]
+    np.testing.assert_allclose(grid, [0.2, 0.4, 0.6, 0.8])
+    np.testing.assert_array_equal(matrix, [[5, 5, 5, 5], [1, 1, 2, 2]])
+
+
+def test_loss_coincidence():
+    result = loss_coincidence([np.array([1.0, 5.0]), np.array([1.05, 9.0])], window=0.1, duration=10.0)
+    assert result['losses'] == 4
+    np.testing.assert_array_equal(result['others'], [1, 0, 1, 0])
+    assert result['matrix'][0, 1] == 0.5 and result['matrix'][1, 0] == 0.5
+    assert np.isnan(result['matrix'][0, 0])
+    assert result['rate'] == 0.5
+    assert result['baseline'] == pytest.approx(1 - np.exp(-2 * 2 * 0.1 / 10.0))
@@ -0,0 +1,100 @@
+"""
+Tests cho analyzer/warmup_utils.py: MSER-5, trung bình theo thời gian, cắt warm-up
+"""
+
+import numpy as np
+import pytest
+
+from analyzer.metrics_utils import RunMetrics
+from analyzer.warmup_utils import time_average, mser, detect_warmup, truncate_data, steady_table
+
+
+def _noise(n, seed=6):
+    return np.random.default_rng(seed).normal(50.0, 2.0, n)
+
+
+def test_mser_cuts_at_end_of_transient():
+    values = _noise(1000)
+    values[:100] += np.linspace(-50.0, 0.0, 100)  # slow start: tăng dần tới mức ổn định
+    result = mser(values)
+    assert result['batches'] == 200 and result['reliable']
+    assert 80 <= result['index'] <= 120
+    assert result['index'] % 5 == 0
+    assert len(result['statistic']) == 100  # chỉ xét nửa đầu
+
+
+def test_mser_stationary_series_keeps_most_data():
+    result = mser(_noise(1000))
+    assert result['reliable']
+    assert result['index'] < 250
+
+
+def test_mser_trend_is_unreliable():
+    # Chuỗi tăng suốt lần chạy: điểm cắt chạm giới hạn nửa đầu
+    result = mser(np.arange(1000.0))
+    assert not result['reliable']
+    assert result['index'] == (len(result['statistic']) - 1) * 5
+
+
+def test_mser_too_short():
+    result = mser(np.ones(9))
+    assert result == {'index': 0, 'statistic': result['statistic'], 'batches': 1, 'reliable': False}
+
+
+def test_detect_warmup_maps_index_to_time():
+    values = _noise(1000)
+    values[:100] -= 40.0
+    time = 0.1 * np.arange(1000)
+    result = detect_warmup(time, values)
+    assert result['cut'] == time[mser(values)['index']]
+    assert 10.0 <= result['cut'] <= 12.0 and result['reliable']
+
+
+def test_time_average_exact():
+    starts, means = time_average([0.0, 0.5, 2.0, 3.0], [2.0, 4.0, 6.0, 8.0], 1.0)
+    np.testing.assert_array_equal(starts, [0.0, 1.0, 2.0])
+    # [0,1): 2*0.5 + 4*0.5, [1,2): 4, [2,3): 6
+    np.testing.assert_allclose(means, [3.0, 4.0, 6.0])
+
+
+def test_time_average_keeps_whole_bins_only():
+    starts, means = time_average([0.3, 1.2, 2.7], [1.0, 3.0, 5.0], 1.0)
+    np.testing.assert_array_equal(starts, [1.0])
+    np.testing.assert_allclose(means, [0.2 * 1.0 + 0.8 * 3.0])
+    assert len(time_average([0.0], [1.0], 1.0)[0]) == 0
+
+
+def test_truncate_data_holds_cwnd_at_cut():
+    data = {
+        'time': [0.0, 1.0, 2.0, 3.0], 'cwnd': [1.0, 2.0, 3.0, 4.0],
+        'events': [{'time': 0.5, 'event': 'DUP_ACK'}, {'time': 2.5, 'event': 'DUP_ACK'}],
+        'state_changes': [{'time': 1.0}, {'time': 1.6}],
+        'flow_cwnd': {0: {'time': np.array([0.0, 2.0]), 'cwnd': np.array([1.0, 3.0])}},
+        'flow_bytes': {0: {'time': np.array([1.0, 2.0]), 'bytes': np.array([10.0, 20.0])}},
+        'summary': {}, 'metrics': object(),
+    }
+    truncated = truncate_data(data, 1.5)
+    assert truncated['time'] == [1.5, 2.0, 3.0] and truncated['cwnd'] == [2.0, 3.0, 4.0]
+    assert [e['time'] for e in truncated['events']] == [2.5]
+    assert truncated['state_changes'] == [{'time': 1.6}]
+    np.testing.assert_array_equal(truncated['flow_bytes'][0]['bytes'], [20.0])
+    assert 'metrics' not in truncated and truncated['warmup_cut'] == 1.5
+    # Dữ liệu gốc không bị sửa
+    assert data['time'][0] == 0.0 and len(data['events']) == 2
+
+
+def test_steady_table_goodput_is_bytes_over_window():
+    # 1000 byte gửi và được ACK mỗi 0.25s từ 0.25s tới 2.5s: bin 1s đầu và cuối chỉ có một phần
+    times = np.arange(1, 11) * 0.25
+    tx = np.column_stack([times - 0.05, np.arange(10) * 1000, np.full(10, 1000)])
+    ack = np.column_stack([np.r_[0.0, times], np.arange(11) * 1000])
+    data = {'time': [0.0, 2.5], 'cwnd': [1.0, 1.0], 'events': [], 'state_changes': [],
+            'flow_cwnd': {}, 'flow_bytes': {}, 'summary': {}, 'trace_filters': {}}
+    metrics = RunMetrics(data)
+    metrics.segments = (tx, ack)
+    metrics.warmup = {'cut': 1.0, 'step': 1.0}
+    table = steady_table(metrics)
+    row = table['columns']['metric'].index('goodput')
+    assert table['columns']['full'][row] == pytest.approx(10000 * 8 / 2.5 / 1e6)
+    # Sau warm-up: 7 ACK trong [1.0, 2.5]
+    assert table['columns']['steady'][row] == pytest.approx(7000 * 8 / 1.5 / 1e6)
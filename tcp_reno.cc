@@ -1,7 +1,7 @@
 // =============================================================
 // File: scratch/tcp-reno-project/tcp-reno-enhanced.cc
 // Simulate TCP Reno with DropTail vs RED Queue Comparison
-// 7-node topology with detailed FSM tracing
+// Parametric dumbbell topology (default: 7 nodes) with detailed FSM tracing
 // Compatible with ns-3.43
 // All outputs saved to results/ directory
 // =============================================================
@@ -9,11 +9,16 @@
 #include <iomanip>
 #include <fstream>
 #include <map>
+#include <set>
+#include <cmath>
+#include <cstdio>
 #include <string>
 #include <cstdlib>
 #include <unistd.h>
 #include <ctime>
 #include <sstream>
+#include <vector>
+#include <algorithm>
 
 #include "ns3/core-module.h"
 #include "ns3/network-module.h"
@@ -36,6 +41,8 @@ NS_LOG_COMPONENT_DEFINE("TcpRenoSimulation");
 static std::ofstream g_cwndStream;
 static std::ofstream g_stateStream;
 static std::ofstream g_summaryStream;
+static std::ofstream g_flowCwndStream;
+static std::ofstream g_flowBytesStream;
 
 static uint32_t g_ssthresh = 0xFFFFFFFF;
 static uint32_t g_prevCwnd = 0;
@@ -44,6 +51,37 @@ static uint32_t g_consecutiveDupAcks = 0;
 static bool g_inFastRecovery = false;
 static std::string g_currentState = "SlowStart";
 
+// Realtime plotter: when disabled (batch/sweep runs) skip the per-event
+// pacing sleep and the per-line flushes that only exist to feed it
+static bool g_realtimePlot = true;
+
+// Trace volume controls (see --logEvents, --cwndSampleInterval, --maxLogMBytes)
+static bool g_logAllEvents = true;
+static std::set<std::string> g_enabledCategories;
+static double g_cwndSampleInterval = 0.0;
+static double g_cwndMinChange = 0.0;
+static double g_lastCwndLogTime = -1.0;
+static double g_lastCwndLogValue = 0.0;
+static std::vector<double> g_flowLastLogTime;
+static std::vector<double> g_flowLastLogValue;
+static std::vector<uint64_t> g_flowAckedBytes;
+static double g_flowSampleInterval = 0.1;
+static std::string g_stateFile;
+static std::string g_stateHeader;
+static uint64_t g_maxLogBytes = 0;
+static uint32_t g_logRotateCount = 3;
+static uint32_t g_logRotations = 0;
+
+// Event tag -> category used by --logEvents
+static const std::map<std::string, std::string> g_eventCategory = {
+  {"STATE_CHANGE", "state"}, {"EXIT_FAST_RECOVERY", "state"},
+  {"UPDATE", "state"}, {"SSTHRESH_UPDATE", "state"},
+  {"DUP_ACK", "loss"}, {"TRIPLE_DUP_ACK", "loss"}, {"FAST_RECOVERY_DUP", "loss"},
+  {"RTO_CHANGE", "rto"}, {"TIMEOUT_EVENT", "rto"}, {"TIMEOUT_IN_SS", "rto"},
+  {"TX-DATA", "tx"}, {"TX-SYN", "tx"},
+  {"NEW_ACK", "ack"},
+};
+
 // Statistics counters
 static uint32_t g_totalStateChanges = 0;
 static uint32_t g_totalDupAcks = 0;
@@ -51,12 +89,77 @@ static uint32_t g_totalTimeouts = 0;
 static uint32_t g_totalFastRetransmits = 0;
 static uint32_t g_totalFastRecoveries = 0;
 
+// Convergence-based early stop: batch means of the sink throughput (one batch per check
+// interval) and the cwnd peak of every flow before each of its losses, both after dropping
+// the first kConvWarmupFraction of samples as the start-up transient
+static bool g_convergenceStop = false;
+static double g_convTolerance = 0.05;
+static double g_convCheckInterval = 1.0;
+static const uint32_t kConvMinBatches = 10;
+static const uint32_t kConvMinCycles = 10;
+static const double kConvWarmupFraction = 0.2;
+static ApplicationContainer g_sinkApps;
+static uint64_t g_convLastRxBytes = 0;
+static std::vector<double> g_convThroughput;
+static std::vector<double> g_cyclePeaks;
+static std::vector<uint32_t> g_flowCwnd;
+static double g_convThroughputCi = INFINITY;
+static double g_convCycleCi = INFINITY;
+static double g_convergedAt = -1.0;
+
+// =============================================================
+// Helper: event filtering, cwnd sampling and log rotation
+// =============================================================
+static bool
+EventEnabled(const std::string &tag)
+{
+  if (g_logAllEvents) return true;
+  auto it = g_eventCategory.find(tag);
+  // Setup/configuration events are always logged
+  if (it == g_eventCategory.end()) return true;
+  return g_enabledCategories.count(it->second) > 0;
+}
+
+// Decide whether a cwnd change should be written given the sampling options
+static bool
+CwndSampleDue(double now, double value, double lastTime, double lastValue)
+{
+  if (g_cwndSampleInterval <= 0.0 && g_cwndMinChange <= 0.0) return true;
+  if (lastTime < 0.0) return true;
+  if (g_cwndSampleInterval > 0.0 && now - lastTime >= g_cwndSampleInterval) return true;
+  if (g_cwndMinChange > 0.0 && lastValue > 0.0 &&
+      std::fabs(value - lastValue) >= g_cwndMinChange * lastValue) return true;
+  return false;
+}
+
+// Rotate the state log: .log -> .log.1 -> .log.2 ... (oldest dropped)
+static void
+RotateStateLog()
+{
+  g_stateStream.close();
+  std::remove((g_stateFile + "." + std::to_string(g_logRotateCount)).c_str());
+  for (uint32_t k = g_logRotateCount; k > 1; --k)
+  {
+    std::rename((g_stateFile + "." + std::to_string(k - 1)).c_str(),
+                (g_stateFile + "." + std::to_string(k)).c_str());
+  }
+  if (g_logRotateCount > 0)
+  {
+    std::rename(g_stateFile.c_str(), (g_stateFile + ".1").c_str());
+  }
+  g_stateStream.open(g_stateFile, std::ios::trunc);
+  g_stateStream << g_stateHeader;
+  g_logRotations++;
+}
+
 // =============================================================
 // Helper: log event to console + file
 // =============================================================
 static void
 LogEvent(const std::string &tag, const std::string &detail = "")
 {
+  if (!EventEnabled(tag)) return;
+
   double now = Simulator::Now().GetSeconds();
   std::ostringstream oss;
   oss << std::fixed << std::setprecision(3) << now;
@@ -64,18 +167,24 @@ LogEvent(const std::string &tag, const std::string &detail = "")
 
   std::cout << times << "s: [" << tag << "]";
   if (!detail.empty()) std::cout << " " << detail;
-  std::cout << std::endl;
+  std::cout << "\n";
+  if (g_realtimePlot) std::cout.flush();
 
   if (g_stateStream.is_open())
   {
     g_stateStream << std::left << std::setw(8) << times
                   << std::setw(20) << tag;
     if (!detail.empty()) g_stateStream << detail;
-    g_stateStream << std::endl;
-    g_stateStream.flush();
+    g_stateStream << "\n";
+    if (g_realtimePlot) g_stateStream.flush();
+
+    if (g_maxLogBytes > 0 && static_cast<uint64_t>(g_stateStream.tellp()) >= g_maxLogBytes)
+    {
+      RotateStateLog();
+    }
   }
 
-  usleep(10000);
+  if (g_realtimePlot) usleep(10000);
 }
 
 // =============================================================
@@ -192,11 +301,14 @@ CwndChange(uint32_t oldCwnd, uint32_t newCwnd)
     g_consecutiveDupAcks = 0;
   }
 
-  if (g_cwndStream.is_open())
+  double cwndKb = (double)newCwnd / 1024.0;
+  if (g_cwndStream.is_open() && CwndSampleDue(now, cwndKb, g_lastCwndLogTime, g_lastCwndLogValue))
   {
     g_cwndStream << std::fixed << std::setprecision(6)
-                 << now << " " << (double)newCwnd / 1024.0 << std::endl;
-    g_cwndStream.flush();
+                 << now << " " << cwndKb << "\n";
+    if (g_realtimePlot) g_cwndStream.flush();
+    g_lastCwndLogTime = now;
+    g_lastCwndLogValue = cwndKb;
   }
 
   g_prevCwnd = newCwnd;
@@ -228,9 +340,163 @@ RtoChange(Time oldRto, Time newRto)
   }
 }
 
+// Per-flow cwnd trace: one line per change, tagged with the flow index
+static void
+FlowCwndChange(uint32_t flowId, uint32_t oldCwnd, uint32_t newCwnd)
+{
+  g_flowCwnd[flowId] = newCwnd;
+  double now = Simulator::Now().GetSeconds();
+  double cwndKb = (double)newCwnd / 1024.0;
+  if (g_flowCwndStream.is_open() &&
+      CwndSampleDue(now, cwndKb, g_flowLastLogTime[flowId], g_flowLastLogValue[flowId]))
+  {
+    g_flowCwndStream << std::fixed << std::setprecision(6)
+                     << now << " " << flowId << " " << cwndKb << "\n";
+    g_flowLastLogTime[flowId] = now;
+    g_flowLastLogValue[flowId] = cwndKb;
+  }
+}
+
+// Per-flow congestion state: entering Recovery (fast retransmit) or Loss (RTO) ends a
+// sawtooth cycle; ns-3 switches the state before reducing cwnd, so the last traced cwnd
+// of the flow is the cycle peak
+static void
+FlowCongStateChange(uint32_t flowId, TcpSocketState::TcpCongState_t oldState,
+                    TcpSocketState::TcpCongState_t newState)
+{
+  bool loss = newState == TcpSocketState::CA_RECOVERY || newState == TcpSocketState::CA_LOSS;
+  if (loss && newState != oldState && g_flowCwnd[flowId] > 0)
+  {
+    g_cyclePeaks.push_back(g_flowCwnd[flowId] / 1024.0);
+  }
+}
+
+// Per-flow acked bytes: cumulative ack advance of each sender socket
+static void
+FlowAckChange(uint32_t flowId, SequenceNumber32 oldAck, SequenceNumber32 newAck)
+{
+  if (newAck > oldAck)
+  {
+    g_flowAckedBytes[flowId] += static_cast<uint32_t>(newAck - oldAck);
+  }
+}
+
+// Periodic per-flow byte sample: one line per flow, cumulative acked bytes
+static void
+SampleFlowBytes()
+{
+  double now = Simulator::Now().GetSeconds();
+  for (uint32_t i = 0; i < g_flowAckedBytes.size(); ++i)
+  {
+    g_flowBytesStream << std::fixed << std::setprecision(6)
+                      << now << " " << i << " " << g_flowAckedBytes[i] << "\n";
+  }
+  Simulator::Schedule(Seconds(g_flowSampleInterval), &SampleFlowBytes);
+}
+
+// =============================================================
+// Convergence-based early stop
+// =============================================================
+
+// Two-sided 95% Student t critical value
+static double
+TCritical95(uint32_t df)
+{
+  static const double table[] = {12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                                 2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+                                 2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042};
+  if (df == 0) return INFINITY;
+  if (df <= 30) return table[df - 1];
+  return 1.960 + 2.4 / df;
+}
+
+// Half-width of the 95% confidence interval of the mean, relative to the mean,
+// over the samples left after dropping the first kConvWarmupFraction
+static double
+RelativeHalfWidth(const std::vector<double> &samples, uint32_t minSamples)
+{
+  size_t skip = static_cast<size_t>(samples.size() * kConvWarmupFraction);
+  size_t n = samples.size() - skip;
+  if (n < minSamples || n < 2) return INFINITY;
+
+  double mean = 0.0;
+  for (size_t i = skip; i < samples.size(); ++i) mean += samples[i];
+  mean /= n;
+  if (mean <= 0.0) return INFINITY;
+
+  double var = 0.0;
+  for (size_t i = skip; i < samples.size(); ++i) var += (samples[i] - mean) * (samples[i] - mean);
+  var /= (n - 1);
+  return TCritical95(n - 1) * std::sqrt(var / n) / mean;
+}
+
+// Periodic check: one throughput batch per interval, stop once both CIs are within tolerance
+static void
+CheckConvergence()
+{
+  uint64_t rxBytes = 0;
+  for (uint32_t i = 0; i < g_sinkApps.GetN(); ++i)
+  {
+    rxBytes += DynamicCast<PacketSink>(g_sinkApps.Get(i))->GetTotalRx();
+  }
+  g_convThroughput.push_back((rxBytes - g_convLastRxBytes) * 8.0 / g_convCheckInterval / 1e6);
+  g_convLastRxBytes = rxBytes;
+
+  g_convThroughputCi = RelativeHalfWidth(g_convThroughput, kConvMinBatches);
+  g_convCycleCi = RelativeHalfWidth(g_cyclePeaks, kConvMinCycles);
+  if (g_convThroughputCi <= g_convTolerance && g_convCycleCi <= g_convTolerance)
+  {
+    g_convergedAt = Simulator::Now().GetSeconds();
+    std::ostringstream oss;
+    oss << std::fixed << std::setprecision(2) << "throughputCI=" << g_convThroughputCi * 100
+        << "% cyclePeakCI=" << g_convCycleCi * 100 << "% -> stopping";
+    LogEvent("CONVERGED", oss.str());
+    Simulator::Stop();
+    return;
+  }
+  Simulator::Schedule(Seconds(g_convCheckInterval), &CheckConvergence);
+}
+
 // =============================================================
 // Tracing setup
 // =============================================================
+static void
+SetupFlowTracing(Ptr<Application> app, uint32_t flowId)
+{
+  Ptr<BulkSendApplication> bulkApp = DynamicCast<BulkSendApplication>(app);
+  if (!bulkApp) return;
+
+  Ptr<TcpSocketBase> tcpSocket = DynamicCast<TcpSocketBase>(bulkApp->GetSocket());
+  if (!tcpSocket) return;
+
+  tcpSocket->TraceConnectWithoutContext("CongestionWindow", MakeBoundCallback(&FlowCwndChange, flowId));
+  tcpSocket->TraceConnectWithoutContext("HighestRxAck", MakeBoundCallback(&FlowAckChange, flowId));
+  if (g_convergenceStop)
+  {
+    tcpSocket->TraceConnectWithoutContext("CongState", MakeBoundCallback(&FlowCongStateChange, flowId));
+  }
+}
+
+// Format a node range for the summary: "n0, n1, n2" or "n0 .. n199"
+static std::string
+NodeRange(uint32_t first, uint32_t count)
+{
+  std::ostringstream oss;
+  if (count <= 3)
+  {
+    for (uint32_t i = 0; i < count; ++i)
+    {
+      if (i > 0) oss << ", ";
+      oss << "n" << (first + i);
+    }
+  }
+  else
+  {
+    oss << "n" << first << " .. n" << (first + count - 1);
+  }
+  return oss.str();
+}
+
 static void
 SetupTracing(Ptr<Application> app)
 {
@@ -259,6 +525,13 @@ int main(int argc, char *argv[])
   std::string queueType = "DropTail";
   double duration = 20.0;
   uint32_t numFlows = 3;
+
+  // Topology size (0 senders = one sender per flow, at least 3)
+  uint32_t numSenders = 0;
+  uint32_t numReceivers = 2;
+  double flowStartInterval = 1.0;
+  double startJitter = 0.0;
+  std::string s_delay_spread = "0ms";
   
   // Buffer sizes
   uint32_t s_buf_size = 131072;
@@ -288,13 +561,24 @@ int main(int argc, char *argv[])
   uint32_t max_mbytes_to_send = 0;
   std::string prefix_file_name = "P2P-project";
   std::string graph_output = "png";
+  std::string resultsDir = "scratch/tcp_reno_project/results/";
   bool ascii_tracing = false;
   bool pcap_tracing = false;
 
+  // Trace volume parameters
+  std::string logEvents = "all";
+  double maxLogMBytes = 0.0;
+  uint32_t logRotateCount = 3;
+
   CommandLine cmd;
   cmd.AddValue("queueType", "Queue type: DropTail or RED", queueType);
   cmd.AddValue("duration", "Duration of the simulation (s)", duration);
-  cmd.AddValue("numFlows", "Number of flows to simulate (1-3)", numFlows);
+  cmd.AddValue("numFlows", "Number of flows to simulate", numFlows);
+  cmd.AddValue("numSenders", "Number of sender nodes (0 = max(numFlows, 3))", numSenders);
+  cmd.AddValue("numReceivers", "Number of receiver nodes", numReceivers);
+  cmd.AddValue("flowStartInterval", "Spacing between flow start times (s)", flowStartInterval);
+  cmd.AddValue("startJitter", "Random extra delay added to each flow start, uniform in [0, startJitter) (s)", startJitter);
+  cmd.AddValue("s_delay_spread", "Random extra delay per sender link, uniform in [0, spread) (RTT heterogeneity)", s_delay_spread);
   
   cmd.AddValue("s_buf_size", "Sender buffer size (bytes)", s_buf_size);
   cmd.AddValue("r_buf_size", "Receiver buffer size (bytes)", r_buf_size);
@@ -317,22 +601,81 @@ int main(int argc, char *argv[])
   cmd.AddValue("run", "Run id", run);
   cmd.AddValue("max_mbytes_to_send", "Maximum number of megabytes to send (MB)", max_mbytes_to_send);
   cmd.AddValue("prefix_file_name", "Prefix file name", prefix_file_name);
+  cmd.AddValue("results_dir", "Directory for output files", resultsDir);
+  cmd.AddValue("realtime_plot", "Launch the realtime cwnd plotter (disable for batch/sweep runs)", g_realtimePlot);
   cmd.AddValue("graph_output", "The type of image to output: png, svg", graph_output);
   cmd.AddValue("ascii_tracing", "Enable ASCII tracing", ascii_tracing);
   cmd.AddValue("pcap_tracing", "Enable Pcap tracing", pcap_tracing);
+  cmd.AddValue("logEvents", "Event categories to log: all or comma list of state,loss,rto,tx,ack", logEvents);
+  cmd.AddValue("cwndSampleInterval", "Write cwnd at most once per interval (s, 0 = every change)", g_cwndSampleInterval);
+  cmd.AddValue("flowSampleInterval", "Interval of the per-flow acked bytes samples (s, numFlows > 1)", g_flowSampleInterval);
+  cmd.AddValue("cwndMinChange", "Also write cwnd when it changes by this relative amount (0 = off)", g_cwndMinChange);
+  cmd.AddValue("maxLogMBytes", "Rotate the state log when it reaches this size (MB, 0 = unlimited)", maxLogMBytes);
+  cmd.AddValue("logRotateCount", "Number of rotated state log files to keep", logRotateCount);
+  cmd.AddValue("convergenceStop", "Stop before duration once throughput and cwnd cycle CIs converge", g_convergenceStop);
+  cmd.AddValue("convTolerance", "Relative 95% CI half-width for convergence (e.g. 0.05 = 5%)", g_convTolerance);
+  cmd.AddValue("convCheckInterval", "Convergence check interval = throughput batch length (s)", g_convCheckInterval);
   
   cmd.Parse(argc, argv);
 
-  // Validate number of flows
-  if (numFlows < 1 || numFlows > 3)
+  // Validate topology parameters
+  if (numFlows < 1)
+  {
+    std::cerr << "Error: numFlows must be at least 1" << std::endl;
+    return 1;
+  }
+  if (numReceivers < 1)
+  {
+    std::cerr << "Error: numReceivers must be at least 1" << std::endl;
+    return 1;
+  }
+  if (numSenders == 0)
+  {
+    numSenders = std::max<uint32_t>(numFlows, 3);
+  }
+  if (g_flowSampleInterval <= 0.0)
   {
-    std::cerr << "Error: numFlows must be between 1 and 3" << std::endl;
+    std::cerr << "Error: flowSampleInterval must be positive" << std::endl;
     return 1;
   }
+  if (g_convergenceStop && (g_convTolerance <= 0.0 || g_convCheckInterval <= 0.0))
+  {
+    std::cerr << "Error: convTolerance and convCheckInterval must be positive" << std::endl;
+    return 1;
+  }
+
+  // Parse event categories
+  if (logEvents != "all")
+  {
+    static const std::set<std::string> knownCategories = {"state", "loss", "rto", "tx", "ack"};
+    g_logAllEvents = false;
+    std::istringstream iss(logEvents);
+    std::string category;
+    while (std::getline(iss, category, ','))
+    {
+      if (category.empty()) continue;
+      if (!knownCategories.count(category))
+      {
+        std::cerr << "Error: unknown event category '" << category
+                  << "' (use state, loss, rto, tx, ack or all)" << std::endl;
+        return 1;
+      }
+      g_enabledCategories.insert(category);
+    }
+  }
+  g_maxLogBytes = static_cast<uint64_t>(maxLogMBytes * 1024.0 * 1024.0);
+  g_logRotateCount = logRotateCount;
+  g_flowLastLogTime.assign(numFlows, -1.0);
+  g_flowLastLogValue.assign(numFlows, 0.0);
+  g_flowAckedBytes.assign(numFlows, 0);
+  g_flowCwnd.assign(numFlows, 0);
 
   // Create results directory if it doesn't exist
-  std::string resultsDir = "scratch/tcp_reno_project/results/";
-  system(("mkdir -p " + resultsDir).c_str());
+  if (!resultsDir.empty() && resultsDir.back() != '/')
+  {
+    resultsDir += "/";
+  }
+  system(("mkdir -p \"" + resultsDir + "\"").c_str());
 
   // Set RNG run number
   RngSeedManager::SetRun(run);
@@ -354,36 +697,66 @@ int main(int argc, char *argv[])
   std::string cwndFile = resultsDir + unique_prefix + "_cwnd_trace_" + queueType + ".tr";
   std::string stateFile = resultsDir + unique_prefix + "_tcp_state_" + queueType + ".log";
   std::string summaryFile = resultsDir + unique_prefix + "_summary_" + queueType + ".txt";
+  std::string flowCwndFile = resultsDir + unique_prefix + "_flow_cwnd_" + queueType + ".tr";
+  std::string flowBytesFile = resultsDir + unique_prefix + "_flow_bytes_" + queueType + ".tr";
 
   g_cwndStream.open(cwndFile);
   g_stateStream.open(stateFile);
   g_summaryStream.open(summaryFile);
+  if (numFlows > 1)
+  {
+    g_flowCwndStream.open(flowCwndFile);
+    g_flowBytesStream.open(flowBytesFile);
+  }
 
-  g_stateStream << "# time      EVENT                DETAILS\n";
-  g_stateStream << "---------------------------------------------\n";
+  // Header (rewritten at the top of every rotated file) records the filters
+  std::ostringstream header;
+  header << "# time      EVENT                DETAILS\n";
+  header << "# filters: events=" << logEvents
+         << " cwndSampleInterval=" << g_cwndSampleInterval
+         << " cwndMinChange=" << g_cwndMinChange
+         << " maxLogMBytes=" << maxLogMBytes
+         << " logRotateCount=" << logRotateCount << "\n";
+  header << "---------------------------------------------\n";
+  g_stateHeader = header.str();
+  g_stateFile = stateFile;
+  g_stateStream << g_stateHeader;
 
   // =============================================================
-  // Topology: 7 nodes
-  // 3 senders (n0, n1, n2) -> 1 router (n3) -> 1 bottleneck router (n4) -> 2 receivers (n5, n6)
+  // Topology: dumbbell built programmatically
+  // N senders -> 1 router (n3) -> 1 bottleneck router (n4) -> M receivers
+  // Default (3 senders, 2 receivers) matches the original 7-node layout
   // =============================================================
   NodeContainer senders;
-  senders.Create(3);  // n0, n1, n2
+  senders.Create(numSenders);
 
   NodeContainer routers;
-  routers.Create(2);  // n3 (aggregation), n4 (bottleneck)
+  routers.Create(2);  // aggregation router, bottleneck router
 
   NodeContainer receivers;
-  receivers.Create(2);  // n5, n6
+  receivers.Create(numReceivers);
+
+  // Random streams for RTT heterogeneity and start jitter (seeded by --run)
+  Ptr<UniformRandomVariable> delayRng = CreateObject<UniformRandomVariable>();
+  Ptr<UniformRandomVariable> startRng = CreateObject<UniformRandomVariable>();
+  double delaySpread = Time(s_delay_spread).GetSeconds();
 
   // Senders -> Router n3
   PointToPointHelper p2pAccess;
   p2pAccess.SetDeviceAttribute("DataRate", StringValue(s_bandwidth));
-  p2pAccess.SetChannelAttribute("Delay", StringValue(s_delay));
   p2pAccess.SetQueue("ns3::DropTailQueue<Packet>", "MaxSize", StringValue(std::to_string(tcp_queue_size * 2) + "p"));
 
-  NetDeviceContainer devS0R3 = p2pAccess.Install(senders.Get(0), routers.Get(0));
-  NetDeviceContainer devS1R3 = p2pAccess.Install(senders.Get(1), routers.Get(0));
-  NetDeviceContainer devS2R3 = p2pAccess.Install(senders.Get(2), routers.Get(0));
+  std::vector<NetDeviceContainer> senderDevs;
+  for (uint32_t i = 0; i < numSenders; ++i)
+  {
+    Time accessDelay = Time(s_delay);
+    if (delaySpread > 0.0)
+    {
+      accessDelay += Seconds(delayRng->GetValue(0.0, delaySpread));
+    }
+    p2pAccess.SetChannelAttribute("Delay", TimeValue(accessDelay));
+    senderDevs.push_back(p2pAccess.Install(senders.Get(i), routers.Get(0)));
+  }
 
   // Router n3 -> Router n4 (BOTTLENECK with queue discipline)
   PointToPointHelper p2pBottleneck;
@@ -399,8 +772,11 @@ int main(int argc, char *argv[])
   p2pEgress.SetChannelAttribute("Delay", StringValue(r_delay));
   p2pEgress.SetQueue("ns3::DropTailQueue<Packet>", "MaxSize", StringValue(std::to_string(tcp_queue_size * 2) + "p"));
 
-  NetDeviceContainer devR4R5 = p2pEgress.Install(routers.Get(1), receivers.Get(0));
-  NetDeviceContainer devR4R6 = p2pEgress.Install(routers.Get(1), receivers.Get(1));
+  std::vector<NetDeviceContainer> receiverDevs;
+  for (uint32_t r = 0; r < numReceivers; ++r)
+  {
+    receiverDevs.push_back(p2pEgress.Install(routers.Get(1), receivers.Get(r)));
+  }
 
   // Add error model if requested
   if (error_p > 0.0)
@@ -439,26 +815,26 @@ int main(int argc, char *argv[])
   }
   tch.Install(devR3R4.Get(0)); // Install on router n3's interface to n4
 
-  // Assign IP addresses
+  // Assign IP addresses: one /24 per link, in the order
+  // sender links, bottleneck link, receiver links (10.1.1.0, 10.1.2.0, ...)
   Ipv4AddressHelper address;
-  
   address.SetBase("10.1.1.0", "255.255.255.0");
-  Ipv4InterfaceContainer ifS0R3 = address.Assign(devS0R3);
-  
-  address.SetBase("10.1.2.0", "255.255.255.0");
-  Ipv4InterfaceContainer ifS1R3 = address.Assign(devS1R3);
-  
-  address.SetBase("10.1.3.0", "255.255.255.0");
-  Ipv4InterfaceContainer ifS2R3 = address.Assign(devS2R3);
-  
-  address.SetBase("10.1.4.0", "255.255.255.0");
+
+  for (auto &dev : senderDevs)
+  {
+    address.Assign(dev);
+    address.NewNetwork();
+  }
+
   Ipv4InterfaceContainer ifR3R4 = address.Assign(devR3R4);
-  
-  address.SetBase("10.1.5.0", "255.255.255.0");
-  Ipv4InterfaceContainer ifR4R5 = address.Assign(devR4R5);
-  
-  address.SetBase("10.1.6.0", "255.255.255.0");
-  Ipv4InterfaceContainer ifR4R6 = address.Assign(devR4R6);
+  address.NewNetwork();
+
+  std::vector<Ipv4InterfaceContainer> receiverIfs;
+  for (auto &dev : receiverDevs)
+  {
+    receiverIfs.push_back(address.Assign(dev));
+    address.NewNetwork();
+  }
 
   // Enable routing
   Ipv4GlobalRoutingHelper::PopulateRoutingTables();
@@ -484,59 +860,65 @@ int main(int argc, char *argv[])
   // Calculate max bytes to send
   uint64_t maxBytes = (max_mbytes_to_send == 0) ? 0 : max_mbytes_to_send * 1024 * 1024;
 
-  // Receiver 0 (n5)
-  Address serverAddr0(InetSocketAddress(ifR4R5.GetAddress(1), port));
-  PacketSinkHelper sink0("ns3::TcpSocketFactory", serverAddr0);
-  ApplicationContainer serverApp0 = sink0.Install(receivers.Get(0));
-  serverApp0.Start(Seconds(0.0));
-  serverApp0.Stop(Seconds(duration + 1.0));
-  serverApps.Add(serverApp0);
-
-  // Receiver 1 (n6)
-  Address serverAddr1(InetSocketAddress(ifR4R6.GetAddress(1), port + 1));
-  PacketSinkHelper sink1("ns3::TcpSocketFactory", serverAddr1);
-  ApplicationContainer serverApp1 = sink1.Install(receivers.Get(1));
-  serverApp1.Start(Seconds(0.0));
-  serverApp1.Stop(Seconds(duration + 1.0));
-  serverApps.Add(serverApp1);
-
-  // Flow 1: Sender 0 -> Receiver 0
-  if (numFlows >= 1)
-  {
-    BulkSendHelper source0("ns3::TcpSocketFactory", serverAddr0);
-    source0.SetAttribute("MaxBytes", UintegerValue(maxBytes));
-    source0.SetAttribute("SendSize", UintegerValue(mtu - 40));
-    ApplicationContainer clientApp0 = source0.Install(senders.Get(0));
-    clientApp0.Start(Seconds(1.0));
-    clientApp0.Stop(Seconds(duration + 0.5));
-    clientApps.Add(clientApp0);
-    
-    // Setup tracing for first sender
-    Simulator::Schedule(Seconds(1.1), &SetupTracing, clientApp0.Get(0));
-  }
-
-  // Flow 2: Sender 1 -> Receiver 1
-  if (numFlows >= 2)
-  {
-    BulkSendHelper source1("ns3::TcpSocketFactory", serverAddr1);
-    source1.SetAttribute("MaxBytes", UintegerValue(maxBytes));
-    source1.SetAttribute("SendSize", UintegerValue(mtu - 40));
-    ApplicationContainer clientApp1 = source1.Install(senders.Get(1));
-    clientApp1.Start(Seconds(2.0));
-    clientApp1.Stop(Seconds(duration + 0.5));
-    clientApps.Add(clientApp1);
-  }
-
-  // Flow 3: Sender 2 -> Receiver 0 (competing traffic)
-  if (numFlows >= 3)
-  {
-    BulkSendHelper source2("ns3::TcpSocketFactory", serverAddr0);
-    source2.SetAttribute("MaxBytes", UintegerValue(maxBytes));
-    source2.SetAttribute("SendSize", UintegerValue(mtu - 40));
-    ApplicationContainer clientApp2 = source2.Install(senders.Get(2));
-    clientApp2.Start(Seconds(3.0));
-    clientApp2.Stop(Seconds(duration + 0.5));
-    clientApps.Add(clientApp2);
+  // One packet sink per receiver, listening on port + receiver index
+  std::vector<Address> sinkAddrs;
+  for (uint32_t r = 0; r < numReceivers; ++r)
+  {
+    Address sinkAddr(InetSocketAddress(receiverIfs[r].GetAddress(1), static_cast<uint16_t>(port + r)));
+    PacketSinkHelper sink("ns3::TcpSocketFactory", sinkAddr);
+    ApplicationContainer serverApp = sink.Install(receivers.Get(r));
+    serverApp.Start(Seconds(0.0));
+    serverApp.Stop(Seconds(duration + 1.0));
+    serverApps.Add(serverApp);
+    g_sinkApps.Add(serverApp);
+    sinkAddrs.push_back(sinkAddr);
+  }
+
+  // Flow i: sender (i mod numSenders) -> receiver (i mod numReceivers)
+  // Flows start at 1s, spaced by flowStartInterval, plus optional jitter
+  for (uint32_t i = 0; i < numFlows; ++i)
+  {
+    double startTime = 1.0 + i * flowStartInterval;
+    if (startJitter > 0.0)
+    {
+      startTime += startRng->GetValue(0.0, startJitter);
+    }
+    if (startTime >= duration + 0.5)
+    {
+      std::cerr << "Warning: flow " << i << " starts after the simulation ends, skipped" << std::endl;
+      continue;
+    }
+
+    BulkSendHelper source("ns3::TcpSocketFactory", sinkAddrs[i % numReceivers]);
+    source.SetAttribute("MaxBytes", UintegerValue(maxBytes));
+    source.SetAttribute("SendSize", UintegerValue(mtu - 40));
+    ApplicationContainer clientApp = source.Install(senders.Get(i % numSenders));
+    clientApp.Start(Seconds(startTime));
+    clientApp.Stop(Seconds(duration + 0.5));
+    clientApps.Add(clientApp);
+
+    // Detailed FSM tracing follows the first flow only
+    if (i == 0)
+    {
+      Simulator::Schedule(Seconds(startTime + 0.1), &SetupTracing, clientApp.Get(0));
+    }
+    if (g_flowCwndStream.is_open() || g_convergenceStop)
+    {
+      Simulator::Schedule(Seconds(startTime + 0.1), &SetupFlowTracing, clientApp.Get(0), i);
+    }
+  }
+
+  // Per-flow byte samples start with the first flow (t = 1s)
+  if (g_flowBytesStream.is_open())
+  {
+    Simulator::Schedule(Seconds(1.0), &SampleFlowBytes);
+  }
+
+  // Convergence checks: the first throughput batch starts with the first flow (t = 1s);
+  // duration stays the upper bound (Simulator::Stop below)
+  if (g_convergenceStop)
+  {
+    Simulator::Schedule(Seconds(1.0 + g_convCheckInterval), &CheckConvergence);
   }
 
   // Enable tracing if requested
@@ -558,7 +940,7 @@ int main(int argc, char *argv[])
   Ptr<FlowMonitor> monitor = flowmon.InstallAll();
 
   // Launch realtime plotter (optional)
- if (numFlows >= 1) {
+ if (g_realtimePlot) {
     pid_t pid = fork();
     if (pid == 0) // Child process
     {
@@ -588,6 +970,9 @@ int main(int argc, char *argv[])
   std::cout << "Queue Type: " << queueType << "\n";
   std::cout << "Duration: " << duration << " seconds\n";
   std::cout << "Number of Flows: " << numFlows << "\n";
+  std::cout << "Senders / Receivers: " << numSenders << " / " << numReceivers << "\n";
+  std::cout << "Flow Start Interval: " << flowStartInterval << " s (jitter " << startJitter << " s)\n";
+  std::cout << "Sender Delay Spread: " << s_delay_spread << "\n";
   std::cout << "MTU: " << mtu << " bytes\n";
   std::cout << "Initial CWND: " << cwnd << " segments\n";
   std::cout << "Initial SSThresh: " << ssthresh << " segments\n";
@@ -597,10 +982,24 @@ int main(int argc, char *argv[])
   std::cout << "Sender Bandwidth: " << s_bandwidth << "\n";
   std::cout << "Bottleneck Bandwidth: " << bottleneck_bandwidth << "\n";
   std::cout << "Queue Size: " << tcp_queue_size << " packets\n";
+  if (g_convergenceStop)
+  {
+    std::cout << "Convergence Stop: tolerance " << g_convTolerance * 100 << "%, check every "
+              << g_convCheckInterval << " s (max " << duration << " s)\n";
+  }
   std::cout << "========================================\n\n";
   
   Simulator::Run();
 
+  // Actual stop time: convergence may end the run before duration
+  double stopTime = Simulator::Now().GetSeconds();
+  std::string stopReason = (g_convergedAt >= 0.0) ? "converged"
+                           : (g_convergenceStop ? "max duration" : "fixed duration");
+  if (g_convergenceStop)
+  {
+    std::cout << "\nStopped at " << stopTime << " s (" << stopReason << ")\n";
+  }
+
   // =============================================================
   // Generate Summary Report
   // =============================================================
@@ -619,17 +1018,49 @@ int main(int argc, char *argv[])
   g_summaryStream << "Simulation Configuration:\n";
   g_summaryStream << "  - Duration: " << duration << " seconds\n";
   g_summaryStream << "  - Number of Flows: " << numFlows << "\n";
+  g_summaryStream << "  - Flow Start Interval: " << flowStartInterval << " s (jitter " << startJitter << " s)\n";
   g_summaryStream << "  - MTU: " << mtu << " bytes\n";
   g_summaryStream << "  - Initial CWND: " << cwnd << " segments\n";
   g_summaryStream << "  - Initial SSThresh: " << ssthresh << " segments\n";
   g_summaryStream << "  - SACK: " << (sack ? "Enabled" : "Disabled") << "\n";
-  g_summaryStream << "  - Error Rate: " << error_p << "\n\n";
+  g_summaryStream << "  - Error Rate: " << error_p << "\n";
+  std::ostringstream stopLine;
+  stopLine << std::fixed << std::setprecision(3) << stopTime;
+  g_summaryStream << "  - Stop Time: " << stopLine.str() << " s (" << stopReason << ")\n\n";
+
+  if (g_convergenceStop)
+  {
+    std::ostringstream conv;
+    conv << std::fixed << std::setprecision(2);
+    conv << "Convergence:\n";
+    conv << "  - Tolerance: " << g_convTolerance * 100 << "% (95% CI half-width), check every "
+         << g_convCheckInterval << " s\n";
+    conv << "  - Throughput CI: " << g_convThroughputCi * 100 << "% (" << g_convThroughput.size() << " batches)\n";
+    conv << "  - CWND Cycle Peak CI: " << g_convCycleCi * 100 << "% (" << g_cyclePeaks.size() << " cycles, all flows)\n\n";
+    g_summaryStream << conv.str();
+  }
+
+  g_summaryStream << "Trace Filters:\n";
+  g_summaryStream << "  - Logged Events: " << logEvents << "\n";
+  g_summaryStream << "  - CWND Sample Interval: " << g_cwndSampleInterval << " s\n";
+  g_summaryStream << "  - CWND Min Change: " << g_cwndMinChange << "\n";
+  if (numFlows > 1)
+  {
+    g_summaryStream << "  - Flow Byte Sample Interval: " << g_flowSampleInterval << " s\n";
+  }
+  g_summaryStream << "  - State Log Cap: " << maxLogMBytes << " MB x " << logRotateCount << " files\n";
+  g_summaryStream << "  - State Log Rotations: " << g_logRotations << "\n\n";
 
   g_summaryStream << "Network Topology:\n";
-  g_summaryStream << "  - 3 Senders (n0, n1, n2)\n";
-  g_summaryStream << "  - 2 Routers (n3: aggregation, n4: bottleneck)\n";
-  g_summaryStream << "  - 2 Receivers (n5, n6)\n";
-  g_summaryStream << "  - Sender Links: " << s_bandwidth << ", " << s_delay << " delay\n";
+  g_summaryStream << "  - " << numSenders << " Senders (" << NodeRange(0, numSenders) << ")\n";
+  g_summaryStream << "  - 2 Routers (n" << numSenders << ": aggregation, n" << numSenders + 1 << ": bottleneck)\n";
+  g_summaryStream << "  - " << numReceivers << " Receivers (" << NodeRange(numSenders + 2, numReceivers) << ")\n";
+  g_summaryStream << "  - Sender Links: " << s_bandwidth << ", " << s_delay << " delay";
+  if (delaySpread > 0.0)
+  {
+    g_summaryStream << " (+ up to " << s_delay_spread << " per sender)";
+  }
+  g_summaryStream << "\n";
   g_summaryStream << "  - Bottleneck Link: " << bottleneck_bandwidth << ", " << bottleneck_delay << " delay\n";
   g_summaryStream << "  - Receiver Links: " << r_bandwidth << ", " << r_delay << " delay\n\n";
 
@@ -643,7 +1074,10 @@ int main(int argc, char *argv[])
   for (auto &kv : stats)
   {
     Ipv4FlowClassifier::FiveTuple t = classifier->FindFlow(kv.first);
-    double throughput = (kv.second.rxBytes * 8.0 / duration / 1e6);
+    // Over the flow's active interval (first Tx to last Rx): the same basis whether the run
+    // converged early or ran to duration, and without the time before the flow started
+    double activeTime = (kv.second.timeLastRxPacket - kv.second.timeFirstTxPacket).GetSeconds();
+    double throughput = (activeTime > 0.0) ? (kv.second.rxBytes * 8.0 / activeTime / 1e6) : 0.0;
     double avgDelay = (kv.second.rxPackets > 0) ? 
                       (kv.second.delaySum.GetSeconds() / kv.second.rxPackets * 1000.0) : 0;
     uint32_t lostPackets = kv.second.txPackets - kv.second.rxPackets;
@@ -747,12 +1181,25 @@ int main(int argc, char *argv[])
   g_cwndStream.close();
   g_stateStream.close();
   g_summaryStream.close();
+  if (g_flowCwndStream.is_open())
+  {
+    g_flowCwndStream.close();
+  }
+  if (g_flowBytesStream.is_open())
+  {
+    g_flowBytesStream.close();
+  }
 
   std::cout << "\n========================================\n";
   std::cout << "Files generated:\n";
   std::cout << "  - " << cwndFile << "\n";
   std::cout << "  - " << stateFile << "\n";
   std::cout << "  - " << summaryFile << "\n";
+  if (numFlows > 1)
+  {
+    std::cout << "  - " << flowCwndFile << "\n";
+    std::cout << "  - " << flowBytesFile << "\n";
+  }
   std::cout << "========================================\n\n";
 
   return 0;
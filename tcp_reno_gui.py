@@ -59,8 +59,48 @@ class TCPRenoGUI:
         },
         'num_flows': {
             'name': 'Number of Flows',
-            'desc': 'Số luồng TCP đồng thời (1-3)',
-            'help': 'Số lượng kết nối TCP chạy song song qua bottleneck link. Nhiều flows → tranh chấp bandwidth nhiều hơn → dễ quan sát congestion.\n\nĐề xuất: 3 flows\n• 1 flow: Quan sát thuần túy 1 kết nối\n• 2-3 flows: Quan sát sự cạnh tranh và fairness'
+            'desc': 'Số luồng TCP đồng thời (1-500)',
+            'help': 'Số lượng kết nối TCP chạy song song qua bottleneck link. Nhiều flows → tranh chấp bandwidth nhiều hơn → dễ quan sát congestion.\n\nĐề xuất: 3 flows\n• 1 flow: Quan sát thuần túy 1 kết nối\n• 2-3 flows: Quan sát sự cạnh tranh và fairness\n• 10-200 flows: Số flow thực tế, mỗi flow có 1 sender riêng\n\nVới nhiều flows, nên giảm Start Interval để các flow bắt đầu gần nhau.'
+        },
+        'num_receivers': {
+            'name': 'Number of Receivers',
+            'desc': 'Số node nhận (receiver)',
+            'help': 'Số receiver phía sau bottleneck router. Flow i gửi tới receiver (i mod số receiver).\n\nĐề xuất: 2 receivers'
+        },
+        'start_interval': {
+            'name': 'Flow Start Interval',
+            'desc': 'Khoảng cách thời gian bắt đầu giữa các flow (s)',
+            'help': 'Flow i bắt đầu tại 1s + i × interval (+ jitter ngẫu nhiên).\n\nĐề xuất: 1.0s cho 3 flows, 0.01-0.1s cho 50-200 flows\n\nJitter: độ lệch ngẫu nhiên thêm vào thời điểm bắt đầu mỗi flow, phân phối đều trong [0, jitter).'
+        },
+        'delay_spread': {
+            'name': 'Sender Delay Spread',
+            'desc': 'Độ trễ ngẫu nhiên thêm vào mỗi sender link (RTT khác nhau)',
+            'help': 'Mỗi sender link có delay = Sender delay + U(0, spread). Tạo RTT khác nhau giữa các flow để quan sát fairness thực tế hơn.\n\nĐề xuất: 0ms (mọi flow cùng RTT) hoặc 20ms-50ms\nFormat: số + đơn vị (ms, s)'
+        },
+        'log_events': {
+            'name': 'Logged Event Categories',
+            'desc': 'Nhóm sự kiện ghi vào state log (all hoặc state,loss,rto,tx,ack)',
+            'help': 'Chọn nhóm sự kiện ghi vào file *_tcp_state_*.log. TX-DATA và NEW_ACK chiếm phần lớn log, nên bỏ tx,ack khi chạy lâu.\n\nĐề xuất: all (chạy ngắn) hoặc state,loss,rto (chạy dài)\n\n• state: STATE_CHANGE, SSTHRESH_UPDATE, ...\n• loss: DUP_ACK, TRIPLE_DUP_ACK\n• rto: RTO_CHANGE, TIMEOUT_EVENT\n• tx: TX-DATA, TX-SYN\n• ack: NEW_ACK\n\nSummary vẫn đếm đầy đủ mọi sự kiện.'
+        },
+        'cwnd_sample': {
+            'name': 'CWND Sample Interval',
+            'desc': 'Ghi CWND tối đa 1 lần mỗi khoảng (s), 0 = mọi thay đổi',
+            'help': 'Giảm kích thước *_cwnd_trace_*.tr bằng cách chỉ ghi CWND theo chu kỳ. Thay đổi CWND lớn (≥ Min Change) vẫn được ghi ngay để không mất các lần giảm cửa sổ.\n\nĐề xuất: 0 (chạy ngắn), 0.01-0.1s (chạy dài)\nMin Change: tỉ lệ thay đổi tương đối, vd 0.1 = 10%'
+        },
+        'max_log_mb': {
+            'name': 'Max State Log Size',
+            'desc': 'Xoay vòng state log khi vượt kích thước này (MB), 0 = không giới hạn',
+            'help': 'Khi state log vượt giới hạn, file hiện tại được đổi tên thành .log.1, .log.2, ... và chỉ giữ lại 3 file cũ nhất. Analyzer tự đọc các file xoay vòng theo thứ tự thời gian.\n\nĐề xuất: 0 hoặc 50-200 MB cho các lần chạy dài'
+        },
+        'sweep': {
+            'name': 'Parameter Sweep',
+            'desc': 'Chạy lưới tham số song song (mỗi tổ hợp × queue × seed là 1 job)',
+            'help': 'Mỗi tham số là key=v1,v2 (tên option của simulator), cách nhau bởi dấu ;\nVí dụ: bottleneck_bandwidth=2Mbps,5Mbps; tcp_queue_size=10-50:10\n\nCác tham số khác lấy từ form hiện tại, hàng đợi lấy từ Queue Types.\nSeeds: run id của RNG, vd 1-5 hoặc 1,3,7\nJobs: số mô phỏng chạy đồng thời (mặc định = số core)\nTimeout: thời gian tối đa mỗi job (giây), trống = không giới hạn\n\nKết quả: results/sweeps/<sweep>/ kèm sweep_manifest.json, sweep_journal.jsonl và log từng job.\nResume Sweep: chọn thư mục sweep bị gián đoạn, chỉ chạy các job chưa xong.'
+        },
+        'cache': {
+            'name': 'Result Cache',
+            'desc': 'Dùng lại kết quả đã mô phỏng với cùng tham số',
+            'help': 'Mô phỏng là tất định với cùng tham số và run id. Khi bật, mỗi lần chạy được lưu trong results/.sim_cache/ theo hash của toàn bộ tham số + mã nguồn tcp_reno.cc; lần chạy sau với cùng tham số sẽ copy kết quả thay vì chạy lại ns-3.\n\nSửa tcp_reno.cc sẽ tự làm mất hiệu lực cache. Cache tối đa 2 GB, xóa kết quả ít dùng nhất khi đầy.'
         },
         'mtu': {
             'name': 'MTU (Maximum Transmission Unit)',
@@ -171,8 +211,17 @@ class TCPRenoGUI:
             'sender_bw': '10Mbps',
             'receiver_bw': '10Mbps',
             'error_rate': '0',
+            'num_receivers': '2',
+            'start_interval': '1.0',
+            'start_jitter': '0',
+            'delay_spread': '0ms',
+            'log_events': 'all',
+            'cwnd_sample': '0',
+            'cwnd_min_change': '0',
+            'max_log_mb': '0',
             'enable_sack': True,
             'enable_nagle': False,
+            'use_cache': True,
             'queue_droptail': True,
             'queue_red': True
         }
@@ -432,7 +481,7 @@ class TCPRenoGUI:
         ToolTip(nf_label, self.PARAM_INFO['num_flows']['desc'])
         
         self.num_flows = tk.StringVar(value="3")
-        nf_spin = ttk.Spinbox(config_frame, from_=1, to=3, textvariable=self.num_flows, width=10)
+        nf_spin = ttk.Spinbox(config_frame, from_=1, to=500, textvariable=self.num_flows, width=10)
         nf_spin.grid(row=4, column=3, sticky=tk.W, pady=5)
         ToolTip(nf_spin, self.PARAM_INFO['num_flows']['help'])
         
@@ -527,28 +576,105 @@ class TCPRenoGUI:
         err_entry.grid(row=11, column=1, sticky=tk.W, pady=5)
         ToolTip(err_entry, self.PARAM_INFO['error_rate']['help'])
         
+        rcv_label = ttk.Label(config_frame, text="Receivers:")
+        rcv_label.grid(row=11, column=2, sticky=tk.W, padx=(20, 0), pady=5)
+        ToolTip(rcv_label, self.PARAM_INFO['num_receivers']['desc'])
+        
+        self.num_receivers = tk.StringVar(value="2")
+        rcv_spin = ttk.Spinbox(config_frame, from_=1, to=500, textvariable=self.num_receivers, width=10)
+        rcv_spin.grid(row=11, column=3, sticky=tk.W, pady=5)
+        ToolTip(rcv_spin, self.PARAM_INFO['num_receivers']['help'])
+        
+        # Row 12: Flow start schedule
+        si_label = ttk.Label(config_frame, text="Start Interval (s):")
+        si_label.grid(row=12, column=0, sticky=tk.W, padx=(20, 0), pady=5)
+        ToolTip(si_label, self.PARAM_INFO['start_interval']['desc'])
+        
+        self.start_interval = tk.StringVar(value="1.0")
+        si_entry = ttk.Entry(config_frame, textvariable=self.start_interval, width=12)
+        si_entry.grid(row=12, column=1, sticky=tk.W, pady=5)
+        ToolTip(si_entry, self.PARAM_INFO['start_interval']['help'])
+        
+        sj_label = ttk.Label(config_frame, text="Start Jitter (s):")
+        sj_label.grid(row=12, column=2, sticky=tk.W, padx=(20, 0), pady=5)
+        ToolTip(sj_label, self.PARAM_INFO['start_interval']['desc'])
+        
+        self.start_jitter = tk.StringVar(value="0")
+        sj_entry = ttk.Entry(config_frame, textvariable=self.start_jitter, width=10)
+        sj_entry.grid(row=12, column=3, sticky=tk.W, pady=5)
+        ToolTip(sj_entry, self.PARAM_INFO['start_interval']['help'])
+        
+        # Row 13: RTT heterogeneity
+        ds_label = ttk.Label(config_frame, text="Delay Spread:")
+        ds_label.grid(row=13, column=0, sticky=tk.W, padx=(20, 0), pady=5)
+        ToolTip(ds_label, self.PARAM_INFO['delay_spread']['desc'])
+        
+        self.delay_spread = tk.StringVar(value="0ms")
+        ds_entry = ttk.Entry(config_frame, textvariable=self.delay_spread, width=12)
+        ds_entry.grid(row=13, column=1, sticky=tk.W, pady=5)
+        ToolTip(ds_entry, self.PARAM_INFO['delay_spread']['help'])
+        
+        # Row 13-14: Trace volume
+        le_label = ttk.Label(config_frame, text="Log Events:")
+        le_label.grid(row=13, column=2, sticky=tk.W, padx=(20, 0), pady=5)
+        ToolTip(le_label, self.PARAM_INFO['log_events']['desc'])
+        
+        self.log_events = tk.StringVar(value="all")
+        le_entry = ttk.Entry(config_frame, textvariable=self.log_events, width=14)
+        le_entry.grid(row=13, column=3, sticky=tk.W, pady=5)
+        ToolTip(le_entry, self.PARAM_INFO['log_events']['help'])
+        
+        cs_label = ttk.Label(config_frame, text="CWND Sample (s/Δ):")
+        cs_label.grid(row=14, column=0, sticky=tk.W, padx=(20, 0), pady=5)
+        ToolTip(cs_label, self.PARAM_INFO['cwnd_sample']['desc'])
+        
+        cs_frame = ttk.Frame(config_frame)
+        cs_frame.grid(row=14, column=1, sticky=tk.W, pady=5)
+        self.cwnd_sample = tk.StringVar(value="0")
+        cs_entry = ttk.Entry(cs_frame, textvariable=self.cwnd_sample, width=6)
+        cs_entry.grid(row=0, column=0, sticky=tk.W)
+        ToolTip(cs_entry, self.PARAM_INFO['cwnd_sample']['help'])
+        self.cwnd_min_change = tk.StringVar(value="0")
+        cm_entry = ttk.Entry(cs_frame, textvariable=self.cwnd_min_change, width=6)
+        cm_entry.grid(row=0, column=1, sticky=tk.W, padx=(4, 0))
+        ToolTip(cm_entry, self.PARAM_INFO['cwnd_sample']['help'])
+        
+        ml_label = ttk.Label(config_frame, text="Max Log (MB):")
+        ml_label.grid(row=14, column=2, sticky=tk.W, padx=(20, 0), pady=5)
+        ToolTip(ml_label, self.PARAM_INFO['max_log_mb']['desc'])
+        
+        self.max_log_mb = tk.StringVar(value="0")
+        ml_entry = ttk.Entry(config_frame, textvariable=self.max_log_mb, width=10)
+        ml_entry.grid(row=14, column=3, sticky=tk.W, pady=5)
+        ToolTip(ml_entry, self.PARAM_INFO['max_log_mb']['help'])
+        
         # Options
-        ttk.Separator(config_frame, orient=tk.HORIZONTAL).grid(row=12, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=10)
+        ttk.Separator(config_frame, orient=tk.HORIZONTAL).grid(row=15, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=10)
         ttk.Label(config_frame, text="Options:", 
-                 font=('Arial', 10, 'bold')).grid(row=13, column=0, columnspan=2, sticky=tk.W, pady=5)
+                 font=('Arial', 10, 'bold')).grid(row=16, column=0, columnspan=2, sticky=tk.W, pady=5)
         
         self.enable_sack = tk.BooleanVar(value=True)
         sack_cb = ttk.Checkbutton(config_frame, text="Enable SACK", variable=self.enable_sack)
-        sack_cb.grid(row=14, column=0, columnspan=2, sticky=tk.W, padx=(20, 0), pady=2)
+        sack_cb.grid(row=17, column=0, columnspan=2, sticky=tk.W, padx=(20, 0), pady=2)
         ToolTip(sack_cb, self.PARAM_INFO['sack']['help'])
         
         self.enable_nagle = tk.BooleanVar(value=False)
         nagle_cb = ttk.Checkbutton(config_frame, text="Enable Nagle", variable=self.enable_nagle)
-        nagle_cb.grid(row=14, column=2, columnspan=2, sticky=tk.W, pady=2)
+        nagle_cb.grid(row=17, column=2, columnspan=2, sticky=tk.W, pady=2)
         ToolTip(nagle_cb, self.PARAM_INFO['nagle']['help'])
         
+        self.use_cache = tk.BooleanVar(value=True)
+        cache_cb = ttk.Checkbutton(config_frame, text="Reuse cached results", variable=self.use_cache)
+        cache_cb.grid(row=18, column=0, columnspan=2, sticky=tk.W, padx=(20, 0), pady=2)
+        ToolTip(cache_cb, self.PARAM_INFO['cache']['help'])
+        
         # NS-3 Directory
-        ttk.Separator(config_frame, orient=tk.HORIZONTAL).grid(row=15, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=10)
+        ttk.Separator(config_frame, orient=tk.HORIZONTAL).grid(row=19, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=10)
         ttk.Label(config_frame, text="NS-3 Directory:", 
-                 font=('Arial', 10, 'bold')).grid(row=16, column=0, columnspan=4, sticky=tk.W, pady=(5, 5))
+                 font=('Arial', 10, 'bold')).grid(row=20, column=0, columnspan=4, sticky=tk.W, pady=(5, 5))
         
         ns3_frame = ttk.Frame(config_frame)
-        ns3_frame.grid(row=17, column=0, columnspan=4, sticky=(tk.W, tk.E), padx=(20, 0))
+        ns3_frame.grid(row=21, column=0, columnspan=4, sticky=(tk.W, tk.E), padx=(20, 0))
         
         self.ns3_path = tk.StringVar(value=str(self.ns3_dir))
         ns3_entry = ttk.Entry(ns3_frame, textvariable=self.ns3_path, width=60)
@@ -560,6 +686,42 @@ class TCPRenoGUI:
         
         ns3_frame.columnconfigure(0, weight=1)
         
+        # Parameter sweep
+        ttk.Separator(config_frame, orient=tk.HORIZONTAL).grid(row=22, column=0, columnspan=4, sticky=(tk.W, tk.E), pady=10)
+        sweep_title = ttk.Label(config_frame, text="Parameter Sweep:", 
+                               font=('Arial', 10, 'bold'))
+        sweep_title.grid(row=23, column=0, columnspan=4, sticky=tk.W, pady=(5, 5))
+        ToolTip(sweep_title, self.PARAM_INFO['sweep']['desc'])
+        
+        sweep_frame = ttk.Frame(config_frame)
+        sweep_frame.grid(row=24, column=0, columnspan=4, sticky=(tk.W, tk.E), padx=(20, 0))
+        
+        self.sweep_params = tk.StringVar(value="bottleneck_bandwidth=2Mbps,5Mbps; tcp_queue_size=10,25,50")
+        sweep_entry = ttk.Entry(sweep_frame, textvariable=self.sweep_params, width=50)
+        sweep_entry.grid(row=0, column=0, columnspan=5, sticky=(tk.W, tk.E), pady=(0, 5))
+        ToolTip(sweep_entry, self.PARAM_INFO['sweep']['help'])
+        
+        ttk.Label(sweep_frame, text="Seeds:").grid(row=1, column=0, sticky=tk.W)
+        self.sweep_seeds = tk.StringVar(value="1-3")
+        ttk.Entry(sweep_frame, textvariable=self.sweep_seeds, width=8).grid(row=1, column=1, sticky=tk.W, padx=(5, 15))
+        
+        ttk.Label(sweep_frame, text="Jobs:").grid(row=1, column=2, sticky=tk.W)
+        self.sweep_jobs = tk.StringVar(value=str(os.cpu_count() or 1))
+        ttk.Spinbox(sweep_frame, from_=1, to=256, textvariable=self.sweep_jobs, width=5).grid(row=1, column=3, sticky=tk.W, padx=(5, 15))
+        
+        self.btn_sweep = ttk.Button(sweep_frame, text="🧪 Run Sweep",
+                                    command=self.run_sweep, width=16)
+        self.btn_sweep.grid(row=1, column=4, sticky=tk.E)
+        
+        ttk.Label(sweep_frame, text="Timeout (s):").grid(row=2, column=0, sticky=tk.W, pady=(5, 0))
+        self.sweep_timeout = tk.StringVar(value="")
+        ttk.Entry(sweep_frame, textvariable=self.sweep_timeout, width=8).grid(row=2, column=1, sticky=tk.W, padx=(5, 15), pady=(5, 0))
+        
+        self.btn_resume_sweep = ttk.Button(sweep_frame, text="⏯️ Resume Sweep",
+                                           command=self.resume_sweep, width=16)
+        self.btn_resume_sweep.grid(row=2, column=4, sticky=tk.E, pady=(5, 0))
+        sweep_frame.columnconfigure(0, weight=1)
+        
         # Control buttons
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=1, column=0, pady=(0, 10))
@@ -695,6 +857,11 @@ class TCPRenoGUI:
                   command=lambda: self.run_analysis('print'),
                   width=25).grid(row=6, column=0, pady=5)
         
+        ttk.Button(left_frame,
+                  text="🧵 Flow Analysis",
+                  command=lambda: self.run_analysis('flows'),
+                  width=25).grid(row=7, column=0, pady=5)
+        
         # Right panel - Comparison Analysis
         right_frame = ttk.LabelFrame(self.tab_analysis,
                                     text="⚖️ Comparison Analysis",
@@ -721,6 +888,11 @@ class TCPRenoGUI:
                   command=lambda: self.run_analysis('infographic-gui'),
                   width=25).grid(row=3, column=0, pady=5)
         
+        ttk.Button(right_frame,
+                  text="🌐 HTML Report",
+                  command=lambda: self.run_analysis('html'),
+                  width=25).grid(row=4, column=0, pady=5)
+        
         # Output section
         output_frame = ttk.LabelFrame(self.tab_analysis,
                                      text="📟 Analysis Output",
@@ -888,11 +1060,13 @@ queue management algorithms: DropTail and RED (Random Early Detection).
    • Dashboard: Comprehensive performance dashboard
    • Timeline: Detailed event timeline with annotations
    • Print Analysis: Text-based statistics in console
+   • Flow Analysis: Per-flow table + CWND small multiples (many-flow runs)
 
 ⚖️ Comparison Analysis:
    • Comparison Dashboard: Side-by-side performance metrics
    • Infographic (PDF): 5-page detailed report saved as PDF
    • Infographic (GUI): Interactive scrollable visualization
+   • HTML Report: Single offline HTML file with zoomable charts
 
 ═══════════════════════════════════════════════════════════════════════════════
 
@@ -1058,8 +1232,17 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
         self.sender_bw.set(self.default_params['sender_bw'])
         self.receiver_bw.set(self.default_params['receiver_bw'])
         self.error_rate.set(self.default_params['error_rate'])
+        self.num_receivers.set(self.default_params['num_receivers'])
+        self.start_interval.set(self.default_params['start_interval'])
+        self.start_jitter.set(self.default_params['start_jitter'])
+        self.delay_spread.set(self.default_params['delay_spread'])
+        self.log_events.set(self.default_params['log_events'])
+        self.cwnd_sample.set(self.default_params['cwnd_sample'])
+        self.cwnd_min_change.set(self.default_params['cwnd_min_change'])
+        self.max_log_mb.set(self.default_params['max_log_mb'])
         self.enable_sack.set(self.default_params['enable_sack'])
         self.enable_nagle.set(self.default_params['enable_nagle'])
+        self.use_cache.set(self.default_params['use_cache'])
         self.queue_droptail.set(self.default_params['queue_droptail'])
         self.queue_red.set(self.default_params['queue_red'])
         messagebox.showinfo("Reset", "All parameters reset to recommended defaults!")
@@ -1091,6 +1274,153 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
         thread.daemon = True
         thread.start()
         
+    def run_sweep(self):
+        """Run a parameter sweep (main.py sweep) with the current form as base parameters"""
+        if self.is_running:
+            messagebox.showwarning("Warning", "Simulation is already running!")
+            return
+        
+        queue_types = [q for q, var in (('DropTail', self.queue_droptail), ('RED', self.queue_red)) if var.get()]
+        if not queue_types:
+            messagebox.showerror("Error", "Please select at least one queue type!")
+            return
+        
+        self.console.delete('1.0', tk.END)
+        try:
+            base_params = self._collect_sim_params()
+            jobs = int(self.sweep_jobs.get())
+            if jobs < 1:
+                raise ValueError("Jobs must be at least 1")
+            timeout_args = self._sweep_timeout_args()
+        except ValueError as e:
+            self.log_to_console(f"\n❌ Invalid parameter: {str(e)}\n", 'error')
+            return
+        
+        grid = [item.strip() for item in self.sweep_params.get().split(';') if item.strip()]
+        if not grid:
+            messagebox.showerror("Error", "Please enter at least one sweep parameter (key=v1,v2)!")
+            return
+        
+        # Tham số sweep ghi đè tham số cố định cùng tên
+        swept = {item.partition('=')[0].strip() for item in grid}
+        cmd = [self.python_cmd, 'main.py', 'sweep',
+               '--queues', ','.join(queue_types),
+               '--seeds', self.sweep_seeds.get().strip() or '1',
+               '--jobs', str(jobs),
+               '--ns3-dir', self.ns3_path.get()] + timeout_args
+        if not self.use_cache.get():
+            cmd.append('--no-cache')
+        for item in grid:
+            cmd += ['--param', item.replace(' ', '')]
+        for key, value in base_params.items():
+            if key not in swept:
+                cmd += ['--set', f"{key}={value}"]
+        
+        self.log_to_console("🧪 Starting parameter sweep...\n", 'info')
+        self._start_sweep(cmd)
+    
+    def resume_sweep(self):
+        """Resume an interrupted sweep from its journal (only unfinished jobs are run)"""
+        if self.is_running:
+            messagebox.showwarning("Warning", "Simulation is already running!")
+            return
+        
+        sweeps_dir = self.results_dir / 'sweeps'
+        directory = filedialog.askdirectory(
+            title="Select Sweep to Resume",
+            initialdir=str(sweeps_dir if sweeps_dir.exists() else self.results_dir))
+        if not directory:
+            return
+        if not (Path(directory) / 'sweep_journal.jsonl').exists():
+            messagebox.showerror("Error", "Selected folder has no sweep_journal.jsonl!")
+            return
+        
+        self.console.delete('1.0', tk.END)
+        try:
+            jobs = int(self.sweep_jobs.get())
+            if jobs < 1:
+                raise ValueError("Jobs must be at least 1")
+            timeout_args = self._sweep_timeout_args()
+        except ValueError as e:
+            self.log_to_console(f"\n❌ Invalid parameter: {str(e)}\n", 'error')
+            return
+        
+        cmd = [self.python_cmd, 'main.py', 'sweep',
+               '--resume', directory,
+               '--jobs', str(jobs),
+               '--ns3-dir', self.ns3_path.get()] + timeout_args
+        if messagebox.askyesno("Resume Sweep", "Also re-run jobs that failed?"):
+            cmd.append('--retry-failed')
+        if not self.use_cache.get():
+            cmd.append('--no-cache')
+        
+        self.log_to_console(f"⏯️ Resuming sweep {Path(directory).name}...\n", 'info')
+        self._start_sweep(cmd)
+    
+    def _sweep_timeout_args(self):
+        """--timeout option from the Timeout field (empty = no limit)"""
+        value = self.sweep_timeout.get().strip()
+        if not value:
+            return []
+        if float(value) <= 0:
+            raise ValueError("Timeout must be positive")
+        return ['--timeout', value]
+    
+    def _start_sweep(self, cmd):
+        """Lock the UI and run main.py sweep in a worker thread"""
+        self.log_to_console(f"📝 Command: {' '.join(cmd)}\n\n", 'info')
+        
+        self.is_running = True
+        self.btn_run.configure(state=tk.DISABLED)
+        self.btn_sweep.configure(state=tk.DISABLED)
+        self.btn_resume_sweep.configure(state=tk.DISABLED)
+        self.btn_stop.configure(state=tk.NORMAL)
+        self.status_var.set("⏳ Sweep running...")
+        self.progress_label.config(text="🧪 Running parameter sweep...")
+        self.progress_bar.start(10)
+        
+        thread = threading.Thread(target=self._run_sweep_thread, args=(cmd,))
+        thread.daemon = True
+        thread.start()
+    
+    def _open_result_cache(self):
+        """Open the simulation result cache in results/.sim_cache (None if unavailable)"""
+        try:
+            if str(self.analyze_dir) not in sys.path:
+                sys.path.insert(0, str(self.analyze_dir))
+            from sweep.cache import SimCache
+            return SimCache(self.results_dir / '.sim_cache', self.project_dir / 'tcp_reno.cc')
+        except Exception as e:
+            self.log_to_console(f"⚠️  Result cache disabled: {e}\n", 'warning')
+            return None
+    
+    def _run_sweep_thread(self, cmd):
+        """Thread worker for parameter sweep"""
+        try:
+            process = subprocess.Popen(cmd,
+                                     cwd=str(self.analyze_dir),
+                                     stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT,
+                                     text=True,
+                                     bufsize=1)
+            self.simulation_process = process
+            
+            for line in process.stdout:
+                self.log_to_console(line)
+            
+            return_code = process.wait()
+            self.simulation_process = None
+            
+            if return_code == 0:
+                self.log_to_console("\n✅ Sweep completed successfully!\n", 'success')
+            else:
+                self.log_to_console(f"\n⚠️ Sweep finished with failed or cancelled jobs (code {return_code})\n", 'warning')
+                self.log_to_console("💡 See logs/ and sweep_manifest.json in the sweep folder, or use ⏯️ Resume Sweep\n", 'warning')
+            self._simulation_finished(return_code == 0)
+        except Exception as e:
+            self.log_to_console(f"\n❌ Error: {str(e)}\n", 'error')
+            self._simulation_finished(False)
+    
     def create_labeled_entry_with_help(self, parent, row, col, param_key, variable, **kwargs):
         """Create label + entry + help icon with tooltip"""
         info = self.PARAM_INFO.get(param_key, {})
@@ -1122,6 +1452,79 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
             self.ns3_path.set(directory)
             self.ns3_dir = Path(directory)
     
+    def _collect_sim_params(self):
+        """
+        Read and validate simulation parameters from the form
+        
+        Returns:
+            dict: {simulator option: value} for every option except queueType
+        
+        Raises:
+            ValueError: If a parameter is invalid
+        """
+        sim_time = int(self.sim_time.get())
+        num_flows = int(self.num_flows.get())
+        mtu = int(self.mtu.get())
+        cwnd = int(self.cwnd.get())
+        ssthresh = int(self.ssthresh.get())
+        tcp_queue_size = int(self.tcp_queue_size.get())
+        error_rate = float(self.error_rate.get())
+        num_receivers = int(self.num_receivers.get())
+        start_interval = float(self.start_interval.get())
+        start_jitter = float(self.start_jitter.get())
+        cwnd_sample = float(self.cwnd_sample.get())
+        cwnd_min_change = float(self.cwnd_min_change.get())
+        max_log_mb = float(self.max_log_mb.get())
+        log_events = self.log_events.get().strip().replace(' ', '') or 'all'
+        
+        # Validate ranges
+        if sim_time <= 0:
+            raise ValueError("Duration must be positive")
+        if num_flows < 1:
+            raise ValueError("Number of flows must be at least 1")
+        if num_receivers < 1:
+            raise ValueError("Number of receivers must be at least 1")
+        if start_interval < 0 or start_jitter < 0:
+            raise ValueError("Start interval and jitter must be non-negative")
+        if 1.0 + (num_flows - 1) * start_interval >= sim_time:
+            self.log_to_console(f"⚠️  WARNING: with start interval {start_interval}s some of the {num_flows} flows start after the simulation ends\n", 'warning')
+        if cwnd_sample < 0 or cwnd_min_change < 0 or max_log_mb < 0:
+            raise ValueError("CWND sampling and log size must be non-negative")
+        if log_events != 'all':
+            unknown = set(log_events.split(',')) - {'state', 'loss', 'rto', 'tx', 'ack'}
+            if unknown:
+                raise ValueError(f"Unknown event categories: {', '.join(sorted(unknown))}")
+        if error_rate < 0 or error_rate > 1:
+            raise ValueError("Error rate must be between 0 and 1")
+        if error_rate > 0.02:
+            self.log_to_console(f"⚠️  WARNING: High error rate ({error_rate*100:.1f}%) may prevent TCP connection establishment!\n", 'warning')
+            self.log_to_console("   Recommended: 0-0.01 (0-1%) for stable connections\n", 'warning')
+        
+        # Use consistent decimal format for error_rate (ensure . not ,)
+        return {
+            'duration': sim_time,
+            'numFlows': num_flows,
+            'numReceivers': num_receivers,
+            'flowStartInterval': start_interval,
+            'startJitter': start_jitter,
+            's_delay_spread': self.delay_spread.get(),
+            'mtu': mtu,
+            'cwnd': cwnd,
+            'ssthresh': ssthresh,
+            'tcp_queue_size': tcp_queue_size,
+            'error_p': str(error_rate).replace(',', '.'),
+            'bottleneck_bandwidth': self.bottleneck_bw.get(),
+            'bottleneck_delay': self.bottleneck_delay.get(),
+            's_bandwidth': self.sender_bw.get(),
+            'r_bandwidth': self.receiver_bw.get(),
+            'sack': 'true' if self.enable_sack.get() else 'false',
+            'nagle': 'true' if self.enable_nagle.get() else 'false',
+            'logEvents': log_events,
+            'cwndSampleInterval': cwnd_sample,
+            'cwndMinChange': cwnd_min_change,
+            'maxLogMBytes': max_log_mb
+        }
+    
     def _run_simulation_thread(self):
         """Thread worker for running simulation"""
         try:
@@ -1143,25 +1546,7 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
             
             # Get and validate parameters
             try:
-                sim_time = int(self.sim_time.get())
-                num_flows = int(self.num_flows.get())
-                mtu = int(self.mtu.get())
-                cwnd = int(self.cwnd.get())
-                ssthresh = int(self.ssthresh.get())
-                tcp_queue_size = int(self.tcp_queue_size.get())
-                error_rate = float(self.error_rate.get())
-                
-                # Validate ranges
-                if sim_time <= 0:
-                    raise ValueError("Duration must be positive")
-                if not 1 <= num_flows <= 3:
-                    raise ValueError("Number of flows must be 1-3")
-                if error_rate < 0 or error_rate > 1:
-                    raise ValueError("Error rate must be between 0 and 1")
-                if error_rate > 0.02:
-                    self.log_to_console(f"⚠️  WARNING: High error rate ({error_rate*100:.1f}%) may prevent TCP connection establishment!\n", 'warning')
-                    self.log_to_console("   Recommended: 0-0.01 (0-1%) for stable connections\n", 'warning')
-                    
+                sim_params = self._collect_sim_params()
             except ValueError as e:
                 self.log_to_console(f"\n❌ Invalid parameter: {str(e)}\n", 'error')
                 self.log_to_console("Please check your input values\n", 'warning')
@@ -1169,7 +1554,7 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
                 return
             
             self.log_to_console(f"📂 NS-3 Directory: {ns3_dir}\n")
-            self.log_to_console(f"📊 Simulation time: {sim_time} seconds\n")
+            self.log_to_console(f"📊 Simulation time: {sim_params['duration']} seconds\n")
             self.log_to_console(f"📦 Queue types: ", 'info')
             
             if self.queue_droptail.get():
@@ -1189,6 +1574,9 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
             
             self.log_to_console(f"\n📋 Total queues to run: {len(queue_types)}\n", 'info')
             
+            # Result cache (bỏ qua ns-3 khi đã có kết quả với cùng tham số)
+            cache = self._open_result_cache() if self.use_cache.get() else None
+            
             # Run simulation for each queue type
             all_success = True
             for i, queue_type in enumerate(queue_types):
@@ -1200,26 +1588,17 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
                 self.log_to_console(f"🚀 Running simulation {i+1}/{len(queue_types)}: {queue_type}\n", 'info')
                 self.log_to_console(f"{'='*60}\n", 'info')
                 
-                # Build command with all parameters
-                # Use consistent decimal format for error_rate (ensure . not ,)
-                error_rate_str = str(error_rate).replace(',', '.')
+                run_params = dict(sim_params, queueType=queue_type)
+                cache_key = cache.key(run_params) if cache else None
+                if cache and cache.restore(cache_key, self.results_dir, "P2P-project"):
+                    self.log_to_console(f"♻️ Cache hit: reused results of an identical {queue_type} run "
+                                        f"(key {cache_key[:12]}), ns-3 not launched\n", 'success')
+                    continue
+                before = set(self.results_dir.glob("P2P-project_*")) if cache else set()
                 
-                cmd_params = [
-                    f"--queueType={queue_type}",
-                    f"--duration={sim_time}",
-                    f"--numFlows={num_flows}",
-                    f"--mtu={mtu}",
-                    f"--cwnd={cwnd}",
-                    f"--ssthresh={ssthresh}",
-                    f"--tcp_queue_size={tcp_queue_size}",
-                    f"--error_p={error_rate_str}",
-                    f"--bottleneck_bandwidth={self.bottleneck_bw.get()}",
-                    f"--bottleneck_delay={self.bottleneck_delay.get()}",
-                    f"--s_bandwidth={self.sender_bw.get()}",
-                    f"--r_bandwidth={self.receiver_bw.get()}",
-                    f"--sack={'true' if self.enable_sack.get() else 'false'}",
-                    f"--nagle={'true' if self.enable_nagle.get() else 'false'}"
-                ]
+                # Build command with all parameters
+                cmd_params = [f"--queueType={queue_type}"] + \
+                             [f"--{key}={value}" for key, value in sim_params.items()]
                 
                 cmd_string = " ".join(cmd_params)
                 
@@ -1269,6 +1648,10 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
                     break
                 else:
                     self.log_to_console(f"\n✅ {queue_type} simulation completed!\n", 'success')
+                    if cache:
+                        new_files = set(self.results_dir.glob("P2P-project_*")) - before
+                        if cache.store(cache_key, run_params, new_files, "P2P-project"):
+                            cache.evict()
                     # Small delay between simulations
                     if i < len(queue_types) - 1:
                         self.log_to_console(f"\n⏳ Waiting 2 seconds before next simulation...\n", 'info')
@@ -1290,7 +1673,8 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
         """Stop running simulation"""
         if self.simulation_process:
             self.is_running = False
-            self.simulation_process.kill()
+            # terminate (không kill) để sweep runner kịp dừng các job ns-3 con
+            self.simulation_process.terminate()
             self.log_to_console("\n⏹️ Simulation stopped by user\n", 'warning')
             self._simulation_finished(False)
     
@@ -1302,6 +1686,8 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
         """Update UI on main thread"""
         self.is_running = False
         self.btn_run.configure(state=tk.NORMAL)
+        self.btn_sweep.configure(state=tk.NORMAL)
+        self.btn_resume_sweep.configure(state=tk.NORMAL)
         self.btn_stop.configure(state=tk.DISABLED)
         self.progress_bar.stop()
         
@@ -1399,9 +1785,11 @@ Click on the "🎮 Run Simulation" tab to begin your learning journey!
             'dashboard': f'{self.python_cmd} main.py --prefix "{prefix}" --queue {queue_type} --dashboard',
             'timeline': f'{self.python_cmd} main.py --prefix "{prefix}" --queue {queue_type} --timeline',
             'print': f'{self.python_cmd} main.py --prefix "{prefix}" --queue {queue_type} --print',
+            'flows': f'{self.python_cmd} main.py --prefix "{prefix}" --queue {queue_type} --flows',
             'comparison': f'{self.python_cmd} main.py --prefix "{prefix}" --compare --dashboard',
             'infographic-pdf': f'{self.python_cmd} main.py --prefix "{prefix}" --infographic',
-            'infographic-gui': f'{self.python_cmd} main.py --prefix "{prefix}" --infographic --gui'
+            'infographic-gui': f'{self.python_cmd} main.py --prefix "{prefix}" --infographic --gui',
+            'html': f'{self.python_cmd} main.py --prefix "{prefix}" --compare --html'
         }
         
         cmd = commands.get(analysis_type)